@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = "accounts"
+
+    def ready(self):
+        # Yetki cache versiyon damgaları için signal'ları kaydet
+        from . import signals  # noqa: F401
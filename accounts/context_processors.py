@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .services.yetki_service import yetkileri_coz
+
+
+def yetkiler(request):
+    """Şablonlara kullanıcının çözülmüş rollerini `yetki` olarak verir (ilk kullanımda çözülür)."""
+    return {'yetki': SimpleLazyObject(lambda: yetkileri_coz(getattr(request, 'user', None)))}
@@ -0,0 +1,46 @@
+"""
+Audit log saklama komutu.
+
+Gelecek ayların partisyonlarını hazırlar ve saklama süresini aşan kayıtları
+gzip'li JSONL arşiv dosyalarına taşır. Aylık (ör. cron ile her ayın 1'i)
+çalıştırılması önerilir:
+
+    python manage.py audit_log_arsivle --saklama-ay 12
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+
+from accounts.services.audit_arsiv_service import eski_kayitlari_arsivle, gelecek_partisyonlari_olustur
+
+
+class Command(BaseCommand):
+    help = "Audit log partisyonlarını hazırlar ve eski kayıtları sıkıştırılmış arşive taşır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saklama-ay', type=int, default=None,
+                            help="Canlı tabloda tutulacak ay sayısı (varsayılan AUDIT_LOG_SAKLAMA_AY)")
+        parser.add_argument('--dizin', default=None,
+                            help="Arşiv dizini (varsayılan AUDIT_LOG_ARSIV_DIZINI)")
+        parser.add_argument('--onceden-ay', type=int, default=3,
+                            help="Önceden oluşturulacak aylık partisyon sayısı")
+        parser.add_argument('--kuru', action='store_true',
+                            help="Değişiklik yapmadan arşivlenecek ayları listeler")
+
+    def handle(self, *args, **options):
+        if not options['kuru']:
+            for ad in gelecek_partisyonlari_olustur(options['onceden_ay']):
+                self.stdout.write(f"Partisyon oluşturuldu: {ad}")
+
+        try:
+            sonuc = eski_kayitlari_arsivle(options['saklama_ay'], options['dizin'], kuru=options['kuru'])
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        if not sonuc:
+            self.stdout.write("Arşivlenecek kayıt yok.")
+        for kayit in sonuc:
+            ay = kayit['ay'].strftime('%m.%Y')
+            if options['kuru']:
+                self.stdout.write(f"{ay}: ~{kayit['kayit_sayisi'] or 0} kayıt arşivlenecek")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{ay}: {kayit['kayit_sayisi']} kayıt -> {kayit['dosya']}"))
@@ -0,0 +1,46 @@
+"""
+Süresi dolmuş oturumları siler.
+
+Veritabanı oturum backend'inde süresi dolan django_session satırları
+kendiliğinden silinmez. Silme, expire_date indeksi üzerinden parça parça
+yapılır; büyük tabloda uzun süre kilit tutulmaz. Günlük (ör. cron ile)
+çalıştırılması önerilir:
+
+    python manage.py oturumlari_temizle --parti-boyutu 5000
+"""
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Süresi dolmuş veritabanı oturumlarını parça parça siler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--parti-boyutu', type=int, default=5000,
+                            help="Tek DELETE ile silinecek en fazla oturum sayısı")
+        parser.add_argument('--kuru', action='store_true',
+                            help="Silmeden, süresi dolmuş oturum sayısını gösterir")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in ('django.contrib.sessions.backends.db',
+                                           'django.contrib.sessions.backends.cached_db'):
+            self.stdout.write(f"{settings.SESSION_ENGINE} süresi dolan oturumları kendisi siler; işlem gerekmiyor.")
+            return
+
+        simdi = timezone.now()
+        suresi_dolmus = Session.objects.filter(expire_date__lt=simdi)
+        if options['kuru']:
+            self.stdout.write(f"{suresi_dolmus.count()} süresi dolmuş oturum silinecek.")
+            return
+
+        parti_boyutu = max(options['parti_boyutu'], 1)
+        toplam = 0
+        while True:
+            anahtarlar = list(suresi_dolmus.values_list('session_key', flat=True)[:parti_boyutu])
+            if not anahtarlar:
+                break
+            silinen, _ = Session.objects.filter(session_key__in=anahtarlar).delete()
+            toplam += silinen
+        self.stdout.write(self.style.SUCCESS(f"{toplam} süresi dolmuş oturum silindi."))
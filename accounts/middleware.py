@@ -1,43 +1,174 @@
-from django.core.cache import cache
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
+import cProfile
+import logging
 import time
 
+from stoktakip.performans import istek_olcumu, olcumu_kaydet
+from .services.profil_service import profil_istendi_mi, profil_izni_al, profil_kaydet
+from .services.rate_limit_service import istek_kimligi, istek_kontrol, kural_bul
+from .utils import denetim_tamponu, islem_yapan
+
+logger = logging.getLogger(__name__)
+
+
+class PerformansOlcumMiddleware:
+    """
+    İstek süresi, DB süresi, sorgu sayısı ve cache isabetlerini view bazında toplar (bkz. stoktakip/performans.py),
+    eşiği aşan sorguları yavaş sorgu kaydına yazar.
+
+    Ölçüm diğer middleware'leri de kapsasın diye listede en başa yakın durmalıdır.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'PERFORMANS_OLCUMU', True):
+            return self.get_response(request)
+
+        with istek_olcumu() as olcum:
+            response = self.get_response(request)
+        try:
+            eslesme = getattr(request, 'resolver_match', None)
+            view_adi = (eslesme.view_name or eslesme._func_path) if eslesme else '<eşleşmeyen>'
+            olcumu_kaydet(olcum, view_adi, request.method, request.path)
+            if olcum.yavas_sorgular:
+                from .services.yavas_sorgu_service import yavas_sorgulari_kaydet
+                yavas_sorgulari_kaydet(olcum.yavas_sorgular, view_adi)
+        except Exception as e:
+            logger.error(f"Performans ölçümü kaydedilemedi: {e}", exc_info=True)
+        return response
+
+
+class ProfilMiddleware:
+    """
+    Personelin istediği istekleri cProfile ile profiller (bkz. profil_service).
+
+    Kullanıcıyı görebilmek için AuthenticationMiddleware'den sonra yer almalıdır.
+    Profillenen yanıtlara X-Profil-Id başlığı eklenir.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            istendi = profil_istendi_mi(request) and profil_izni_al()
+        except Exception as e:
+            logger.error(f"Profil kontrolü hatası: {e}", exc_info=True)
+            istendi = False
+        if not istendi:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Aynı iş parçacığında başka bir profiler çalışıyor
+            return self.get_response(request)
+        baslangic = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        sure = time.perf_counter() - baslangic
+
+        try:
+            eslesme = getattr(request, 'resolver_match', None)
+            view_adi = (eslesme.view_name or eslesme._func_path) if eslesme else '<eşleşmeyen>'
+            response['X-Profil-Id'] = profil_kaydet(profiler, request, view_adi, sure, response.status_code)
+        except Exception as e:
+            logger.error(f"Profil kaydedilemedi: {e}", exc_info=True)
+        return response
+
 
 class RateLimitMiddleware:
-    """Rate limiting middleware"""
-    
+    """
+    Yol önekine göre kayan pencereli istek sınırlaması (bkz. rate_limit_service).
+
+    API isteklerinde token veya kullanıcı, diğerlerinde IP başına sayılır;
+    yanıtlara X-RateLimit-* başlıkları, reddedilenlere Retry-After eklenir.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+
+    def __call__(self, request):
+        if not getattr(settings, 'RATELIMIT_ENABLE', True):
+            return self.get_response(request)
+
+        sonuc = None
+        try:
+            kural = kural_bul(request.path, request.method)
+            if kural is not None:
+                kapsam, kimlik = istek_kimligi(request)
+                sonuc = istek_kontrol(kural, kapsam, kimlik)
+        except Exception as e:
+            # Sınırlama hatası isteği engellememeli
+            logger.error(f"Rate limit kontrol hatası: {e}", exc_info=True)
+
+        if sonuc is not None and not sonuc.izinli:
+            mesaj = 'Rate limit exceeded. Please try again later.'
+            if '/api/' in request.path:
+                response = JsonResponse({'success': False, 'error': mesaj}, status=429)
+            else:
+                response = HttpResponse(mesaj, status=429)
+            response['Retry-After'] = str(sonuc.bekleme)
+        else:
+            response = self.get_response(request)
+
+        if sonuc is not None:
+            response['X-RateLimit-Limit'] = str(sonuc.limit)
+            response['X-RateLimit-Remaining'] = str(sonuc.kalan)
+        return response
+
+
+class OturumYenilemeMiddleware:
+    """
+    Oturum süresini her istekte değil, SESSION_YENILEME_ORANI kadarı geçtiğinde uzatır.
+
+    SESSION_SAVE_EVERY_REQUEST her sayfa görüntülemesinde oturum kaydını
+    (veritabanı backend'inde django_session satırını) yeniden yazar. Bunun
+    yerine son yenileme zamanı oturumda tutulur; süre eşiği aşıldığında
+    oturum değişmiş işaretlenir ve SessionMiddleware kaydı bir kez yazar.
+    SessionMiddleware'den sonra yer almalıdır.
+    """
+
+    ANAHTAR = '_son_yenileme'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        oran = getattr(settings, 'SESSION_YENILEME_ORANI', 0.1)
+        self.esik = max(int(settings.SESSION_COOKIE_AGE * oran), 1)
+
     def __call__(self, request):
-        # Rate limiting sadece API ve login sayfaları için
-        if request.path.startswith('/api/') or request.path.startswith('/accounts/login/'):
-            try:
-                ip = self.get_client_ip(request)
-                cache_key = f'ratelimit_{ip}_{request.path}'
-                
-                # 1 dakikada 60 istek limiti
-                requests = cache.get(cache_key, 0)
-                if requests >= 60:
-                    return HttpResponse('Rate limit exceeded. Please try again later.', status=429)
-                
-                cache.set(cache_key, requests + 1, 60)  # 60 saniye TTL
-            except Exception:
-                # Cache hatası durumunda rate limiting'i atla
-                pass
-        
         response = self.get_response(request)
+
+        session = getattr(request, 'session', None)
+        # Anonim ziyaretçiye yeni oturum açılmaz; hata yanıtlarında oturum kaydedilmez
+        if session is None or session.session_key is None or response.status_code >= 500:
+            return response
+        try:
+            simdi = int(time.time())
+            if session.modified or simdi - session.get(self.ANAHTAR, 0) >= self.esik:
+                session[self.ANAHTAR] = simdi
+        except Exception as e:
+            logger.error(f"Oturum yenileme hatası: {e}", exc_info=True)
         return response
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+
+
+class AuditLogMiddleware:
+    """İstek boyunca commit edilen audit kayıtlarını toplayıp tek seferde yazar, değişiklikleri yapanı belirler"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with denetim_tamponu(), islem_yapan(request):
+            return self.get_response(request)
 
 
 class SecurityHeadersMiddleware:
@@ -0,0 +1,102 @@
+# Generated by Django 6.0 on 2026-10-19 19:40
+
+from datetime import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+ONCEDEN_AY = 3
+
+
+def _ay_baslangici(yil, ay):
+    yil, ay = yil + (ay - 1) // 12, (ay - 1) % 12 + 1
+    return timezone.make_aware(datetime(yil, ay, 1))
+
+
+def partisyonla(apps, schema_editor):
+    """accounts_auditlog tablosunu timestamp'e göre aylık RANGE partisyonlu tabloya dönüştürür (yalnızca PostgreSQL)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE accounts_auditlog RENAME TO accounts_auditlog_eski")
+        # İndeks adları yeni tabloda aynen kullanılır (Django migration durumu ile uyumlu)
+        cursor.execute("DROP INDEX IF EXISTS accounts_au_timesta_40aa9a_idx")
+        cursor.execute("DROP INDEX IF EXISTS accounts_au_user_id_1110c4_idx")
+        cursor.execute("CREATE SEQUENCE accounts_auditlog_kayit_id_seq")
+        cursor.execute("""
+            CREATE TABLE accounts_auditlog (
+                id bigint NOT NULL DEFAULT nextval('accounts_auditlog_kayit_id_seq'),
+                action varchar(20) NOT NULL,
+                object_id integer NULL CHECK (object_id >= 0),
+                model_name varchar(100) NOT NULL,
+                description text NOT NULL,
+                ip_address inet NULL,
+                user_agent text NULL,
+                timestamp timestamp with time zone NOT NULL,
+                content_type_id integer NULL
+                    REFERENCES django_content_type (id) DEFERRABLE INITIALLY DEFERRED,
+                user_id integer NULL
+                    REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+        """)
+        cursor.execute("ALTER SEQUENCE accounts_auditlog_kayit_id_seq OWNED BY accounts_auditlog.id")
+        cursor.execute("CREATE INDEX accounts_au_timesta_40aa9a_idx ON accounts_auditlog (timestamp DESC)")
+        cursor.execute("CREATE INDEX accounts_au_user_id_1110c4_idx ON accounts_auditlog (user_id, timestamp DESC)")
+        cursor.execute("CREATE TABLE accounts_auditlog_default PARTITION OF accounts_auditlog DEFAULT")
+
+        # Mevcut kayıtların ilk ayından itibaren ileriye dönük aylık partisyonlar
+        cursor.execute("SELECT MIN(timestamp) FROM accounts_auditlog_eski")
+        ilk = cursor.fetchone()[0]
+        simdi = timezone.localtime()
+        ilk = timezone.localtime(ilk) if ilk else simdi
+        baslangic = _ay_baslangici(ilk.year, ilk.month)
+        son = _ay_baslangici(simdi.year, simdi.month + ONCEDEN_AY)
+        while baslangic <= son:
+            bitis = _ay_baslangici(baslangic.year, baslangic.month + 1)
+            cursor.execute(
+                f"CREATE TABLE accounts_auditlog_p{baslangic:%Y_%m} PARTITION OF accounts_auditlog "
+                f"FOR VALUES FROM ('{baslangic.isoformat()}') TO ('{bitis.isoformat()}')"
+            )
+            baslangic = bitis
+
+        cursor.execute("""
+            INSERT INTO accounts_auditlog
+                (id, action, object_id, model_name, description, ip_address, user_agent, timestamp, content_type_id, user_id)
+            SELECT id, action, object_id, model_name, description, ip_address, user_agent, timestamp, content_type_id, user_id
+            FROM accounts_auditlog_eski
+        """)
+        cursor.execute(
+            "SELECT setval('accounts_auditlog_kayit_id_seq', COALESCE((SELECT MAX(id) FROM accounts_auditlog), 0) + 1, false)"
+        )
+        cursor.execute("DROP TABLE accounts_auditlog_eski")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_auditlog_timestamp_default'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='accounts_au_action_918219_idx',
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='content_type',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        # Partisyonlu tablo geri dönüştürülmez; Django açısından düz tabloyla aynı şekilde çalışır
+        migrations.RunPython(partisyonla, migrations.RunPython.noop),
+    ]
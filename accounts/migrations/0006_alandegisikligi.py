@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 22:40
+
+import django.contrib.postgres.indexes
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_auditlog_partisyon'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlanDegisikligi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('islem', models.CharField(choices=[('create', 'Oluşturma'), ('update', 'Güncelleme'), ('delete', 'Silme')], max_length=10)),
+                ('degisiklikler', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('content_type', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Alan Değişikliği',
+                'verbose_name_plural': 'Alan Değişiklikleri',
+                'db_table': 'accounts_alandegisikligi',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', '-timestamp'], name='alandegisikligi_nesne_idx'), django.contrib.postgres.indexes.GinIndex(fields=['degisiklikler'], name='alandegisikligi_alan_gin_idx')],
+            },
+        ),
+    ]
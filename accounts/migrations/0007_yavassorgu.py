@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 23:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alandegisikligi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YavasSorgu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parmak_izi', models.CharField(max_length=32, unique=True)),
+                ('kalip', models.TextField()),
+                ('ornek_sql', models.TextField()),
+                ('plan', models.TextField(blank=True)),
+                ('cagiran', models.CharField(blank=True, max_length=255)),
+                ('view', models.CharField(blank=True, max_length=200)),
+                ('adet', models.PositiveIntegerField(default=0)),
+                ('toplam_ms', models.FloatField(default=0)),
+                ('en_uzun_ms', models.FloatField(default=0)),
+                ('ilk_gorulme', models.DateTimeField(default=django.utils.timezone.now)),
+                ('son_gorulme', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'accounts_yavassorgu',
+                'ordering': ['-toplam_ms'],
+            },
+        ),
+    ]
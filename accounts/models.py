@@ -1,7 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
 
 
 class UserProfile(models.Model):
@@ -20,6 +23,13 @@ class UserProfile(models.Model):
 
 
 class AuditLog(models.Model):
+    """
+    Audit log kaydı.
+
+    PostgreSQL'de tablo timestamp'e göre aylık RANGE partisyonludur (birincil
+    anahtar (id, timestamp)); eski partisyonlar audit_log_arsivle komutuyla
+    sıkıştırılmış JSONL dosyalarına arşivlenir (bkz. accounts/services/audit_arsiv_service.py).
+    """
     ACTION_CHOICES = [
         ('create', 'Oluşturma'),
         ('update', 'Güncelleme'),
@@ -29,16 +39,18 @@ class AuditLog(models.Model):
         ('logout', 'Çıkış'),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Kullanıcı sorguları (user, -timestamp) indeksini kullanır; ayrı FK indeksleri tutulmaz
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
-    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True)
+    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
     object_id = models.PositiveIntegerField(null=True, blank=True)
     content_object = GenericForeignKey('content_type', 'object_id')
     model_name = models.CharField(max_length=100)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Kayıtlar toplu ve gecikmeli yazıldığından zaman log_action anında atanır
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-timestamp']
@@ -46,9 +58,77 @@ class AuditLog(models.Model):
         indexes = [
             models.Index(fields=['-timestamp']),
             models.Index(fields=['user', '-timestamp']),
-            models.Index(fields=['action', '-timestamp']),
         ]
 
     def __str__(self):
         return f"{self.user} - {self.get_action_display()} - {self.model_name} - {self.timestamp}"
 
+
+class AlanDegisikligi(models.Model):
+    """
+    Model kaydında değişen alanlar.
+
+    degisiklikler {alan: [eski, yeni]} biçimindedir; yalnızca değişen alanlar
+    tutulur. Eski değerler nesne yüklenirken alınan görüntüden gelir (bkz.
+    stoktakip/model_utils.py DegisiklikIzlemeMixin), kayıt başına ek sorgu
+    yapılmaz. "X alanındaki değişiklikler" sorguları GIN indeksini kullanır.
+    """
+    ISLEM_CHOICES = [
+        ('create', 'Oluşturma'),
+        ('update', 'Güncelleme'),
+        ('delete', 'Silme'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, db_index=False)
+    object_id = models.PositiveBigIntegerField()
+    islem = models.CharField(max_length=10, choices=ISLEM_CHOICES)
+    degisiklikler = models.JSONField(encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['-timestamp']
+        db_table = 'accounts_alandegisikligi'
+        verbose_name = "Alan Değişikliği"
+        verbose_name_plural = "Alan Değişiklikleri"
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', '-timestamp'], name='alandegisikligi_nesne_idx'),
+            # degisiklikler__has_key / __contains sorguları için (jsonb_ops)
+            GinIndex(fields=['degisiklikler'], name='alandegisikligi_alan_gin_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}#{self.object_id} - {self.get_islem_display()} - {', '.join(self.degisiklikler)}"
+
+
+class YavasSorgu(models.Model):
+    """
+    Eşik süresini aşan sorguların kalıp (parmak izi) bazında toplamı.
+
+    Parametre ve sabitleri ayıklanmış SQL kalıbı başına bir satır tutulur;
+    her yavaş çalışmada sayaçlar F() ile artırılır. Plan, kalıp ilk
+    görüldüğünde EXPLAIN (ANALYZE olmadan) ile bir kez alınır (bkz.
+    accounts/services/yavas_sorgu_service.py).
+    """
+    parmak_izi = models.CharField(max_length=32, unique=True)
+    kalip = models.TextField()
+    ornek_sql = models.TextField()
+    plan = models.TextField(blank=True)
+    cagiran = models.CharField(max_length=255, blank=True)
+    view = models.CharField(max_length=200, blank=True)
+    adet = models.PositiveIntegerField(default=0)
+    toplam_ms = models.FloatField(default=0)
+    en_uzun_ms = models.FloatField(default=0)
+    ilk_gorulme = models.DateTimeField(default=timezone.now)
+    son_gorulme = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-toplam_ms']
+        db_table = 'accounts_yavassorgu'
+
+    def __str__(self):
+        return f"{self.adet} x {self.kalip[:80]}"
+
+    @property
+    def ortalama_ms(self) -> float:
+        return self.toplam_ms / self.adet if self.adet else 0.0
@@ -0,0 +1,375 @@
+"""
+Audit log partisyon ve arşiv servisi.
+
+accounts_auditlog PostgreSQL'de timestamp'e göre aylık RANGE partisyonludur
+(bkz. accounts/migrations/0005_auditlog_partisyon.py):
+
+- Aylık partisyonlar (accounts_auditlog_pYYYY_AA) ileriye dönük oluşturulur;
+  aralığı olmayan kayıtlar accounts_auditlog_default partisyonuna düşer ve
+  partisyon oluşturulurken oraya taşınır.
+- Saklama süresini aşan partisyonlar tablodan ayrılır (DETACH), satırları
+  id sırasıyla parça parça gzip'li JSONL dosyasına yazılır, ardından
+  partisyon silinir. Canlı tabloda DELETE/VACUUM yükü oluşmaz.
+- PostgreSQL dışındaki veritabanlarında (geliştirme) aynı arşiv ay ay
+  okuma + toplu silme ile yapılır.
+
+Arşiv dosyaları AUDIT_LOG_ARSIV_DIZINI altında audit_log_YYYY_AA.jsonl.gz
+adıyla tutulur ve bellek kullanımı sabit kalacak şekilde satır satır okunur.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from accounts.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+TABLO = 'accounts_auditlog'
+DEFAULT_PARTISYON = 'accounts_auditlog_default'
+ARSIV_DOSYA_DESENI = re.compile(r'^audit_log_(\d{4})_(\d{2})(?:_\d+)?\.jsonl\.gz$')
+PARCA_BOYUTU = 5000
+
+_SATIR_ALANLARI = (
+    'id', 'timestamp', 'user_id', 'username', 'action', 'model_name',
+    'content_type_id', 'object_id', 'description', 'ip_address', 'user_agent',
+)
+
+
+def arsiv_dizini() -> Path:
+    return Path(getattr(settings, 'AUDIT_LOG_ARSIV_DIZINI', Path(settings.BASE_DIR) / 'arsiv' / 'audit_log'))
+
+
+def _ay_baslangici(yil: int, ay: int) -> datetime:
+    """Yerel saat dilimine göre ayın ilk anı (ay 12'den büyük/1'den küçük olabilir)."""
+    yil, ay = yil + (ay - 1) // 12, (ay - 1) % 12 + 1
+    return timezone.make_aware(datetime(yil, ay, 1))
+
+
+def _partisyon_adi(baslangic: datetime) -> str:
+    return f'{TABLO}_p{baslangic:%Y_%m}'
+
+
+def partisyonlu_mu() -> bool:
+    """accounts_auditlog tablosu PostgreSQL partisyonlu tablo mu?"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLO])
+        satir = cursor.fetchone()
+    return bool(satir) and satir[0] == 'p'
+
+
+def partisyonlari_listele() -> list[dict]:
+    """
+    Bağlı aylık partisyonları döndürür.
+
+    Returns:
+        [{'ad', 'baslangic', 'satir_tahmini'}, ...] (eskiden yeniye)
+    """
+    if not partisyonlu_mu():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, c.reltuples::bigint
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s
+            ORDER BY c.relname
+        """, [TABLO])
+        satirlar = cursor.fetchall()
+    partisyonlar = []
+    for ad, tahmin in satirlar:
+        eslesme = re.match(rf'^{TABLO}_p(\d{{4}})_(\d{{2}})$', ad)
+        if eslesme:
+            partisyonlar.append({
+                'ad': ad,
+                'baslangic': _ay_baslangici(int(eslesme.group(1)), int(eslesme.group(2))),
+                'satir_tahmini': max(tahmin, 0),
+            })
+    return partisyonlar
+
+
+@transaction.atomic
+def aylik_partisyon_olustur(baslangic: datetime) -> bool:
+    """
+    Verilen ay için partisyon oluşturur; default partisyondaki o aya ait kayıtları taşır.
+
+    Args:
+        baslangic: Ayın ilk anı (yerel saat)
+
+    Returns:
+        Partisyon oluşturulduysa True, zaten varsa False
+    """
+    ad = _partisyon_adi(baslangic)
+    bitis = _ay_baslangici(baslangic.year, baslangic.month + 1)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [ad])
+        if cursor.fetchone():
+            return False
+        # Default partisyonda bu aralıkta kayıt varsa doğrudan PARTITION OF hata verir;
+        # tablo ayrı oluşturulup kayıtlar taşındıktan sonra bağlanır
+        cursor.execute(f"CREATE TABLE {ad} (LIKE {TABLO} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"WITH tasinan AS (DELETE FROM {DEFAULT_PARTISYON} WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+            f"INSERT INTO {ad} SELECT * FROM tasinan",
+            [baslangic, bitis]
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLO} ATTACH PARTITION {ad} "
+            f"FOR VALUES FROM ('{baslangic.isoformat()}') TO ('{bitis.isoformat()}')"
+        )
+    return True
+
+
+def gelecek_partisyonlari_olustur(onceden_ay: int = 3) -> list[str]:
+    """
+    Bu ay ve sonraki onceden_ay ay için eksik partisyonları oluşturur.
+
+    Returns:
+        Oluşturulan partisyon adları
+    """
+    if not partisyonlu_mu():
+        return []
+    simdi = timezone.localtime()
+    olusturulan = []
+    for fark in range(onceden_ay + 1):
+        baslangic = _ay_baslangici(simdi.year, simdi.month + fark)
+        if aylik_partisyon_olustur(baslangic):
+            olusturulan.append(_partisyon_adi(baslangic))
+    return olusturulan
+
+
+def _arsiv_dosyasi(baslangic: datetime, dizin: Path) -> Path:
+    dosya = dizin / f'audit_log_{baslangic:%Y_%m}.jsonl.gz'
+    sira = 2
+    while dosya.exists():
+        # Aynı ay sonradan (default partisyondan) tekrar arşivlenirse önceki dosya korunur
+        dosya = dizin / f'audit_log_{baslangic:%Y_%m}_{sira}.jsonl.gz'
+        sira += 1
+    return dosya
+
+
+def _satir_json(satir: dict) -> str:
+    satir = dict(satir)
+    if isinstance(satir.get('timestamp'), datetime):
+        satir['timestamp'] = satir['timestamp'].isoformat()
+    if satir.get('ip_address') is not None:
+        satir['ip_address'] = str(satir['ip_address'])
+    return json.dumps(satir, ensure_ascii=False)
+
+
+def _jsonl_yaz(parcalar: Iterator[list[dict]], dosya: Path) -> int:
+    """Satır parçalarını gzip'li JSONL olarak geçici dosyaya yazar, bitince yerine taşır."""
+    dosya.parent.mkdir(parents=True, exist_ok=True)
+    gecici = dosya.with_name(dosya.name + '.tmp')
+    sayi = 0
+    with gzip.open(gecici, 'wt', encoding='utf-8') as cikti:
+        for parca in parcalar:
+            for satir in parca:
+                cikti.write(_satir_json(satir) + '\n')
+            sayi += len(parca)
+    os.replace(gecici, dosya)
+    return sayi
+
+
+def _tablo_parcalari(tablo: str) -> Iterator[list[dict]]:
+    """Ayrılmış partisyon tablosunu id sırasıyla (keyset) parça parça okur."""
+    son_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT a.id, a.timestamp, a.user_id, u.username, a.action, a.model_name,
+                       a.content_type_id, a.object_id, a.description, host(a.ip_address), a.user_agent
+                FROM {tablo} a LEFT JOIN auth_user u ON u.id = a.user_id
+                WHERE a.id > %s ORDER BY a.id LIMIT %s
+            """, [son_id, PARCA_BOYUTU])
+            parca = [dict(zip(_SATIR_ALANLARI, satir)) for satir in cursor.fetchall()]
+        if not parca:
+            return
+        son_id = parca[-1]['id']
+        yield parca
+
+
+def _queryset_parcalari(baslangic: datetime, bitis: datetime) -> Iterator[list[dict]]:
+    """Canlı tablodaki bir ayın kayıtlarını id sırasıyla (keyset) parça parça okur."""
+    son_id = 0
+    while True:
+        parca = list(
+            AuditLog.objects.filter(timestamp__gte=baslangic, timestamp__lt=bitis, id__gt=son_id)
+            .order_by('id')
+            .values('id', 'timestamp', 'user_id', 'action', 'model_name',
+                    'content_type_id', 'object_id', 'description', 'ip_address', 'user_agent',
+                    username=F('user__username'))[:PARCA_BOYUTU]
+        )
+        if not parca:
+            return
+        son_id = parca[-1]['id']
+        yield parca
+
+
+def _ayrilmis_partisyonlar() -> list[str]:
+    """DETACH edilmiş ama arşivlenmemiş (ör. yarıda kalan çalıştırma) partisyon tabloları."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname FROM pg_class c
+            WHERE c.relname ~ %s AND c.relkind = 'r'
+              AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            ORDER BY c.relname
+        """, [rf'^{TABLO}_p[0-9]{{4}}_[0-9]{{2}}$'])
+        return [satir[0] for satir in cursor.fetchall()]
+
+
+def _partisyonu_arsivle(ad: str, baslangic: datetime, dizin: Path, bagli: bool) -> dict:
+    if bagli:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {TABLO} DETACH PARTITION {ad}")
+    dosya = _arsiv_dosyasi(baslangic, dizin)
+    sayi = _jsonl_yaz(_tablo_parcalari(ad), dosya)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {ad}")
+    return {'ay': baslangic, 'dosya': dosya.name, 'kayit_sayisi': sayi}
+
+
+def eski_kayitlari_arsivle(saklama_ay: Optional[int] = None, dizin: Optional[Path] = None, kuru: bool = False) -> list[dict]:
+    """
+    Saklama süresini aşan audit log kayıtlarını arşiv dosyalarına taşır.
+
+    Args:
+        saklama_ay: Canlı tabloda tutulacak ay sayısı (varsayılan AUDIT_LOG_SAKLAMA_AY)
+        dizin: Arşiv dizini (varsayılan AUDIT_LOG_ARSIV_DIZINI)
+        kuru: True ise hiçbir şey değiştirilmez, yalnızca arşivlenecek aylar döner
+
+    Returns:
+        [{'ay', 'dosya', 'kayit_sayisi'}, ...]
+    """
+    saklama_ay = saklama_ay if saklama_ay is not None else getattr(settings, 'AUDIT_LOG_SAKLAMA_AY', 12)
+    if saklama_ay < 1:
+        raise ValidationError("Saklama süresi en az 1 ay olmalıdır.")
+    dizin = Path(dizin) if dizin else arsiv_dizini()
+    simdi = timezone.localtime()
+    sinir = _ay_baslangici(simdi.year, simdi.month - saklama_ay + 1)
+    sonuc = []
+
+    if partisyonlu_mu():
+        for ad in _ayrilmis_partisyonlar():
+            eslesme = re.match(rf'^{TABLO}_p(\d{{4}})_(\d{{2}})$', ad)
+            baslangic = _ay_baslangici(int(eslesme.group(1)), int(eslesme.group(2)))
+            sonuc.append({'ay': baslangic, 'dosya': None, 'kayit_sayisi': None} if kuru
+                         else _partisyonu_arsivle(ad, baslangic, dizin, bagli=False))
+        for partisyon in partisyonlari_listele():
+            if partisyon['baslangic'] >= sinir:
+                continue
+            sonuc.append({'ay': partisyon['baslangic'], 'dosya': None, 'kayit_sayisi': partisyon['satir_tahmini']} if kuru
+                         else _partisyonu_arsivle(partisyon['ad'], partisyon['baslangic'], dizin, bagli=True))
+
+    # Partisyonsuz veritabanı veya default partisyona düşmüş eski kayıtlar
+    aylar = (
+        AuditLog.objects.filter(timestamp__lt=sinir)
+        .annotate(ay=TruncMonth('timestamp'))
+        .values_list('ay', flat=True).distinct().order_by('ay')
+    )
+    for ay in list(aylar):
+        ay = timezone.localtime(ay)
+        baslangic = _ay_baslangici(ay.year, ay.month)
+        bitis = _ay_baslangici(ay.year, ay.month + 1)
+        ay_kayitlari = AuditLog.objects.filter(timestamp__gte=baslangic, timestamp__lt=bitis)
+        if kuru:
+            sonuc.append({'ay': baslangic, 'dosya': None, 'kayit_sayisi': ay_kayitlari.count()})
+            continue
+        dosya = _arsiv_dosyasi(baslangic, dizin)
+        sayi = _jsonl_yaz(_queryset_parcalari(baslangic, bitis), dosya)
+        ay_kayitlari.delete()
+        sonuc.append({'ay': baslangic, 'dosya': dosya.name, 'kayit_sayisi': sayi})
+
+    for kayit in sonuc:
+        if kayit['dosya']:
+            logger.info(f"Audit log arşivlendi: {kayit['dosya']} ({kayit['kayit_sayisi']} kayıt)")
+    return sonuc
+
+
+def arsiv_dosyalari(dizin: Optional[Path] = None) -> list[dict]:
+    """
+    Arşiv dosyalarını yeniden eskiye döndürür.
+
+    Returns:
+        [{'ad', 'ay', 'boyut', 'olusturma'}, ...]
+    """
+    dizin = Path(dizin) if dizin else arsiv_dizini()
+    if not dizin.is_dir():
+        return []
+    dosyalar = []
+    for dosya in dizin.iterdir():
+        eslesme = ARSIV_DOSYA_DESENI.match(dosya.name)
+        if not eslesme or not dosya.is_file():
+            continue
+        bilgi = dosya.stat()
+        dosyalar.append({
+            'ad': dosya.name,
+            'ay': f'{eslesme.group(2)}.{eslesme.group(1)}',
+            'boyut': bilgi.st_size,
+            'olusturma': timezone.make_aware(datetime.fromtimestamp(bilgi.st_mtime)),
+        })
+    return sorted(dosyalar, key=lambda d: d['ad'], reverse=True)
+
+
+def arsiv_dosya_yolu(ad: str, dizin: Optional[Path] = None) -> Path:
+    """
+    Arşiv dosyasının yolunu döndürür; yalnızca arşiv dizinindeki arşiv dosyalarına izin verir.
+
+    Raises:
+        ValidationError: Dosya adı geçersizse veya dosya yoksa
+    """
+    if not ARSIV_DOSYA_DESENI.match(ad or ''):
+        raise ValidationError("Geçersiz arşiv dosyası.")
+    dosya = (Path(dizin) if dizin else arsiv_dizini()) / ad
+    if not dosya.is_file():
+        raise ValidationError("Arşiv dosyası bulunamadı.")
+    return dosya
+
+
+def arsiv_kayitlari(ad: str, arama: str = '', action: str = '', sayfa: int = 1, sayfa_boyutu: int = 50) -> dict:
+    """
+    Arşiv dosyasındaki kayıtları filtreleyerek sayfa sayfa okur.
+
+    Dosya satır satır açılır; istenen sayfa dolunca okuma durur, toplam
+    sayım için dosyanın tamamı okunmaz.
+
+    Returns:
+        {'kayitlar': [...], 'sayfa', 'onceki_var', 'sonraki_var'}
+    """
+    dosya = arsiv_dosya_yolu(ad)
+    arama = (arama or '').casefold()
+    atla = (sayfa - 1) * sayfa_boyutu
+    kayitlar = []
+    sonraki_var = False
+    with gzip.open(dosya, 'rt', encoding='utf-8') as girdi:
+        for satir in girdi:
+            kayit = json.loads(satir)
+            if action and kayit.get('action') != action:
+                continue
+            if arama and not any(
+                arama in str(kayit.get(alan) or '').casefold() for alan in ('description', 'model_name', 'username')
+            ):
+                continue
+            if atla:
+                atla -= 1
+                continue
+            if len(kayitlar) == sayfa_boyutu:
+                sonraki_var = True
+                break
+            kayit['timestamp'] = datetime.fromisoformat(kayit['timestamp']) if kayit.get('timestamp') else None
+            kayitlar.append(kayit)
+    return {'kayitlar': kayitlar, 'sayfa': sayfa, 'onceki_var': sayfa > 1, 'sonraki_var': sonraki_var}
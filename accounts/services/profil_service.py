@@ -0,0 +1,208 @@
+"""
+İstek üzerine profil çıkarma servisi.
+
+ProfilMiddleware (accounts/middleware.py) yalnızca açıkça istenen istekleri
+cProfile ile profiller:
+
+- Personel oturumunda `?_profil=1` parametresi, ya da personelin ürettiği
+  imzalı, süreli token'ı taşıyan X-Stoktakip-Profil başlığı (token ile
+  çağrılan API'ler ve oturumsuz araçlar için).
+- Profil sayısı tüm kullanıcılar için PROFIL_PENCERE saniyede PROFIL_LIMITI
+  ile sınırlıdır (rate_limit_service sayaçları); profil yükü üretimde
+  kontrolsüz büyümez. Sınır aşılırsa istek profillenmeden çalışır.
+
+Profiller PROFIL_DIZINI altında pstats dosyası (.prof) ve yanında view adı,
+parametreler ve en pahalı fonksiyonları içeren JSON olarak saklanır; en
+yeni PROFIL_SAKLAMA_SAYISI profil tutulur.
+"""
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .rate_limit_service import Kural, istek_kontrol
+
+logger = logging.getLogger(__name__)
+
+PROFIL_PARAMETRESI = '_profil'
+PROFIL_BASLIGI = 'HTTP_X_STOKTAKIP_PROFIL'
+_IMZA_TUZU = 'stoktakip.profil'
+PROFIL_ID_DESENI = re.compile(r'^\d{8}_\d{6}_[0-9a-f]{8}$')
+EN_PAHALI_SAYISI = 30
+
+
+def profil_dizini() -> Path:
+    return Path(getattr(settings, 'PROFIL_DIZINI', settings.BASE_DIR / 'profiller'))
+
+
+def profil_tokeni_olustur(user) -> str:
+    """X-Stoktakip-Profil başlığında kullanılacak imzalı token (PROFIL_TOKEN_SURESI boyunca geçerli)."""
+    return signing.dumps({'u': user.pk}, salt=_IMZA_TUZU, compress=True)
+
+
+def _token_gecerli(token: str) -> bool:
+    try:
+        veri = signing.loads(token, salt=_IMZA_TUZU, max_age=getattr(settings, 'PROFIL_TOKEN_SURESI', 3600))
+    except (signing.BadSignature, TypeError, ValueError):
+        return False
+    # Token'ı üreten kullanıcının personel yetkisi geri alınmışsa token geçersizdir
+    return get_user_model().objects.filter(pk=veri.get('u'), is_active=True, is_staff=True).exists()
+
+
+def profil_istendi_mi(request) -> bool:
+    if not getattr(settings, 'PROFIL_ETKIN', True):
+        return False
+    token = request.META.get(PROFIL_BASLIGI)
+    if token:
+        return _token_gecerli(token)
+    if request.GET.get(PROFIL_PARAMETRESI) == '1':
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_authenticated and user.is_staff
+    return False
+
+
+def profil_izni_al() -> bool:
+    """Profil kotasından bir hak kullanır; kota dolmuşsa False."""
+    kural = Kural(
+        ad='profil',
+        onekler=('/',),
+        pencere=getattr(settings, 'PROFIL_PENCERE', 3600),
+        limit=getattr(settings, 'PROFIL_LIMITI', 20),
+    )
+    return istek_kontrol(kural, 'ip', 'genel').izinli
+
+
+def _en_pahali_fonksiyonlar(istatistik: pstats.Stats, sayi: int = EN_PAHALI_SAYISI) -> list[dict]:
+    satirlar = []
+    for (dosya, satir, fonksiyon), (_, cagri, ic_sure, kumulatif, _) in istatistik.stats.items():
+        satirlar.append({
+            'fonksiyon': fonksiyon,
+            'konum': f'{dosya}:{satir}',
+            'cagri': cagri,
+            'ic_sure_ms': round(ic_sure * 1000, 3),
+            'kumulatif_ms': round(kumulatif * 1000, 3),
+        })
+    satirlar.sort(key=lambda s: s['kumulatif_ms'], reverse=True)
+    return satirlar[:sayi]
+
+
+def profil_kaydet(profiler, request, view_adi: str, sure: float, durum_kodu: int) -> str:
+    """
+    Profili ve özet bilgisini diske yazar, profil kimliğini döndürür.
+
+    GET parametreleri saklanır; POST gövdesinden yalnızca alan adları
+    alınır (parola vb. değerler diske yazılmaz).
+    """
+    dizin = profil_dizini()
+    dizin.mkdir(parents=True, exist_ok=True)
+    simdi = timezone.localtime()
+    profil_id = f'{simdi:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}'
+
+    istatistik = pstats.Stats(profiler, stream=io.StringIO())
+    istatistik.dump_stats(dizin / f'{profil_id}.prof')
+
+    user = getattr(request, 'user', None)
+    ozet = {
+        'id': profil_id,
+        'zaman': simdi.isoformat(),
+        'view': view_adi,
+        'yontem': request.method,
+        'yol': request.path,
+        'parametreler': {k: v for k, v in request.GET.lists() if k != PROFIL_PARAMETRESI},
+        'post_alanlari': sorted(request.POST.keys()) if request.method == 'POST' else [],
+        'kullanici': user.get_username() if user is not None and user.is_authenticated else None,
+        'durum_kodu': durum_kodu,
+        'sure_ms': round(sure * 1000, 1),
+        'toplam_cagri': istatistik.total_calls,
+        'en_pahali': _en_pahali_fonksiyonlar(istatistik),
+    }
+    with open(dizin / f'{profil_id}.json', 'w', encoding='utf-8') as f:
+        json.dump(ozet, f, ensure_ascii=False)
+
+    _eski_profilleri_sil(dizin)
+    return profil_id
+
+
+def _ozet_dosyalari(dizin: Path) -> list[Path]:
+    """Profil özet dosyaları, yeniden eskiye."""
+    dosyalar = []
+    for dosya in dizin.glob('*.json'):
+        if not PROFIL_ID_DESENI.match(dosya.stem):
+            continue
+        try:
+            dosyalar.append((dosya.stat().st_mtime_ns, dosya))
+        except FileNotFoundError:
+            # Başka bir süreç eski profili silmiş
+            continue
+    return [dosya for _, dosya in sorted(dosyalar, reverse=True)]
+
+
+def _eski_profilleri_sil(dizin: Path) -> None:
+    saklama = getattr(settings, 'PROFIL_SAKLAMA_SAYISI', 100)
+    for profil_id in [dosya.stem for dosya in _ozet_dosyalari(dizin)][saklama:]:
+        for uzanti in ('.json', '.prof'):
+            try:
+                os.remove(dizin / f'{profil_id}{uzanti}')
+            except FileNotFoundError:
+                pass
+
+
+def profilleri_listele() -> list[dict]:
+    """Saklanan profillerin özetleri (yeniden eskiye, en pahalı fonksiyonlar hariç)."""
+    dizin = profil_dizini()
+    if not dizin.is_dir():
+        return []
+    profiller = []
+    for dosya in _ozet_dosyalari(dizin):
+        try:
+            with open(dosya, encoding='utf-8') as f:
+                ozet = json.load(f)
+        except (OSError, ValueError):
+            continue
+        ozet.pop('en_pahali', None)
+        ozet['zaman'] = datetime.fromisoformat(ozet['zaman'])
+        profiller.append(ozet)
+    return profiller
+
+
+def _profil_yolu(profil_id: str, uzanti: str) -> Path:
+    if not PROFIL_ID_DESENI.match(profil_id or ''):
+        raise ValidationError("Geçersiz profil.")
+    dosya = profil_dizini() / f'{profil_id}{uzanti}'
+    if not dosya.is_file():
+        raise ValidationError("Profil bulunamadı.")
+    return dosya
+
+
+def profil_detayi(profil_id: str) -> dict:
+    """
+    Profilin özet bilgisi ve en pahalı fonksiyonları.
+
+    Raises:
+        ValidationError: Profil kimliği geçersizse veya profil yoksa
+    """
+    with open(_profil_yolu(profil_id, '.json'), encoding='utf-8') as f:
+        ozet = json.load(f)
+    ozet['zaman'] = datetime.fromisoformat(ozet['zaman'])
+    return ozet
+
+
+def profil_dosya_yolu(profil_id: str) -> Path:
+    """
+    pstats dosyasının yolu (python -m pstats veya snakeviz ile açılabilir).
+
+    Raises:
+        ValidationError: Profil kimliği geçersizse veya dosya yoksa
+    """
+    return _profil_yolu(profil_id, '.prof')
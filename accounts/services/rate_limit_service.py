@@ -0,0 +1,290 @@
+"""
+İstek sınırlama (rate limit) servisi.
+
+Kayan pencere sayacı (sliding window counter) kullanılır:
+
+- Her kimlik (IP, kullanıcı veya API token'ı) için pencere başına bir sayaç
+  tutulur ve cache.add + cache.incr ile atomik artırılır. Redis'te INCR,
+  LocMemCache'te kilitli artırma kullanıldığından eşzamanlı isteklerde sayım
+  kaybolmaz.
+- Anlık istek sayısı, önceki pencerenin sayacı geçen süre oranında azaltılarak
+  hesaplanır: onceki * (1 - gecen / pencere) + simdiki. Sayaç anahtarı
+  pencere numarasını içerdiğinden sürekli istek gönderen istemcide de süre
+  dolar.
+- Yapılandırılan cache erişilemezse (ör. Redis hatalarının yutulduğu durum)
+  süreç içi LocMemCache'e düşülür; sınırlama devre dışı kalmaz.
+
+Kurallar yol önekine göre tanımlanır (VARSAYILAN_KURALLAR, RATELIMIT_KURALLARI
+ayarıyla değiştirilebilir); ilk eşleşen kural uygulanır. Reddedilen istekler kural ve kapsam bazında sayılır
+(rate_limit_istatistikleri).
+"""
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+KAPSAMLAR = ('ip', 'kullanici', 'token')
+_ANAHTAR_ONEKI = 'rl'
+_TOKEN_CACHE_SURESI = 300
+
+# Asıl cache kullanılamadığında devreye giren süreç içi sayaçlar
+_yedek_cache = LocMemCache('stoktakip-ratelimit', {'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 10000}})
+
+# limit: IP başına, kullanici_limit / token_limit: oturum açmış kullanıcı / API token'ı başına
+# (pencere saniyesinde); yontemler verilmezse tüm HTTP yöntemleri sayılır
+VARSAYILAN_KURALLAR = [
+    {
+        'ad': 'giris',
+        'onek': '/accounts/login/',
+        'yontemler': ('POST',),
+        'pencere': 60,
+        'limit': 10,
+    },
+    # Kasa / sayım terminalleri: barkod okuyucu saniyede ~20 okutma yapabilir, aynı oturumu
+    # paylaşan birden fazla terminal olabilir. Genel API kuralından önce eşleşmelidir.
+    {
+        'ad': 'barkod',
+        'onek': '/stok/api/barkod/',
+        'pencere': 60,
+        'limit': 3000,
+        'kullanici_limit': 6000,
+        'token_limit': 6000,
+    },
+    {
+        'ad': 'sayim',
+        'onek': '/stok/api/sayim/',
+        'pencere': 60,
+        'limit': 600,
+        'kullanici_limit': 1200,
+        'token_limit': 1200,
+    },
+    # Ürün seçici autocomplete'i: her tuş vuruşu bir istek
+    {
+        'ad': 'urun_arama',
+        'onek': '/stok/api/ara/',
+        'pencere': 60,
+        'limit': 600,
+        'kullanici_limit': 1800,
+        'token_limit': 1800,
+    },
+    {
+        'ad': 'api',
+        'onek': ('/api/', '/stok/api/', '/fatura/api/', '/accounts/api/', '/musteri-paneli/api/'),
+        'pencere': 60,
+        'limit': 60,
+        'kullanici_limit': 300,
+        'token_limit': 600,
+    },
+]
+
+
+@dataclass(frozen=True)
+class Kural:
+    """Yol önekine bağlı sınırlama kuralı; limitler pencere (saniye) başına istek sayısıdır."""
+    ad: str
+    onekler: tuple
+    pencere: int
+    limit: int
+    kullanici_limit: Optional[int] = None
+    token_limit: Optional[int] = None
+    yontemler: Optional[tuple] = None
+
+    def eslesir(self, yol: str, yontem: str) -> bool:
+        if self.yontemler and yontem not in self.yontemler:
+            return False
+        return yol.startswith(self.onekler)
+
+    def kapsam_limiti(self, kapsam: str) -> int:
+        if kapsam == 'token':
+            return self.token_limit or self.kullanici_limit or self.limit
+        if kapsam == 'kullanici':
+            return self.kullanici_limit or self.limit
+        return self.limit
+
+
+@dataclass(frozen=True)
+class Sonuc:
+    kural: Kural
+    kapsam: str
+    limit: int
+    kalan: int
+    izinli: bool
+    bekleme: int = 0
+
+
+_kurallar_onbellek: Optional[tuple] = None
+
+
+def kurallar() -> tuple:
+    """RATELIMIT_KURALLARI ayarından (yoksa varsayılanlardan) kural listesini üretir."""
+    global _kurallar_onbellek
+    tanimlar = getattr(settings, 'RATELIMIT_KURALLARI', VARSAYILAN_KURALLAR)
+    if _kurallar_onbellek is None or _kurallar_onbellek[0] is not tanimlar:
+        liste = []
+        for tanim in tanimlar:
+            onek = tanim['onek']
+            liste.append(Kural(
+                ad=tanim.get('ad') or (onek if isinstance(onek, str) else onek[0]),
+                onekler=(onek,) if isinstance(onek, str) else tuple(onek),
+                pencere=int(tanim.get('pencere', 60)),
+                limit=int(tanim['limit']),
+                kullanici_limit=tanim.get('kullanici_limit'),
+                token_limit=tanim.get('token_limit'),
+                yontemler=tuple(y.upper() for y in tanim['yontemler']) if tanim.get('yontemler') else None,
+            ))
+        _kurallar_onbellek = (tanimlar, tuple(liste))
+    return _kurallar_onbellek[1]
+
+
+def kural_bul(yol: str, yontem: str) -> Optional[Kural]:
+    for kural in kurallar():
+        if kural.eslesir(yol, yontem):
+            return kural
+    return None
+
+
+def _cache():
+    return caches[getattr(settings, 'RATELIMIT_USE_CACHE', 'default')]
+
+
+def _artir(anahtar: str, sure: Optional[int]) -> tuple[int, object]:
+    """Sayacı atomik artırır; (yeni değer, kullanılan cache) döndürür."""
+    try:
+        hedef = _cache()
+        for _ in range(2):
+            hedef.add(anahtar, 0, sure)
+            try:
+                deger = hedef.incr(anahtar)
+            except ValueError:
+                # add ile incr arasında anahtarın süresi doldu; tekrar dene
+                continue
+            if deger is not None:
+                return deger, hedef
+            break
+    except Exception as e:
+        logger.warning(f"Rate limit cache hatası, yerel sayaca geçildi: {e}")
+    _yedek_cache.add(anahtar, 0, sure)
+    return _yedek_cache.incr(anahtar), _yedek_cache
+
+
+def _token_kullanici_id(anahtar: str) -> Optional[int]:
+    """Authorization başlığındaki token'ın sahibini (cache'li) bulur; geçersizse None."""
+    ozet = hashlib.sha256(anahtar.encode()).hexdigest()[:32]
+    cache_anahtari = f'{_ANAHTAR_ONEKI}:token:{ozet}'
+    try:
+        kullanici_id = _cache().get(cache_anahtari)
+    except Exception:
+        kullanici_id = None
+    if kullanici_id is None:
+        from rest_framework.authtoken.models import Token
+        kullanici_id = Token.objects.filter(key=anahtar).values_list('user_id', flat=True).first() or 0
+        try:
+            _cache().set(cache_anahtari, kullanici_id, _TOKEN_CACHE_SURESI)
+        except Exception:
+            pass
+    return kullanici_id or None
+
+
+def istemci_ip(request) -> str:
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or ''
+
+
+def istek_kimligi(request) -> tuple[str, str]:
+    """
+    İsteğin sınırlandığı kimliği (kapsam, anahtar) döndürür.
+
+    Geçerli bir API token'ı varsa token, oturum açmış kullanıcı varsa kullanıcı,
+    diğer durumlarda istemci IP'si esas alınır. Geçersiz token'lar IP'ye düşer;
+    rastgele token göndererek sınır aşılamaz.
+    """
+    yetki = request.META.get('HTTP_AUTHORIZATION', '')
+    if yetki[:6].lower() == 'token ':
+        anahtar = yetki[6:].strip()
+        if anahtar and _token_kullanici_id(anahtar):
+            return 'token', hashlib.sha256(anahtar.encode()).hexdigest()[:32]
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return 'kullanici', str(user.pk)
+    return 'ip', istemci_ip(request)
+
+
+def _reddi_say(kural: Kural, kapsam: str) -> None:
+    try:
+        _artir(f'{_ANAHTAR_ONEKI}:red:{kural.ad}:{kapsam}', None)
+    except Exception:
+        pass
+
+
+def istek_kontrol(kural: Kural, kapsam: str, kimlik: str, simdi: Optional[float] = None) -> Sonuc:
+    """
+    İsteği kuralın kayan penceresine sayar ve izin verilip verilmediğini döndürür.
+
+    Reddedilen istek sayaçtan geri düşülür; limit üzerinde istek göndermeye
+    devam eden istemci, pencere kaydıkça yeniden izin alır.
+    """
+    simdi = time.time() if simdi is None else simdi
+    limit = kural.kapsam_limiti(kapsam)
+    pencere_no, gecen = divmod(simdi, kural.pencere)
+    pencere_no = int(pencere_no)
+    temel = f'{_ANAHTAR_ONEKI}:{kural.ad}:{kapsam}:{kimlik}'
+
+    anahtar = f'{temel}:{pencere_no}'
+    simdiki, hedef = _artir(anahtar, kural.pencere * 2)
+    try:
+        onceki = hedef.get(f'{temel}:{pencere_no - 1}') or 0
+    except Exception:
+        onceki = 0
+
+    agirlik = 1 - gecen / kural.pencere
+    tahmin = onceki * agirlik + simdiki
+    if tahmin <= limit:
+        return Sonuc(kural, kapsam, limit, max(int(limit - tahmin), 0), True)
+
+    if simdiki > limit or not onceki:
+        bekleme = kural.pencere - gecen
+    else:
+        # Önceki pencerenin payı, tahmin limite inene kadar azalmalı
+        bekleme = kural.pencere * (1 - (limit - simdiki) / onceki) - gecen
+    try:
+        hedef.decr(anahtar)
+    except Exception:
+        pass
+    _reddi_say(kural, kapsam)
+    logger.warning(f"Rate limit aşıldı: kural={kural.ad} kapsam={kapsam} kimlik={kimlik}")
+    return Sonuc(kural, kapsam, limit, 0, False, max(math.ceil(bekleme), 1))
+
+
+def rate_limit_istatistikleri() -> list[dict]:
+    """Kural ve kapsam bazında reddedilen istek sayıları."""
+    anahtarlar = {
+        f'{_ANAHTAR_ONEKI}:red:{kural.ad}:{kapsam}': (kural, kapsam)
+        for kural in kurallar() for kapsam in KAPSAMLAR
+    }
+    try:
+        degerler = _cache().get_many(list(anahtarlar))
+    except Exception:
+        degerler = {}
+    yerel = _yedek_cache.get_many(list(anahtarlar))
+
+    sonuc = []
+    for anahtar, (kural, kapsam) in anahtarlar.items():
+        sonuc.append({
+            'kural': kural.ad,
+            'kapsam': kapsam,
+            'limit': kural.kapsam_limiti(kapsam),
+            'pencere': kural.pencere,
+            'reddedilen': (degerler.get(anahtar) or 0) + (yerel.get(anahtar) or 0),
+        })
+    return sonuc
@@ -0,0 +1,119 @@
+"""
+Yavaş sorgu kaydı servisi.
+
+PerformansOlcumMiddleware'in sorgu sarmalayıcısı (stoktakip/performans.py)
+YAVAS_SORGU_ESIGI_MS süresini aşan sorguları, çağıran proje fonksiyonuyla
+birlikte istek boyunca biriktirir. İstek bitince (sarmalayıcı kaldırıldıktan
+sonra, ölçüme karışmadan):
+
+- Sorgular parmak izine (parametre ve sabitleri ayıklanmış SQL kalıbının
+  özeti) göre gruplanır; kalıp başına tek UPDATE ile sayaç, toplam ve en
+  uzun süre artırılır.
+- Kalıp ilk kez görülüyorsa örnek sorgunun planı EXPLAIN ile (ANALYZE
+  olmadan, sorgu yeniden çalıştırılmadan) alınır ve satır oluşturulur.
+
+Rapor toplam süreye göre sıralanır; sık çalışan orta hızlı sorgular da tek
+seferlik yavaş sorgular kadar görünür olur.
+"""
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from accounts.models import YavasSorgu
+from stoktakip.performans import YavasSorguKaydi, sorgu_kalibi
+
+logger = logging.getLogger(__name__)
+
+_OKUMA_SORGUSU_RE = re.compile(r'^\s*\(?\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+
+def parmak_izi(kalip: str) -> str:
+    return hashlib.md5(kalip.encode(), usedforsecurity=False).hexdigest()
+
+
+def sorgu_plani(kayit: YavasSorguKaydi) -> str:
+    """
+    Sorgunun çalıştırma planı; yalnızca okuma sorguları için, hata olursa boş.
+
+    EXPLAIN kendi savepoint'i içinde çalışır; hata olursa açık transaction
+    bozulmaz.
+    """
+    if kayit.coklu or not _OKUMA_SORGUSU_RE.match(kayit.sql):
+        return ''
+    connection = connections[kayit.baglanti]
+    if connection.vendor == 'postgresql':
+        onek = 'EXPLAIN (ANALYZE false, VERBOSE false, FORMAT TEXT) '
+    elif connection.vendor == 'sqlite':
+        onek = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'mysql':
+        onek = 'EXPLAIN '
+    else:
+        return ''
+    try:
+        with transaction.atomic(using=kayit.baglanti), connection.cursor() as cursor:
+            cursor.execute(onek + kayit.sql, kayit.params)
+            satirlar = cursor.fetchall()
+    except Exception as e:
+        logger.info(f"Sorgu planı alınamadı: {e}")
+        return ''
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return '\n'.join(str(satir[-1]) for satir in satirlar)
+    return '\n'.join(' | '.join(str(deger) for deger in satir) for satir in satirlar)
+
+
+def yavas_sorgulari_kaydet(kayitlar: Iterable[YavasSorguKaydi], view_adi: str = '') -> None:
+    """İstekte biriken yavaş sorguları kalıp bazında toplamlara ekler."""
+    gruplar: dict[str, list] = defaultdict(list)
+    kaliplar = {}
+    for kayit in kayitlar:
+        kalip = sorgu_kalibi(kayit.sql)
+        iz = parmak_izi(kalip)
+        gruplar[iz].append(kayit)
+        kaliplar[iz] = kalip
+
+    simdi = timezone.now()
+    for iz, grup in gruplar.items():
+        en_yavas = max(grup, key=lambda k: k.sure)
+        toplam_ms = sum(k.sure for k in grup) * 1000
+        en_uzun_ms = en_yavas.sure * 1000
+        logger.warning(
+            f"Yavaş sorgu: {en_uzun_ms:.0f} ms ({len(grup)} kez) {view_adi} {en_yavas.cagiran}: {kaliplar[iz][:300]}"
+        )
+
+        guncelleme = {
+            'adet': F('adet') + len(grup),
+            'toplam_ms': F('toplam_ms') + toplam_ms,
+            'en_uzun_ms': Greatest(F('en_uzun_ms'), en_uzun_ms),
+            'son_gorulme': simdi,
+            'cagiran': en_yavas.cagiran[:255],
+            'view': view_adi[:200],
+        }
+        if YavasSorgu.objects.filter(parmak_izi=iz).update(**guncelleme):
+            continue
+        # İlk görülme: plan bir kez alınır
+        try:
+            with transaction.atomic():
+                YavasSorgu.objects.create(
+                    parmak_izi=iz,
+                    kalip=kaliplar[iz],
+                    ornek_sql=en_yavas.sql,
+                    plan=sorgu_plani(en_yavas),
+                    cagiran=en_yavas.cagiran[:255],
+                    view=view_adi[:200],
+                    adet=len(grup),
+                    toplam_ms=toplam_ms,
+                    en_uzun_ms=en_uzun_ms,
+                    ilk_gorulme=simdi,
+                    son_gorulme=simdi,
+                )
+        except IntegrityError:
+            # Aynı kalıbı eşzamanlı başka bir istek oluşturdu
+            YavasSorgu.objects.filter(parmak_izi=iz).update(**guncelleme)
@@ -0,0 +1,154 @@
+"""
+Rol ve yetki çözümleme servisi.
+
+Kullanıcının grupları, izinleri ve bağlı olduğu cari tek seferde okunur:
+
+- Sonuç istek boyunca kullanıcı nesnesinde tutulur; decorator'lar, view'lar
+  ve şablonlar (context processor ile `yetki`) aynı nesneyi kullanır.
+- Paylaşımlı cache (Redis) varsa istekler arasında cache'lenir. Anahtar, kullanıcının ve genel yetki
+  versiyon damgasını içerir; grup üyeliği, kullanıcı izinleri veya cari
+  bağlantısı değiştiğinde kullanıcının damgası, grup izinleri veya grup
+  adı değiştiğinde genel damga artırılır (accounts/signals.py). Eski
+  kayıtlar okunmaz, süresi dolunca silinir. LocMemCache'te damga yalnızca
+  değişikliği yapan süreçte artar; diğer worker'lar geri alınan yetkiyi
+  YETKI_CACHE_TIMEOUT boyunca vermeye devam ederdi. Bu yüzden paylaşımlı
+  cache yoksa yetkiler her istekte veritabanından okunur.
+- is_staff / is_superuser / is_active her istekte yüklenen kullanıcı
+  nesnesinden okunur, cache'lenmez.
+- Django'nun izin önbelleği (user._perm_cache) de doldurulur; has_perm ve
+  şablondaki `perms` ek sorgu yapmaz.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from stoktakip.cache_utils import paylasimli_cache_mi
+
+MUDUR_GRUBU = 'Müdür'
+GENEL_VERSIYON_KEY = 'yetki_versiyon'
+
+
+def _cache_timeout() -> int:
+    return getattr(settings, 'YETKI_CACHE_TIMEOUT', 3600)
+
+
+def _kullanici_versiyon_key(user_id: int) -> str:
+    return f'yetki_versiyon_{user_id}'
+
+
+def _versiyon_artir(key: str) -> None:
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key add ile incr arasında silindiyse
+        cache.set(key, 1, timeout=None)
+
+
+def kullanici_yetkilerini_gecersiz_kil(user_ids: Iterable[int]) -> None:
+    """
+    Kullanıcıların cache'lenmiş yetkilerini geçersiz kılar.
+
+    Signal tetiklemeyen toplu işlemlerden (ör. through tablosuna bulk_create)
+    sonra elle çağrılmalıdır.
+    """
+    for user_id in set(user_ids):
+        if user_id:
+            _versiyon_artir(_kullanici_versiyon_key(user_id))
+
+
+def tum_yetkileri_gecersiz_kil() -> None:
+    """Tüm kullanıcıların cache'lenmiş yetkilerini geçersiz kılar."""
+    _versiyon_artir(GENEL_VERSIYON_KEY)
+
+
+@dataclass(frozen=True)
+class Yetkiler:
+    """Kullanıcının çözülmüş rolleri; şablonda `yetki.mudur`, `yetki.musteri` gibi kullanılır."""
+    gruplar: frozenset = frozenset()
+    izinler: frozenset = frozenset()
+    cari_id: Optional[int] = None
+    giris_yapmis: bool = False
+    is_staff: bool = False
+    is_superuser: bool = False
+
+    @property
+    def personel(self) -> bool:
+        return self.is_staff
+
+    @property
+    def mudur(self) -> bool:
+        return self.is_superuser or MUDUR_GRUBU in self.gruplar
+
+    @property
+    def musteri(self) -> bool:
+        return self.cari_id is not None
+
+    def grupta(self, ad: str) -> bool:
+        return ad in self.gruplar
+
+    def izinli(self, izin: str) -> bool:
+        """'app_label.codename' biçimindeki izin; superuser her izne sahiptir."""
+        return self.is_superuser or izin in self.izinler
+
+
+ANONIM = Yetkiler()
+
+
+def _yetki_verisi_oku(user) -> tuple[list, list, Optional[int]]:
+    from django.contrib.auth.models import Permission
+    from django.db.models import Q
+    from cari.models import Cari
+
+    gruplar = list(user.groups.values_list('name', flat=True))
+    izinler = [
+        f'{app_label}.{codename}'
+        for app_label, codename in Permission.objects.filter(
+            Q(user=user) | Q(group__user=user)
+        ).values_list('content_type__app_label', 'codename').distinct()
+    ] if user.is_active else []
+    cari_id = Cari.objects.filter(user_id=user.pk).values_list('pk', flat=True).first()
+    return gruplar, izinler, cari_id
+
+
+def yetkileri_coz(user) -> Yetkiler:
+    """
+    Kullanıcının rol ve yetkilerini döndürür.
+
+    İstek içinde ilk çağrıda cache'ten (yoksa veya cache paylaşımlı değilse
+    3 sorguyla veritabanından) okunur, sonraki çağrılar kullanıcı nesnesindeki
+    sonucu kullanır.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONIM
+    yetkiler = getattr(user, '_yetkiler', None)
+    if yetkiler is not None:
+        return yetkiler
+
+    if paylasimli_cache_mi():
+        kullanici_key = _kullanici_versiyon_key(user.pk)
+        damgalar = cache.get_many([GENEL_VERSIYON_KEY, kullanici_key])
+        key = f'yetkiler_{user.pk}_{damgalar.get(GENEL_VERSIYON_KEY, 0)}_{damgalar.get(kullanici_key, 0)}'
+        veri = cache.get(key)
+        if veri is None:
+            veri = _yetki_verisi_oku(user)
+            cache.set(key, veri, _cache_timeout())
+    else:
+        veri = _yetki_verisi_oku(user)
+    gruplar, izinler, cari_id = veri
+
+    yetkiler = Yetkiler(
+        gruplar=frozenset(gruplar),
+        izinler=frozenset(izinler),
+        cari_id=cari_id,
+        giris_yapmis=True,
+        is_staff=user.is_staff,
+        is_superuser=user.is_superuser,
+    )
+    user._yetkiler = yetkiler
+    if not user.is_superuser and not hasattr(user, '_perm_cache'):
+        # ModelBackend.get_all_permissions bu önbelleği kullanır
+        user._perm_cache = set(yetkiler.izinler)
+    return yetkiler
@@ -0,0 +1,58 @@
+"""
+Accounts signal'ları.
+
+Grup üyeliği, kullanıcı / grup izinleri ve cari bağlantısı değiştiğinde yetki
+cache damgalarını artırır (bkz. accounts/services/yetki_service.py).
+"""
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from cari.models import Cari
+from .services.yetki_service import kullanici_yetkilerini_gecersiz_kil, tum_yetkileri_gecersiz_kil
+
+_DEGISIKLIK_ISLEMLERI = ('post_add', 'post_remove', 'post_clear', 'pre_clear')
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def kullanici_iliskisi_degisti(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in _DEGISIKLIK_ISLEMLERI:
+        return
+    if not reverse:
+        # user.groups.add(...) / user.user_permissions.add(...)
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        # group.user_set.clear(): temizlenecek kullanıcılar henüz okunabilir
+        user_ids = list(instance.user_set.values_list('pk', flat=True))
+    else:
+        # group.user_set.add(...) / permission.user_set.remove(...)
+        user_ids = list(pk_set or ())
+    if user_ids:
+        transaction.on_commit(lambda: kullanici_yetkilerini_gecersiz_kil(user_ids))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def grup_izinleri_degisti(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(tum_yetkileri_gecersiz_kil)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def grup_degisti(sender, instance, created=False, **kwargs):
+    # Yeni grubun üyesi yoktur; ad değişikliği ve silme tüm kullanıcıları etkileyebilir
+    if not created:
+        transaction.on_commit(tum_yetkileri_gecersiz_kil)
+
+
+@receiver(post_save, sender=Cari)
+@receiver(post_delete, sender=Cari)
+def cari_kullanicisi_degisti(sender, instance, **kwargs):
+    # Yüklendiği andaki bağlı kullanıcı (alan geçmişi görüntüsü) ile yenisi
+    eski = (instance.__dict__.get('_ilk_degerler') or {}).get('user')
+    user_ids = {eski, instance.user_id} - {None}
+    if kwargs.get('signal') is post_delete or eski != instance.user_id:
+        if user_ids:
+            transaction.on_commit(lambda: kullanici_yetkilerini_gecersiz_kil(user_ids))
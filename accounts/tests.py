@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.services.rate_limit_service import Kural, istek_kontrol, kural_bul
+
+
+class KuralEslesmeTests(SimpleTestCase):
+    """Terminal uç noktaları genel API kuralından önce kendi kurallarına düşer."""
+
+    def test_varsayilan_kurallar(self):
+        self.assertEqual(kural_bul('/stok/api/barkod/8690000000/', 'GET').ad, 'barkod')
+        self.assertEqual(kural_bul('/stok/api/sayim/3/parti/', 'POST').ad, 'sayim')
+        self.assertEqual(kural_bul('/stok/api/ara/', 'GET').ad, 'urun_arama')
+        self.assertEqual(kural_bul('/stok/api/urun/1/fiyat-gecmisi/', 'GET').ad, 'api')
+        self.assertEqual(kural_bul('/accounts/login/', 'POST').ad, 'giris')
+        self.assertIsNone(kural_bul('/accounts/login/', 'GET'))
+        self.assertIsNone(kural_bul('/stok/', 'GET'))
+
+    def test_terminal_kurallari_genel_kuraldan_yuksek(self):
+        genel = kural_bul('/stok/api/x/', 'GET')
+        for yol in ('/stok/api/barkod/1/', '/stok/api/sayim/1/', '/stok/api/ara/'):
+            kural = kural_bul(yol, 'GET')
+            for kapsam in ('ip', 'kullanici', 'token'):
+                self.assertGreater(kural.kapsam_limiti(kapsam), genel.kapsam_limiti(kapsam))
+
+
+class KayanPencereTests(SimpleTestCase):
+    """Kayan pencere sayacı; zaman `simdi` parametresiyle verilir."""
+
+    kural = Kural(ad='test', onekler=('/test/',), pencere=60, limit=10)
+
+    def setUp(self):
+        cache.clear()
+
+    def istek(self, simdi, kimlik='1.2.3.4'):
+        return istek_kontrol(self.kural, 'ip', kimlik, simdi=simdi)
+
+    def test_limit_pencere_icinde(self):
+        sonuclar = [self.istek(6000 + 50) for _ in range(10)]
+        self.assertTrue(all(s.izinli for s in sonuclar))
+        self.assertEqual(sonuclar[-1].kalan, 0)
+
+        red = self.istek(6000 + 50)
+        self.assertFalse(red.izinli)
+        self.assertEqual(red.bekleme, 10)  # pencere sonuna kadar
+
+    def test_pencere_siniri_onceki_pencere_agirliklandirilir(self):
+        for _ in range(10):
+            self.istek(6000 + 59)
+
+        # Yeni pencerenin başında önceki pencerenin tamamı sayılır: 10 + 1 > 10
+        red = self.istek(6060)
+        self.assertFalse(red.izinli)
+        # Önceki payı 10 * (1 - 6/60) = 9'a inince bir istek sığar
+        self.assertEqual(red.bekleme, 6)
+        self.assertFalse(self.istek(6060 + 5).izinli)
+        self.assertTrue(self.istek(6060 + 6).izinli)
+
+    def test_reddedilen_istek_sayaci_sisirmez(self):
+        for _ in range(10):
+            self.istek(6000)
+        for _ in range(50):
+            self.assertFalse(self.istek(6000).izinli)
+        # İki pencere sonra önceki pencere boş; tam limit yeniden kullanılabilir
+        sonuclar = [self.istek(6120) for _ in range(10)]
+        self.assertTrue(all(s.izinli for s in sonuclar))
+
+    def test_kimlikler_ayri_sayilir(self):
+        for _ in range(10):
+            self.istek(6000, kimlik='a')
+        self.assertFalse(self.istek(6000, kimlik='a').izinli)
+        self.assertTrue(self.istek(6000, kimlik='b').izinli)
+
+
+@override_settings(
+    RATELIMIT_ENABLE=True,
+    RATELIMIT_KURALLARI=[{'ad': 'test_api', 'onek': '/api/', 'pencere': 60, 'limit': 2}],
+)
+class RateLimitMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_429_ve_retry_after(self):
+        for kalan in ('1', '0'):
+            response = self.client.get('/api/yok/')
+            self.assertNotEqual(response.status_code, 429)
+            self.assertEqual(response['X-RateLimit-Limit'], '2')
+            self.assertEqual(response['X-RateLimit-Remaining'], kalan)
+
+        response = self.client.get('/api/yok/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['success'], False)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertLessEqual(int(response['Retry-After']), 60)
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+
+    def test_kural_disi_yol_sinirlanmaz(self):
+        for _ in range(5):
+            response = self.client.get('/accounts/login/')
+            self.assertNotEqual(response.status_code, 429)
+            self.assertFalse(response.has_header('X-RateLimit-Limit'))
@@ -26,4 +26,13 @@ urlpatterns = [
         name='password_reset_complete',
     ),
     path('audit-log/', views.audit_log_list, name='audit_log'),
+    path('audit-log/arsiv/', views.audit_log_arsiv, name='audit_log_arsiv'),
+    path('audit-log/arsiv/<str:dosya>/indir/', views.audit_log_arsiv_indir, name='audit_log_arsiv_indir'),
+    path('performans/', views.performans_istatistikleri, name='performans'),
+    path('yavas-sorgular/', views.yavas_sorgular, name='yavas_sorgular'),
+    path('profiller/', views.profil_listesi, name='profil_listesi'),
+    path('profiller/<str:profil_id>/', views.profil_detay, name='profil_detay'),
+    path('profiller/<str:profil_id>/indir/', views.profil_indir, name='profil_indir'),
+    path('api/alan-degisiklikleri/', views.alan_degisiklikleri_api, name='alan_degisiklikleri_api'),
+    path('api/rate-limit/', views.rate_limit_istatistikleri_api, name='rate_limit_istatistikleri_api'),
 ]
@@ -1,37 +1,243 @@
+"""
+Audit log yardımcıları.
+
+Kayıtlar tek tek INSERT edilmez:
+
+- log_action() kaydı bellekte oluşturur ve transaction.on_commit ile kuyruğa
+  alır; transaction geri alınırsa kayıt hiç yazılmaz (hayalet log kalmaz).
+- İstek (AuditLogMiddleware) veya denetim_tamponu() bloğu boyunca commit edilen
+  kayıtlar toplanır ve blok sonunda tek bulk_create ile yazılır. Tampon dışında
+  commit edilen kayıtlar hemen yazılır.
+- AUDIT_LOG_ASYNC açıksa (varsayılan kapalı) yazma işlemi istekten ayrı, tek
+  işçili bir arka plan iş parçacığına bırakılır. Kuyruk süreç belleğindedir:
+  düzgün kapanışta (atexit) boşaltılır, ancak süreç öldürülürse (SIGKILL,
+  OOM, worker timeout) kuyrukta bekleyen, commit edilmiş işlemlere ait kayıtlar
+  kaybolur. Kayıp kabul edilemiyorsa ayar kapalı bırakılmalıdır; bu durumda
+  kayıtlar commit anında (on_commit) eşzamanlı yazılır.
+- ContentType'lar Django'nun süreç içi ContentType cache'inden çözülür; kayıt
+  yalnızca content_type_id ile oluşturulur.
+- Alan bazlı değişiklik kayıtları (AlanDegisikligi) aynı tampon üzerinden
+  yazılır; işlemi yapan kullanıcı istek bağlamından (islem_yapan) alınır.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Iterator, Optional
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from .models import AuditLog
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import AlanDegisikligi, AuditLog
+
+logger = logging.getLogger(__name__)
+
+_tampon: ContextVar[Optional[list]] = ContextVar('audit_log_tamponu', default=None)
+_istek: ContextVar[Optional[object]] = ContextVar('audit_log_istegi', default=None)
+_yazici: Optional[ThreadPoolExecutor] = None
+_yazici_kilidi = threading.Lock()
+
+
+def _kayitlari_yaz(kayitlar: list) -> None:
+    gruplar = defaultdict(list)
+    for kayit in kayitlar:
+        gruplar[type(kayit)].append(kayit)
+    for model, model_kayitlari in gruplar.items():
+        try:
+            model.objects.bulk_create(model_kayitlari, batch_size=500)
+        except Exception as e:
+            # Loglama hatası ana akışı bozmamalı
+            logger.error(f"Audit log error: {str(e)}")
+
+
+def _arka_planda_yaz(kayitlar: list[AuditLog]) -> None:
+    try:
+        _kayitlari_yaz(kayitlar)
+    finally:
+        # İşçi iş parçacığının bağlantısı açık kalmasın
+        connections.close_all()
+
+
+def _arka_plan_yazicisi() -> ThreadPoolExecutor:
+    global _yazici
+    with _yazici_kilidi:
+        if _yazici is None:
+            _yazici = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audit-log')
+            atexit.register(_arka_plan_yazicisini_kapat)
+        return _yazici
+
+
+def _arka_plan_yazicisini_kapat() -> None:
+    """Süreç kapanırken kuyrukta bekleyen kayıtların yazılmasını bekler."""
+    global _yazici
+    with _yazici_kilidi:
+        yazici, _yazici = _yazici, None
+    if yazici is not None:
+        yazici.shutdown(wait=True)
+
+
+def audit_kayitlarini_yaz(kayitlar: list[AuditLog]) -> None:
+    """
+    Kaydedilmemiş AuditLog / AlanDegisikligi nesnelerini model başına tek bulk_create ile yazar.
+
+    AUDIT_LOG_ASYNC ayarı açıksa yazma arka plan iş parçacığında yapılır
+    (süreç öldürülürse kuyruktaki kayıtlar kaybolabilir, bkz. modül açıklaması).
+
+    Args:
+        kayitlar: Kaydedilmemiş AuditLog / AlanDegisikligi nesneleri
+    """
+    if not kayitlar:
+        return
+    if getattr(settings, 'AUDIT_LOG_ASYNC', False):
+        _arka_plan_yazicisi().submit(_arka_planda_yaz, list(kayitlar))
+    else:
+        _kayitlari_yaz(kayitlar)
+
+
+def _tampona_ekle(kayit: AuditLog) -> None:
+    tampon = _tampon.get()
+    if tampon is None:
+        audit_kayitlarini_yaz([kayit])
+    else:
+        tampon.append(kayit)
+
+
+@contextmanager
+def denetim_tamponu() -> Iterator[None]:
+    """
+    Blok boyunca commit edilen audit kayıtlarını toplar, blok sonunda tek seferde yazar.
+
+    İç içe kullanıldığında dıştaki tampon kullanılır. Blok içinde açılıp
+    blok bittikten sonra commit edilen transaction'ların kayıtları commit
+    anında yazılır.
+    """
+    if _tampon.get() is not None:
+        yield
+        return
+    tampon: list[AuditLog] = []
+    token = _tampon.set(tampon)
+    try:
+        yield
+    finally:
+        _tampon.reset(token)
+        audit_kayitlarini_yaz(tampon)
+
+
+@contextmanager
+def islem_yapan(request) -> Iterator[None]:
+    """
+    Blok boyunca alan değişikliklerini yapan kullanıcıyı request.user olarak belirler.
+
+    Kullanıcı yalnızca bir değişiklik kaydedildiğinde çözülür.
+    """
+    token = _istek.set(request)
+    try:
+        yield
+    finally:
+        _istek.reset(token)
+
+
+def _istek_kullanici_id() -> Optional[int]:
+    user = getattr(_istek.get(), 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def alan_degisikligi_kaydet(obj, islem: str, degisiklikler: dict, object_id: Optional[int] = None) -> Optional[AlanDegisikligi]:
+    """
+    Nesnenin değişen alanlarını kaydeder (commit sonrası toplu yazılır).
+
+    Args:
+        obj: Değişen model nesnesi
+        islem: create, update veya delete
+        degisiklikler: {alan: [eski, yeni]}
+        object_id: Silinen nesneler için birincil anahtar (obj.pk artık None'dır)
+
+    Returns:
+        Oluşturulan (henüz yazılmamış olabilecek) AlanDegisikligi, hata olursa None
+    """
+    try:
+        kayit = AlanDegisikligi(
+            content_type_id=ContentType.objects.get_for_model(obj).pk,
+            object_id=object_id if object_id is not None else obj.pk,
+            islem=islem,
+            degisiklikler=degisiklikler,
+            user_id=_istek_kullanici_id(),
+            timestamp=timezone.now(),
+        )
+        transaction.on_commit(partial(_tampona_ekle, kayit))
+        return kayit
+    except Exception as e:
+        # Loglama hatası ana akışı bozmamalı
+        logger.error(f"Audit log error: {str(e)}")
+        return None
+
+
+def alan_gecmisi(model, alan: Optional[str] = None, object_id: Optional[int] = None):
+    """
+    Bir modelin (veya tek nesnenin) değişiklik kayıtlarını döndürür.
+
+    Args:
+        model: Model sınıfı veya nesnesi (nesne verilirse yalnızca onun kayıtları)
+        alan: Verilirse yalnızca bu alanı değiştiren kayıtlar (GIN indeksi)
+        object_id: Verilirse yalnızca bu nesnenin kayıtları
+
+    Returns:
+        AlanDegisikligi queryset'i (yeniden eskiye)
+    """
+    if object_id is None and not isinstance(model, type):
+        object_id = model.pk
+    kayitlar = AlanDegisikligi.objects.filter(content_type=ContentType.objects.get_for_model(model))
+    if object_id is not None:
+        kayitlar = kayitlar.filter(object_id=object_id)
+    if alan:
+        kayitlar = kayitlar.filter(degisiklikler__has_key=alan)
+    return kayitlar.select_related('user').order_by('-timestamp', '-id')
+
 
 def log_action(user, action, obj, description, request=None):
     """
     Audit log kaydı oluşturur.
-    
+
+    Kayıt transaction commit edildiğinde tampona alınır ve toplu yazılır
+    (bkz. modül açıklaması); geri alınan işlemler için kayıt oluşmaz.
+
     Args:
         user: İşlemi yapan kullanıcı
         action: İşlem türü (create, update, delete, vs.)
         obj: İşlem yapılan obje (opsiyonel)
         description: İşlem açıklaması
         request: HTTP request (IP ve User-Agent için opsiyonel)
+
+    Returns:
+        Oluşturulan (henüz yazılmamış olabilecek) AuditLog nesnesi, hata olursa None
     """
     try:
-        log_data = {
-            'user': user if user and user.is_authenticated else None,
-            'action': action,
-            'description': description,
-            'model_name': obj.__class__.__name__ if obj else 'System',
-        }
-        
+        kayit = AuditLog(
+            user=user if user and user.is_authenticated else None,
+            action=action,
+            description=description,
+            model_name=obj.__class__.__name__ if obj else 'System',
+            timestamp=timezone.now(),
+        )
+
         if obj:
-            log_data['content_type'] = ContentType.objects.get_for_model(obj)
-            log_data['object_id'] = obj.pk
-            
+            kayit.content_type_id = ContentType.objects.get_for_model(obj).pk
+            kayit.object_id = obj.pk
+
         if request:
-            log_data['ip_address'] = request.META.get('REMOTE_ADDR')
-            log_data['user_agent'] = request.META.get('HTTP_USER_AGENT')
-            
-        return AuditLog.objects.create(**log_data)
+            kayit.ip_address = request.META.get('REMOTE_ADDR')
+            kayit.user_agent = request.META.get('HTTP_USER_AGENT')
+
+        # Transaction dışında hemen çalışır; içindeyse yalnızca commit'te
+        transaction.on_commit(partial(_tampona_ekle, kayit))
+        return kayit
     except Exception as e:
         # Loglama hatası ana akışı bozmamalı
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Audit log error: {str(e)}")
         return None
@@ -4,7 +4,6 @@ from django.contrib.auth.forms import UserCreationForm, PasswordChangeForm
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.db import transaction
 from django.core.cache import cache
@@ -13,15 +12,28 @@ from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.views import LoginView
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils import timezone
+from datetime import datetime, timedelta
 from typing import Any
 import logging
-from stoktakip.error_handling import handle_view_errors, database_transaction
+from stoktakip.pagination import KeysetPaginator, IMLEC_PARAMETRESI
+from stoktakip.template_helpers import generate_pagination_html
+from stoktakip.error_handling import handle_view_errors, handle_api_errors, database_transaction
 from stoktakip.security_utils import validate_search_query
 from .services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
 
+def _gun_baslangici(tarih: str) -> datetime:
+    """YYYY-MM-DD tarihinin yerel saatle başlangıç anı."""
+    return timezone.make_aware(datetime.strptime(tarih, '%Y-%m-%d'))
+
+
 class CustomLoginView(LoginView):
     """Özel login view'i.
 
@@ -32,8 +44,9 @@ class CustomLoginView(LoginView):
     template_name = "registration/login.html"
 
     def get_success_url(self):
-        user = self.request.user
-        if hasattr(user, 'cari_account'):
+        from .services.yetki_service import yetkileri_coz
+
+        if yetkileri_coz(self.request.user).musteri:
             return reverse('musteri_paneli:index')
         return reverse('raporlar:dashboard')
 
@@ -239,6 +252,8 @@ def audit_log_list(request: Any) -> Any:
                 user_filter = ''
 
         # Tarih filtresi - Input validation
+        # timestamp__date yerine yerel gün sınırlarıyla aralık verilir; indeks ve
+        # (PostgreSQL'de) aylık partisyon budaması kullanılabilsin
         tarih_baslangic = request.GET.get('tarih_baslangic', '')
         tarih_bitis = request.GET.get('tarih_bitis', '')
         if tarih_baslangic and tarih_bitis:
@@ -246,34 +261,48 @@ def audit_log_list(request: Any) -> Any:
                 from stoktakip.security_utils import validate_date_range
                 tarih_baslangic, tarih_bitis = validate_date_range(tarih_baslangic, tarih_bitis)
                 log_list = log_list.filter(
-                    timestamp__date__gte=tarih_baslangic,
-                    timestamp__date__lte=tarih_bitis
+                    timestamp__gte=_gun_baslangici(tarih_baslangic),
+                    timestamp__lt=_gun_baslangici(tarih_bitis) + timedelta(days=1)
                 )
             except Exception as e:
                 logger.warning(f"Geçersiz tarih aralığı: {str(e)}")
                 messages.warning(request, "Geçersiz tarih aralığı.")
                 tarih_baslangic = ''
                 tarih_bitis = ''
-        elif tarih_baslangic:
-            log_list = log_list.filter(timestamp__date__gte=tarih_baslangic)
-        elif tarih_bitis:
-            log_list = log_list.filter(timestamp__date__lte=tarih_bitis)
-
-        # Sayfalama - Input validation
-        try:
-            from stoktakip.security_utils import sanitize_integer
-            page_number = request.GET.get('page', '1')
-            page_number = sanitize_integer(page_number, min_value=1)
-        except Exception:
-            page_number = 1
+        elif tarih_baslangic or tarih_bitis:
+            try:
+                if tarih_baslangic:
+                    log_list = log_list.filter(timestamp__gte=_gun_baslangici(tarih_baslangic))
+                else:
+                    log_list = log_list.filter(timestamp__lt=_gun_baslangici(tarih_bitis) + timedelta(days=1))
+            except ValueError:
+                messages.warning(request, "Geçersiz tarih.")
+                tarih_baslangic = ''
+                tarih_bitis = ''
 
-        paginator = Paginator(log_list, 50)
-        logs = paginator.get_page(page_number)
+        # Tarih verilmezse yalnızca son günler taranır; daha eskisi için tarih filtresi veya arşiv
+        varsayilan_aralik = not (tarih_baslangic or tarih_bitis)
+        varsayilan_gun = getattr(settings, 'AUDIT_LOG_VARSAYILAN_GUN', 30)
+        if varsayilan_aralik:
+            log_list = log_list.filter(timestamp__gte=timezone.now() - timedelta(days=varsayilan_gun))
+
+        # Keyset sayfalama; toplam kayıt sayısı büyük listelerde tahminidir
+        paginator = KeysetPaginator(log_list, 50, siralama=('-timestamp', '-id'))
+        logs = paginator.get_page(request.GET.get(IMLEC_PARAMETRESI))
+        request_params = {
+            'search': search_query,
+            'action': action_filter,
+            'user': user_filter,
+            'tarih_baslangic': tarih_baslangic,
+            'tarih_bitis': tarih_bitis,
+        }
+        pagination_html = generate_pagination_html(logs, request_params, request.path) if logs.has_other_pages() else None
 
         from django.contrib.auth.models import User
 
         context = {
             'logs': logs,
+            'pagination_html': pagination_html,
             'search_query': search_query,
             'action_filter': action_filter,
             'user_filter': user_filter,
@@ -281,8 +310,223 @@ def audit_log_list(request: Any) -> Any:
             'tarih_bitis': tarih_bitis,
             'users': User.objects.all().order_by('username'),
             'action_choices': AuditLog.ACTION_CHOICES,
+            'varsayilan_aralik': varsayilan_aralik,
+            'varsayilan_gun': varsayilan_gun,
         }
         return render(request, 'accounts/audit_log.html', context)
     except Exception as e:
         logger.error(f"Audit log listesi hatası: {str(e)}", exc_info=True)
         raise
+
+
+@handle_view_errors(error_message="Audit log arşivi yüklenirken bir hata oluştu.")
+@staff_member_required
+def audit_log_arsiv(request: Any) -> Any:
+    """Arşivlenmiş audit log dosyalarını listeler ve seçilen dosyanın kayıtlarını gösterir."""
+    from .models import AuditLog
+    from .services.audit_arsiv_service import arsiv_dosyalari, arsiv_kayitlari
+    from stoktakip.security_utils import sanitize_integer
+
+    dosya = request.GET.get('dosya', '')
+    search_query = request.GET.get('search', '')
+    action_filter = request.GET.get('action', '')
+    if action_filter not in dict(AuditLog.ACTION_CHOICES):
+        action_filter = ''
+    try:
+        page_number = sanitize_integer(request.GET.get('page', '1'), min_value=1)
+    except Exception:
+        page_number = 1
+
+    sonuc = None
+    if dosya:
+        try:
+            if search_query:
+                search_query = validate_search_query(search_query, max_length=100)
+            sonuc = arsiv_kayitlari(dosya, arama=search_query, action=action_filter, sayfa=page_number)
+            action_adlari = dict(AuditLog.ACTION_CHOICES)
+            for kayit in sonuc['kayitlar']:
+                kayit['action_adi'] = action_adlari.get(kayit['action'], kayit['action'])
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+            dosya = ''
+
+    context = {
+        'dosyalar': arsiv_dosyalari(),
+        'dosya': dosya,
+        'sonuc': sonuc,
+        'search_query': search_query,
+        'action_filter': action_filter,
+        'action_choices': AuditLog.ACTION_CHOICES,
+    }
+    return render(request, 'accounts/audit_log_arsiv.html', context)
+
+
+@handle_view_errors(error_message="Arşiv dosyası indirilemedi.")
+@staff_member_required
+def audit_log_arsiv_indir(request: Any, dosya: str) -> Any:
+    """Arşiv dosyasını (gzip'li JSONL) indirir."""
+    from .services.audit_arsiv_service import arsiv_dosya_yolu
+
+    try:
+        yol = arsiv_dosya_yolu(dosya)
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
+        return redirect('accounts:audit_log_arsiv')
+    return FileResponse(open(yol, 'rb'), as_attachment=True, filename=yol.name, content_type='application/gzip')
+
+
+@handle_api_errors(error_message="Alan değişiklikleri alınamadı", status_code=400)
+@staff_member_required
+def alan_degisiklikleri_api(request: Any) -> JsonResponse:
+    """
+    İzlenen modellerdeki alan değişikliklerini döndürür (en yeni 100 kayıt).
+
+    GET: ?model=stok.urun (zorunlu) &alan=fiyat &nesne=<id>
+    """
+    from django.apps import apps
+    from stoktakip.model_utils import DegisiklikIzlemeMixin
+    from stoktakip.security_utils import sanitize_integer
+    from .utils import alan_gecmisi
+
+    try:
+        model = apps.get_model(request.GET.get('model', ''))
+    except (LookupError, ValueError):
+        model = None
+    if model is None or not issubclass(model, DegisiklikIzlemeMixin):
+        return JsonResponse({'success': False, 'error': 'Geçersiz model.'}, status=400)
+
+    alan = request.GET.get('alan', '').strip()
+    if alan and alan not in model.izlenen_alanlar:
+        return JsonResponse({'success': False, 'error': 'Bu alan izlenmiyor.'}, status=400)
+    nesne = request.GET.get('nesne', '').strip()
+    object_id = sanitize_integer(nesne, min_value=1) if nesne else None
+
+    kayitlar = alan_gecmisi(model, alan or None, object_id)[:100]
+    return JsonResponse({
+        'success': True,
+        'degisiklikler': [
+            {
+                'nesne': kayit.object_id,
+                'islem': kayit.islem,
+                'alanlar': kayit.degisiklikler,
+                'kullanici': kayit.user.username if kayit.user else None,
+                'tarih': kayit.timestamp.isoformat(),
+            }
+            for kayit in kayitlar
+        ],
+    })
+
+
+@handle_api_errors(error_message="Rate limit istatistikleri alınamadı")
+@staff_member_required
+def rate_limit_istatistikleri_api(request: Any) -> JsonResponse:
+    """Kural ve kapsam (ip / kullanici / token) bazında reddedilen istek sayılarını döndürür."""
+    from .services.rate_limit_service import rate_limit_istatistikleri
+
+    return JsonResponse({'success': True, 'kurallar': rate_limit_istatistikleri()})
+
+
+@handle_view_errors(error_message="Performans istatistikleri yüklenirken bir hata oluştu.")
+@staff_member_required
+def performans_istatistikleri(request: Any) -> Any:
+    """View bazında istek süresi, sorgu sayısı, cache isabeti ve son N+1 adaylarını gösterir."""
+    from stoktakip import performans
+
+    if request.method == 'POST':
+        performans.istatistikleri_sifirla()
+        messages.success(request, "Performans istatistikleri sıfırlandı.")
+        return redirect('accounts:performans')
+
+    son_n1 = performans.son_n1_adaylari()
+    for kayit in son_n1:
+        kayit['zaman'] = datetime.fromtimestamp(kayit['zaman'], tz=timezone.get_current_timezone())
+
+    context = {
+        'istatistikler': performans.istatistikler(),
+        'son_n1': son_n1,
+        'n1_esigi': getattr(settings, 'PERFORMANS_N1_ESIGI', 5),
+        'olcum_acik': getattr(settings, 'PERFORMANS_OLCUMU', True),
+    }
+    return render(request, 'accounts/performans.html', context)
+
+
+@handle_view_errors(error_message="Profiller yüklenirken bir hata oluştu.")
+@staff_member_required
+def profil_listesi(request: Any) -> Any:
+    """Saklanan istek profillerini listeler; POST ile X-Stoktakip-Profil başlığı için token üretir."""
+    from .services.profil_service import PROFIL_PARAMETRESI, profil_tokeni_olustur, profilleri_listele
+
+    token = None
+    if request.method == 'POST':
+        token = profil_tokeni_olustur(request.user)
+
+    context = {
+        'profiller': profilleri_listele(),
+        'token': token,
+        'profil_parametresi': PROFIL_PARAMETRESI,
+        'profil_etkin': getattr(settings, 'PROFIL_ETKIN', True),
+        'profil_limiti': getattr(settings, 'PROFIL_LIMITI', 20),
+        'profil_pencere_dk': getattr(settings, 'PROFIL_PENCERE', 3600) // 60,
+        'token_suresi_dk': getattr(settings, 'PROFIL_TOKEN_SURESI', 3600) // 60,
+    }
+    return render(request, 'accounts/profil_listesi.html', context)
+
+
+@handle_view_errors(error_message="Profil yüklenirken bir hata oluştu.")
+@staff_member_required
+def profil_detay(request: Any, profil_id: str) -> Any:
+    """Profilin en pahalı (kümülatif süreye göre) fonksiyonlarını gösterir."""
+    from .services.profil_service import profil_detayi
+
+    try:
+        profil = profil_detayi(profil_id)
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
+        return redirect('accounts:profil_listesi')
+    return render(request, 'accounts/profil_detay.html', {'profil': profil})
+
+
+@handle_view_errors(error_message="Profil dosyası indirilemedi.")
+@staff_member_required
+def profil_indir(request: Any, profil_id: str) -> Any:
+    """Profilin pstats dosyasını indirir."""
+    from .services.profil_service import profil_dosya_yolu
+
+    try:
+        yol = profil_dosya_yolu(profil_id)
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
+        return redirect('accounts:profil_listesi')
+    return FileResponse(open(yol, 'rb'), as_attachment=True, filename=yol.name, content_type='application/octet-stream')
+
+
+@handle_view_errors(error_message="Yavaş sorgu raporu yüklenirken bir hata oluştu.")
+@staff_member_required
+def yavas_sorgular(request: Any) -> Any:
+    """Yavaş sorgu kalıplarını toplam süreye göre listeler; POST ile kayıtları temizler."""
+    from .models import YavasSorgu
+
+    if request.method == 'POST':
+        YavasSorgu.objects.all().delete()
+        messages.success(request, "Yavaş sorgu kayıtları temizlendi.")
+        return redirect('accounts:yavas_sorgular')
+
+    search_query = request.GET.get('search', '')
+    sorgular = YavasSorgu.objects.order_by('-toplam_ms')
+    if search_query:
+        try:
+            search_query = validate_search_query(search_query, max_length=100)
+            sorgular = sorgular.filter(
+                Q(kalip__icontains=search_query) | Q(cagiran__icontains=search_query) | Q(view__icontains=search_query)
+            )
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+            search_query = ''
+
+    context = {
+        'sorgular': sorgular[:100],
+        'search_query': search_query,
+        'esik_ms': getattr(settings, 'YAVAS_SORGU_ESIGI_MS', 0),
+        'olcum_acik': getattr(settings, 'PERFORMANS_OLCUMU', True),
+    }
+    return render(request, 'accounts/yavas_sorgular.html', context)
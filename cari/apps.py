@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CariConfig(AppConfig):
+    name = "cari"
+
+    def ready(self):
+        # Fiyat listesi cache versiyon damgaları için signal'ları kaydet
+        from . import signals  # noqa: F401
@@ -1,14 +1,16 @@
 from django import forms
 from django.core.exceptions import ValidationError
 import re
-from .models import Cari, CariHareketi, CariNotu, TahsilatMakbuzu, TediyeMakbuzu
+from .models import (
+    Cari, CariGrubu, CariHareketi, CariNotu, FiyatListesi, IskontoKurali, TahsilatMakbuzu, TediyeMakbuzu
+)
 
 
 class CariForm(forms.ModelForm):
     class Meta:
         model = Cari
         fields = ['ad_soyad', 'vergi_dairesi', 'vergi_no', 'tc_vkn', 'telefon', 'email', 
-                  'adres', 'sehir', 'ilce', 'kategori', 'durum', 'risk_limiti', 'user']
+                  'adres', 'sehir', 'ilce', 'kategori', 'durum', 'risk_limiti', 'grup', 'user']
         widgets = {
             'ad_soyad': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ad Soyad / Firma Adı'}),
             'vergi_dairesi': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Vergi Dairesi'}),
@@ -22,6 +24,7 @@ class CariForm(forms.ModelForm):
             'kategori': forms.Select(attrs={'class': 'form-control'}),
             'durum': forms.Select(attrs={'class': 'form-control'}),
             'risk_limiti': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
+            'grup': forms.Select(attrs={'class': 'form-control'}),
             'user': forms.Select(attrs={'class': 'form-control'}),
         }
         labels = {
@@ -37,6 +40,7 @@ class CariForm(forms.ModelForm):
             'kategori': 'Kategori',
             'durum': 'Durum',
             'risk_limiti': 'Risk Limiti (₺)',
+            'grup': 'Cari Grubu',
             'user': 'Kullanıcı Hesabı',
         }
 
@@ -172,3 +176,71 @@ class TediyeMakbuzuForm(forms.ModelForm):
             'aciklama': 'Açıklama',
             'dekont_no': 'Dekont No',
         }
+
+
+class CariGrubuForm(forms.ModelForm):
+    class Meta:
+        model = CariGrubu
+        fields = ['ad', 'aciklama']
+        widgets = {
+            'ad': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ör. Bayiler'}),
+            'aciklama': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
+        }
+        labels = {
+            'ad': 'Grup Adı',
+            'aciklama': 'Açıklama',
+        }
+
+
+class FiyatListesiForm(forms.ModelForm):
+    class Meta:
+        model = FiyatListesi
+        fields = ['ad', 'cari', 'cari_grubu', 'oncelik', 'aktif', 'aciklama']
+        widgets = {
+            'ad': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ör. 2026 Bayi Fiyatları'}),
+            'cari': forms.Select(attrs={'class': 'form-control'}),
+            'cari_grubu': forms.Select(attrs={'class': 'form-control'}),
+            'oncelik': forms.NumberInput(attrs={'class': 'form-control'}),
+            'aktif': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'aciklama': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
+        }
+        labels = {
+            'ad': 'Liste Adı',
+            'cari': 'Cari',
+            'cari_grubu': 'Cari Grubu',
+            'oncelik': 'Öncelik',
+            'aktif': 'Aktif',
+            'aciklama': 'Açıklama',
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['cari'].queryset = Cari.objects.filter(durum='aktif', kategori__in=['musteri', 'her_ikisi'])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('cari') and not cleaned_data.get('cari_grubu'):
+            raise ValidationError('Fiyat listesi bir cariye veya cari grubuna atanmalıdır.')
+        return cleaned_data
+
+
+class IskontoKuraliForm(forms.ModelForm):
+    class Meta:
+        model = IskontoKurali
+        fields = ['urun', 'kategori', 'iskonto_orani']
+        widgets = {
+            'urun': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Ürün ID (opsiyonel)'}),
+            'kategori': forms.Select(attrs={'class': 'form-control'}),
+            'iskonto_orani': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'max': '100'}),
+        }
+        labels = {
+            'urun': 'Ürün',
+            'kategori': 'Kategori',
+            'iskonto_orani': 'İskonto Oranı (%)',
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('urun') and cleaned_data.get('kategori'):
+            raise ValidationError('Kural ya bir ürüne ya da bir kategoriye uygulanmalıdır.')
+        return cleaned_data
@@ -0,0 +1,92 @@
+# Generated by Django 6.0 on 2026-10-19 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cari', '0006_cari_user'),
+        ('stok', '0012_sayim_oturumu'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CariGrubu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad', models.CharField(max_length=100, unique=True, verbose_name='Grup Adı')),
+                ('aciklama', models.TextField(blank=True, null=True, verbose_name='Açıklama')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Cari Grubu',
+                'verbose_name_plural': 'Cari Grupları',
+                'db_table': 'cari_carigrubu',
+                'ordering': ['ad'],
+            },
+        ),
+        migrations.AddField(
+            model_name='cari',
+            name='grup',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cariler', to='cari.carigrubu', verbose_name='Cari Grubu'),
+        ),
+        migrations.CreateModel(
+            name='FiyatListesi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad', models.CharField(max_length=200, verbose_name='Liste Adı')),
+                ('oncelik', models.IntegerField(default=0, verbose_name='Öncelik')),
+                ('aktif', models.BooleanField(default=True, verbose_name='Aktif')),
+                ('aciklama', models.TextField(blank=True, null=True, verbose_name='Açıklama')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('cari', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_listeleri', to='cari.cari', verbose_name='Cari')),
+                ('cari_grubu', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_listeleri', to='cari.carigrubu', verbose_name='Cari Grubu')),
+            ],
+            options={
+                'verbose_name': 'Fiyat Listesi',
+                'verbose_name_plural': 'Fiyat Listeleri',
+                'db_table': 'cari_fiyatlistesi',
+                'ordering': ['-oncelik', 'ad'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FiyatListesiKalemi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fiyat', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Fiyat (KDV Dahil ₺)')),
+                ('fiyat_listesi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kalemler', to='cari.fiyatlistesi', verbose_name='Fiyat Listesi')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_listesi_kalemleri', to='stok.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Fiyat Listesi Kalemi',
+                'verbose_name_plural': 'Fiyat Listesi Kalemleri',
+                'db_table': 'cari_fiyatlistesikalemi',
+            },
+        ),
+        migrations.CreateModel(
+            name='IskontoKurali',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('iskonto_orani', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='İskonto Oranı (%)')),
+                ('fiyat_listesi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='iskonto_kurallari', to='cari.fiyatlistesi', verbose_name='Fiyat Listesi')),
+                ('kategori', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='stok.kategori', verbose_name='Kategori')),
+                ('urun', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='stok.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'İskonto Kuralı',
+                'verbose_name_plural': 'İskonto Kuralları',
+                'db_table': 'cari_iskontokurali',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fiyatlistesi',
+            constraint=models.CheckConstraint(condition=models.Q(('cari__isnull', False), ('cari_grubu__isnull', False), _connector='OR'), name='fiyat_listesi_cari_veya_grup'),
+        ),
+        migrations.AddConstraint(
+            model_name='fiyatlistesikalemi',
+            constraint=models.UniqueConstraint(fields=('fiyat_listesi', 'urun'), name='fiyat_listesi_urun_unique'),
+        ),
+    ]
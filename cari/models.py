@@ -6,8 +6,25 @@ from django.utils import timezone
 from decimal import Decimal
 import re
 
+from stoktakip.model_utils import DegisiklikIzlemeMixin, KisitliKayitMixin
 
-class Cari(models.Model):
+
+class CariGrubu(models.Model):
+    ad = models.CharField(max_length=100, unique=True, verbose_name="Grup Adı")
+    aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+
+    class Meta:
+        verbose_name = "Cari Grubu"
+        verbose_name_plural = "Cari Grupları"
+        ordering = ['ad']
+        db_table = 'cari_carigrubu'
+
+    def __str__(self):
+        return self.ad
+
+
+class Cari(DegisiklikIzlemeMixin, models.Model):
     KATEGORI_CHOICES = [
         ('musteri', 'Müşteri'),
         ('tedarikci', 'Tedarikçi'),
@@ -32,6 +49,7 @@ class Cari(models.Model):
     kategori = models.CharField(max_length=20, choices=KATEGORI_CHOICES, default='musteri', verbose_name="Kategori")
     durum = models.CharField(max_length=10, choices=DURUM_CHOICES, default='aktif', verbose_name="Durum")
     risk_limiti = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name="Risk Limiti (₺)")
+    grup = models.ForeignKey(CariGrubu, on_delete=models.SET_NULL, null=True, blank=True, related_name='cariler', verbose_name="Cari Grubu")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
     guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
 
@@ -47,6 +65,8 @@ class Cari(models.Model):
             models.Index(fields=['vergi_no'], name='cari_vergi_no_idx'),
         ]
 
+    izlenen_alanlar = ('ad_soyad', 'vergi_dairesi', 'vergi_no', 'tc_vkn', 'telefon', 'email', 'adres', 'kategori', 'durum', 'risk_limiti', 'grup', 'user')
+
     def __str__(self):
         return self.ad_soyad
     
@@ -112,7 +132,7 @@ class Cari(models.Model):
         return son_hareket.tarih if son_hareket else None
 
 
-class CariHareketi(models.Model):
+class CariHareketi(DegisiklikIzlemeMixin, KisitliKayitMixin, models.Model):
     HAREKET_TURU_CHOICES = [
         ('satis_faturasi', 'Satış Faturası'),
         ('alis_faturasi', 'Alış Faturası'),
@@ -149,6 +169,15 @@ class CariHareketi(models.Model):
             models.Index(fields=['hareket_turu'], name='carihareketi_hareket_turu_idx'),
             models.Index(fields=['cari', 'tarih'], name='carihareketi_cari_tarih_idx'),
         ]
+        constraints = [
+            models.CheckConstraint(condition=Q(tutar__gt=0), name='carihareketi_tutar_pozitif'),
+        ]
+
+    izlenen_alanlar = ('cari', 'hareket_turu', 'tutar', 'belge_no', 'tarih', 'odeme_yontemi')
+
+    kisit_mesajlari = {
+        'carihareketi_tutar_pozitif': ('tutar', 'Tutar 0\'dan büyük olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.cari.ad_soyad} - {self.get_hareket_turu_display()} - {self.tutar} ₺"
@@ -169,10 +198,94 @@ class CariHareketi(models.Model):
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
 
 
+class FiyatListesi(models.Model):
+    """
+    Cariye veya cari grubuna özel satış fiyat listesi.
+
+    Cariye doğrudan atanmış liste, grubunun listesinden önce gelir; aynı
+    seviyede birden fazla aktif liste varsa önceliği yüksek olan kullanılır.
+    Fiyatlar Urun.fiyat gibi KDV dahildir.
+    """
+    ad = models.CharField(max_length=200, verbose_name="Liste Adı")
+    cari = models.ForeignKey(Cari, on_delete=models.CASCADE, null=True, blank=True, related_name='fiyat_listeleri', verbose_name="Cari")
+    cari_grubu = models.ForeignKey(CariGrubu, on_delete=models.CASCADE, null=True, blank=True, related_name='fiyat_listeleri', verbose_name="Cari Grubu")
+    oncelik = models.IntegerField(default=0, verbose_name="Öncelik")
+    aktif = models.BooleanField(default=True, verbose_name="Aktif")
+    aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    class Meta:
+        verbose_name = "Fiyat Listesi"
+        verbose_name_plural = "Fiyat Listeleri"
+        ordering = ['-oncelik', 'ad']
+        db_table = 'cari_fiyatlistesi'
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(cari__isnull=False) | models.Q(cari_grubu__isnull=False),
+                name='fiyat_listesi_cari_veya_grup',
+            ),
+        ]
+
+    def __str__(self):
+        return self.ad
+
+    def clean(self):
+        if not self.cari_id and not self.cari_grubu_id:
+            raise ValidationError('Fiyat listesi bir cariye veya cari grubuna atanmalıdır.')
+
+
+class FiyatListesiKalemi(models.Model):
+    fiyat_listesi = models.ForeignKey(FiyatListesi, on_delete=models.CASCADE, related_name='kalemler', verbose_name="Fiyat Listesi")
+    urun = models.ForeignKey('stok.Urun', on_delete=models.CASCADE, related_name='fiyat_listesi_kalemleri', verbose_name="Ürün")
+    fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Fiyat (KDV Dahil ₺)")
+
+    class Meta:
+        verbose_name = "Fiyat Listesi Kalemi"
+        verbose_name_plural = "Fiyat Listesi Kalemleri"
+        db_table = 'cari_fiyatlistesikalemi'
+        constraints = [
+            models.UniqueConstraint(fields=['fiyat_listesi', 'urun'], name='fiyat_listesi_urun_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.fiyat_listesi} - {self.urun_id}: {self.fiyat}"
+
+    def clean(self):
+        if self.fiyat is not None and self.fiyat < 0:
+            raise ValidationError({'fiyat': 'Fiyat negatif olamaz.'})
+
+
+class IskontoKurali(models.Model):
+    """
+    Fiyat listesinde fiyatı tanımlı olmayan ürünlere uygulanan iskonto.
+
+    Ürüne özel kural, kategori kuralından; kategori kuralı da genel (ürün ve
+    kategori boş) kuraldan önce gelir.
+    """
+    fiyat_listesi = models.ForeignKey(FiyatListesi, on_delete=models.CASCADE, related_name='iskonto_kurallari', verbose_name="Fiyat Listesi")
+    urun = models.ForeignKey('stok.Urun', on_delete=models.CASCADE, null=True, blank=True, verbose_name="Ürün")
+    kategori = models.ForeignKey('stok.Kategori', on_delete=models.CASCADE, null=True, blank=True, verbose_name="Kategori")
+    iskonto_orani = models.DecimalField(max_digits=5, decimal_places=2, verbose_name="İskonto Oranı (%)")
+
+    class Meta:
+        verbose_name = "İskonto Kuralı"
+        verbose_name_plural = "İskonto Kuralları"
+        db_table = 'cari_iskontokurali'
+
+    def __str__(self):
+        hedef = self.urun or self.kategori or 'Tüm ürünler'
+        return f"{self.fiyat_listesi} - {hedef}: %{self.iskonto_orani}"
+
+    def clean(self):
+        if self.iskonto_orani is not None and not (0 <= self.iskonto_orani <= 100):
+            raise ValidationError({'iskonto_orani': 'İskonto oranı 0 ile 100 arasında olmalıdır.'})
+
+
 class CariNotu(models.Model):
     cari = models.ForeignKey(Cari, on_delete=models.CASCADE, related_name='notlar', verbose_name="Cari")
     baslik = models.CharField(max_length=200, verbose_name="Başlık")
@@ -191,7 +304,7 @@ class CariNotu(models.Model):
         return f"{self.cari.ad_soyad} - {self.baslik}"
 
 
-class TahsilatMakbuzu(models.Model):
+class TahsilatMakbuzu(KisitliKayitMixin, models.Model):
     ODEME_YONTEMI_CHOICES = [
         ('nakit', 'Nakit'),
         ('havale', 'Havale'),
@@ -215,6 +328,14 @@ class TahsilatMakbuzu(models.Model):
         verbose_name_plural = "Tahsilat Makbuzları"
         ordering = ['-tarih', '-id']
         db_table = 'cari_tahsilatmakbuzu'
+        constraints = [
+            models.CheckConstraint(condition=Q(tutar__gt=0), name='tahsilatmakbuzu_tutar_pozitif'),
+        ]
+
+    kisit_mesajlari = {
+        'makbuz_no': ('makbuz_no', 'Bu makbuz numarası zaten kullanılıyor.'),
+        'tahsilatmakbuzu_tutar_pozitif': ('tutar', 'Tutar 0\'dan büyük olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.makbuz_no} - {self.cari.ad_soyad} - {self.tutar} ₺"
@@ -227,17 +348,13 @@ class TahsilatMakbuzu(models.Model):
         if self.tutar <= 0:
             errors['tutar'] = 'Tutar 0\'dan büyük olmalıdır.'
         
-        # Makbuz no unique kontrolü (unique=True var ama clean'de kontrol)
-        if self.makbuz_no:
-            existing = TahsilatMakbuzu.objects.filter(makbuz_no=self.makbuz_no).exclude(pk=self.pk)
-            if existing.exists():
-                errors['makbuz_no'] = 'Bu makbuz numarası zaten kullanılıyor.'
+        # Makbuz no benzersizliği veritabanı kısıtıyla sağlanır (bkz. kisit_mesajlari)
         
         if errors:
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
         CariHareketi.objects.create(
             cari=self.cari,
@@ -251,7 +368,7 @@ class TahsilatMakbuzu(models.Model):
         )
 
 
-class TediyeMakbuzu(models.Model):
+class TediyeMakbuzu(KisitliKayitMixin, models.Model):
     ODEME_YONTEMI_CHOICES = [
         ('nakit', 'Nakit'),
         ('havale', 'Havale'),
@@ -275,6 +392,14 @@ class TediyeMakbuzu(models.Model):
         verbose_name_plural = "Tediye Makbuzları"
         ordering = ['-tarih', '-id']
         db_table = 'cari_tediyemakbuzu'
+        constraints = [
+            models.CheckConstraint(condition=Q(tutar__gt=0), name='tediyemakbuzu_tutar_pozitif'),
+        ]
+
+    kisit_mesajlari = {
+        'makbuz_no': ('makbuz_no', 'Bu makbuz numarası zaten kullanılıyor.'),
+        'tediyemakbuzu_tutar_pozitif': ('tutar', 'Tutar 0\'dan büyük olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.makbuz_no} - {self.cari.ad_soyad} - {self.tutar} ₺"
@@ -287,17 +412,13 @@ class TediyeMakbuzu(models.Model):
         if self.tutar <= 0:
             errors['tutar'] = 'Tutar 0\'dan büyük olmalıdır.'
         
-        # Makbuz no unique kontrolü (unique=True var ama clean'de kontrol)
-        if self.makbuz_no:
-            existing = TediyeMakbuzu.objects.filter(makbuz_no=self.makbuz_no).exclude(pk=self.pk)
-            if existing.exists():
-                errors['makbuz_no'] = 'Bu makbuz numarası zaten kullanılıyor.'
+        # Makbuz no benzersizliği veritabanı kısıtıyla sağlanır (bkz. kisit_mesajlari)
         
         if errors:
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
         CariHareketi.objects.create(
             cari=self.cari,
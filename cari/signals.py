@@ -0,0 +1,44 @@
+"""
+Cari signal'ları.
+
+Fiyat listesi, kalemleri, iskonto kuralları ve cari grubu değişikliklerinde
+fiyat listesi cache damgalarını artırır (bkz.
+stoktakip/services/fiyat_listesi_service.py).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Cari, FiyatListesi, FiyatListesiKalemi, IskontoKurali
+from stoktakip.services.fiyat_listesi_service import (
+    fiyat_listesi_atamalarini_gecersiz_kil,
+    fiyat_listesi_versiyonunu_artir,
+)
+
+
+@receiver(post_save, sender=FiyatListesi)
+@receiver(post_delete, sender=FiyatListesi)
+def fiyat_listesi_degisti(sender, instance, **kwargs):
+    liste_id = instance.pk
+
+    def damgala():
+        fiyat_listesi_versiyonunu_artir([liste_id])
+        # Aktiflik, öncelik veya atanan cari/grup değişmiş olabilir
+        fiyat_listesi_atamalarini_gecersiz_kil()
+
+    transaction.on_commit(damgala)
+
+
+@receiver(post_save, sender=FiyatListesiKalemi)
+@receiver(post_delete, sender=FiyatListesiKalemi)
+@receiver(post_save, sender=IskontoKurali)
+@receiver(post_delete, sender=IskontoKurali)
+def fiyat_listesi_icerigi_degisti(sender, instance, **kwargs):
+    liste_id = instance.fiyat_listesi_id
+    transaction.on_commit(lambda: fiyat_listesi_versiyonunu_artir([liste_id]))
+
+
+@receiver(post_save, sender=Cari)
+def cari_kaydedildi(sender, instance, **kwargs):
+    # Carinin grubu değişmiş olabilir
+    transaction.on_commit(fiyat_listesi_atamalarini_gecersiz_kil)
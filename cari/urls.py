@@ -24,4 +24,6 @@ urlpatterns = [
     path('tediye/ekle/', views.tediye_makbuzu_ekle, name='tediye_ekle'),
     path('tediye/<int:cari_pk>/ekle/', views.tediye_makbuzu_ekle, name='tediye_cari_ekle'),
     path('tediye/', views.tediye_makbuzu_listesi, name='tediye_listesi'),
+    path('fiyat-listeleri/', views.fiyat_listeleri, name='fiyat_listeleri'),
+    path('fiyat-listeleri/<int:pk>/', views.fiyat_listesi_detay, name='fiyat_listesi_detay'),
 ]
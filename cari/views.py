@@ -11,17 +11,24 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Any
 import logging
-from .models import Cari, CariHareketi, CariNotu, TahsilatMakbuzu, TediyeMakbuzu
-from .forms import CariForm, CariHareketiForm, CariNotuForm, TahsilatMakbuzuForm, TediyeMakbuzuForm
+from .models import (
+    Cari, CariGrubu, CariHareketi, CariNotu, FiyatListesi, IskontoKurali, TahsilatMakbuzu, TediyeMakbuzu
+)
+from .forms import (
+    CariForm, CariGrubuForm, CariHareketiForm, CariNotuForm, FiyatListesiForm, IskontoKuraliForm,
+    TahsilatMakbuzuForm, TediyeMakbuzuForm
+)
 from stoktakip.template_helpers import (
     generate_pagination_html, prepare_cari_table_data, generate_table_html
 )
+from stoktakip.pagination import KeysetPaginator, IMLEC_PARAMETRESI
 from stoktakip.error_handling import handle_view_errors, database_transaction
 from stoktakip.security_utils import (
     sanitize_string, sanitize_integer, sanitize_decimal, validate_date_range, validate_search_query
 )
 from stoktakip.cache_utils import cache_view_result
 from accounts.utils import log_action
+from stoktakip.services.fiyat_listesi_service import fiyat_listesi_kalemlerini_kaydet
 
 logger = logging.getLogger(__name__)
 
@@ -447,7 +454,7 @@ def hareket_listesi(request: Any) -> Any:
     hareket listesini gösterir. Input validation, caching ve error handling ile güvenli hale getirilmiştir.
     """
     try:
-        hareket_list = CariHareketi.objects.select_related('cari', 'olusturan').all().order_by('-tarih', '-id')
+        hareket_list = CariHareketi.objects.select_related('cari', 'olusturan').all()
 
         # Cari filtresi - Input validation
         cari_filter = request.GET.get('cari', '')
@@ -496,9 +503,16 @@ def hareket_listesi(request: Any) -> Any:
             except Exception:
                 tarih_bitis = ''
 
-        paginator = Paginator(hareket_list, 50)
-        page_number = request.GET.get('page')
-        hareketler = paginator.get_page(page_number)
+        # Keyset sayfalama: derin sayfalar OFFSET taraması yapmaz, toplam büyük listelerde tahminidir
+        paginator = KeysetPaginator(hareket_list, 50, siralama=('-tarih', '-id'))
+        hareketler = paginator.get_page(request.GET.get(IMLEC_PARAMETRESI))
+        request_params = {
+            'cari': cari_filter,
+            'hareket_turu': hareket_turu_filter,
+            'tarih_baslangic': tarih_baslangic,
+            'tarih_bitis': tarih_bitis,
+        }
+        pagination_html = generate_pagination_html(hareketler, request_params, request.path) if hareketler.has_other_pages() else None
 
         # Fatura lookup - N+1 query problemini çöz (prefetch_related kullanılamaz çünkü belge_no ile lookup yapılıyor)
         from fatura.models import Fatura
@@ -523,6 +537,7 @@ def hareket_listesi(request: Any) -> Any:
         context = {
             'hareketler': hareketler,
             'hareketler_with_fatura': hareketler_with_fatura,
+            'pagination_html': pagination_html,
             'cariler': Cari.objects.filter(durum='aktif').order_by('ad_soyad'),
             'cari_filter': cari_filter,
             'hareket_turu_filter': hareket_turu_filter,
@@ -993,3 +1008,125 @@ def tediye_makbuzu_listesi(request: Any) -> Any:
     except Exception as e:
         logger.error(f"Tediye makbuzu listesi hatası: {str(e)}", exc_info=True)
         raise
+
+
+@handle_view_errors(error_message="Fiyat listeleri yüklenirken bir hata oluştu.")
+@login_required
+def fiyat_listeleri(request: Any) -> Any:
+    """
+    Cari / cari grubu fiyat listeleri.
+
+    GET: Listeler ve gruplar. POST: yeni fiyat listesi ('liste') veya yeni cari grubu ('grup').
+    """
+    liste_form = FiyatListesiForm(prefix='liste')
+    grup_form = CariGrubuForm(prefix='grup')
+
+    if request.method == 'POST':
+        if request.POST.get('islem') == 'grup':
+            grup_form = CariGrubuForm(request.POST, prefix='grup')
+            if grup_form.is_valid():
+                grup = grup_form.save()
+                log_action(request.user, 'create', grup, f'Cari grubu oluşturuldu: {grup.ad}', request)
+                messages.success(request, f'"{grup.ad}" grubu oluşturuldu.')
+                return redirect('cari:fiyat_listeleri')
+        else:
+            liste_form = FiyatListesiForm(request.POST, prefix='liste')
+            if liste_form.is_valid():
+                liste = liste_form.save()
+                log_action(request.user, 'create', liste, f'Fiyat listesi oluşturuldu: {liste.ad}', request)
+                messages.success(request, f'"{liste.ad}" fiyat listesi oluşturuldu.')
+                return redirect('cari:fiyat_listesi_detay', pk=liste.pk)
+        messages.error(request, 'Lütfen form hatalarını düzeltin.')
+
+    listeler = FiyatListesi.objects.select_related('cari', 'cari_grubu').annotate(
+        kalem_sayisi=models.Count('kalemler', distinct=True),
+        kural_sayisi=models.Count('iskonto_kurallari', distinct=True),
+    )
+    gruplar = CariGrubu.objects.annotate(cari_sayisi=models.Count('cariler'))
+    return render(request, 'cari/fiyat_listeleri.html', {
+        'listeler': listeler,
+        'gruplar': gruplar,
+        'liste_form': liste_form,
+        'grup_form': grup_form,
+    })
+
+
+@handle_view_errors(error_message="Fiyat listesi işlenirken bir hata oluştu.", redirect_url="cari:fiyat_listeleri")
+@login_required
+def fiyat_listesi_detay(request: Any, pk: int) -> Any:
+    """
+    Fiyat listesi detayı: liste bilgileri, ürün fiyatları ve iskonto kuralları.
+
+    POST islem: 'kaydet' (liste bilgileri), 'fiyatlar' (toplu fiyat girişi, her satır
+    "barkod veya ürün ID;fiyat"), 'fiyat_sil', 'kural_ekle', 'kural_sil', 'sil'.
+    """
+    from django.core.exceptions import ValidationError
+
+    liste = get_object_or_404(FiyatListesi.objects.select_related('cari', 'cari_grubu'), pk=pk)
+    liste_form = FiyatListesiForm(instance=liste, prefix='liste')
+    kural_form = IskontoKuraliForm(prefix='kural')
+
+    if request.method == 'POST':
+        islem = request.POST.get('islem')
+        if islem == 'kaydet':
+            liste_form = FiyatListesiForm(request.POST, instance=liste, prefix='liste')
+            if liste_form.is_valid():
+                liste_form.save()
+                log_action(request.user, 'update', liste, f'Fiyat listesi güncellendi: {liste.ad}', request)
+                messages.success(request, 'Fiyat listesi güncellendi.')
+                return redirect('cari:fiyat_listesi_detay', pk=pk)
+            messages.error(request, 'Lütfen form hatalarını düzeltin.')
+        elif islem == 'fiyatlar':
+            satirlar = []
+            for satir in request.POST.get('fiyat_metni', '').splitlines():
+                parcalar = [p for p in satir.replace('\t', ';').split(';') if p.strip()]
+                if len(parcalar) >= 2:
+                    satirlar.append((parcalar[0], parcalar[1]))
+            try:
+                sonuc = fiyat_listesi_kalemlerini_kaydet(liste, satirlar)
+            except ValidationError as e:
+                messages.error(request, ' '.join(e.messages))
+            else:
+                log_action(request.user, 'update', liste,
+                           f'Fiyat listesine {sonuc["kaydedilen"]} ürün fiyatı kaydedildi: {liste.ad}', request)
+                messages.success(request, f'{sonuc["kaydedilen"]} ürün fiyatı kaydedildi.')
+                if sonuc['bulunamayan'] or sonuc['hatali']:
+                    messages.warning(request, 'Atlanan satırlar: ' + ', '.join((sonuc['bulunamayan'] + sonuc['hatali'])[:20]))
+            return redirect('cari:fiyat_listesi_detay', pk=pk)
+        elif islem == 'fiyat_sil':
+            kalem_idler = [int(x) for x in request.POST.getlist('kalem_ids') if x.isdigit()]
+            liste.kalemler.filter(pk__in=kalem_idler).delete()
+            messages.success(request, 'Seçilen fiyatlar silindi.')
+            return redirect('cari:fiyat_listesi_detay', pk=pk)
+        elif islem == 'kural_ekle':
+            kural_form = IskontoKuraliForm(request.POST, prefix='kural')
+            if kural_form.is_valid():
+                kural = kural_form.save(commit=False)
+                kural.fiyat_listesi = liste
+                kural.save()
+                messages.success(request, 'İskonto kuralı eklendi.')
+                return redirect('cari:fiyat_listesi_detay', pk=pk)
+            messages.error(request, 'Lütfen form hatalarını düzeltin.')
+        elif islem == 'kural_sil':
+            kural = get_object_or_404(IskontoKurali, pk=request.POST.get('kural_id'), fiyat_listesi=liste)
+            kural.delete()
+            messages.success(request, 'İskonto kuralı silindi.')
+            return redirect('cari:fiyat_listesi_detay', pk=pk)
+        elif islem == 'sil':
+            ad = liste.ad
+            log_action(request.user, 'delete', liste, f'Fiyat listesi silindi: {ad}', request)
+            liste.delete()
+            messages.success(request, f'"{ad}" fiyat listesi silindi.')
+            return redirect('cari:fiyat_listeleri')
+
+    kalemler = Paginator(
+        liste.kalemler.select_related('urun').order_by('urun__ad'), 100
+    ).get_page(request.GET.get('page'))
+    return render(request, 'cari/fiyat_listesi_detay.html', {
+        'liste': liste,
+        'liste_form': liste_form,
+        'kural_form': kural_form,
+        'kalemler': kalemler,
+        'kurallar': liste.iskonto_kurallari.select_related('urun', 'kategori'),
+    })
+
@@ -123,7 +123,7 @@ class FaturaKalemForm(forms.ModelForm):
         # Empty label ekle
         self.fields['urun'].empty_label = 'Seçiniz'
         # KDV oranı varsayılan değeri 20
-        if not self.instance.pk or not self.instance.kdv_orani or self.instance.kdv_orani == 0:
+        if not self.instance.pk:
             self.fields['kdv_orani'].initial = 20
     
     def clean(self):
@@ -143,7 +143,7 @@ class FaturaKalemForm(forms.ModelForm):
         
         # KDV oranı kontrolü ve varsayılan değer
         kdv_orani = cleaned_data.get('kdv_orani')
-        if kdv_orani is None or kdv_orani == 0:
+        if kdv_orani is None:
             cleaned_data['kdv_orani'] = 20  # Varsayılan %20
         elif kdv_orani < 0 or kdv_orani > 100:
             errors['kdv_orani'] = 'KDV oranı 0 ile 100 arasında olmalıdır.'
@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+APP = 'fatura'
+
+# (model, kısıt adı, koşul); koşullar aşağıdaki AddConstraint'lerle aynıdır
+KISITLAR = [
+    ('FaturaKalem', 'faturakalem_miktar_pozitif', models.Q(('miktar__gt', 0))),
+    ('FaturaKalem', 'faturakalem_birim_fiyat_negatif_degil', models.Q(('birim_fiyat__gte', 0))),
+    ('FaturaKalem', 'faturakalem_kdv_orani_aralik', models.Q(('kdv_orani__gte', 0), ('kdv_orani__lte', 100))),
+]
+
+
+def kisitlara_uymayanlari_bildir(apps, schema_editor):
+    """
+    Kısıtlar eklenmeden önce mevcut veride ihlal eden satırları arar.
+
+    Bu satırlar iş verisidir (tutar/miktar işareti kendiliğinden düzeltilemez);
+    varsa tablo, kısıt ve örnek ID'lerle birlikte raporlanır ve migration
+    kısıt eklenmeden durur. Satırlar düzeltildikten sonra migrate tekrar çalıştırılır.
+    """
+    hatalar = []
+    for model_adi, kisit_adi, kosul in KISITLAR:
+        model = apps.get_model(APP, model_adi)
+        uymayanlar = model.objects.exclude(kosul)
+        ornekler = list(uymayanlar.order_by('pk').values_list('pk', flat=True)[:20])
+        if ornekler:
+            hatalar.append(
+                f"{model._meta.db_table}: {uymayanlar.count()} satır '{kisit_adi}' kısıtına uymuyor "
+                f"(ilk ID'ler: {', '.join(map(str, ornekler))})"
+            )
+    if hatalar:
+        raise RuntimeError(
+            "Veritabanı kısıtları eklenemedi, önce aşağıdaki kayıtlar düzeltilmeli:\n" + '\n'.join(hatalar)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fatura', '0009_update_durum_choices'),
+        ('stok', '0014_kisitlar'),
+    ]
+
+    operations = [
+        migrations.RunPython(kisitlara_uymayanlari_bildir, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='faturakalem',
+            constraint=models.CheckConstraint(condition=models.Q(('miktar__gt', 0)), name='faturakalem_miktar_pozitif'),
+        ),
+        migrations.AddConstraint(
+            model_name='faturakalem',
+            constraint=models.CheckConstraint(condition=models.Q(('birim_fiyat__gte', 0)), name='faturakalem_birim_fiyat_negatif_degil'),
+        ),
+        migrations.AddConstraint(
+            model_name='faturakalem',
+            constraint=models.CheckConstraint(condition=models.Q(('kdv_orani__gte', 0), ('kdv_orani__lte', 100)), name='faturakalem_kdv_orani_aralik'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-19 23:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fatura', '0010_faturakalem_kisitlari'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaturaNoSayaci',
+            fields=[
+                ('onek', models.CharField(max_length=30, primary_key=True, serialize=False, verbose_name='Önek')),
+                ('son_no', models.PositiveIntegerField(default=0, verbose_name='Son Numara')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Fatura No Sayacı',
+                'verbose_name_plural': 'Fatura No Sayaçları',
+                'db_table': 'fatura_faturanosayaci',
+            },
+        ),
+    ]
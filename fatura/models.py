@@ -4,8 +4,10 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from stoktakip.model_utils import DegisiklikIzlemeMixin, KisitliKayitMixin
 
-class Fatura(models.Model):
+
+class Fatura(DegisiklikIzlemeMixin, models.Model):
     TIP_SECENEKLERI = [
         ('Satis', 'Satış'),
         ('Alis', 'Alış'),
@@ -43,36 +45,25 @@ class Fatura(models.Model):
             models.Index(fields=['cari', 'fatura_tarihi'], name='fatura_cari_tarih_idx'),
         ]
 
+    izlenen_alanlar = (
+        'fatura_no', 'cari', 'fatura_tarihi', 'fatura_tipi', 'durum', 'iskonto_orani', 'iskonto_tutari',
+        'toplam_tutar', 'kdv_tutari', 'genel_toplam',
+    )
+
     def __str__(self):
         return f"{self.fatura_no} - {self.fatura_tarihi}"
     
     def olustur_fatura_no(self):
-        from django.db.models import Max
-        from datetime import datetime
-        
-        prefix = 'SATIS' if self.fatura_tipi == 'Satis' else 'ALIS'
-        yil = self.fatura_tarihi.year if self.fatura_tarihi else datetime.now().year
-        ay = self.fatura_tarihi.month if self.fatura_tarihi else datetime.now().month
-        gun = self.fatura_tarihi.day if self.fatura_tarihi else datetime.now().day
-        
-        tarih_str = f"{yil}{ay:02d}{gun:02d}"
-        arama_pattern = f"{prefix}-{tarih_str}-"
-        
-        son_fatura = Fatura.objects.filter(
-            fatura_no__startswith=arama_pattern
-        ).aggregate(Max('fatura_no'))
-        
-        if son_fatura['fatura_no__max']:
-            try:
-                son_no_str = son_fatura['fatura_no__max'].split('-')[-1]
-                son_no = int(son_no_str)
-                yeni_no = son_no + 1
-            except (ValueError, IndexError):
-                yeni_no = 1
-        else:
-            yeni_no = 1
-        
-        return f"{prefix}-{tarih_str}-{yeni_no:03d}"
+        """
+        Sıradaki fatura numarasını ayırır (SATIS-YYYYMMDD-NNN / ALIS-YYYYMMDD-NNN).
+
+        Toplu oluşturmayla aynı sayaçtan (FaturaNoSayaci) alınır; eşzamanlı
+        kaydedilen faturalar aynı numarayı alamaz.
+        """
+        from django.utils import timezone
+        from stoktakip.services.fatura_toplu_service import siradaki_fatura_nolari
+
+        return siradaki_fatura_nolari(self.fatura_tipi, self.fatura_tarihi or timezone.localdate(), 1)[0]
 
     def save(self, *args, **kwargs):
         """
@@ -92,9 +83,15 @@ class Fatura(models.Model):
         # NOT: Bu model seviyesinde kalabilir çünkü model'in kendi verisini günceller
         if self.pk:
             self.hesapla_toplamlar()
-            self.refresh_from_db()
 
     def hesapla_toplamlar(self):
+        """
+        Kalemlerden toplamları hesaplayıp tek UPDATE ile yazar.
+
+        Yeni değerler nesneye de atanır (ek SELECT yapılmaz). update() izleme
+        dışında kaldığı için değişen toplamlar yükleme görüntüsüyle
+        karşılaştırılıp alan değişikliği olarak ayrıca kaydedilir.
+        """
         from decimal import ROUND_HALF_UP
         kalemler = self.kalemler.all()
         toplam_tutar = kalemler.aggregate(toplam=Sum('toplam_tutar'))['toplam'] or Decimal('0.00')
@@ -112,16 +109,46 @@ class Fatura(models.Model):
         # Genel toplam = Genel toplam (KDV dahil) - İskonto
         genel_toplam = genel_toplam_brut - iskonto_tutari
         
-        Fatura.objects.filter(pk=self.pk).update(
-            toplam_tutar=toplam_tutar,
-            kdv_tutari=kdv_tutari,
-            iskonto_tutari=iskonto_tutari,
-            genel_toplam=genel_toplam
-        )
-        self.refresh_from_db()
+        toplamlar = {
+            'toplam_tutar': toplam_tutar,
+            'kdv_tutari': kdv_tutari,
+            'iskonto_tutari': iskonto_tutari,
+            'genel_toplam': genel_toplam,
+        }
+        Fatura.objects.filter(pk=self.pk).update(**toplamlar)
+        for alan, deger in toplamlar.items():
+            setattr(self, alan, deger.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+        degisiklikler = {alan: degerler for alan, degerler in self.degisen_alanlar().items() if alan in toplamlar}
+        if degisiklikler:
+            from accounts.utils import alan_degisikligi_kaydet
+            alan_degisikligi_kaydet(self, 'update', degisiklikler)
+        ilk = self.__dict__.get('_ilk_degerler')
+        if ilk is not None:
+            ilk.update(self._izlenen_degerler(set(toplamlar)))
+
+
+class FaturaNoSayaci(models.Model):
+    """
+    Fatura numarası öneki (ör. 'SATIS-20261019-') başına son verilen numara.
 
+    Toplu numara ayırma sırasında satır kilitlenir (SELECT ... FOR UPDATE);
+    eşzamanlı satışlar aynı numarayı alamaz.
+    """
+    onek = models.CharField(max_length=30, primary_key=True, verbose_name="Önek")
+    son_no = models.PositiveIntegerField(default=0, verbose_name="Son Numara")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    class Meta:
+        verbose_name = "Fatura No Sayacı"
+        verbose_name_plural = "Fatura No Sayaçları"
+        db_table = 'fatura_faturanosayaci'
 
-class FaturaKalem(models.Model):
+    def __str__(self):
+        return f"{self.onek}{self.son_no:03d}"
+
+
+class FaturaKalem(DegisiklikIzlemeMixin, KisitliKayitMixin, models.Model):
     fatura = models.ForeignKey(Fatura, on_delete=models.CASCADE, related_name='kalemler', verbose_name="Fatura")
     urun = models.ForeignKey('stok.Urun', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Ürün")
     urun_adi = models.CharField(max_length=100, verbose_name="Ürün Adı")
@@ -137,6 +164,21 @@ class FaturaKalem(models.Model):
         verbose_name_plural = "Fatura Kalemleri"
         ordering = ['sira_no']
         db_table = 'fatura_faturakalem'
+        constraints = [
+            models.CheckConstraint(condition=models.Q(miktar__gt=0), name='faturakalem_miktar_pozitif'),
+            models.CheckConstraint(condition=models.Q(birim_fiyat__gte=0), name='faturakalem_birim_fiyat_negatif_degil'),
+            models.CheckConstraint(
+                condition=models.Q(kdv_orani__gte=0, kdv_orani__lte=100), name='faturakalem_kdv_orani_aralik'
+            ),
+        ]
+
+    izlenen_alanlar = ('fatura', 'urun', 'urun_adi', 'miktar', 'birim_fiyat', 'kdv_orani', 'toplam_tutar')
+
+    kisit_mesajlari = {
+        'faturakalem_miktar_pozitif': ('miktar', 'Miktar 0\'dan büyük olmalıdır.'),
+        'faturakalem_birim_fiyat_negatif_degil': ('birim_fiyat', 'Birim fiyat negatif olamaz.'),
+        'faturakalem_kdv_orani_aralik': ('kdv_orani', 'KDV oranı 0 ile 100 arasında olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.fatura.fatura_no} - {self.urun_adi}"
@@ -162,8 +204,8 @@ class FaturaKalem(models.Model):
     
     def save(self, *args, **kwargs):
         from decimal import Decimal, ROUND_HALF_UP
-        # KDV oranı yoksa veya 0 ise, varsayılan %20 yap
-        if not self.kdv_orani or self.kdv_orani == 0:
+        # KDV oranı verilmemişse varsayılan %20; %0 (istisna) geçerli bir orandır
+        if self.kdv_orani is None:
             self.kdv_orani = 20
         ara_toplam = Decimal(str(self.birim_fiyat)) * Decimal(str(self.miktar))
         # 2 ondalık basamağa yuvarla
@@ -171,7 +213,7 @@ class FaturaKalem(models.Model):
         self.kdv_tutari = (ara_toplam * (Decimal(str(self.kdv_orani)) / Decimal('100'))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         self.toplam_tutar = ara_toplam
 
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         
         if not self.sira_no or self.sira_no == 0:
             max_sira = FaturaKalem.objects.filter(fatura=self.fatura).aggregate(
@@ -0,0 +1,256 @@
+import io
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DataError, connections, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from accounts.utils import alan_gecmisi
+from cari.models import Cari
+from fatura.models import Fatura, FaturaKalem, FaturaNoSayaci
+from finans.models import HesapKart
+from stok.models import Urun
+from stoktakip.services import fatura_import_service
+from stoktakip.services.fatura_import_service import import_alis_faturalari
+from stoktakip.services.fatura_toplu_service import siradaki_fatura_nolari
+from stoktakip.services.hizli_satis_service import hizli_satis_olustur
+from stoktakip.services.urun_service import urun_bilgileri_toplu
+
+TARIH = date(2026, 3, 14)
+
+
+class FaturaNoAyirmaTests(TestCase):
+    """Tekil (Fatura.save) ve toplu numara ayırma aynı sayacı kullanır."""
+
+    def test_tekil_ve_toplu_numaralar_ardisik(self):
+        ilk = Fatura.objects.create(fatura_tarihi=TARIH, fatura_tipi='Satis')
+        toplu = siradaki_fatura_nolari('Satis', TARIH, 3)
+        son = Fatura.objects.create(fatura_tarihi=TARIH, fatura_tipi='Satis')
+
+        self.assertEqual(ilk.fatura_no, 'SATIS-20260314-001')
+        self.assertEqual(toplu, ['SATIS-20260314-002', 'SATIS-20260314-003', 'SATIS-20260314-004'])
+        self.assertEqual(son.fatura_no, 'SATIS-20260314-005')
+        self.assertEqual(FaturaNoSayaci.objects.get(onek='SATIS-20260314-').son_no, 5)
+
+    def test_tip_ve_tarih_ayri_sayac(self):
+        self.assertEqual(siradaki_fatura_nolari('Alis', TARIH, 1), ['ALIS-20260314-001'])
+        self.assertEqual(siradaki_fatura_nolari('Satis', date(2026, 3, 15), 1), ['SATIS-20260315-001'])
+
+    def test_sayactan_once_verilmis_numaradan_devam_eder(self):
+        Fatura.objects.create(fatura_no='SATIS-20260314-041', fatura_tarihi=TARIH, fatura_tipi='Satis')
+        self.assertEqual(siradaki_fatura_nolari('Satis', TARIH, 1), ['SATIS-20260314-042'])
+
+    def test_999_sonrasi(self):
+        Fatura.objects.create(fatura_no='SATIS-20260314-999', fatura_tarihi=TARIH, fatura_tipi='Satis')
+        self.assertEqual(siradaki_fatura_nolari('Satis', TARIH, 2), ['SATIS-20260314-1000', 'SATIS-20260314-1001'])
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class FaturaNoEszamanlilikTests(TransactionTestCase):
+    """İki transaction aynı önekten numara alırken çakışma olmaz."""
+
+    def test_eszamanli_transactionlar_farkli_numara_alir(self):
+        ayrildi = threading.Event()
+        sonuclar = {}
+        hatalar = []
+
+        def toplu_satis():
+            # Numarayı ayırır, commit etmeden bekler (kasada uzun süren satış)
+            try:
+                with transaction.atomic():
+                    no = siradaki_fatura_nolari('Satis', TARIH, 1)[0]
+                    ayrildi.set()
+                    # Diğer transaction bu sırada sayaç kilidinde beklemeli
+                    threading.Event().wait(0.5)
+                    Fatura.objects.create(fatura_no=no, fatura_tarihi=TARIH, fatura_tipi='Satis')
+                sonuclar['toplu'] = no
+            except Exception as e:
+                hatalar.append(e)
+            finally:
+                connections.close_all()
+
+        def form_faturasi():
+            try:
+                ayrildi.wait(5)
+                with transaction.atomic():
+                    sonuclar['form'] = Fatura.objects.create(fatura_tarihi=TARIH, fatura_tipi='Satis').fatura_no
+            except Exception as e:
+                hatalar.append(e)
+            finally:
+                connections.close_all()
+
+        iplikler = [threading.Thread(target=toplu_satis), threading.Thread(target=form_faturasi)]
+        for iplik in iplikler:
+            iplik.start()
+        for iplik in iplikler:
+            iplik.join(10)
+
+        self.assertEqual(hatalar, [])
+        self.assertEqual(sonuclar, {'toplu': 'SATIS-20260314-001', 'form': 'SATIS-20260314-002'})
+        self.assertEqual(Fatura.objects.filter(fatura_no__startswith='SATIS-20260314-').count(), 2)
+
+    def test_paralel_toplu_ayirma_benzersiz(self):
+        bariyer = threading.Barrier(6)
+        numaralar = []
+        hatalar = []
+
+        def ayir():
+            try:
+                bariyer.wait(5)
+                with transaction.atomic():
+                    numaralar.extend(siradaki_fatura_nolari('Satis', TARIH, 5))
+            except Exception as e:
+                hatalar.append(e)
+            finally:
+                connections.close_all()
+
+        iplikler = [threading.Thread(target=ayir) for _ in range(6)]
+        for iplik in iplikler:
+            iplik.start()
+        for iplik in iplikler:
+            iplik.join(10)
+
+        self.assertEqual(hatalar, [])
+        self.assertEqual(len(numaralar), 30)
+        self.assertEqual(len(set(numaralar)), 30)
+        self.assertEqual(FaturaNoSayaci.objects.get(onek='SATIS-20260314-').son_no, 30)
+
+
+class FaturaKalemKdvTests(TestCase):
+
+    def setUp(self):
+        self.fatura = Fatura.objects.create(fatura_tarihi=TARIH, fatura_tipi='Satis')
+
+    def kalem(self, **kwargs):
+        return FaturaKalem.objects.create(
+            fatura=self.fatura, urun_adi='Kitap', miktar=2, birim_fiyat=Decimal('50.00'), **kwargs
+        )
+
+    def test_sifir_kdv_korunur(self):
+        kalem = self.kalem(kdv_orani=0)
+        self.assertEqual(kalem.kdv_orani, 0)
+        self.assertEqual(kalem.kdv_tutari, Decimal('0.00'))
+        self.fatura.refresh_from_db()
+        self.assertEqual(self.fatura.genel_toplam, Decimal('100.00'))
+
+    def test_oran_verilmezse_varsayilan(self):
+        self.assertEqual(self.kalem(kdv_orani=None).kdv_orani, 20)
+        self.assertEqual(self.kalem().kdv_tutari, Decimal('20.00'))
+
+
+class UrunKdvOraniTests(TestCase):
+    """Hızlı satış ve ürün API'leri sabit %20 yerine ürünün KDV oranını kullanır."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('kasiyer')
+        cls.hesap = HesapKart.objects.create(ad='Kasa', hesap_tipi='kasa')
+        cls.kitap = Urun.objects.create(ad='Kitap', barkod='9780000000001', fiyat=Decimal('110.00'), kdv_orani=10)
+        cls.ekmek = Urun.objects.create(ad='Ekmek', barkod='8690000000200', fiyat=Decimal('15.00'), kdv_orani=0)
+
+    def test_hizli_satis_urun_kdv_orani(self):
+        fatura = hizli_satis_olustur(
+            [{'urun_id': self.kitap.pk, 'miktar': 1}, {'urun_id': self.ekmek.pk, 'miktar': 2}], self.user, self.hesap
+        )
+
+        kalemler = {k.urun_id: k for k in fatura.kalemler.all()}
+        kitap, ekmek = kalemler[self.kitap.pk], kalemler[self.ekmek.pk]
+        self.assertEqual((kitap.kdv_orani, kitap.birim_fiyat, kitap.kdv_tutari), (10, Decimal('100.00'), Decimal('10.00')))
+        self.assertEqual((ekmek.kdv_orani, ekmek.birim_fiyat, ekmek.kdv_tutari), (0, Decimal('15.00'), Decimal('0.00')))
+        self.assertEqual(fatura.genel_toplam, Decimal('140.00'))
+
+    def test_urun_apileri_urun_kdv_orani(self):
+        toplu = urun_bilgileri_toplu(urun_ids=[self.kitap.pk], barkodlar=[self.ekmek.barkod])
+        self.assertEqual([u['kdv_orani'] for u in toplu['urunler']], [10, 0])
+
+
+class FaturaToplamDegisiklikTests(TestCase):
+    """Toplamlar update() ile yazılsa da değişiklikleri alan geçmişine düşer."""
+
+    def test_kalem_eklenince_toplam_degisikligi_kaydedilir(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fatura = Fatura.objects.create(fatura_tarihi=TARIH, fatura_tipi='Satis', iskonto_orani=Decimal('10'))
+            FaturaKalem.objects.create(fatura=fatura, urun_adi='Kalem', miktar=2, birim_fiyat=Decimal('50.00'))
+
+        self.assertEqual(fatura.genel_toplam, Decimal('108.00'))
+        kayit = alan_gecmisi(fatura, alan='genel_toplam').get(islem='update')
+        self.assertEqual(kayit.degisiklikler['toplam_tutar'], ['0.00', '100.00'])
+        self.assertEqual(kayit.degisiklikler['kdv_tutari'], ['0.00', '20.00'])
+        self.assertEqual(kayit.degisiklikler['iskonto_tutari'], ['0.00', '12.00'])
+        self.assertEqual(kayit.degisiklikler['genel_toplam'], ['0.00', '108.00'])
+
+        # Toplam değişmeyen yeniden hesaplama kayıt üretmez
+        with self.captureOnCommitCallbacks(execute=True):
+            fatura.hesapla_toplamlar()
+        self.assertEqual(alan_gecmisi(fatura, alan='genel_toplam').filter(islem='update').count(), 1)
+
+
+def _dosya(icerik: bytes, ad: str) -> io.BytesIO:
+    dosya = io.BytesIO(icerik)
+    dosya.name = ad
+    return dosya
+
+
+class AlisFaturasiImportTests(TestCase):
+
+    CSV_BASLIK = 'fatura_no,fatura_tarihi,vergi_no,barkod,urun_adi,miktar,birim_fiyat,kdv_orani\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ithalat')
+        Cari.objects.create(ad_soyad='ACME Ltd', vergi_no='1234567890', kategori='tedarikci')
+        for i in range(3):
+            Urun.objects.create(ad=f'Ürün {i}', barkod=f'869000{i:04d}', fiyat=10, alis_fiyati=5)
+
+    def csv(self, *satirlar):
+        return _dosya((self.CSV_BASLIK + ''.join(f'{satir}\n' for satir in satirlar)).encode(), 'alis.csv')
+
+    def test_veritabani_hatasi_yalniz_ilgili_faturayi_reddeder(self):
+        dosya = self.csv(
+            'IMP-A,2026-01-05,1234567890,8690000000,,1,10,0',
+            'IMP-B,2026-01-05,1234567890,8690000001,,1,10,20',
+            'IMP-C,2026-01-05,1234567890,8690000002,,2,5,10',
+        )
+        gercek = fatura_import_service.bulk_create_faturalar
+
+        def tasan(faturalar, user):
+            # Alan taşmasını (PostgreSQL'de numeric overflow) taklit eder
+            if any(fatura.fatura_no == 'IMP-B' for fatura, _ in faturalar):
+                raise DataError('numeric field overflow')
+            return gercek(faturalar, user)
+
+        with mock.patch.object(fatura_import_service, 'bulk_create_faturalar', side_effect=tasan):
+            rapor, = import_alis_faturalari([dosya], self.user, batch_size=3)
+
+        self.assertEqual(rapor['toplam'], 3)
+        self.assertEqual(rapor['basarili'], 2)
+        self.assertEqual([r['fatura_no'] for r in rapor['reddedilen']], ['IMP-B'])
+        self.assertIn('sınırları', rapor['reddedilen'][0]['sebep'])
+        self.assertEqual(
+            set(Fatura.objects.filter(fatura_no__startswith='IMP-').values_list('fatura_no', flat=True)),
+            {'IMP-A', 'IMP-C'},
+        )
+        self.assertEqual(FaturaKalem.objects.get(fatura__fatura_no='IMP-A').kdv_orani, 0)
+
+    def test_entity_iceren_xml_reddedilir(self):
+        bomba = _dosya(
+            b'<?xml version="1.0"?>'
+            b'<!DOCTYPE l [<!ENTITY a "aaaaaaaaaa"><!ENTITY b "&a;&a;&a;&a;&a;&a;&a;&a;&a;&a;">]>'
+            b'<Invoice>&b;</Invoice>',
+            'bomba.xml',
+        )
+        dis_entity = _dosya(
+            b'<?xml version="1.0"?><!DOCTYPE l [<!ENTITY x SYSTEM "file:///etc/passwd">]><Invoice>&x;</Invoice>',
+            'dis.xml',
+        )
+        raporlar = import_alis_faturalari([bomba, dis_entity, self.csv('IMP-D,2026-01-05,1234567890,8690000000,,1,10,20')], self.user)
+
+        for rapor in raporlar[:2]:
+            self.assertEqual(rapor['basarili'], 0)
+            self.assertEqual(len(rapor['reddedilen']), 1)
+            self.assertIn('entity', rapor['reddedilen'][0]['sebep'])
+        # Aynı içe aktarmadaki geçerli dosya etkilenmez
+        self.assertEqual(raporlar[2]['basarili'], 1)
@@ -13,4 +13,9 @@ urlpatterns = [
     path('kalem/<int:pk>/duzenle/', views.kalem_duzenle, name='kalem_duzenle'),
     path('kalem/<int:pk>/sil/', views.kalem_sil, name='kalem_sil'),
     path('api/urun/<int:urun_id>/', views.urun_bilgi_api, name='urun_bilgi_api'),
+    path('api/urunler/', views.urun_bilgi_toplu_api, name='urun_bilgi_toplu_api'),
+    path('<int:pk>/ubl/', views.fatura_ubl_export, name='ubl_export'),
+    path('ubl/toplu/', views.fatura_ubl_toplu_export, name='ubl_toplu_export'),
+    path('ice-aktar/', views.fatura_ice_aktar, name='ice_aktar'),
+    path('hizli-satis/', views.hizli_satis, name='hizli_satis'),
 ]
@@ -1,16 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q, Max
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 # Transaction yönetimi artık servis katmanında yapılıyor
 from datetime import datetime
 from django.utils import timezone
 from typing import Any
+import json
 import logging
 from .models import Fatura, FaturaKalem
-from django.db import models
+from django.db import IntegrityError, models
 from .forms import FaturaForm, FaturaKalemForm
 from accounts.utils import log_action
 from stok.models import Urun
@@ -19,6 +20,7 @@ from stoktakip.template_helpers import (
     prepare_fatura_table_data,
     generate_table_html,
 )
+from stoktakip.pagination import KeysetPaginator, IMLEC_PARAMETRESI
 from stoktakip.error_handling import (
     handle_view_errors,
     handle_api_errors,
@@ -41,6 +43,10 @@ from stoktakip.services.fatura_kalem_service import (
 )
 from stoktakip.services.stok_service import create_stok_hareketleri_from_fatura
 from stoktakip.services.cari_service import create_or_update_cari_hareketi_from_fatura
+from stoktakip.services.efatura_service import export_fatura_ubl, stream_fatura_ubl_zip, ubl_dosya_adi
+from stoktakip.services.fatura_import_service import import_alis_faturalari
+from stoktakip.services.urun_service import urun_bilgileri_toplu, icerik_etag, TOPLU_URUN_BILGI_LIMIT
+from stoktakip.services.hizli_satis_service import hizli_satis_olustur, hizli_satis_hesaplari
 from django.contrib.auth.decorators import login_required
 from typing import Any
 import logging
@@ -60,7 +66,7 @@ def index(request: Any) -> Any:
     Input validation ve error handling ile güvenli hale getirilmiştir.
     """
     try:
-        fatura_list = Fatura.objects.all().select_related('cari').order_by('-fatura_tarihi', '-olusturma_tarihi')
+        fatura_list = Fatura.objects.all().select_related('cari')
         
         # Arama - Input validation ile
         search_query = request.GET.get('search', '')
@@ -129,15 +135,9 @@ def index(request: Any) -> Any:
             except Exception:
                 tutar_max = ''
         
-        # Sayfalama
-        try:
-            page_number = request.GET.get('page', '1')
-            page_number = sanitize_integer(page_number, min_value=1)
-        except Exception:
-            page_number = 1
-        
-        paginator = Paginator(fatura_list, 20)
-        faturalar = paginator.get_page(page_number)
+        # Keyset sayfalama; toplam kayıt sayısı büyük listelerde tahminidir
+        paginator = KeysetPaginator(fatura_list, 20, siralama=('-fatura_tarihi', '-olusturma_tarihi', '-id'))
+        faturalar = paginator.get_page(request.GET.get(IMLEC_PARAMETRESI))
         
         # Prepare table data in Python
         table_data = prepare_fatura_table_data(faturalar)
@@ -197,8 +197,7 @@ def fatura_ekle(request: Any) -> Any:
     except Exception:
         tip = 'Satis'
 
-    # Ürün listesi (Formda dropdown için her durumda gerekli)
-    urunler = Urun.objects.all().order_by('ad')
+    # Ürünler formda autocomplete ile (stok:urun_ara_api) ihtiyaç oldukça yüklenir
     title = 'Yeni Alış Faturası' if tip == 'Alis' else 'Yeni Satış Faturası'
 
     if request.method == 'POST':
@@ -230,7 +229,6 @@ def fatura_ekle(request: Any) -> Any:
                         'form': fatura_form,
                         'title': title,
                         'tip': tip,
-                        'urunler': urunler
                     })
 
                 # Başarı durumu
@@ -269,7 +267,6 @@ def fatura_ekle(request: Any) -> Any:
         'form': fatura_form,
         'title': title,
         'tip': tip,
-        'urunler': urunler
     })
 
 
@@ -347,27 +344,17 @@ def fatura_duzenle(request: Any, pk: int) -> Any:
         else:
             form = FaturaForm(instance=fatura)
         
-        # Ürün listesini context'e ekle
-        urunler = Urun.objects.all().order_by('ad')
-        
         # Mevcut kalemleri context'e ekle ve KDV dahil fiyatları hesapla
         from decimal import Decimal, ROUND_HALF_UP
         kalemler = fatura.kalemler.select_related('urun').all().order_by('sira_no')
         kalemler_with_kdv_dahil = []
         for kalem in kalemler:
-            # KDV oranı 0 ise veya yoksa, 20 yap
-            kdv_orani = kalem.kdv_orani if kalem.kdv_orani and kalem.kdv_orani > 0 else 20
+            # KDV oranı yoksa 20 yap; %0 olduğu gibi gösterilir
+            kdv_orani = kalem.kdv_orani if kalem.kdv_orani is not None else 20
             # KDV dahil fiyat = birim_fiyat * (1 + kdv_orani / 100)
             kdv_dahil_fiyat = kalem.birim_fiyat * (Decimal('1') + Decimal(str(kdv_orani)) / Decimal('100'))
             kdv_dahil_fiyat = kdv_dahil_fiyat.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            
-            # Eğer kalem.kdv_orani 0 ise, KDV tutarını yeniden hesapla
-            if kalem.kdv_orani == 0 or not kalem.kdv_orani:
-                ara_toplam = kalem.birim_fiyat * Decimal(str(kalem.miktar))
-                ara_toplam = ara_toplam.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                kdv_tutari = (ara_toplam * (Decimal('20') / Decimal('100'))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            else:
-                kdv_tutari = kalem.kdv_tutari
+            kdv_tutari = kalem.kdv_tutari
             
             kalemler_with_kdv_dahil.append({
                 'kalem': kalem,
@@ -384,7 +371,6 @@ def fatura_duzenle(request: Any, pk: int) -> Any:
             'form': form, 
             'title': 'Fatura Düzenle', 
             'fatura': fatura,
-            'urunler': urunler,
             'kalemler': kalemler,
             'kalemler_with_kdv_dahil': kalemler_with_kdv_dahil
         })
@@ -512,6 +498,54 @@ def urun_bilgi_api(request: Any, urun_id: int) -> JsonResponse:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@handle_api_errors(error_message="Ürün bilgileri alınamadı", status_code=400)
+@login_required
+def urun_bilgi_toplu_api(request: Any) -> Any:
+    """
+    Birden fazla ürünün fiyat, stok ve KDV bilgilerini tek istekte döndürür.
+
+    GET: ?ids=1,2,3&barkodlar=869...,869...&cari=5
+    POST (JSON): {"ids": [1, 2, 3], "barkodlar": ["869..."], "cari": 5} (uzun listeler için)
+
+    Cari verilirse satış fiyatları carinin fiyat listesine göre döner.
+
+    Yanıt ETag ile döner; If-None-Match aynıysa 304 Not Modified gönderilir.
+    """
+    try:
+        if request.method == 'POST':
+            try:
+                govde = json.loads(request.body or b'{}')
+            except (ValueError, UnicodeDecodeError):
+                raise ValidationError("Geçersiz JSON.")
+            ham_idler = govde.get('ids') or []
+            barkodlar = govde.get('barkodlar') or []
+            ham_cari = govde.get('cari')
+        else:
+            ham_idler = [x for x in request.GET.get('ids', '').split(',') if x.strip()]
+            barkodlar = request.GET.get('barkodlar', '').split(',')
+            ham_cari = request.GET.get('cari')
+
+        if not isinstance(ham_idler, list) or not isinstance(barkodlar, list):
+            raise ValidationError("ids ve barkodlar liste olmalıdır.")
+        urun_idler = [sanitize_integer(x, min_value=1) for x in ham_idler]
+        cari_id = sanitize_integer(ham_cari, min_value=1) if ham_cari not in (None, '') else None
+        barkodlar = [sanitize_string(str(b), max_length=100).strip() for b in barkodlar if str(b).strip()]
+        if len(urun_idler) + len(barkodlar) > TOPLU_URUN_BILGI_LIMIT:
+            raise ValidationError(f"Tek istekte en fazla {TOPLU_URUN_BILGI_LIMIT} ürün sorgulanabilir.")
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': ' '.join(e.messages)}, status=400)
+
+    veri = {'success': True, **urun_bilgileri_toplu(urun_idler, barkodlar, cari_id=cari_id)}
+    etag = icerik_etag(veri)
+    if etag in [t.strip() for t in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(veri)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @handle_view_errors(
     error_message="Fatura kalemi güncellenirken bir hata oluştu.",
     redirect_url="fatura:index"
@@ -580,4 +614,164 @@ def kalem_sil(request: Any, pk: int) -> Any:
         raise
 
 
+@handle_view_errors(error_message="e-Fatura oluşturulurken bir hata oluştu.")
+@login_required
+def fatura_ubl_export(request: Any, pk: int) -> Any:
+    """
+    Satış faturasını UBL-TR XML dosyası olarak indirir.
+    """
+    fatura = get_object_or_404(Fatura, pk=pk)
+    try:
+        xml = export_fatura_ubl(fatura)
+    except ValidationError as e:
+        messages.error(request, '; '.join(e.messages))
+        return redirect('fatura:detay', pk=pk)
+
+    response = HttpResponse(xml, content_type='application/xml; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{fatura.fatura_no}.xml"'
+    return response
+
 
+@handle_view_errors(
+    error_message="e-Fatura toplu dışa aktarımı sırasında bir hata oluştu.",
+    redirect_url="fatura:index"
+)
+@login_required
+def fatura_ubl_toplu_export(request: Any) -> Any:
+    """
+    Filtrelenen satış faturalarını UBL-TR XML dosyaları içeren ZIP olarak indirir.
+
+    Liste sayfasındaki durum ve tarih filtrelerini kullanır. ZIP akış halinde
+    üretildiği için binlerce fatura bellek kullanımını artırmadan indirilebilir.
+    """
+    fatura_list = Fatura.objects.all()
+
+    durum_filter = request.GET.get('durum', '')
+    if durum_filter in ['AcikHesap', 'KasadanKapanacak']:
+        fatura_list = fatura_list.filter(durum=durum_filter)
+
+    tarih_baslangic = request.GET.get('tarih_baslangic', '')
+    tarih_bitis = request.GET.get('tarih_bitis', '')
+    try:
+        if tarih_baslangic and tarih_bitis:
+            from stoktakip.security_utils import validate_date_range
+            tarih_baslangic, tarih_bitis = validate_date_range(tarih_baslangic, tarih_bitis)
+        if tarih_baslangic:
+            datetime.strptime(tarih_baslangic, '%Y-%m-%d')
+            fatura_list = fatura_list.filter(fatura_tarihi__gte=tarih_baslangic)
+        if tarih_bitis:
+            datetime.strptime(tarih_bitis, '%Y-%m-%d')
+            fatura_list = fatura_list.filter(fatura_tarihi__lte=tarih_bitis)
+    except (ValueError, ValidationError):
+        messages.warning(request, "Geçersiz tarih aralığı.")
+        return redirect('fatura:index')
+
+    log_action(request.user, 'view', None, 'e-Fatura toplu dışa aktarım', request)
+
+    response = StreamingHttpResponse(stream_fatura_ubl_zip(fatura_list), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{ubl_dosya_adi()}"'
+    return response
+
+
+@handle_view_errors(
+    error_message="Faturalar içe aktarılırken bir hata oluştu.",
+    redirect_url="fatura:index"
+)
+@login_required
+def fatura_ice_aktar(request: Any) -> Any:
+    """
+    Tedarikçi UBL-TR XML veya CSV dosyalarından alış faturalarını toplu içe aktarır.
+
+    Her dosya için eklenen ve reddedilen faturalar (sebepleriyle) raporlanır.
+    """
+    raporlar = []
+    durum = 'AcikHesap'
+    if request.method == 'POST':
+        dosyalar = request.FILES.getlist('dosyalar')
+        durum = request.POST.get('durum', 'AcikHesap')
+        if durum not in ['AcikHesap', 'KasadanKapanacak']:
+            durum = 'AcikHesap'
+
+        if not dosyalar:
+            messages.error(request, "Lütfen en az bir dosya seçin.")
+        else:
+            raporlar = import_alis_faturalari(dosyalar, request.user, durum=durum, request=request)
+            basarili = sum(r['basarili'] for r in raporlar)
+            reddedilen = sum(len(r['reddedilen']) for r in raporlar)
+            if basarili:
+                messages.success(request, f"{basarili} alış faturası içe aktarıldı.")
+            if reddedilen:
+                messages.warning(request, f"{reddedilen} fatura reddedildi. Ayrıntılar aşağıdadır.")
+
+    return render(request, 'fatura/fatura_ice_aktar.html', {
+        'raporlar': raporlar,
+        'durum': durum,
+    })
+
+
+@handle_view_errors(
+    error_message="Hızlı satış kaydedilirken bir hata oluştu.",
+    redirect_url="fatura:index"
+)
+@login_required
+def hizli_satis(request: Any) -> Any:
+    """
+    Hızlı satış (POS) ekranı.
+
+    GET: Barkod okutma ekranını döndürür; sepet tarayıcıda tutulur.
+    POST (JSON): {"hesap_id": 1, "cari_id": null, "iskonto_orani": 0,
+                  "kalemler": [{"urun_id": 1, "miktar": 2, "kdv_dahil_fiyat": "12.50"}]}
+    Fatura, kalemler, stok çıkışları ve kasa hareketi tek transaction içinde oluşturulur.
+    """
+    from cari.models import Cari
+    from finans.models import HesapKart
+
+    if request.method != 'POST':
+        return render(request, 'fatura/hizli_satis.html', {
+            'hesaplar': hizli_satis_hesaplari(),
+        })
+
+    try:
+        try:
+            govde = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError("Geçersiz JSON.")
+        kalemler = govde.get('kalemler') or []
+        if not isinstance(kalemler, list) or not all(isinstance(k, dict) for k in kalemler):
+            raise ValidationError("kalemler liste olmalıdır.")
+
+        hesap = None
+        if govde.get('hesap_id'):
+            hesap = HesapKart.objects.filter(pk=sanitize_integer(govde.get('hesap_id'), min_value=1)).first()
+        cari = None
+        if govde.get('cari_id'):
+            cari = Cari.objects.filter(pk=sanitize_integer(govde.get('cari_id'), min_value=1)).first()
+            if cari is None:
+                raise ValidationError("Müşteri bulunamadı.")
+
+        fatura = hizli_satis_olustur(
+            kalemler,
+            request.user,
+            hesap=hesap,
+            cari=cari,
+            iskonto_orani=govde.get('iskonto_orani') or 0,
+            aciklama=sanitize_string(str(govde.get('aciklama') or ''), max_length=500),
+        )
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': ' '.join(e.messages)}, status=400)
+    except IntegrityError as e:
+        # Kasa istemcisi JSON bekler; yönlendirme yerine tekrar denenebilir hata döndürülür
+        logger.warning(f"Hızlı satış çakışması: {e}")
+        return JsonResponse({'success': False, 'error': "Satış kaydedilemedi, lütfen tekrar deneyin."}, status=409)
+
+    log_action(request.user, 'create', fatura, f'Hızlı satış: {fatura.fatura_no}', request)
+    return JsonResponse({
+        'success': True,
+        'fatura_id': fatura.pk,
+        'fatura_no': fatura.fatura_no,
+        'toplam_tutar': str(fatura.toplam_tutar),
+        'kdv_tutari': str(fatura.kdv_tutari),
+        'iskonto_tutari': str(fatura.iskonto_tutari),
+        'genel_toplam': str(fatura.genel_toplam),
+        'detay_url': reverse('fatura:detay', args=[fatura.pk]),
+    })
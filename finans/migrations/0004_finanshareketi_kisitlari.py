@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+APP = 'finans'
+
+# (model, kısıt adı, koşul); koşullar aşağıdaki AddConstraint'lerle aynıdır
+KISITLAR = [
+    ('FinansHareketi', 'finanshareketi_tutar_pozitif', models.Q(('tutar__gt', 0))),
+]
+
+
+def kisitlara_uymayanlari_bildir(apps, schema_editor):
+    """
+    Kısıtlar eklenmeden önce mevcut veride ihlal eden satırları arar.
+
+    Bu satırlar iş verisidir (tutar/miktar işareti kendiliğinden düzeltilemez);
+    varsa tablo, kısıt ve örnek ID'lerle birlikte raporlanır ve migration
+    kısıt eklenmeden durur. Satırlar düzeltildikten sonra migrate tekrar çalıştırılır.
+    """
+    hatalar = []
+    for model_adi, kisit_adi, kosul in KISITLAR:
+        model = apps.get_model(APP, model_adi)
+        uymayanlar = model.objects.exclude(kosul)
+        ornekler = list(uymayanlar.order_by('pk').values_list('pk', flat=True)[:20])
+        if ornekler:
+            hatalar.append(
+                f"{model._meta.db_table}: {uymayanlar.count()} satır '{kisit_adi}' kısıtına uymuyor "
+                f"(ilk ID'ler: {', '.join(map(str, ornekler))})"
+            )
+    if hatalar:
+        raise RuntimeError(
+            "Veritabanı kısıtları eklenemedi, önce aşağıdaki kayıtlar düzeltilmeli:\n" + '\n'.join(hatalar)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finans', '0003_remove_account_account_code_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(kisitlara_uymayanlari_bildir, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='finanshareketi',
+            constraint=models.CheckConstraint(condition=models.Q(('tutar__gt', 0)), name='finanshareketi_tutar_pozitif'),
+        ),
+    ]
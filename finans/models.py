@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from stoktakip.model_utils import KisitliKayitMixin
+
 
 class HesapKart(models.Model):
     HESAP_TIPI_CHOICES = [
@@ -31,7 +33,7 @@ class HesapKart(models.Model):
         return f"{self.ad} - {self.get_hesap_tipi_display()}"
 
 
-class FinansHareketi(models.Model):
+class FinansHareketi(KisitliKayitMixin, models.Model):
     HAREKET_TIPI_CHOICES = [
         ('gelir', 'Gelir'),
         ('gider', 'Gider'),
@@ -54,6 +56,14 @@ class FinansHareketi(models.Model):
         verbose_name_plural = "Finans Hareketleri"
         ordering = ['-tarih', '-id']
         db_table = 'finans_finanshareketi'
+        constraints = [
+            models.CheckConstraint(condition=models.Q(tutar__gt=0), name='finanshareketi_tutar_pozitif'),
+        ]
+
+    kisit_mesajlari = {
+        'hareket_no': ('hareket_no', 'Bu hareket numarası zaten kullanılıyor.'),
+        'finanshareketi_tutar_pozitif': ('tutar', 'Tutar 0\'dan büyük olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.hareket_no} - {self.get_hareket_tipi_display()} - {self.tutar} ₺"
@@ -77,5 +87,5 @@ class FinansHareketi(models.Model):
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
@@ -15,6 +15,7 @@ import logging
 from fatura.models import Fatura, FaturaKalem
 from .forms import KullaniciForm
 from accounts.utils import log_action
+from accounts.services.yetki_service import yetkileri_coz
 from stoktakip.error_handling import handle_view_errors, database_transaction
 from stoktakip.security_utils import (
     sanitize_string, sanitize_integer, validate_search_query
@@ -32,8 +33,7 @@ def mudur_required(view_func):
             from django.contrib.auth.views import redirect_to_login
             return redirect_to_login(request.get_full_path())
         # Superuser veya Müdür grubunda olanlar erişebilir
-        user_groups = request.user.groups.values_list('name', flat=True)
-        if not (request.user.is_superuser or 'Müdür' in user_groups):
+        if not yetkileri_coz(request.user).mudur:
             raise PermissionDenied("Bu işlem için müdür yetkisi gereklidir.")
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -51,8 +51,7 @@ def index(request: Any) -> Any:
     """
     """Kullanıcı yönetimi ana sayfası - Tüm kullanıcıların performans analizi"""
     # Sadece müdür kullanıcı yönetimi yapabilir
-    user_groups = request.user.groups.values_list('name', flat=True)
-    if not (request.user.is_superuser or 'Müdür' in user_groups):
+    if not yetkileri_coz(request.user).mudur:
         # Normal kullanıcılar sadece kendi performanslarını görebilir
         return redirect('kullanici_yonetimi:kullanici_detay', user_id=request.user.id)
     
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 22:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('masraf', '0003_masraf_kisitlari'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='masraf',
+            index=models.Index(fields=['tarih', 'id'], name='masraf_tarih_id_idx'),
+        ),
+    ]
@@ -4,10 +4,12 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
 
+from stoktakip.model_utils import DegisiklikIzlemeMixin, KisitliKayitMixin
 
 
 
-class Masraf(models.Model):
+
+class Masraf(DegisiklikIzlemeMixin, KisitliKayitMixin, models.Model):
     ODEME_YONTEMI_CHOICES = [
         ('nakit', 'Nakit'),
         ('havale', 'Havale'),
@@ -37,6 +39,20 @@ class Masraf(models.Model):
         verbose_name_plural = "Masraflar"
         ordering = ['-tarih', '-id']
         db_table = 'masraf_masraf'
+        indexes = [
+            # Liste keyset sayfalaması (tarih, id) sırasıyla okur
+            models.Index(fields=['tarih', 'id'], name='masraf_tarih_id_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(tutar__gte=0), name='masraf_tutar_negatif_degil'),
+        ]
+
+    izlenen_alanlar = ('masraf_no', 'aciklama', 'tutar', 'tarih', 'odeme_yontemi', 'durum')
+
+    kisit_mesajlari = {
+        'masraf_no': ('masraf_no', 'Bu masraf numarası zaten kullanılıyor.'),
+        'masraf_tutar_negatif_degil': ('tutar', 'Tutar negatif olamaz.'),
+    }
 
     def __str__(self):
         return f"{self.masraf_no} - {self.aciklama[:50]} - {self.tutar} ₺"
@@ -57,5 +73,5 @@ class Masraf(models.Model):
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
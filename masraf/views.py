@@ -1,8 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Sum, Q
+from django.db.models import Count, Sum, Q
 from django.utils import timezone
 from django.db import transaction
 from datetime import timedelta
@@ -11,6 +10,8 @@ import logging
 from .models import Masraf
 from .forms import MasrafForm
 from accounts.utils import log_action
+from stoktakip.pagination import KeysetPaginator, IMLEC_PARAMETRESI
+from stoktakip.template_helpers import generate_pagination_html
 from stoktakip.error_handling import handle_view_errors, database_transaction
 from stoktakip.security_utils import (
     sanitize_string, sanitize_decimal, validate_date_range, validate_search_query
@@ -31,7 +32,7 @@ def index(request: Any) -> Any:
     masraf listesini gösterir. Input validation ve error handling ile güvenli hale getirilmiştir.
     """
     try:
-        masraf_list = Masraf.objects.select_related('olusturan').order_by('-tarih', '-id')
+        masraf_list = Masraf.objects.select_related('olusturan')
 
         # Arama - Input validation ile
         search_query = request.GET.get('search', '')
@@ -76,23 +77,24 @@ def index(request: Any) -> Any:
         elif tarih_bitis:
             masraf_list = masraf_list.filter(tarih__lte=tarih_bitis)
 
-        # Toplam tutar hesapla
-        toplam_tutar = masraf_list.aggregate(toplam=Sum('tutar'))['toplam'] or 0
+        # Toplam tutar ve kayıt sayısı tek sorguda; sayfalama için ayrıca COUNT yapılmaz
+        ozet = masraf_list.aggregate(toplam=Sum('tutar'), sayi=Count('id'))
+        toplam_tutar = ozet['toplam'] or 0
 
-        # Sayfalama - Input validation
-        try:
-            page_number = request.GET.get('page', '1')
-            page_number = int(page_number)
-            if page_number < 1:
-                page_number = 1
-        except (ValueError, TypeError):
-            page_number = 1
-
-        paginator = Paginator(masraf_list, 20)
-        masraflar = paginator.get_page(page_number)
+        # Keyset sayfalama
+        paginator = KeysetPaginator(masraf_list, 20, siralama=('-tarih', '-id'), toplam=ozet['sayi'])
+        masraflar = paginator.get_page(request.GET.get(IMLEC_PARAMETRESI))
+        request_params = {
+            'search': search_query,
+            'durum': durum_filter,
+            'tarih_baslangic': tarih_baslangic,
+            'tarih_bitis': tarih_bitis,
+        }
+        pagination_html = generate_pagination_html(masraflar, request_params, request.path) if masraflar.has_other_pages() else None
 
         context = {
             'masraflar': masraflar,
+            'pagination_html': pagination_html,
             'toplam_tutar': toplam_tutar,
             'search_query': search_query,
             'kategori_filter': '',
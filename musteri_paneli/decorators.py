@@ -2,18 +2,21 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from functools import wraps
 
+from accounts.services.yetki_service import yetkileri_coz
+
 def musteri_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if not request.user.is_authenticated:
             return redirect('login')
         
-        # Kullanıcının Cari kaydı var mı kontrol et
-        if hasattr(request.user, 'cari_account'):
+        # Kullanıcının Cari kaydı var mı kontrol et (cache'li yetki bilgisinden)
+        yetki = yetkileri_coz(request.user)
+        if yetki.musteri:
             return view_func(request, *args, **kwargs)
         
         # Eğer personelse dashboard'a gönder, aksi halde hata ver
-        if request.user.is_staff:
+        if yetki.personel:
             messages.info(request, "Müşteri paneli sadece müşteriler içindir.")
             return redirect('raporlar:dashboard')
         
@@ -0,0 +1,72 @@
+# Generated by Django 6.0 on 2026-10-19 17:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def acik_siparisleri_rezerve_et(apps, schema_editor):
+    """Mevcut açık siparişler için (stok kontrolü yapmadan) rezervasyon oluşturur."""
+    SiparisKalem = apps.get_model('musteri_paneli', 'SiparisKalem')
+    SiparisRezervasyonu = apps.get_model('musteri_paneli', 'SiparisRezervasyonu')
+    StokRezervasyonBakiyesi = apps.get_model('musteri_paneli', 'StokRezervasyonBakiyesi')
+
+    satirlar = SiparisKalem.objects.filter(
+        siparis__durum__in=['beklemede', 'onaylandi']
+    ).values('siparis_id', 'urun_id').annotate(toplam=Sum('miktar')).order_by()
+
+    rezervasyonlar = []
+    bakiyeler = {}
+    for satir in satirlar.iterator(chunk_size=2000):
+        rezervasyonlar.append(SiparisRezervasyonu(
+            siparis_id=satir['siparis_id'], urun_id=satir['urun_id'], miktar=satir['toplam']
+        ))
+        bakiyeler[satir['urun_id']] = bakiyeler.get(satir['urun_id'], 0) + satir['toplam']
+
+    SiparisRezervasyonu.objects.bulk_create(rezervasyonlar, batch_size=1000)
+    StokRezervasyonBakiyesi.objects.bulk_create(
+        [StokRezervasyonBakiyesi(urun_id=urun_id, rezerve_miktar=miktar) for urun_id, miktar in bakiyeler.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri_paneli', '0002_siparis_sipariskalem_delete_musteritalebi'),
+        ('stok', '0012_sayim_oturumu'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StokRezervasyonBakiyesi',
+            fields=[
+                ('urun', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rezervasyon_bakiyesi', serialize=False, to='stok.urun', verbose_name='Ürün')),
+                ('rezerve_miktar', models.PositiveIntegerField(default=0, verbose_name='Rezerve Miktar')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Stok Rezervasyon Bakiyesi',
+                'verbose_name_plural': 'Stok Rezervasyon Bakiyeleri',
+            },
+        ),
+        migrations.CreateModel(
+            name='SiparisRezervasyonu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('miktar', models.PositiveIntegerField(verbose_name='Miktar')),
+                ('durum', models.CharField(choices=[('aktif', 'Aktif'), ('serbest', 'Serbest Bırakıldı'), ('tuketildi', 'Tüketildi')], default='aktif', max_length=20, verbose_name='Durum')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('kapanma_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Kapanma Tarihi')),
+                ('siparis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rezervasyonlar', to='musteri_paneli.siparis', verbose_name='Sipariş')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='stok.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Sipariş Rezervasyonu',
+                'verbose_name_plural': 'Sipariş Rezervasyonları',
+                'indexes': [models.Index(fields=['siparis', 'durum'], name='siparisrez_siparis_durum_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('durum', 'aktif')), fields=('siparis', 'urun'), name='siparisrezervasyonu_aktif_uniq')],
+            },
+        ),
+        migrations.RunPython(acik_siparisleri_rezerve_et, migrations.RunPython.noop),
+    ]
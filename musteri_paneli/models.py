@@ -54,7 +54,8 @@ class Siparis(models.Model):
         super().save(*args, **kwargs)
 
     def hesapla_toplam(self):
-        self.toplam_tutar = sum(item.toplam_tutar for item in self.kalemler.all())
+        # Toplam veritabanında hesaplanır; kalemler belleğe alınmaz
+        self.toplam_tutar = self.kalemler.aggregate(toplam=models.Sum('toplam_tutar'))['toplam'] or 0
         Siparis.objects.filter(pk=self.pk).update(toplam_tutar=self.toplam_tutar)
 
 class SiparisKalem(models.Model):
@@ -75,3 +76,54 @@ class SiparisKalem(models.Model):
         self.toplam_tutar = self.miktar * self.birim_fiyat
         super().save(*args, **kwargs)
         self.siparis.hesapla_toplam()
+
+
+class StokRezervasyonBakiyesi(models.Model):
+    """
+    Ürün başına açık siparişlerce ayrılmış toplam miktar.
+
+    Satılabilir miktar (ATP) = mevcut stok - rezerve_miktar. Satır, rezervasyon
+    sırasında kilitlenir (SELECT ... FOR UPDATE) ve F() ile güncellenir;
+    eşzamanlı onaylar aynı stoku iki kez ayıramaz.
+    """
+    urun = models.OneToOneField('stok.Urun', on_delete=models.CASCADE, primary_key=True,
+                                related_name='rezervasyon_bakiyesi', verbose_name="Ürün")
+    rezerve_miktar = models.PositiveIntegerField(default=0, verbose_name="Rezerve Miktar")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    class Meta:
+        verbose_name = "Stok Rezervasyon Bakiyesi"
+        verbose_name_plural = "Stok Rezervasyon Bakiyeleri"
+
+    def __str__(self):
+        return f"{self.urun_id}: {self.rezerve_miktar}"
+
+
+class SiparisRezervasyonu(models.Model):
+    """Bir siparişin ürün başına ayırdığı stok (rezervasyon defteri)."""
+    DURUM_CHOICES = [
+        ('aktif', 'Aktif'),
+        ('serbest', 'Serbest Bırakıldı'),
+        ('tuketildi', 'Tüketildi'),
+    ]
+
+    siparis = models.ForeignKey(Siparis, on_delete=models.CASCADE, related_name='rezervasyonlar', verbose_name="Sipariş")
+    urun = models.ForeignKey('stok.Urun', on_delete=models.CASCADE, verbose_name="Ürün")
+    miktar = models.PositiveIntegerField(verbose_name="Miktar")
+    durum = models.CharField(max_length=20, choices=DURUM_CHOICES, default='aktif', verbose_name="Durum")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    kapanma_tarihi = models.DateTimeField(blank=True, null=True, verbose_name="Kapanma Tarihi")
+
+    class Meta:
+        verbose_name = "Sipariş Rezervasyonu"
+        verbose_name_plural = "Sipariş Rezervasyonları"
+        constraints = [
+            models.UniqueConstraint(fields=['siparis', 'urun'], condition=models.Q(durum='aktif'),
+                                    name='siparisrezervasyonu_aktif_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['siparis', 'durum'], name='siparisrez_siparis_durum_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.siparis.siparis_no} - {self.urun_id}: {self.miktar} ({self.get_durum_display()})"
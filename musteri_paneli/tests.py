@@ -0,0 +1,171 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+
+from cari.models import Cari
+from musteri_paneli.models import Siparis, SiparisRezervasyonu
+from stok.models import StokHareketi, Urun
+from stoktakip.services.rezervasyon_service import (
+    kullanilabilir_miktarlar,
+    rezerve_miktarlar,
+    siparis_durumunu_degistir,
+    siparis_rezerve_et,
+)
+from stoktakip.services.siparis_service import musteri_siparisi_olustur, siparisleri_faturalandir
+from stoktakip.services.stok_service import urun_stok_miktarlari
+
+
+def _stoklu_urun(miktar: int) -> Urun:
+    urun = Urun.objects.create(ad='Defter', barkod='8690000000100', fiyat=25, alis_fiyati=10)
+    StokHareketi.objects.create(urun=urun, islem_turu='giriş', miktar=miktar)
+    return urun
+
+
+class StokRezervasyonTests(TestCase):
+    """Sipariş rezervasyonu: ayırma, serbest bırakma, tüketme ve fazla satış koruması."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('yonetici', is_staff=True)
+        cls.cari = Cari.objects.create(ad_soyad='Kırtasiye A.Ş.')
+        cls.urun = _stoklu_urun(10)
+
+    def siparis(self, miktar: int) -> Siparis:
+        return musteri_siparisi_olustur(self.cari, [{'urun_id': self.urun.pk, 'miktar': miktar}])
+
+    def kullanilabilir(self) -> int:
+        return kullanilabilir_miktarlar([self.urun.pk])[self.urun.pk]
+
+    def test_siparis_stok_ayirir(self):
+        siparis = self.siparis(4)
+
+        self.assertEqual(rezerve_miktarlar([self.urun.pk])[self.urun.pk], 4)
+        self.assertEqual(self.kullanilabilir(), 6)
+        rezervasyon = SiparisRezervasyonu.objects.get(siparis=siparis)
+        self.assertEqual((rezervasyon.miktar, rezervasyon.durum), (4, 'aktif'))
+
+    def test_fazla_satis_engellenir(self):
+        self.siparis(7)
+        with self.assertRaisesMessage(ValidationError, 'Yetersiz stok: Defter (en fazla 3)'):
+            self.siparis(4)
+
+        # Reddedilen sipariş hiç oluşturulmaz, ayrılan miktar değişmez
+        self.assertEqual(Siparis.objects.count(), 1)
+        self.assertEqual(self.kullanilabilir(), 3)
+        self.siparis(3)
+        self.assertEqual(self.kullanilabilir(), 0)
+
+    def test_red_ve_iptal_rezervasyonu_serbest_birakir(self):
+        siparis = self.siparis(4)
+        siparis_durumunu_degistir(siparis, 'reddedildi')
+        siparis.save()
+
+        self.assertEqual(self.kullanilabilir(), 10)
+        self.assertEqual(SiparisRezervasyonu.objects.get(siparis=siparis).durum, 'serbest')
+
+        # Yeniden onaylanan sipariş tekrar ayırır
+        siparis_durumunu_degistir(siparis, 'onaylandi')
+        siparis.save()
+        self.assertEqual(self.kullanilabilir(), 6)
+        self.assertEqual(SiparisRezervasyonu.objects.filter(siparis=siparis, durum='aktif').count(), 1)
+
+    def test_stoku_baskasina_verilen_iptal_siparis_yeniden_acilamaz(self):
+        ilk = self.siparis(6)
+        siparis_durumunu_degistir(ilk, 'iptal')
+        ilk.save()
+        self.siparis(8)
+
+        with self.assertRaisesMessage(ValidationError, 'Yetersiz stok'):
+            siparis_durumunu_degistir(ilk, 'onaylandi')
+        self.assertEqual(self.kullanilabilir(), 2)
+
+    def test_faturalandirma_rezervasyonu_tuketir(self):
+        siparis = self.siparis(4)
+        sonuc = siparisleri_faturalandir([siparis.pk], self.user)
+
+        self.assertEqual(len(sonuc['faturalar']), 1)
+        self.assertEqual(SiparisRezervasyonu.objects.get(siparis=siparis).durum, 'tuketildi')
+        self.assertEqual(rezerve_miktarlar([self.urun.pk])[self.urun.pk], 0)
+        # Stok çıkışı faturayla yapıldı; satılabilir miktar aynı kalır
+        self.assertEqual(urun_stok_miktarlari([self.urun.pk])[self.urun.pk], 6)
+        self.assertEqual(self.kullanilabilir(), 6)
+
+    def test_ayni_siparis_iki_kez_rezerve_edilemez(self):
+        siparis = self.siparis(2)
+        with self.assertRaisesMessage(ValidationError, 'aktif rezervasyon zaten var'):
+            siparis_rezerve_et(siparis, {self.urun.pk: 2})
+        self.assertEqual(self.kullanilabilir(), 8)
+
+
+class AdminSiparisDetayTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_user('yonetici', is_staff=True)
+        cls.cari = Cari.objects.create(ad_soyad='Kırtasiye A.Ş.')
+        cls.urun = _stoklu_urun(10)
+
+    def setUp(self):
+        self.client.force_login(self.yonetici)
+        self.siparis = musteri_siparisi_olustur(self.cari, [{'urun_id': self.urun.pk, 'miktar': 4}])
+        self.url = reverse('musteri_paneli:admin_siparis_detay', args=[self.siparis.pk])
+
+    def test_red_rezervasyonu_serbest_birakir(self):
+        response = self.client.post(self.url, {'durum': 'reddedildi', 'admin_notu': 'stok yok'})
+
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.siparis.refresh_from_db()
+        self.assertEqual((self.siparis.durum, self.siparis.notlar), ('reddedildi', 'stok yok'))
+        self.assertEqual(kullanilabilir_miktarlar([self.urun.pk])[self.urun.pk], 10)
+
+    def test_faturalanan_siparis_degistirilemez(self):
+        self.client.post(self.url, {'durum': 'faturalandi'})
+        response = self.client.post(self.url, {'durum': 'iptal'})
+
+        mesajlar = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn("Faturalanmış siparişin durumu değiştirilemez.", mesajlar)
+        self.siparis.refresh_from_db()
+        self.assertEqual(self.siparis.durum, 'faturalandi')
+        self.assertEqual(SiparisRezervasyonu.objects.get(siparis=self.siparis).durum, 'tuketildi')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class AdminSiparisEszamanlilikTests(TransactionTestCase):
+    """Aynı siparişe eşzamanlı durum değişiklikleri sipariş satırı kilidiyle sıralanır."""
+
+    def test_eszamanli_yeniden_onay_tek_rezervasyon(self):
+        yonetici = User.objects.create_user('yonetici', is_staff=True)
+        urun = _stoklu_urun(10)
+        siparis = musteri_siparisi_olustur(Cari.objects.create(ad_soyad='Cari'), [{'urun_id': urun.pk, 'miktar': 4}])
+        siparis_durumunu_degistir(siparis, 'reddedildi')
+        siparis.save()
+        url = reverse('musteri_paneli:admin_siparis_detay', args=[siparis.pk])
+
+        bariyer = threading.Barrier(2)
+        mesajlar = []
+
+        def onayla():
+            try:
+                client = Client()
+                client.force_login(yonetici)
+                bariyer.wait(5)
+                response = client.post(url, {'durum': 'onaylandi'})
+                mesajlar.extend(m.level_tag for m in get_messages(response.wsgi_request))
+            finally:
+                connections.close_all()
+
+        iplikler = [threading.Thread(target=onayla) for _ in range(2)]
+        for iplik in iplikler:
+            iplik.start()
+        for iplik in iplikler:
+            iplik.join(10)
+
+        # İkinci istek kilidi bekler, siparişi zaten açık görür ve yeniden ayırmaz
+        self.assertEqual(mesajlar, ['success', 'success'])
+        self.assertEqual(SiparisRezervasyonu.objects.filter(siparis=siparis, durum='aktif').count(), 1)
+        self.assertEqual(rezerve_miktarlar([urun.pk])[urun.pk], 4)
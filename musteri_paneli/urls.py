@@ -11,11 +11,14 @@ urlpatterns = [
     path('tahsilatlar/', views.tahsilat_listesi, name='tahsilat_listesi'),
     path('siparisler/', views.siparis_listesi, name='siparis_listesi'),
     path('siparisler/yeni/', views.siparis_olustur, name='siparis_olustur'),
+    path('api/siparisler/', views.siparis_olustur_api, name='siparis_olustur_api'),
+    path('urunler/ara/', views.urun_ara_api, name='urun_ara_api'),
     path('siparisler/<int:pk>/', views.siparis_detay, name='siparis_detay'),
     path('profil/', views.profil, name='profil'),
     
     # Admin Yolları
     path('yonetim/siparisler/', views.admin_siparis_listesi, name='admin_siparis_listesi'),
+    path('yonetim/siparisler/toplu-faturalandir/', views.admin_siparis_toplu_faturalandir, name='admin_siparis_toplu_faturalandir'),
     path('yonetim/siparisler/<int:pk>/', views.admin_siparis_detay, name='admin_siparis_detay'),
     path('yonetim/siparisler/<int:pk>/<str:islem>/', views.admin_siparis_islem, name='admin_siparis_islem'),
 ]
@@ -13,38 +13,27 @@ from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
 from fatura.models import Fatura, FaturaKalem
-from stoktakip.services.stok_service import create_stok_hareketleri_from_fatura
-from stoktakip.services.cari_service import create_or_update_cari_hareketi_from_fatura
+from stoktakip.services.siparis_service import musteri_siparisi_olustur, siparisleri_faturalandir
+from stoktakip.services.urun_arama_service import urun_autocomplete
+from stoktakip.services.fiyat_listesi_service import efektif_fiyatlar
+from stoktakip.services.rezervasyon_service import (
+    rezerve_miktarlar,
+    siparis_durumunu_degistir,
+)
+from stoktakip.security_utils import sanitize_search_query, sanitize_integer
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
 
 def siparis_faturalandir(request, siparis):
     """Siparişi faturalandırıp Fatura modeline aktaran yardımcı fonk."""
     if siparis.durum != 'faturalandi':
-        with transaction.atomic():
-            fatura = Fatura.objects.create(
-                cari=siparis.cari,
-                fatura_tarihi=timezone.now().date(),
-                fatura_tipi='Satis',
-                durum='AcikHesap',
-                aciklama=f"Sipariş No: {siparis.siparis_no} üzerinden otomatik oluşturuldu.",
-                olusturan=request.user
-            )
-            for kalem in siparis.kalemler.all():
-                FaturaKalem.objects.create(
-                    fatura=fatura,
-                    urun=kalem.urun,
-                    urun_adi=kalem.urun.ad,
-                    miktar=kalem.miktar,
-                    birim_fiyat=kalem.birim_fiyat,
-                    kdv_orani=20
-                )
-            
-            # Fatura toplamlarını hesapla ve hareketleri oluştur
-            fatura.refresh_from_db()
-            create_stok_hareketleri_from_fatura(fatura, request.user)
-            create_or_update_cari_hareketi_from_fatura(fatura, request.user)
-            
+        # Tekli faturalandırma, toplu faturalandırma ile aynı set bazlı yolu kullanır
+        durumlar = [durum for durum, _ in Siparis.DURUM_CHOICES if durum != 'faturalandi']
+        sonuc = siparisleri_faturalandir([siparis.pk], request.user, durumlar=durumlar)
+        if sonuc['siparisler']:
             siparis.durum = 'faturalandi'
-            siparis.save()
             return True
     return False
 
@@ -173,37 +162,91 @@ def siparis_listesi(request):
 @musteri_required
 def siparis_olustur(request):
     cari = request.user.cari_account
-    urunler = Urun.objects.all().order_by('ad')
     
+    # Ürünler formda autocomplete ile (musteri_paneli:urun_ara_api) ihtiyaç oldukça yüklenir
     if request.method == 'POST':
         urun_idleri = request.POST.getlist('urun_id')
         miktarlar = request.POST.getlist('miktar')
         notlar = request.POST.get('notlar', '')
-        
-        valid_items = False
-        with transaction.atomic():
-            siparis = Siparis.objects.create(cari=cari, notlar=notlar)
-            for urun_id, miktar in zip(urun_idleri, miktarlar):
-                if int(miktar) > 0:
-                    urun = get_object_or_404(Urun, id=urun_id)
-                    SiparisKalem.objects.create(
-                        siparis=siparis,
-                        urun=urun,
-                        miktar=int(miktar),
-                        birim_fiyat=urun.fiyat
-                    )
-                    valid_items = True
-            
-            if not valid_items:
-                siparis.delete()
-                messages.error(request, "Lütfen en az bir ürün seçiniz.")
-                return redirect('musteri_paneli:siparis_olustur')
-            
-            siparis.hesapla_toplam()
-            messages.success(request, "Siparişiniz başarıyla oluşturuldu.")
-            return redirect('musteri_paneli:siparis_listesi')
+
+        kalemler = [
+            {'urun_id': urun_id, 'miktar': miktar}
+            for urun_id, miktar in zip(urun_idleri, miktarlar)
+            if miktar.strip().isdigit() and int(miktar) > 0
+        ]
+        try:
+            musteri_siparisi_olustur(cari, kalemler, notlar=notlar)
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+            return redirect('musteri_paneli:siparis_olustur')
+
+        messages.success(request, "Siparişiniz başarıyla oluşturuldu.")
+        return redirect('musteri_paneli:siparis_listesi')
             
-    return render(request, 'musteri_paneli/siparis_form.html', {'urunler': urunler})
+    return render(request, 'musteri_paneli/siparis_form.html')
+
+@api_view(['POST'])
+def siparis_olustur_api(request):
+    """
+    B2B sipariş API'si: müşteri sistemlerinden toplu sipariş alır.
+
+    Oturum veya token (Authorization: Token <anahtar>) ile çağrılır.
+    Gövde: {"notlar": "...", "kalemler": [{"urun_id": 1, "miktar": 5}, {"barkod": "869...", "miktar": 2}]}
+    """
+    cari = getattr(request.user, 'cari_account', None)
+    if cari is None:
+        return Response({'success': False, 'error': 'Bu işlem yalnızca müşteri hesapları içindir.'}, status=403)
+
+    veri = request.data if isinstance(request.data, dict) else {}
+    kalemler = veri.get('kalemler')
+    if not isinstance(kalemler, list):
+        return Response({'success': False, 'error': "'kalemler' listesi gönderilmelidir."}, status=400)
+
+    try:
+        siparis = musteri_siparisi_olustur(cari, kalemler, notlar=str(veri.get('notlar') or ''))
+    except ValidationError as e:
+        return Response({'success': False, 'error': ' '.join(e.messages), 'hatalar': e.messages}, status=400)
+
+    return Response({
+        'success': True,
+        'siparis_id': siparis.pk,
+        'siparis_no': siparis.siparis_no,
+        'durum': siparis.durum,
+        'kalem_sayisi': siparis.kalemler.count(),
+        'toplam_tutar': f"{siparis.toplam_tutar:.2f}",
+    }, status=201)
+
+@musteri_required
+def urun_ara_api(request):
+    """Sipariş formu için ürün arama sonuçları (alış fiyatı gibi iç bilgiler hariç)."""
+    try:
+        sorgu = sanitize_search_query(request.GET.get('q', ''), max_length=100)
+        sayfa = sanitize_integer(request.GET.get('sayfa', 1), min_value=1, max_value=1000)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': ' '.join(e.messages)}, status=400)
+
+    sonuc = urun_autocomplete(sorgu, sayfa, 20)
+    alanlar = ('id', 'ad', 'barkod', 'birim', 'kategori', 'kdv_orani')
+    # Müşteriye açık siparişlerce ayrılmış miktar düşülmüş (satılabilir) stok gösterilir
+    rezervler = rezerve_miktarlar(urun['id'] for urun in sonuc['sonuclar'])
+    # Fiyatlar müşterinin fiyat listesine göre (sayfa için toplu) çözülür
+    fiyatlar = efektif_fiyatlar(
+        request.user.cari_account.pk,
+        {urun['id']: Decimal(urun['fiyat']) for urun in sonuc['sonuclar']}
+    )
+    return JsonResponse({
+        'success': True,
+        'sonuclar': [
+            {
+                **{alan: urun[alan] for alan in alanlar},
+                'fiyat': str(fiyatlar[urun['id']]['fiyat']),
+                'stok': urun['stok'] - rezervler[urun['id']],
+            }
+            for urun in sonuc['sonuclar']
+        ],
+        'sayfa': sonuc['sayfa'],
+        'sonraki_sayfa': sonuc['sonraki_sayfa'],
+    })
 
 @musteri_required
 def siparis_detay(request, pk):
@@ -217,7 +260,7 @@ def siparis_detay(request, pk):
 @staff_member_required
 def admin_siparis_listesi(request):
     durum_filter = request.GET.get('durum')
-    siparisler = Siparis.objects.all().order_by('-olusturma_tarihi')
+    siparisler = Siparis.objects.select_related('cari').order_by('-olusturma_tarihi')
     
     if durum_filter:
         siparisler = siparisler.filter(durum=durum_filter)
@@ -239,8 +282,9 @@ def admin_siparis_islem(request, pk, islem):
             
     elif islem == 'reddet':
         if siparis.durum in ['beklemede', 'onaylandi']:
-            siparis.durum = 'reddedildi'
-            siparis.save()
+            with transaction.atomic():
+                siparis_durumunu_degistir(siparis, 'reddedildi')
+                siparis.save()
             messages.warning(request, f"{siparis.siparis_no} reddedildi.")
             
     elif islem == 'faturalandir':
@@ -251,6 +295,34 @@ def admin_siparis_islem(request, pk, islem):
                 messages.warning(request, f"{siparis.siparis_no} zaten faturalandırılmış.")
             
     return redirect('musteri_paneli:admin_siparis_listesi')
+
+@staff_member_required
+def admin_siparis_toplu_faturalandir(request):
+    """Seçilen onaylı siparişleri tek işlemde faturalandırır."""
+    if request.method != 'POST':
+        return redirect('musteri_paneli:admin_siparis_listesi')
+
+    # Çok sayıda sipariş tek alan (virgülle ayrılmış) olarak gönderilir; alan sayısı limitine takılmaz
+    ham_idler = request.POST.getlist('siparis_ids')
+    ham_idler += [x for x in request.POST.get('siparis_id_listesi', '').split(',') if x.strip()]
+    siparis_ids = []
+    for deger in ham_idler:
+        try:
+            siparis_ids.append(sanitize_integer(deger, min_value=1))
+        except ValidationError:
+            continue
+    if not siparis_ids:
+        messages.warning(request, "Faturalandırılacak sipariş seçilmedi.")
+        return redirect('musteri_paneli:admin_siparis_listesi')
+
+    sonuc = siparisleri_faturalandir(siparis_ids, request.user, durumlar=('onaylandi',))
+    if sonuc['faturalar']:
+        messages.success(request, f"{len(sonuc['faturalar'])} sipariş faturalandırıldı.")
+    if sonuc['atlanan']:
+        ornekler = ', '.join(f"{no}: {sebep}" for no, sebep in sonuc['atlanan'][:5])
+        messages.warning(request, f"{len(sonuc['atlanan'])} sipariş atlandı ({ornekler}).")
+    return redirect('musteri_paneli:admin_siparis_listesi')
+
 @staff_member_required
 def admin_siparis_detay(request, pk):
     siparis = get_object_or_404(Siparis, pk=pk)
@@ -259,18 +331,25 @@ def admin_siparis_detay(request, pk):
         yeni_durum = request.POST.get('durum')
         admin_notu = request.POST.get('admin_notu', '')
         
-        if siparis.durum == 'faturalandi':
-            messages.warning(request, "Faturalanmış siparişin durumu değiştirilemez.")
-            return redirect('musteri_paneli:admin_siparis_detay', pk=pk)
-
         if yeni_durum in dict(Siparis.DURUM_CHOICES):
-            if yeni_durum == 'faturalandi':
-                siparis_faturalandir(request, siparis)
-            else:
-                siparis.durum = yeni_durum
-            
-            siparis.notlar = admin_notu # Notları güncelle
-            siparis.save()
+            try:
+                with transaction.atomic():
+                    # Aynı siparişe eşzamanlı durum değişikliği (çift tıklama, iki yönetici)
+                    # sırayla işlenir; durum kilit alındıktan sonra okunur
+                    siparis = Siparis.objects.select_for_update().get(pk=pk)
+                    if siparis.durum == 'faturalandi':
+                        raise ValidationError("Faturalanmış siparişin durumu değiştirilemez.")
+                    if yeni_durum == 'faturalandi':
+                        siparis_faturalandir(request, siparis)
+                    else:
+                        # Reddedilen/iptal edilen siparişin rezervasyonu serbest bırakılır
+                        siparis_durumunu_degistir(siparis, yeni_durum)
+                    
+                    siparis.notlar = admin_notu # Notları güncelle
+                    siparis.save()
+            except ValidationError as e:
+                messages.error(request, ' '.join(e.messages))
+                return redirect('musteri_paneli:admin_siparis_detay', pk=pk)
             messages.success(request, f"{siparis.siparis_no} güncellendi.")
             return redirect('musteri_paneli:admin_siparis_detay', pk=pk)
             
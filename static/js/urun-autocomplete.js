@@ -0,0 +1,186 @@
+// Ürün Autocomplete
+// Ürünleri sayfaya topluca basmak yerine arama yapıldıkça API'den sayfa sayfa yükler.
+//
+// Kullanım:
+//   new UrunAutocomplete(document.getElementById('urunAra'), {
+//       url: '/stok/api/ara/',
+//       barkodUrl: '/stok/api/barkod/__barkod__/',   // opsiyonel: Enter'da önce barkod indeksine sorulur
+//       onSelect: (urun) => { ... }   // urun: {id, ad, barkod, birim, fiyat, stok, ...}
+//   });
+class UrunAutocomplete {
+    constructor(input, options = {}) {
+        this.input = input;
+        this.url = options.url || input.dataset.url;
+        this.barkodUrl = options.barkodUrl || input.dataset.barkodUrl;
+        this.onSelect = options.onSelect || (() => {});
+        this.minLength = options.minLength ?? 1;
+        this.delay = options.delay ?? 250;
+        this.sayfa = 1;
+        this.sonuclar = [];
+        this.timer = null;
+        this.istek = null;
+
+        this.liste = document.createElement('div');
+        this.liste.className = 'list-group position-absolute w-100 shadow-sm';
+        this.liste.style.zIndex = 1050;
+        this.liste.style.maxHeight = '320px';
+        this.liste.style.overflowY = 'auto';
+        this.input.parentElement.classList.add('position-relative');
+        this.input.insertAdjacentElement('afterend', this.liste);
+        this.input.setAttribute('autocomplete', 'off');
+
+        this.init();
+    }
+
+    init() {
+        this.input.addEventListener('input', () => {
+            clearTimeout(this.timer);
+            this.timer = setTimeout(() => this.ara(1), this.delay);
+        });
+
+        this.input.addEventListener('focus', () => {
+            if (!this.liste.children.length && this.input.value.trim().length >= this.minLength) {
+                this.ara(1);
+            }
+        });
+
+        // Enter: ilk sonucu seç (barkod okuyucular Enter gönderir)
+        this.input.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                clearTimeout(this.timer);
+                const sorgu = this.input.value.trim();
+                if (this.sonuclar.length && this.sonSorgu === sorgu) {
+                    this.sec(this.sonuclar[0]);
+                } else if (this.barkodUrl && /^\S+$/.test(sorgu)) {
+                    this.barkodAra(sorgu);
+                } else if (sorgu.length >= this.minLength) {
+                    this.aramaIleSec();
+                }
+            } else if (e.key === 'Escape') {
+                this.temizle();
+            }
+        });
+
+        this.liste.addEventListener('click', (e) => {
+            const item = e.target.closest('[data-index]');
+            if (item) {
+                this.sec(this.sonuclar[parseInt(item.dataset.index)]);
+            } else if (e.target.closest('[data-daha-fazla]')) {
+                this.ara(this.sayfa + 1);
+            }
+        });
+
+        document.addEventListener('click', (e) => {
+            if (e.target !== this.input && !this.liste.contains(e.target)) {
+                this.liste.innerHTML = '';
+            }
+        });
+    }
+
+    aramaIleSec() {
+        return this.ara(1).then(() => {
+            if (this.sonuclar.length) this.sec(this.sonuclar[0]);
+        });
+    }
+
+    // Barkod okuyucu girişi: sunucudaki barkod indeksinden tek istekte çözülür.
+    // Bilinmeyen barkodda benzer isimli bir ürün otomatik seçilmez (yanlış ürün sepete girmesin).
+    barkodAra(barkod) {
+        if (this.istek) this.istek.abort();
+        return fetch(this.barkodUrl.replace('__barkod__', encodeURIComponent(barkod)), { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    this.sec(data.urun);
+                } else {
+                    this.mesajGoster(`Barkod bulunamadı: ${barkod}`);
+                }
+            })
+            .catch(() => this.mesajGoster('Barkod sorgulanamadı, lütfen tekrar okutun.'));
+    }
+
+    mesajGoster(metin) {
+        this.sonuclar = [];
+        this.sonSorgu = null;
+        this.liste.innerHTML = '';
+        const mesaj = document.createElement('div');
+        mesaj.className = 'list-group-item text-muted small';
+        mesaj.textContent = metin;
+        this.liste.appendChild(mesaj);
+        this.input.select();
+    }
+
+    ara(sayfa) {
+        const sorgu = this.input.value.trim();
+        if (sorgu.length < this.minLength) {
+            this.temizle();
+            return Promise.resolve();
+        }
+        if (this.istek) this.istek.abort();
+        this.istek = new AbortController();
+
+        const params = new URLSearchParams({ q: sorgu, sayfa: sayfa });
+        return fetch(`${this.url}?${params}`, { signal: this.istek.signal, credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) return;
+                if (sayfa === 1) this.sonuclar = [];
+                this.sonuclar = this.sonuclar.concat(data.sonuclar || []);
+                this.sayfa = data.sayfa;
+                this.sonSorgu = sorgu;
+                this.ciz(data.sonraki_sayfa);
+            })
+            .catch(err => {
+                if (err.name !== 'AbortError') console.error('Ürün araması başarısız:', err);
+            });
+    }
+
+    ciz(sonrakiSayfa) {
+        this.liste.innerHTML = '';
+        if (!this.sonuclar.length) {
+            const bos = document.createElement('div');
+            bos.className = 'list-group-item text-muted small';
+            bos.textContent = 'Ürün bulunamadı';
+            this.liste.appendChild(bos);
+            return;
+        }
+        this.sonuclar.forEach((urun, index) => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action d-flex justify-content-between align-items-center';
+            item.dataset.index = index;
+
+            const ad = document.createElement('span');
+            ad.textContent = urun.ad + (urun.barkod ? ` (${urun.barkod})` : '');
+            const stok = document.createElement('span');
+            stok.className = `badge ${urun.stok > 0 ? 'bg-success' : 'bg-danger'}`;
+            stok.textContent = `${urun.stok} ${urun.birim}`;
+
+            item.append(ad, stok);
+            this.liste.appendChild(item);
+        });
+        if (sonrakiSayfa) {
+            const daha = document.createElement('button');
+            daha.type = 'button';
+            daha.className = 'list-group-item list-group-item-action text-center text-primary small';
+            daha.dataset.dahaFazla = '1';
+            daha.textContent = 'Daha fazla göster...';
+            this.liste.appendChild(daha);
+        }
+    }
+
+    sec(urun) {
+        if (!urun) return;
+        this.onSelect(urun);
+        this.input.value = '';
+        this.temizle();
+        this.input.focus();
+    }
+
+    temizle() {
+        this.sonuclar = [];
+        this.sonSorgu = null;
+        this.liste.innerHTML = '';
+    }
+}
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class StokConfig(AppConfig):
+    name = "stok"
+
+    def ready(self):
+        # Barkod indeksi versiyon damgaları için signal'ları kaydet
+        from . import signals  # noqa: F401
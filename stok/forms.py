@@ -1,6 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Kategori, Urun, StokHareketi
+from .models import FiyatGuncellemeIslemi, Kategori, Urun, StokHareketi
+from stoktakip.services.fiyat_guncelleme_service import YUVARLAMA_ADIMLARI
 
 
 class KategoriForm(forms.ModelForm):
@@ -20,7 +21,7 @@ class KategoriForm(forms.ModelForm):
 class UrunForm(forms.ModelForm):
     class Meta:
         model = Urun
-        fields = ['ad', 'kategori', 'barkod', 'birim', 'alis_fiyati', 'fiyat']
+        fields = ['ad', 'kategori', 'barkod', 'birim', 'alis_fiyati', 'fiyat', 'kdv_orani']
         widgets = {
             'ad': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ürün adı giriniz'}),
             'kategori': forms.Select(attrs={'class': 'form-control'}),
@@ -28,6 +29,7 @@ class UrunForm(forms.ModelForm):
             'birim': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Adet, Kg, Lt vb.'}),
             'alis_fiyati': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'placeholder': '0.00'}),
             'fiyat': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'placeholder': '0.00'}),
+            'kdv_orani': forms.NumberInput(attrs={'class': 'form-control', 'min': '0', 'max': '100'}),
         }
         labels = {
             'ad': 'Ürün Adı',
@@ -36,6 +38,7 @@ class UrunForm(forms.ModelForm):
             'birim': 'Birim',
             'alis_fiyati': 'Alış Fiyatı (₺)',
             'fiyat': 'Satış Fiyatı (₺)',
+            'kdv_orani': 'KDV Oranı (%)',
         }
     
     def clean(self):
@@ -53,6 +56,11 @@ class UrunForm(forms.ModelForm):
         if fiyat is not None and fiyat < 0:
             errors['fiyat'] = 'Satış fiyatı negatif olamaz.'
         
+        # KDV oranı kontrolü
+        kdv_orani = cleaned_data.get('kdv_orani')
+        if kdv_orani is not None and (kdv_orani < 0 or kdv_orani > 100):
+            errors['kdv_orani'] = 'KDV oranı 0 ile 100 arasında olmalıdır.'
+        
         # Barkod unique kontrolü
         barkod = cleaned_data.get('barkod')
         if barkod:
@@ -85,3 +93,52 @@ class StokHareketiForm(forms.ModelForm):
             'aciklama': 'Açıklama',
         }
 
+
+class FiyatGuncellemeForm(forms.Form):
+    """Toplu fiyat güncelleme kuralı."""
+    kategori = forms.ModelChoiceField(
+        queryset=Kategori.objects.all(), required=False, label='Kategori', empty_label='Tüm kategoriler',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    tedarikci = forms.ModelChoiceField(
+        queryset=None, required=False, label='Tedarikçi', empty_label='Tüm tedarikçiler',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    min_fiyat = forms.DecimalField(
+        required=False, min_value=0, decimal_places=2, label='Min. Fiyat (₺)',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'})
+    )
+    max_fiyat = forms.DecimalField(
+        required=False, min_value=0, decimal_places=2, label='Maks. Fiyat (₺)',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'})
+    )
+    alan = forms.ChoiceField(
+        choices=FiyatGuncellemeIslemi.ALAN_CHOICES, label='Güncellenecek Fiyat',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    islem = forms.ChoiceField(
+        choices=FiyatGuncellemeIslemi.ISLEM_CHOICES, label='İşlem',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    deger = forms.DecimalField(
+        decimal_places=2, label='Değer',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': 'Ör. 12 veya -5'})
+    )
+    yuvarlama = forms.ChoiceField(
+        choices=[(adim, adim) for adim in YUVARLAMA_ADIMLARI],
+        initial='0.01', label='Yuvarlama Adımı (₺)', widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from cari.models import Cari
+        self.fields['tedarikci'].queryset = Cari.objects.filter(durum='aktif', kategori__in=['tedarikci', 'her_ikisi'])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_fiyat = cleaned_data.get('min_fiyat')
+        max_fiyat = cleaned_data.get('max_fiyat')
+        if min_fiyat is not None and max_fiyat is not None and min_fiyat > max_fiyat:
+            raise ValidationError('Minimum fiyat maksimum fiyattan büyük olamaz.')
+        return cleaned_data
+
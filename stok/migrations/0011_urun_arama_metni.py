@@ -0,0 +1,63 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Migration'ın sonradan değişebilecek uygulama koduna bağlı kalmaması için
+# stoktakip/search_utils.py'deki katlama mantığının bu tarihteki kopyası.
+TURKCE_KATLAMA_TABLOSU = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Î': 'i', 'î': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u', 'Û': 'u', 'û': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+    'Â': 'a', 'â': 'a',
+})
+
+
+def urun_arama_metni(ad, barkod=None, kategori_adi=None):
+    metin = ' '.join(parca for parca in (ad, barkod, kategori_adi) if parca)
+    return ' '.join(metin.translate(TURKCE_KATLAMA_TABLOSU).lower().split())[:400]
+
+
+def arama_metinlerini_doldur(apps, schema_editor):
+    Urun = apps.get_model('stok', 'Urun')
+    urunler = []
+    for urun in Urun.objects.select_related('kategori').only('id', 'ad', 'barkod', 'kategori__ad').iterator(chunk_size=2000):
+        urun.arama_metni = urun_arama_metni(urun.ad, urun.barkod, urun.kategori.ad if urun.kategori else None)
+        urunler.append(urun)
+        if len(urunler) >= 2000:
+            Urun.objects.bulk_update(urunler, ['arama_metni'])
+            urunler = []
+    if urunler:
+        Urun.objects.bulk_update(urunler, ['arama_metni'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stok", "0010_urun_alis_fiyati_alter_urun_fiyat_and_more"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="urun",
+            name="arama_metni",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=400,
+                verbose_name="Arama Metni",
+            ),
+        ),
+        migrations.RunPython(arama_metinlerini_doldur, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="urun",
+            index=GinIndex(
+                fields=["arama_metni"],
+                name="urun_arama_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 6.0 on 2026-10-19 17:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stok', '0011_urun_arama_metni'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SayimOturumu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad', models.CharField(max_length=200, verbose_name='Sayım Adı')),
+                ('durum', models.CharField(choices=[('acik', 'Açık'), ('tamamlandi', 'Tamamlandı'), ('iptal', 'İptal')], default='acik', max_length=20, verbose_name='Durum')),
+                ('aciklama', models.TextField(blank=True, null=True, verbose_name='Açıklama')),
+                ('sayilan_urun_sayisi', models.IntegerField(default=0, verbose_name='Sayılan Ürün Sayısı')),
+                ('fark_sayisi', models.IntegerField(default=0, verbose_name='Fark Bulunan Ürün Sayısı')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('tamamlanma_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Tamamlanma Tarihi')),
+                ('olusturan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan')),
+            ],
+            options={
+                'verbose_name': 'Sayım Oturumu',
+                'verbose_name_plural': 'Sayım Oturumları',
+                'db_table': 'stok_sayimoturumu',
+                'ordering': ['-olusturma_tarihi'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SayimPartisi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parti_no', models.CharField(max_length=64, verbose_name='Parti No')),
+                ('okutma_sayisi', models.IntegerField(default=0, verbose_name='Okutma Sayısı')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Alınma Tarihi')),
+                ('olusturan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Gönderen')),
+                ('oturum', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='partiler', to='stok.sayimoturumu', verbose_name='Sayım Oturumu')),
+            ],
+            options={
+                'verbose_name': 'Sayım Partisi',
+                'verbose_name_plural': 'Sayım Partileri',
+                'db_table': 'stok_sayimpartisi',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SayimSatiri',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('miktar', models.PositiveIntegerField(default=0, verbose_name='Sayılan Miktar')),
+                ('sistem_miktari', models.IntegerField(blank=True, null=True, verbose_name='Sistem Stoku')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('oturum', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='satirlar', to='stok.sayimoturumu', verbose_name='Sayım Oturumu')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='stok.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Sayım Satırı',
+                'verbose_name_plural': 'Sayım Satırları',
+                'db_table': 'stok_sayimsatiri',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sayimoturumu',
+            index=models.Index(fields=['durum'], name='sayimoturumu_durum_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sayimpartisi',
+            constraint=models.UniqueConstraint(fields=('oturum', 'parti_no'), name='sayimpartisi_oturum_parti_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='sayimsatiri',
+            constraint=models.UniqueConstraint(fields=('oturum', 'urun'), name='sayimsatiri_oturum_urun_uniq'),
+        ),
+    ]
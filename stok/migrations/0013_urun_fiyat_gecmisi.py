@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-19 18:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mevcut_fiyatlari_yaz(apps, schema_editor):
+    """Mevcut ürün fiyatlarını, ürünün oluşturulma tarihinden geçerli ilk geçmiş kaydı olarak yazar."""
+    Urun = apps.get_model('stok', 'Urun')
+    UrunFiyatGecmisi = apps.get_model('stok', 'UrunFiyatGecmisi')
+    kayitlar = []
+    for urun_id, fiyat, alis_fiyati, olusturma_tarihi in Urun.objects.values_list(
+        'id', 'fiyat', 'alis_fiyati', 'olusturma_tarihi'
+    ).iterator(chunk_size=2000):
+        kayitlar.append(UrunFiyatGecmisi(urun_id=urun_id, fiyat=fiyat, alis_fiyati=alis_fiyati, tarih=olusturma_tarihi))
+        if len(kayitlar) >= 2000:
+            UrunFiyatGecmisi.objects.bulk_create(kayitlar)
+            kayitlar = []
+    UrunFiyatGecmisi.objects.bulk_create(kayitlar)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stok', '0012_sayim_oturumu'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiyatGuncellemeIslemi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aciklama', models.CharField(max_length=500, verbose_name='Kural Özeti')),
+                ('alan', models.CharField(choices=[('fiyat', 'Satış Fiyatı'), ('alis_fiyati', 'Alış Fiyatı')], max_length=20, verbose_name='Güncellenen Fiyat')),
+                ('islem', models.CharField(choices=[('yuzde', 'Yüzde (%)'), ('tutar', 'Tutar (₺)'), ('sabit', 'Sabit Fiyat (₺)')], max_length=10, verbose_name='İşlem')),
+                ('deger', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Değer')),
+                ('etkilenen_urun_sayisi', models.IntegerField(default=0, verbose_name='Etkilenen Ürün Sayısı')),
+                ('tarih', models.DateTimeField(auto_now_add=True, verbose_name='Tarih')),
+                ('olusturan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Uygulayan')),
+            ],
+            options={
+                'verbose_name': 'Fiyat Güncelleme İşlemi',
+                'verbose_name_plural': 'Fiyat Güncelleme İşlemleri',
+                'db_table': 'stok_fiyatguncellemeislemi',
+                'ordering': ['-tarih'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UrunFiyatGecmisi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fiyat', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Satış Fiyatı (₺)')),
+                ('alis_fiyati', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Alış Fiyatı (₺)')),
+                ('tarih', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Geçerlilik Başlangıcı')),
+                ('degistiren', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Değiştiren')),
+                ('islem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gecmis', to='stok.fiyatguncellemeislemi', verbose_name='Toplu İşlem')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_gecmisi', to='stok.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Ürün Fiyat Geçmişi',
+                'verbose_name_plural': 'Ürün Fiyat Geçmişi',
+                'db_table': 'stok_urunfiyatgecmisi',
+                'ordering': ['-tarih', '-id'],
+                'indexes': [models.Index(fields=['urun', '-tarih'], name='urunfiyat_urun_tarih_idx')],
+            },
+        ),
+        migrations.RunPython(mevcut_fiyatlari_yaz, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stok', '0014_kisitlar'),
+    ]
+
+    operations = [
+        # Mevcut ürünler önceki sabit oranla (%20) doldurulur
+        migrations.AddField(
+            model_name='urun',
+            name='kdv_orani',
+            field=models.IntegerField(default=20, verbose_name='KDV Oranı (%)'),
+        ),
+        migrations.AddConstraint(
+            model_name='urun',
+            constraint=models.CheckConstraint(condition=models.Q(('kdv_orani__gte', 0), ('kdv_orani__lte', 100)), name='urun_kdv_orani_aralik'),
+        ),
+    ]
@@ -2,6 +2,11 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Sum, Q
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex
+from django.utils import timezone
+
+from stoktakip.model_utils import DegisiklikIzlemeMixin, KisitliKayitMixin
+from stoktakip.search_utils import urun_arama_metni
 
 
 class Kategori(models.Model):
@@ -18,18 +23,47 @@ class Kategori(models.Model):
     def __str__(self):
         return self.ad
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Yeniden adlandırma tespiti için yüklenen ad (ek SELECT yapılmaz)
+        instance._yuklenen_ad = instance.__dict__.get('ad')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        ad_degisti = (
+            not self._state.adding
+            and 'ad' in self.__dict__
+            and (update_fields is None or 'ad' in update_fields)
+            and self.__dict__.get('_yuklenen_ad') != self.ad
+        )
+        super().save(*args, **kwargs)
+        self._yuklenen_ad = self.__dict__.get('ad')
+
+        # Kategori adı ürünlerin arama metninde yer aldığı için güncellenmeli
+        if ad_degisti:
+            urunler = list(self.urun_set.only('id', 'ad', 'barkod'))
+            for urun in urunler:
+                urun.arama_metni = urun_arama_metni(urun.ad, urun.barkod, self.ad)
+            Urun.objects.bulk_update(urunler, ['arama_metni'], batch_size=1000)
+
 
-class Urun(models.Model):
+class Urun(DegisiklikIzlemeMixin, KisitliKayitMixin, models.Model):
     kategori = models.ForeignKey(Kategori, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Kategori")
     ad = models.CharField(max_length=200, verbose_name="Ürün Adı")
     barkod = models.CharField(max_length=100, blank=True, null=True, unique=True, verbose_name="Barkod")
     birim = models.CharField(max_length=20, default='Adet', verbose_name="Birim")
     alis_fiyati = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Alış Fiyatı (₺)")
     fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Satış Fiyatı (₺)")
+    # Hızlı satış ve sipariş faturalarının kalemleri ile ürün API'leri bu oranı kullanır
+    kdv_orani = models.IntegerField(default=20, verbose_name="KDV Oranı (%)")
     min_stok_adedi = models.IntegerField(default=0, verbose_name="Minimum Stok Seviyesi", editable=False)
     resim = models.ImageField(upload_to='urunler/', blank=True, null=True, verbose_name="Ürün Resmi")
     qr_kod = models.ImageField(upload_to='qr_kodlar/', blank=True, null=True, verbose_name="QR Kod")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    # Ad, barkod ve kategori adının Türkçe katlanmış hali (save'de güncellenir, pg_trgm ile aranır)
+    arama_metni = models.CharField(max_length=400, blank=True, default='', editable=False, verbose_name="Arama Metni")
 
     class Meta:
         verbose_name = "Ürün"
@@ -38,7 +72,23 @@ class Urun(models.Model):
         db_table = 'stok_urun'
         indexes = [
             models.Index(fields=['ad'], name='urun_ad_idx'),
+            GinIndex(fields=['arama_metni'], name='urun_arama_trgm_idx', opclasses=['gin_trgm_ops']),
         ]
+        constraints = [
+            models.CheckConstraint(condition=Q(fiyat__gte=0), name='urun_fiyat_negatif_degil'),
+            models.CheckConstraint(condition=Q(alis_fiyati__gte=0), name='urun_alis_fiyati_negatif_degil'),
+            models.CheckConstraint(condition=Q(kdv_orani__gte=0, kdv_orani__lte=100), name='urun_kdv_orani_aralik'),
+        ]
+
+    # Alan bazlı değişiklik kaydı; fiyat geçmişi de bu görüntüyü kullanır (bkz. stok/signals.py)
+    izlenen_alanlar = ('ad', 'barkod', 'kategori', 'birim', 'fiyat', 'alis_fiyati', 'kdv_orani')
+
+    kisit_mesajlari = {
+        'barkod': ('barkod', 'Bu barkod numarası zaten kullanılıyor.'),
+        'urun_fiyat_negatif_degil': ('fiyat', 'Satış fiyatı negatif olamaz.'),
+        'urun_alis_fiyati_negatif_degil': ('alis_fiyati', 'Alış fiyatı negatif olamaz.'),
+        'urun_kdv_orani_aralik': ('kdv_orani', 'KDV oranı 0 ile 100 arasında olmalıdır.'),
+    }
 
     def __str__(self):
         return self.ad
@@ -54,12 +104,12 @@ class Urun(models.Model):
         # Satış fiyatı kontrolü
         if self.fiyat < 0:
             errors['fiyat'] = 'Satış fiyatı negatif olamaz.'
+
+        # KDV oranı kontrolü
+        if self.kdv_orani is None or self.kdv_orani < 0 or self.kdv_orani > 100:
+            errors['kdv_orani'] = 'KDV oranı 0 ile 100 arasında olmalıdır.'
         
-        # Barkod unique kontrolü (form'da var ama model'de de olmalı)
-        if self.barkod:
-            existing = Urun.objects.filter(barkod=self.barkod).exclude(pk=self.pk)
-            if existing.exists():
-                errors['barkod'] = 'Bu barkod numarası zaten kullanılıyor.'
+        # Barkod benzersizliği veritabanı kısıtıyla sağlanır (bkz. kisit_mesajlari)
         
         if errors:
             raise ValidationError(errors)
@@ -67,7 +117,8 @@ class Urun(models.Model):
     def save(self, *args, **kwargs):
         # Minimum stok seviyesi her zaman 0 olacak
         self.min_stok_adedi = 0
-        self.full_clean()  # clean() metodunu çağır
+        self.arama_metni = urun_arama_metni(self.ad, self.barkod, self.kategori.ad if self.kategori_id else None)
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
 
     @property
@@ -85,7 +136,7 @@ class Urun(models.Model):
         return giris_toplam - cikis_toplam
 
 
-class StokHareketi(models.Model):
+class StokHareketi(KisitliKayitMixin, models.Model):
     ISLEM_TURU_CHOICES = [
         ('giriş', 'Giriş'),
         ('çıkış', 'Çıkış'),
@@ -108,6 +159,13 @@ class StokHareketi(models.Model):
             models.Index(fields=['islem_turu'], name='stokhareketi_islem_turu_idx'),
             models.Index(fields=['urun', 'tarih'], name='stokhareketi_urun_tarih_idx'),
         ]
+        constraints = [
+            models.CheckConstraint(condition=Q(miktar__gt=0), name='stokhareketi_miktar_pozitif'),
+        ]
+
+    kisit_mesajlari = {
+        'stokhareketi_miktar_pozitif': ('miktar', 'Miktar 0\'dan büyük olmalıdır.'),
+    }
 
     def __str__(self):
         return f"{self.urun.ad} - {self.get_islem_turu_display()} - {self.miktar} {self.urun.birim}"
@@ -126,5 +184,146 @@ class StokHareketi(models.Model):
             raise ValidationError(errors)
     
     def save(self, *args, **kwargs):
-        self.full_clean()  # clean() metodunu çağır
+        self.hizli_dogrula()  # Sorgusuz doğrulama: alan kuralları + clean()
         super().save(*args, **kwargs)
+
+
+class SayimOturumu(models.Model):
+    """
+    Parça parça yüklenen (el terminali / çevrimdışı) stok sayımı oturumu.
+
+    Okutmalar partiler halinde gelir; oturum tamamlandığında sayılan miktarlar
+    sistem stoku ile karşılaştırılıp fark hareketleri oluşturulur.
+    """
+    DURUM_CHOICES = [
+        ('acik', 'Açık'),
+        ('tamamlandi', 'Tamamlandı'),
+        ('iptal', 'İptal'),
+    ]
+
+    ad = models.CharField(max_length=200, verbose_name="Sayım Adı")
+    durum = models.CharField(max_length=20, choices=DURUM_CHOICES, default='acik', verbose_name="Durum")
+    aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
+    sayilan_urun_sayisi = models.IntegerField(default=0, verbose_name="Sayılan Ürün Sayısı")
+    fark_sayisi = models.IntegerField(default=0, verbose_name="Fark Bulunan Ürün Sayısı")
+    olusturan = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Oluşturan")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+    tamamlanma_tarihi = models.DateTimeField(blank=True, null=True, verbose_name="Tamamlanma Tarihi")
+
+    class Meta:
+        verbose_name = "Sayım Oturumu"
+        verbose_name_plural = "Sayım Oturumları"
+        ordering = ['-olusturma_tarihi']
+        db_table = 'stok_sayimoturumu'
+        indexes = [
+            models.Index(fields=['durum'], name='sayimoturumu_durum_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ad} ({self.get_durum_display()})"
+
+
+class SayimSatiri(models.Model):
+    """Bir sayım oturumunda ürün başına sayılan miktar."""
+    oturum = models.ForeignKey(SayimOturumu, on_delete=models.CASCADE, related_name='satirlar', verbose_name="Sayım Oturumu")
+    urun = models.ForeignKey(Urun, on_delete=models.CASCADE, verbose_name="Ürün")
+    miktar = models.PositiveIntegerField(default=0, verbose_name="Sayılan Miktar")
+    # Mutabakat anındaki sistem stoku (oturum tamamlanınca dolar)
+    sistem_miktari = models.IntegerField(blank=True, null=True, verbose_name="Sistem Stoku")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    class Meta:
+        verbose_name = "Sayım Satırı"
+        verbose_name_plural = "Sayım Satırları"
+        ordering = ['id']
+        db_table = 'stok_sayimsatiri'
+        constraints = [
+            models.UniqueConstraint(fields=['oturum', 'urun'], name='sayimsatiri_oturum_urun_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.oturum.ad} - {self.urun.ad}: {self.miktar}"
+
+
+class SayimPartisi(models.Model):
+    """
+    İşlenmiş okutma partisi.
+
+    parti_no istemci tarafından üretilir; aynı parti tekrar gönderilirse
+    (ör. bağlantı koptuktan sonra) ikinci kez işlenmez.
+    """
+    oturum = models.ForeignKey(SayimOturumu, on_delete=models.CASCADE, related_name='partiler', verbose_name="Sayım Oturumu")
+    parti_no = models.CharField(max_length=64, verbose_name="Parti No")
+    okutma_sayisi = models.IntegerField(default=0, verbose_name="Okutma Sayısı")
+    olusturan = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Gönderen")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Alınma Tarihi")
+
+    class Meta:
+        verbose_name = "Sayım Partisi"
+        verbose_name_plural = "Sayım Partileri"
+        ordering = ['id']
+        db_table = 'stok_sayimpartisi'
+        constraints = [
+            models.UniqueConstraint(fields=['oturum', 'parti_no'], name='sayimpartisi_oturum_parti_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.oturum.ad} - {self.parti_no}"
+
+
+class FiyatGuncellemeIslemi(models.Model):
+    """Toplu fiyat güncellemesi (kural ve etkilenen ürün sayısı)."""
+    ALAN_CHOICES = [
+        ('fiyat', 'Satış Fiyatı'),
+        ('alis_fiyati', 'Alış Fiyatı'),
+    ]
+    ISLEM_CHOICES = [
+        ('yuzde', 'Yüzde (%)'),
+        ('tutar', 'Tutar (₺)'),
+        ('sabit', 'Sabit Fiyat (₺)'),
+    ]
+
+    aciklama = models.CharField(max_length=500, verbose_name="Kural Özeti")
+    alan = models.CharField(max_length=20, choices=ALAN_CHOICES, verbose_name="Güncellenen Fiyat")
+    islem = models.CharField(max_length=10, choices=ISLEM_CHOICES, verbose_name="İşlem")
+    deger = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Değer")
+    etkilenen_urun_sayisi = models.IntegerField(default=0, verbose_name="Etkilenen Ürün Sayısı")
+    olusturan = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Uygulayan")
+    tarih = models.DateTimeField(auto_now_add=True, verbose_name="Tarih")
+
+    class Meta:
+        verbose_name = "Fiyat Güncelleme İşlemi"
+        verbose_name_plural = "Fiyat Güncelleme İşlemleri"
+        ordering = ['-tarih']
+        db_table = 'stok_fiyatguncellemeislemi'
+
+    def __str__(self):
+        return f"{self.tarih:%d.%m.%Y %H:%M} - {self.aciklama}"
+
+
+class UrunFiyatGecmisi(models.Model):
+    """
+    Ürün fiyat geçmişi: her satır, tarihten itibaren geçerli satış ve alış fiyatıdır.
+
+    Bir tarihteki fiyat, o tarihten önceki en son satırdır ((urun, tarih) indeksi).
+    """
+    urun = models.ForeignKey(Urun, on_delete=models.CASCADE, related_name='fiyat_gecmisi', verbose_name="Ürün")
+    fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Satış Fiyatı (₺)")
+    alis_fiyati = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Alış Fiyatı (₺)")
+    tarih = models.DateTimeField(default=timezone.now, verbose_name="Geçerlilik Başlangıcı")
+    islem = models.ForeignKey(FiyatGuncellemeIslemi, on_delete=models.SET_NULL, null=True, blank=True, related_name='gecmis', verbose_name="Toplu İşlem")
+    degistiren = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Değiştiren")
+
+    class Meta:
+        verbose_name = "Ürün Fiyat Geçmişi"
+        verbose_name_plural = "Ürün Fiyat Geçmişi"
+        ordering = ['-tarih', '-id']
+        db_table = 'stok_urunfiyatgecmisi'
+        indexes = [
+            models.Index(fields=['urun', '-tarih'], name='urunfiyat_urun_tarih_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.urun_id} - {self.tarih:%d.%m.%Y}: {self.fiyat}"
+
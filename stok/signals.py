@@ -0,0 +1,43 @@
+"""
+Stok signal'ları.
+
+Urun ve StokHareketi değişikliklerinde barkod indeksinin versiyon damgalarını
+artırır (bkz. stoktakip/services/barkod_index_service.py). Fiyatı değişen
+ürünler için fiyat geçmişine kayıt ekler.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import StokHareketi, Urun, UrunFiyatGecmisi
+from stoktakip.services.barkod_index_service import katalog_versiyonunu_artir, urun_versiyonlarini_artir
+
+
+@receiver(post_save, sender=Urun)
+def urun_kaydedildi(sender, instance, created, **kwargs):
+    urun_id = instance.pk
+
+    # Yüklenen değerler DegisiklikIzlemeMixin görüntüsünden okunur (save() sonrası yenilenir)
+    degisen = instance.degisen_alanlar()
+    if created or 'fiyat' in degisen or 'alis_fiyati' in degisen:
+        UrunFiyatGecmisi.objects.create(urun_id=urun_id, fiyat=instance.fiyat, alis_fiyati=instance.alis_fiyati)
+
+    def damgala():
+        urun_versiyonlarini_artir([urun_id])
+        # Yeni ürün / değişen barkod daha önce bilinmeyen bir barkodu çözebilir
+        katalog_versiyonunu_artir()
+
+    transaction.on_commit(damgala)
+
+
+@receiver(post_delete, sender=Urun)
+def urun_silindi(sender, instance, **kwargs):
+    urun_id = instance.pk
+    transaction.on_commit(lambda: urun_versiyonlarini_artir([urun_id]))
+
+
+@receiver(post_save, sender=StokHareketi)
+@receiver(post_delete, sender=StokHareketi)
+def stok_hareketi_degisti(sender, instance, **kwargs):
+    urun_id = instance.urun_id
+    transaction.on_commit(lambda: urun_versiyonlarini_artir([urun_id]))
@@ -11,5 +11,14 @@ urlpatterns = [
     path('<int:pk>/stok-duzenle/', views.stok_duzenle, name='stok_duzenle'),
     path('<int:pk>/hareketler/', views.stok_hareketleri, name='hareketler'),
     path('toplu-islem/', views.toplu_stok_islem, name='toplu_islem'),
+    path('fiyat-guncelleme/', views.toplu_fiyat_guncelleme, name='toplu_fiyat_guncelleme'),
+    path('api/urun/<int:pk>/fiyat-gecmisi/', views.urun_fiyat_gecmisi_api, name='urun_fiyat_gecmisi_api'),
     path('sayim/', views.stok_sayim, name='sayim'),
+    path('sayim/<int:pk>/', views.sayim_oturumu, name='sayim_oturumu'),
+    path('sayim/<int:pk>/tamamla/', views.sayim_tamamla, name='sayim_tamamla'),
+    path('sayim/<int:pk>/iptal/', views.sayim_iptal, name='sayim_iptal'),
+    path('api/sayim/<int:pk>/', views.sayim_oturumu_api, name='sayim_oturumu_api'),
+    path('api/sayim/<int:pk>/parti/', views.sayim_parti_api, name='sayim_parti_api'),
+    path('api/ara/', views.urun_ara_api, name='urun_ara_api'),
+    path('api/barkod/<str:barkod>/', views.barkod_tara_api, name='barkod_tara_api'),
 ]
@@ -6,17 +6,39 @@ from django.utils import timezone
 from django.http import JsonResponse
 from django.db.models import Q
 from django.db import transaction
+from django.core.exceptions import ValidationError
+from decimal import Decimal
 from typing import Any
+import json
 import logging
-from .models import Urun, StokHareketi, Kategori
-from .forms import UrunForm
+from .models import Urun, StokHareketi, Kategori, SayimOturumu, FiyatGuncellemeIslemi, UrunFiyatGecmisi
+from .forms import UrunForm, FiyatGuncellemeForm
 from accounts.utils import log_action
 from stoktakip.template_helpers import (
     generate_pagination_html, prepare_urun_table_data, generate_table_html
 )
-from stoktakip.error_handling import handle_view_errors, database_transaction
+from stoktakip.pagination import KeysetPaginator, IMLEC_PARAMETRESI
+from stoktakip.error_handling import handle_view_errors, handle_api_errors, database_transaction
 from stoktakip.cache_utils import cache_view_result
-from stoktakip.security_utils import sanitize_integer, sanitize_string, validate_search_query, sanitize_decimal
+from stoktakip.security_utils import sanitize_integer, sanitize_string, sanitize_search_query, sanitize_decimal
+from stoktakip.services.urun_arama_service import urun_ara, urun_autocomplete
+from stoktakip.services.barkod_index_service import barkod_coz
+from stoktakip.services.stok_service import toplu_stok_hareketi_olustur
+from stoktakip.services.sayim_service import (
+    SAYIM_PARTI_LIMIT,
+    sayim_oturumu_baslat,
+    sayim_partisi_isle,
+    sayim_satirlari,
+    sayim_mutabakat,
+    sayim_oturumu_iptal,
+    tek_seferde_sayim,
+)
+from stoktakip.services.fiyat_guncelleme_service import (
+    FiyatKurali,
+    fiyat_guncelleme_onizleme,
+    toplu_fiyat_guncelle,
+    urun_fiyatlari_tarihte,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +54,11 @@ def index(request: Any) -> Any:
     """
     urun_list = Urun.objects.select_related('kategori').all().order_by('ad')
     
-    # Arama
+    # Arama (Türkçe duyarlı, alaka sıralı)
     search_query = request.GET.get('search', '')
+    search_query = sanitize_search_query(search_query, max_length=100)
     if search_query:
-        urun_list = urun_list.filter(
-            Q(ad__icontains=search_query) |
-            Q(barkod__icontains=search_query) |
-            Q(kategori__ad__icontains=search_query)
-        )
+        urun_list = urun_ara(search_query, urun_list)
     
     # Kategori filtresi
     kategori_filter = request.GET.get('kategori', '')
@@ -348,21 +367,17 @@ def stok_hareketleri(request: Any, pk: int) -> Any:
     """
     try:
         urun = get_object_or_404(Urun, pk=pk)
-        hareketler = StokHareketi.objects.filter(urun=urun).select_related('olusturan').order_by('-tarih')
+        hareketler = StokHareketi.objects.filter(urun=urun).select_related('olusturan')
         
-        # Sayfalama - Input validation
-        try:
-            page_number = request.GET.get('page', '1')
-            page_number = sanitize_integer(page_number, min_value=1)
-        except Exception:
-            page_number = 1
-        
-        paginator = Paginator(hareketler, 20)
-        hareketler_page = paginator.get_page(page_number)
+        # Keyset sayfalama: derin sayfalarda OFFSET taraması ve her sayfada COUNT yapılmaz
+        paginator = KeysetPaginator(hareketler, 20, siralama=('-tarih', '-id'))
+        hareketler_page = paginator.get_page(request.GET.get(IMLEC_PARAMETRESI))
+        pagination_html = generate_pagination_html(hareketler_page, {}, request.path) if hareketler_page.has_other_pages() else None
         
         return render(request, 'stok/stok_hareketleri.html', {
             'urun': urun,
-            'hareketler': hareketler_page
+            'hareketler': hareketler_page,
+            'pagination_html': pagination_html,
         })
     except Exception as e:
         logger.error(f"Stok hareketleri hatası: {str(e)}", exc_info=True)
@@ -373,123 +388,82 @@ def stok_hareketleri(request: Any, pk: int) -> Any:
     error_message="Toplu stok işlemi yapılırken bir hata oluştu.",
     redirect_url="stok:index"
 )
-@database_transaction
 @login_required
 def toplu_stok_islem(request: Any) -> Any:
     """
     Toplu stok işlemi yapar.
-    
-    Transaction içinde çalışır, hata durumunda rollback yapar.
-    Birden fazla ürün için aynı anda stok giriş/çıkış işlemi yapar.
+
+    Birden fazla ürün için aynı anda stok giriş/çıkış işlemi yapar. Ürünler,
+    stoklar ve hareketler set bazlı işlenir (bkz. toplu_stok_hareketi_olustur);
+    işlem için tek bir audit log kaydı yazılır.
     """
-    from django.core.exceptions import ValidationError
-    
     if request.method == 'POST':
         try:
             # Input validation
             urun_ids = request.POST.getlist('urun_ids')
+            urun_ids += [x for x in request.POST.get('urun_id_listesi', '').split(',') if x.strip()]
             if not urun_ids:
                 raise ValidationError('Lütfen en az bir ürün seçin.')
-            
+            gecerli_idler = []
+            for urun_id in urun_ids:
+                try:
+                    gecerli_idler.append(sanitize_integer(urun_id, min_value=1))
+                except ValidationError:
+                    continue
+
             islem_turu = sanitize_string(request.POST.get('islem_turu', '').strip(), max_length=20)
             if not islem_turu or islem_turu not in ['giriş', 'çıkış']:
                 raise ValidationError('Geçerli bir işlem türü seçin.')
-            
+
             miktar = sanitize_integer(request.POST.get('miktar', '0'), min_value=1, max_value=1000000)
             aciklama = sanitize_string(
                 request.POST.get('aciklama', 'Toplu işlem').strip() or 'Toplu işlem',
                 max_length=500
             )
-        
-            # Transaction içinde toplu işlem
+
             with transaction.atomic():
-                # Çıkış işleminde stok kontrolü
-                if islem_turu == 'çıkış':
-                    yetersiz_stok_urunler = []
-                    for urun_id in urun_ids:
-                        try:
-                            urun_id_int = sanitize_integer(urun_id, min_value=1)
-                            urun = Urun.objects.get(pk=urun_id_int)
-                            if urun.mevcut_stok < miktar:
-                                yetersiz_stok_urunler.append(urun.ad)
-                        except (Urun.DoesNotExist, ValidationError):
-                            continue
-                    
-                    if yetersiz_stok_urunler:
-                        messages.warning(request, 
-                                       f'Bazı ürünlerde yetersiz stok var: {", ".join(yetersiz_stok_urunler[:5])}')
-                
-                islem_sayisi = 0
-                hata_sayisi = 0
-                
-                for urun_id in urun_ids:
-                    try:
-                        urun_id_int = sanitize_integer(urun_id, min_value=1)
-                        urun = Urun.objects.get(pk=urun_id_int)
-                        
-                        # Çıkış işleminde stok kontrolü
-                        if islem_turu == 'çıkış' and urun.mevcut_stok < miktar:
-                            hata_sayisi += 1
-                            continue
-                        
-                        StokHareketi.objects.create(
-                            urun=urun,
-                            islem_turu=islem_turu,
-                            miktar=miktar,
-                            aciklama=aciklama,
-                            tarih=timezone.now(),
-                            olusturan=request.user
-                        )
-                        islem_sayisi += 1
-                        log_action(request.user, 'create', urun, 
-                                 f'Toplu stok işlemi: {islem_turu} - {miktar} {urun.birim}', request)
-                    except (Urun.DoesNotExist, ValidationError):
-                        hata_sayisi += 1
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Toplu stok işlemi hatası (ürün {urun_id}): {str(e)}")
-                        hata_sayisi += 1
-                        continue
-                
-                if islem_sayisi > 0:
-                    log_action(request.user, 'create', None, 
-                             f'Toplu stok işlemi: {islem_turu} - {islem_sayisi} ürün', request)
-                    messages.success(request, f'{islem_sayisi} ürün için stok {islem_turu} işlemi başarıyla yapıldı.')
-                if hata_sayisi > 0:
-                    messages.warning(request, f'{hata_sayisi} ürün için işlem yapılamadı.')
-                
-                if islem_sayisi == 0:
+                sonuc = toplu_stok_hareketi_olustur(gecerli_idler, islem_turu, miktar, aciklama, request.user)
+                islenen = sonuc['islenen']
+                hata_sayisi = len(urun_ids) - len(islenen)
+
+                if not islenen:
                     raise ValidationError('Hiçbir ürün için işlem yapılamadı.')
-                
-                return redirect('stok:index')
-                
+
+                urun_adlari = ', '.join(urun.ad for urun in islenen[:20])
+                if len(islenen) > 20:
+                    urun_adlari += f' ve {len(islenen) - 20} ürün daha'
+                log_action(request.user, 'create', None,
+                           f'Toplu stok işlemi: {islem_turu} - {miktar} x {len(islenen)} ürün ({urun_adlari})', request)
+
+            if sonuc['yetersiz_stok']:
+                messages.warning(request,
+                                 f'Bazı ürünlerde yetersiz stok var: {", ".join(u.ad for u in sonuc["yetersiz_stok"][:5])}')
+            messages.success(request, f'{len(islenen)} ürün için stok {islem_turu} işlemi başarıyla yapıldı.')
+            if hata_sayisi > 0:
+                messages.warning(request, f'{hata_sayisi} ürün için işlem yapılamadı.')
+            return redirect('stok:index')
+
         except ValidationError as e:
-            messages.error(request, str(e))
-            urunler = Urun.objects.all().order_by('ad')
-            return render(request, 'stok/toplu_stok_islem.html', {'urunler': urunler})
-        except Exception as e:
-            logger.error(f"Toplu stok işlemi hatası: {str(e)}", exc_info=True)
-            raise
-    
-    urunler = Urun.objects.all().order_by('ad')
-    return render(request, 'stok/toplu_stok_islem.html', {'urunler': urunler})
+            messages.error(request, ' '.join(e.messages))
+            return render(request, 'stok/toplu_stok_islem.html')
+
+    # Ürünler sayfada autocomplete ile (stok:urun_ara_api) ihtiyaç oldukça yüklenir
+    return render(request, 'stok/toplu_stok_islem.html')
 
 
 @handle_view_errors(
     error_message="Stok sayımı yapılırken bir hata oluştu.",
     redirect_url="stok:index"
 )
-@database_transaction
 @login_required
 def stok_sayim(request: Any) -> Any:
     """
-    Stok sayımı yapar.
-    
-    Transaction içinde çalışır, hata durumunda rollback yapar.
-    Gerçek stok ile mevcut stok arasındaki farkları düzeltir.
+    Stok sayımı oturumlarını listeler ve yeni oturum başlatır.
+
+    Sayım, okutmaların parça parça yüklendiği bir oturum olarak yürütülür
+    (bkz. stoktakip/services/sayim_service.py). Klasik formdan tek seferde
+    gelen urun_<id>_miktar alanları da bir oturum üzerinden işlenir.
     """
-    from django.core.exceptions import ValidationError
-    
     if request.method == 'POST':
         try:
             sayim_verileri = {}
@@ -505,61 +479,270 @@ def stok_sayim(request: Any) -> Any:
                         sayim_verileri[urun_id] = gercek_miktar
                     except (ValueError, TypeError, ValidationError):
                         continue
-        
+
             if not sayim_verileri:
-                raise ValidationError('Hiçbir ürün için sayım miktarı girilmedi.')
-            
-            # Transaction içinde stok sayımı
-            with transaction.atomic():
-                fark_sayisi = 0
-                islem_sayisi = 0
-                
-                for urun_id, gercek_miktar in sayim_verileri.items():
-                    try:
-                        urun = Urun.objects.get(pk=urun_id)
-                        mevcut_stok = urun.mevcut_stok
-                        fark = gercek_miktar - mevcut_stok
-                        
-                        if fark != 0:
-                            islem_turu = 'giriş' if fark > 0 else 'çıkış'
-                            StokHareketi.objects.create(
-                                urun=urun,
-                                islem_turu=islem_turu,
-                                miktar=abs(fark),
-                                aciklama=sanitize_string(
-                                    f'Stok sayımı - Mevcut: {mevcut_stok}, Gerçek: {gercek_miktar}',
-                                    max_length=500
-                                ),
-                                tarih=timezone.now(),
-                                olusturan=request.user
-                            )
-                            fark_sayisi += 1
-                        islem_sayisi += 1
-                    except Urun.DoesNotExist:
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Stok sayımı hatası (ürün {urun_id}): {str(e)}")
-                        continue
-                
-                if fark_sayisi > 0:
-                    log_action(request.user, 'create', None, 
-                             f'Stok sayımı tamamlandı - {fark_sayisi} fark bulundu', request)
-                    messages.success(request, 
-                                   f'Stok sayımı tamamlandı. {islem_sayisi} ürün sayıldı, {fark_sayisi} üründe fark bulundu ve düzeltildi.')
-                else:
-                    messages.info(request, 
-                                f'Stok sayımı tamamlandı. {islem_sayisi} ürün sayıldı, fark bulunmadı.')
-                
-                return redirect('stok:index')
-                
+                # Yeni oturum başlat
+                ad = sanitize_string(request.POST.get('ad', ''), max_length=200).strip()
+                oturum = sayim_oturumu_baslat(request.user, ad=ad)
+                log_action(request.user, 'create', oturum, f'Sayım oturumu başlatıldı: {oturum.ad}', request)
+                return redirect('stok:sayim_oturumu', pk=oturum.pk)
+
+            sonuc = tek_seferde_sayim(sayim_verileri, request.user)
+            _sayim_sonuc_mesaji(request, sonuc)
+            return redirect('stok:index')
         except ValidationError as e:
-            messages.error(request, str(e))
-            urunler = Urun.objects.all().order_by('ad')
-            return render(request, 'stok/stok_sayim.html', {'urunler': urunler})
-        except Exception as e:
-            logger.error(f"Stok sayımı hatası: {str(e)}", exc_info=True)
-            raise
-    
-    urunler = Urun.objects.all().order_by('ad')
-    return render(request, 'stok/stok_sayim.html', {'urunler': urunler})
+            messages.error(request, ' '.join(e.messages))
+
+    oturumlar = SayimOturumu.objects.select_related('olusturan').order_by('-olusturma_tarihi')[:50]
+    return render(request, 'stok/stok_sayim.html', {'oturumlar': oturumlar})
+
+
+def _sayim_sonuc_mesaji(request: Any, sonuc: dict) -> None:
+    oturum = sonuc['oturum']
+    if sonuc['fark_sayisi'] > 0:
+        log_action(request.user, 'update', oturum,
+                   f'Stok sayımı tamamlandı - {sonuc["fark_sayisi"]} fark bulundu', request)
+        messages.success(request,
+                         f'Stok sayımı tamamlandı. {sonuc["sayilan"]} ürün sayıldı, '
+                         f'{sonuc["fark_sayisi"]} üründe fark bulundu ve düzeltildi.')
+    else:
+        log_action(request.user, 'update', oturum, 'Stok sayımı tamamlandı - fark yok', request)
+        messages.info(request, f'Stok sayımı tamamlandı. {sonuc["sayilan"]} ürün sayıldı, fark bulunmadı.')
+
+
+@handle_view_errors(
+    error_message="Sayım oturumu yüklenirken bir hata oluştu.",
+    redirect_url="stok:sayim"
+)
+@login_required
+def sayim_oturumu(request: Any, pk: int) -> Any:
+    """
+    Sayım oturumu okutma ekranı.
+
+    Okutmalar tarayıcıda kuyruğa alınır (localStorage) ve partiler halinde
+    sayim_parti_api'ye gönderilir; bağlantı yokken de okutmaya devam edilebilir.
+    """
+    oturum = get_object_or_404(SayimOturumu, pk=pk)
+    return render(request, 'stok/sayim_oturumu.html', {
+        'oturum': oturum,
+        'parti_limit': SAYIM_PARTI_LIMIT,
+    })
+
+
+@handle_api_errors(error_message="Sayım oturumu okunamadı", status_code=400)
+@login_required
+def sayim_oturumu_api(request: Any, pk: int) -> JsonResponse:
+    """
+    Sayım oturumunun durumunu ve sayılan ürünlerini sayfa sayfa döndürür.
+
+    Query params:
+        sayfa: Sayfa numarası (varsayılan 1)
+    """
+    oturum = SayimOturumu.objects.filter(pk=pk).first()
+    if oturum is None:
+        return JsonResponse({'success': False, 'error': 'Sayım oturumu bulunamadı'}, status=404)
+    try:
+        sayfa = sanitize_integer(request.GET.get('sayfa', 1), min_value=1)
+    except ValidationError:
+        sayfa = 1
+
+    return JsonResponse({
+        'success': True,
+        'oturum': {
+            'id': oturum.pk,
+            'ad': oturum.ad,
+            'durum': oturum.durum,
+            'satir_sayisi': oturum.satirlar.count(),
+            'parti_sayisi': oturum.partiler.count(),
+        },
+        **sayim_satirlari(oturum, sayfa=sayfa),
+    })
+
+
+@handle_api_errors(error_message="Sayım partisi işlenemedi", status_code=400)
+@login_required
+def sayim_parti_api(request: Any, pk: int) -> JsonResponse:
+    """
+    Bir okutma partisini sayım oturumuna işler (idempotent).
+
+    POST (JSON): {"parti_no": "<uuid>", "okutmalar": [{"barkod": "869...", "miktar": 1},
+                  {"urun_id": 5, "miktar": 12, "mod": "ayarla"}]}
+    Aynı parti_no ikinci kez gönderilirse tekrar işlenmez.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Yalnızca POST desteklenir.'}, status=405)
+    try:
+        try:
+            govde = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError("Geçersiz JSON.")
+        sonuc = sayim_partisi_isle(pk, str(govde.get('parti_no') or ''), govde.get('okutmalar'), request.user)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': ' '.join(e.messages)}, status=400)
+
+    return JsonResponse({'success': True, **sonuc})
+
+
+@handle_view_errors(
+    error_message="Stok sayımı tamamlanırken bir hata oluştu.",
+    redirect_url="stok:sayim"
+)
+@login_required
+def sayim_tamamla(request: Any, pk: int) -> Any:
+    """Sayım oturumunu tamamlar ve fark bulunan ürünler için stok hareketi oluşturur."""
+    if request.method != 'POST':
+        return redirect('stok:sayim_oturumu', pk=pk)
+    try:
+        sonuc = sayim_mutabakat(pk, request.user)
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
+        return redirect('stok:sayim_oturumu', pk=pk)
+
+    _sayim_sonuc_mesaji(request, sonuc)
+    return redirect('stok:sayim')
+
+
+@handle_view_errors(
+    error_message="Sayım oturumu iptal edilirken bir hata oluştu.",
+    redirect_url="stok:sayim"
+)
+@login_required
+def sayim_iptal(request: Any, pk: int) -> Any:
+    """Açık sayım oturumunu stok hareketi oluşturmadan iptal eder."""
+    if request.method == 'POST':
+        try:
+            oturum = sayim_oturumu_iptal(pk)
+            log_action(request.user, 'update', oturum, f'Sayım oturumu iptal edildi: {oturum.ad}', request)
+            messages.info(request, 'Sayım oturumu iptal edildi.')
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+    return redirect('stok:sayim')
+
+
+@handle_api_errors(error_message="Ürün araması yapılamadı", status_code=400)
+@login_required
+def urun_ara_api(request: Any) -> JsonResponse:
+    """
+    Ürün seçiciler için sayfalı autocomplete sonuçlarını JSON formatında döndürür.
+
+    Query params:
+        q: Arama metni (boşsa ürünler ad sırasıyla listelenir)
+        sayfa: Sayfa numarası (varsayılan 1)
+        limit: Sayfa başına kayıt (1-50, varsayılan 20)
+    """
+    try:
+        sorgu = sanitize_search_query(request.GET.get('q', ''), max_length=100)
+        sayfa = sanitize_integer(request.GET.get('sayfa', 1), min_value=1, max_value=1000)
+        limit = sanitize_integer(request.GET.get('limit', 20), min_value=1, max_value=50)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': ' '.join(e.messages)}, status=400)
+
+    return JsonResponse({'success': True, **urun_autocomplete(sorgu, sayfa, limit)})
+
+
+@handle_api_errors(error_message="Barkod okunamadı", status_code=400)
+@login_required
+def barkod_tara_api(request: Any, barkod: str) -> JsonResponse:
+    """
+    Okutulan barkodu ürün, fiyat ve stok bilgisine çözer.
+
+    Süreç içi barkod indeksini kullanır (paylaşımlı cache ile); ürün değişmediyse veritabanına gidilmez.
+    """
+    urun = barkod_coz(sanitize_string(barkod, max_length=100))
+    if urun is None:
+        return JsonResponse({'success': False, 'error': 'Barkod bulunamadı'}, status=404)
+
+    return JsonResponse({
+        'success': True,
+        'urun': {alan: deger for alan, deger in urun.items() if alan != 'versiyon'},
+    })
+
+
+def _fiyat_kurali(form: FiyatGuncellemeForm) -> FiyatKurali:
+    veri = form.cleaned_data
+    return FiyatKurali(
+        alan=veri['alan'],
+        islem=veri['islem'],
+        deger=veri['deger'],
+        kategori_id=veri['kategori'].pk if veri['kategori'] else None,
+        min_fiyat=veri['min_fiyat'],
+        max_fiyat=veri['max_fiyat'],
+        tedarikci_id=veri['tedarikci'].pk if veri['tedarikci'] else None,
+        yuvarlama=Decimal(veri['yuvarlama']),
+    )
+
+
+@handle_view_errors(
+    error_message="Toplu fiyat güncellemesi yapılırken bir hata oluştu.",
+    redirect_url="stok:toplu_fiyat_guncelleme"
+)
+@login_required
+def toplu_fiyat_guncelleme(request: Any) -> Any:
+    """
+    Kategori, fiyat aralığı veya tedarikçiye göre toplu fiyat güncelleme.
+
+    POST 'onizle': etkilenecek ürünler ve yeni fiyatlar (veritabanına yazılmaz).
+    POST 'uygula': fiyat geçmişi yazılır, ürünler tek UPDATE ile güncellenir.
+    """
+    onizleme = None
+    if request.method == 'POST':
+        form = FiyatGuncellemeForm(request.POST)
+        if form.is_valid():
+            kural = _fiyat_kurali(form)
+            if request.POST.get('islem_turu') == 'uygula':
+                islem = toplu_fiyat_guncelle(kural, request.user)
+                log_action(request.user, 'update', islem,
+                           f'Toplu fiyat güncelleme: {islem.aciklama} - {islem.etkilenen_urun_sayisi} ürün', request)
+                messages.success(request, f'{islem.etkilenen_urun_sayisi} ürünün fiyatı güncellendi.')
+                return redirect('stok:toplu_fiyat_guncelleme')
+            onizleme = fiyat_guncelleme_onizleme(kural)
+            onizleme['ozet'] = kural.ozet()
+        else:
+            messages.error(request, 'Lütfen form hatalarını düzeltin.')
+    else:
+        form = FiyatGuncellemeForm()
+
+    return render(request, 'stok/toplu_fiyat_guncelleme.html', {
+        'form': form,
+        'onizleme': onizleme,
+        'son_islemler': FiyatGuncellemeIslemi.objects.select_related('olusturan')[:10],
+    })
+
+
+@handle_api_errors(error_message="Fiyat geçmişi alınamadı", status_code=400)
+@login_required
+def urun_fiyat_gecmisi_api(request: Any, pk: int) -> JsonResponse:
+    """
+    Ürünün verilen tarihteki fiyatını ve son fiyat değişikliklerini döndürür.
+
+    GET: ?tarih=YYYY-MM-DD (gün sonu itibarıyla; boşsa bugün)
+    """
+    from datetime import datetime, time
+
+    urun = Urun.objects.filter(pk=pk).only('id', 'ad', 'fiyat', 'alis_fiyati').first()
+    if urun is None:
+        return JsonResponse({'success': False, 'error': 'Ürün bulunamadı'}, status=404)
+
+    tarih_metni = request.GET.get('tarih', '').strip()
+    try:
+        gun = datetime.strptime(tarih_metni, '%Y-%m-%d').date() if tarih_metni else timezone.localdate()
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Tarih YYYY-AA-GG biçiminde olmalıdır.'}, status=400)
+
+    tarihteki = urun_fiyatlari_tarihte([urun.pk], timezone.make_aware(datetime.combine(gun, time.max))).get(urun.pk)
+    gecmis = UrunFiyatGecmisi.objects.filter(urun=urun).values('fiyat', 'alis_fiyati', 'tarih')[:20]
+    return JsonResponse({
+        'success': True,
+        'urun': {'id': urun.id, 'ad': urun.ad, 'fiyat': str(urun.fiyat), 'alis_fiyati': str(urun.alis_fiyati)},
+        'tarih': gun.isoformat(),
+        'tarihteki_fiyat': {
+            'fiyat': str(tarihteki['fiyat']),
+            'alis_fiyati': str(tarihteki['alis_fiyati']),
+            'gecerlilik_baslangici': tarihteki['tarih'].isoformat(),
+        } if tarihteki else None,
+        'gecmis': [
+            {'fiyat': str(satir['fiyat']), 'alis_fiyati': str(satir['alis_fiyati']), 'tarih': satir['tarih'].isoformat()}
+            for satir in gecmis
+        ],
+    })
 
@@ -4,8 +4,26 @@ View-level caching, query result caching için decorator'lar ve helper'lar.
 """
 from functools import wraps
 from typing import Callable, Any, Optional
+from django.conf import settings
 from django.core.cache import cache
 
+# Her süreçte ayrı tutulan cache backend'leri; birinde artırılan versiyon damgasını diğer worker'lar görmez
+SUREC_ICI_CACHE_BACKENDLERI = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def paylasimli_cache_mi(alias: str = 'default') -> bool:
+    """
+    Cache tüm worker süreçlerince paylaşılıyor mu (ör. Redis)?
+
+    Versiyon damgasıyla geçersiz kılınan süreç içi veya uzun ömürlü cache
+    kayıtları yalnızca paylaşımlı cache ile güvenlidir.
+    """
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    return backend not in SUREC_ICI_CACHE_BACKENDLERI
+
 
 def cache_view_result(timeout: int = 300, key_prefix: Optional[str] = None):
     """
@@ -0,0 +1,264 @@
+"""
+Model kaydı yardımcıları.
+
+Benzersizlik (unique) ve değer kontrolleri (tutar > 0, miktar > 0 vb.)
+veritabanı kısıtlarıyla sağlanır. save() sırasında bu kontroller için ek
+sorgu yapılmaz:
+
+- full_clean() yerine hizli_dogrula() kullanılır: alan ve clean() kuralları
+  bellekte çalışır; benzersizlik, model kısıtları ve dolu foreign key'ler
+  için sorgu atılmaz.
+- Kısıt ihlalinde oluşan IntegrityError, modelin kisit_mesajlari ile aynı
+  kullanıcı mesajlarını taşıyan ValidationError'a çevrilir. Tekil save()
+  savepoint açmaz; açık transaction geri alınacak olarak işaretlenir ve
+  hata transaction.atomic() bloğunun dışında yakalanmalıdır.
+- Önceden doğrulanmış toplu işlemler dogrulanmis_kayit() içinde save()
+  çağırarak doğrulamayı tamamen atlayabilir veya
+  dogrulanmis_toplu_olustur() ile bulk_create kullanabilir. Bu yollarda
+  benzersiz alanlı modeller savepoint içinde kaydedilir; çakışan satır
+  yakalanıp işleme devam edilebilir.
+
+DegisiklikIzlemeMixin, izlenen alanların yükleme anındaki değerlerini saklar;
+save()/delete() sonrası yalnızca değişen alanlar audit tablosuna yazılır
+(bkz. accounts.utils.alan_degisikligi_kaydet).
+"""
+import re
+from contextlib import contextmanager
+from decimal import Decimal
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import DecimalField
+
+_dogrulamayi_atla: ContextVar[bool] = ContextVar('dogrulamayi_atla', default=False)
+
+GENEL_KISIT_MESAJI = 'Kayıt veritabanı kısıtlarına uymuyor.'
+
+
+@contextmanager
+def dogrulanmis_kayit() -> Iterator[None]:
+    """
+    Blok içindeki save() çağrılarında model doğrulamasını atlar.
+
+    Yalnızca satırları önceden doğrulanmış toplu işlemler için kullanılmalıdır;
+    veritabanı kısıtları ve IntegrityError çevirisi geçerliliğini korur.
+    """
+    token = _dogrulamayi_atla.set(True)
+    try:
+        yield
+    finally:
+        _dogrulamayi_atla.reset(token)
+
+
+def _kisit_adi(hata: IntegrityError) -> str:
+    """IntegrityError'dan ihlal edilen kısıtın adını çıkarır (PostgreSQL / SQLite)."""
+    diag = getattr(hata.__cause__, 'diag', None)
+    ad = getattr(diag, 'constraint_name', None)
+    if ad:
+        return ad
+    metin = str(hata)
+    eslesme = re.search(r'constraint failed: ([\w.]+)', metin) or re.search(r'constraint "([^"]+)"', metin)
+    return eslesme.group(1) if eslesme else ''
+
+
+def integrity_hatasini_cevir(model, hata: IntegrityError) -> ValidationError:
+    """
+    IntegrityError'u modelin kisit_mesajlari ile ValidationError'a çevirir.
+
+    kisit_mesajlari anahtarları model kısıtı (CheckConstraint/UniqueConstraint)
+    adı veya unique=True olan alan adıdır; değerler (alan, mesaj) çiftidir.
+    """
+    ad = _kisit_adi(hata)
+    mesajlar = getattr(model, 'kisit_mesajlari', {})
+    if ad in mesajlar:
+        alan, mesaj = mesajlar[ad]
+        return ValidationError({alan: mesaj})
+
+    tablo = model._meta.db_table
+    for anahtar, (alan, mesaj) in mesajlar.items():
+        try:
+            kolon = model._meta.get_field(anahtar).column
+        except Exception:
+            continue
+        # PostgreSQL: <tablo>_<kolon>_key / <tablo>_<kolon>_<hash>_uniq, SQLite: <tablo>.<kolon>
+        if ad == f'{tablo}.{kolon}' or ad.startswith(f'{tablo}_{kolon}_'):
+            return ValidationError({alan: mesaj})
+    return ValidationError(GENEL_KISIT_MESAJI)
+
+
+class KisitliKayitMixin:
+    """
+    Kısıt kontrollerini veritabanına bırakan model kaydı.
+
+    Model save() içinde full_clean() yerine hizli_dogrula() çağırır ve
+    kisit_mesajlari ile kısıt/alan adlarını kullanıcı mesajlarına eşler.
+
+    Tekil kayıtta savepoint açılmaz (her save() için SAVEPOINT/RELEASE
+    gidiş-dönüşü olmaz); kısıt hatası açık transaction'ı geri alınacak olarak
+    işaretler. Savepoint yalnızca dogrulanmis_kayit() bloğundaki toplu
+    kayıtlarda açılır.
+    """
+    kisit_mesajlari: dict[str, tuple[str, str]] = {}
+
+    def hizli_dogrula(self) -> None:
+        """
+        Sorgu atmadan model doğrulaması (alanlar + clean()).
+
+        Raises:
+            ValidationError: Alan veya clean() kuralları ihlal edilirse
+        """
+        if _dogrulamayi_atla.get():
+            return
+        # Dolu foreign key'lerin varlığı veritabanı kısıtıyla doğrulanır
+        exclude = [
+            field.name for field in self._meta.concrete_fields
+            if field.is_relation and getattr(self, field.attname) is not None
+        ]
+        self.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+
+    @classmethod
+    def _benzersiz_kisit_var(cls) -> bool:
+        meta = cls._meta
+        return any(field.unique and not field.primary_key for field in meta.concrete_fields) or bool(
+            meta.unique_together or meta.total_unique_constraints
+        )
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            if _dogrulamayi_atla.get() and self._benzersiz_kisit_var() and connections[using].in_atomic_block:
+                # Toplu işlemde çakışan satır transaction'ı bozmasın; çağıran satırı atlayıp devam edebilir
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+            else:
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            raise integrity_hatasini_cevir(type(self), e) from e
+
+
+def dogrulanmis_toplu_olustur(model, nesneler: Iterable, batch_size: Optional[int] = 1000) -> list:
+    """
+    Nesneleri sorgu atmadan doğrular ve bulk_create ile ekler.
+
+    Args:
+        model: KisitliKayitMixin kullanan model sınıfı
+        nesneler: Kaydedilmemiş model nesneleri
+        batch_size: bulk_create batch büyüklüğü
+
+    Returns:
+        Oluşturulan nesneler
+
+    Raises:
+        ValidationError: Bir nesne doğrulanamazsa (satır numarasıyla) veya kısıt ihlal edilirse
+    """
+    nesneler = list(nesneler)
+    hatalar = []
+    for sira, nesne in enumerate(nesneler, start=1):
+        try:
+            nesne.hizli_dogrula()
+        except ValidationError as e:
+            hatalar.append(f"{sira}. kayıt: {'; '.join(e.messages)}")
+    if hatalar:
+        raise ValidationError(hatalar)
+
+    try:
+        with transaction.atomic(using=router.db_for_write(model)):
+            return model.objects.bulk_create(nesneler, batch_size=batch_size)
+    except IntegrityError as e:
+        raise integrity_hatasini_cevir(model, e) from e
+
+
+class DegisiklikIzlemeMixin:
+    """
+    Alan bazlı değişiklik kaydı.
+
+    izlenen_alanlar'ın değerleri nesne veritabanından yüklenirken (from_db)
+    saklanır; ertelenmiş (defer/only) alanlar görüntüye girmez ve karşılaştırılmaz.
+    save() sonrası görüntü ile yeni değerler karşılaştırılır, yalnızca değişen
+    alanlar {alan: [eski, yeni]} olarak kaydedilir. Eski değerler için ek
+    SELECT yapılmaz. bulk_create/update() ile yapılan toplu işlemler kapsam dışıdır.
+    """
+    izlenen_alanlar: tuple[str, ...] = ()
+
+    @classmethod
+    def _izlenen_kolonlar(cls) -> list[tuple[str, str, Optional[Decimal]]]:
+        kolonlar = cls.__dict__.get('_izlenen_kolon_onbellegi')
+        if kolonlar is None:
+            kolonlar = []
+            for ad in cls.izlenen_alanlar:
+                alan = cls._meta.get_field(ad)
+                # Ondalık alanlar alan hassasiyetine yuvarlanır (10 ile 10.00 aynı değer)
+                adim = Decimal(1).scaleb(-alan.decimal_places) if isinstance(alan, DecimalField) else None
+                kolonlar.append((ad, alan.attname, adim))
+            cls._izlenen_kolon_onbellegi = kolonlar
+        return kolonlar
+
+    def _izlenen_degerler(self, alanlar: Optional[set] = None) -> dict:
+        degerler = {}
+        veriler = self.__dict__
+        for ad, attname, adim in self._izlenen_kolonlar():
+            if attname not in veriler or (alanlar is not None and ad not in alanlar and attname not in alanlar):
+                continue
+            deger = veriler[attname]
+            if hasattr(deger, 'resolve_expression'):
+                # F() ile güncellenen alanın yeni değeri bilinmiyor
+                continue
+            if adim is not None and deger is not None:
+                try:
+                    deger = Decimal(str(deger)).quantize(adim)
+                except ArithmeticError:
+                    pass
+            degerler[ad] = deger
+        return degerler
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._ilk_degerler = instance._izlenen_degerler()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        ilk = self.__dict__.get('_ilk_degerler')
+        if fields is None or ilk is None:
+            self._ilk_degerler = self._izlenen_degerler()
+        else:
+            # Ertelenmiş alan yüklemesi: yalnızca yeni okunan alanlar görüntüye eklenir,
+            # bellekte değiştirilmiş diğer alanların eski değeri korunur
+            ilk.update(self._izlenen_degerler(set(fields)))
+
+    def degisen_alanlar(self) -> dict:
+        """Yüklendikten sonra değişen izlenen alanlar: {alan: [eski, yeni]}."""
+        ilk = self.__dict__.get('_ilk_degerler') or {}
+        return {
+            ad: [ilk[ad], deger] for ad, deger in self._izlenen_degerler().items()
+            if ad in ilk and ilk[ad] != deger
+        }
+
+    def save(self, *args, **kwargs):
+        ekleme = self._state.adding
+        super().save(*args, **kwargs)
+        yeni = self._izlenen_degerler()
+        if ekleme:
+            islem = 'create'
+            degisiklikler = {ad: [None, deger] for ad, deger in yeni.items() if deger not in (None, '')}
+        else:
+            islem = 'update'
+            degisiklikler = self.degisen_alanlar()
+        if degisiklikler:
+            from accounts.utils import alan_degisikligi_kaydet
+            alan_degisikligi_kaydet(self, islem, degisiklikler)
+        # Aynı nesnenin sonraki save() çağrıları bu değerlere göre karşılaştırılır
+        self._ilk_degerler = yeni
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        eski = self.__dict__.get('_ilk_degerler') or self._izlenen_degerler()
+        sonuc = super().delete(*args, **kwargs)
+        degisiklikler = {ad: [deger, None] for ad, deger in eski.items() if deger not in (None, '')}
+        if degisiklikler:
+            from accounts.utils import alan_degisikligi_kaydet
+            alan_degisikligi_kaydet(self, 'delete', degisiklikler, object_id=pk)
+        return sonuc
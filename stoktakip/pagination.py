@@ -0,0 +1,231 @@
+"""
+Keyset (imleç) tabanlı sayfalama.
+
+Django Paginator her sayfada filtrelenmiş kümenin tamamı için COUNT(*) çalıştırır
+ve derin sayfalarda OFFSET ile atlanan satırları yine tarar. Büyük hareket
+listelerinde bunun yerine:
+
+- Sayfa, bir önceki sayfanın son satırının sıralama değerlerinden sonra gelen
+  satırlar olarak okunur (WHERE (tarih, id) < (...) ORDER BY ... LIMIT n+1).
+  Her sayfa indeks üzerinde sabit maliyetlidir.
+- İmleç (sıralama değerleri + yön + sayfa no) imzalanarak URL'de taşınır.
+- Toplam kayıt sayısı kesin gerekmediğinde PostgreSQL planlayıcı tahmininden
+  okunur; diğer veritabanlarında sınırlı (LIMIT'li) sayım yapılır. Sonuç kısa
+  süre cache'lenir, sayfa geçişlerinde tekrar hesaplanmaz.
+"""
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Sequence
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+IMLEC_PARAMETRESI = 'imlec'
+_IMZA_TUZU = 'stoktakip.keyset'
+SAYIM_CACHE_SURESI = 60
+
+
+def _sayim_cache_anahtari(queryset: QuerySet, kesin_esik: int) -> Optional[str]:
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except Exception:
+        return None
+    ozet = hashlib.md5(f'{sql}|{params}'.encode(), usedforsecurity=False).hexdigest()
+    return f'keyset_sayim:{queryset.db}:{kesin_esik}:{ozet}'
+
+
+def _planlayici_tahmini(queryset: QuerySet) -> Optional[int]:
+    """PostgreSQL EXPLAIN çıktısından tahmini satır sayısı."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def tahmini_sayim(queryset: QuerySet, kesin_esik: int = 10000) -> tuple[int, bool]:
+    """
+    Kümenin kayıt sayısını döndürür; büyük kümelerde tam sayım yapmaz.
+
+    PostgreSQL'de planlayıcı tahmini kesin_esik altındaysa gerçek COUNT
+    yapılır (küçük kümede ucuzdur), üstündeyse tahmin döner. Diğer
+    veritabanlarında en fazla kesin_esik + 1 satır sayılır.
+
+    Args:
+        queryset: Filtrelenmiş queryset
+        kesin_esik: Bu sayıya kadar kesin sayım yapılır
+
+    Returns:
+        (sayı, kesin_mi)
+    """
+    anahtar = _sayim_cache_anahtari(queryset, kesin_esik)
+    if anahtar:
+        onceki = cache.get(anahtar)
+        if onceki is not None:
+            return tuple(onceki)
+
+    tahmin = _planlayici_tahmini(queryset)
+    if tahmin is not None and tahmin >= kesin_esik:
+        sonuc = (tahmin, False)
+    elif tahmin is not None:
+        sonuc = (queryset.order_by().count(), True)
+    else:
+        sayi = queryset.order_by()[:kesin_esik + 1].count()
+        sonuc = (kesin_esik, False) if sayi > kesin_esik else (sayi, True)
+
+    if anahtar:
+        cache.set(anahtar, sonuc, SAYIM_CACHE_SURESI)
+    return sonuc
+
+
+def _deger_yaz(deger):
+    if isinstance(deger, (datetime, date)):
+        return deger.isoformat()
+    if isinstance(deger, Decimal):
+        return str(deger)
+    return deger
+
+
+class KeysetPage:
+    """Keyset sayfası; Django Page ile aynı sorgulama arayüzünü (has_next vb.) sunar."""
+
+    def __init__(self, object_list: list, number: int, onceki_imlec: Optional[str], sonraki_imlec: Optional[str],
+                 paginator: 'KeysetPaginator'):
+        self.object_list = object_list
+        self.number = number
+        self.onceki_imlec = onceki_imlec
+        self.sonraki_imlec = sonraki_imlec
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.sonraki_imlec is not None
+
+    def has_previous(self) -> bool:
+        return self.onceki_imlec is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    @property
+    def toplam(self) -> int:
+        return self.paginator.toplam[0]
+
+    @property
+    def toplam_kesin(self) -> bool:
+        return self.paginator.toplam[1]
+
+
+class KeysetPaginator:
+    """
+    Sıralama sütunlarının değerleriyle sayfalayan paginator.
+
+    Sıralama alanları modelin kendi (ilişkisiz) alanları olmalıdır; sıralamanın
+    tekil olması için sonuna birincil anahtar eklenir. Kullanım:
+
+        paginator = KeysetPaginator(hareketler, 50, siralama=('-tarih', '-id'))
+        sayfa = paginator.get_page(request.GET.get('imlec'))
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, siralama: Sequence[str] = ('-id',),
+                 toplam: Optional[int] = None, kesin_esik: int = 10000):
+        pk_adi = queryset.model._meta.pk.name
+        siralama = list(siralama)
+        if not any(alan.lstrip('-') in (pk_adi, 'pk') for alan in siralama):
+            siralama.append(f'-{pk_adi}' if siralama and siralama[-1].startswith('-') else pk_adi)
+        self.siralama = []
+        for alan in siralama:
+            ad = alan.lstrip('-')
+            self.siralama.append((pk_adi if ad == 'pk' else ad, alan.startswith('-')))
+        self.queryset = queryset
+        self.per_page = per_page
+        self.kesin_esik = kesin_esik
+        self._toplam = (toplam, True) if toplam is not None else None
+
+    @property
+    def toplam(self) -> tuple[int, bool]:
+        """(kayıt sayısı, kesin_mi); ilk erişimde hesaplanır."""
+        if self._toplam is None:
+            self._toplam = tahmini_sayim(self.queryset, self.kesin_esik)
+        return self._toplam
+
+    def _imlec_olustur(self, nesne, yon: str, sayfa: int) -> str:
+        degerler = [_deger_yaz(getattr(nesne, alan)) for alan, _ in self.siralama]
+        return signing.dumps({'y': yon, 'd': degerler, 's': sayfa}, salt=_IMZA_TUZU, compress=True)
+
+    def _imlec_coz(self, imlec: Optional[str]) -> Optional[tuple[str, list, int]]:
+        if not imlec:
+            return None
+        try:
+            veri = signing.loads(imlec, salt=_IMZA_TUZU)
+            if veri['y'] not in ('n', 'p') or len(veri['d']) != len(self.siralama):
+                return None
+            meta = self.queryset.model._meta
+            degerler = [meta.get_field(alan).to_python(deger) for (alan, _), deger in zip(self.siralama, veri['d'])]
+            return veri['y'], degerler, max(int(veri['s']), 1)
+        except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+            # Bozuk veya eski imleç ilk sayfaya döner
+            return None
+
+    def _sonrasi_kosulu(self, degerler: list, geri: bool) -> Q:
+        """(a, b, c) > (x, y, z) karşılaştırmasının sütun yönlerine göre Q karşılığı."""
+        kosul = Q()
+        esitlik = {}
+        for (alan, azalan), deger in zip(self.siralama, degerler):
+            kucuk = azalan != geri
+            kosul |= Q(**esitlik, **{f'{alan}__{"lt" if kucuk else "gt"}': deger})
+            esitlik[alan] = deger
+        # İlk sütun için ek aralık koşulu, indeks aralık taramasının kullanılmasını sağlar
+        ilk_alan, ilk_azalan = self.siralama[0]
+        return Q(**{f'{ilk_alan}__{"lte" if ilk_azalan != geri else "gte"}': degerler[0]}) & kosul
+
+    def _order_by(self, geri: bool) -> list[str]:
+        return [f'-{alan}' if azalan != geri else alan for alan, azalan in self.siralama]
+
+    def get_page(self, imlec: Optional[str] = None) -> KeysetPage:
+        """
+        İmlecin gösterdiği sayfayı döndürür; imleç yoksa veya geçersizse ilk sayfa.
+        """
+        cozulmus = self._imlec_coz(imlec)
+        if cozulmus is None:
+            yon, sayfa = 'n', 1
+            satirlar = list(self.queryset.order_by(*self._order_by(False))[:self.per_page + 1])
+        else:
+            yon, degerler, sayfa = cozulmus
+            geri = yon == 'p'
+            satirlar = list(
+                self.queryset.filter(self._sonrasi_kosulu(degerler, geri)).order_by(*self._order_by(geri))[:self.per_page + 1]
+            )
+
+        fazla = len(satirlar) > self.per_page
+        satirlar = satirlar[:self.per_page]
+        if yon == 'p':
+            satirlar.reverse()
+            onceki_var, sonraki_var = fazla, True
+        else:
+            onceki_var, sonraki_var = cozulmus is not None, fazla
+
+        if yon == 'p' and not fazla and sayfa > 1:
+            # Geri gelirken başa ulaşıldı
+            sayfa = 1
+        onceki = self._imlec_olustur(satirlar[0], 'p', sayfa - 1) if satirlar and onceki_var else None
+        sonraki = self._imlec_olustur(satirlar[-1], 'n', sayfa + 1) if satirlar and sonraki_var else None
+        return KeysetPage(satirlar, sayfa, onceki, sonraki, self)
@@ -0,0 +1,322 @@
+"""
+İstek bazlı performans ölçümü.
+
+PerformansOlcumMiddleware (accounts/middleware.py) her istek için bir
+IstekOlcumu açar:
+
+- Veritabanı sorguları connection.execute_wrapper ile sarılır; sorgu sayısı,
+  toplam DB süresi ve sorgu kalıpları (parametreler ve IN listeleri
+  ayıklanmış SQL) toplanır. Aynı kalıp PERFORMANS_N1_ESIGI kez veya daha
+  fazla çalıştıysa N+1 adayı sayılır.
+- Cache get / get_many çağrıları isabet / ıskalama olarak sayılır.
+- İstek bitince sonuçlar view adına göre süreç içi toplamlara eklenir;
+  toplamlar /metrics (Prometheus metin formatı) ve personel ekranından
+  okunur. Birden çok worker çalışıyorsa her süreç kendi değerlerini sunar,
+  Prometheus bunları instance etiketiyle ayırır.
+- YAVAS_SORGU_ESIGI_MS süresini aşan sorgular, çağıran proje fonksiyonuyla
+  birlikte ayrıca tutulur; istek sonunda yavaş sorgu kaydına yazılır (bkz.
+  accounts/services/yavas_sorgu_service.py).
+- View'ın sorgu bütçesi (PERFORMANS_SORGU_BUTCELERI, yoksa
+  PERFORMANS_VARSAYILAN_SORGU_BUTCESI) aşılırsa uyarı loglanır.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('stoktakip.performans')
+
+SURE_ARALIKLARI = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SON_N1_SAYISI = 50
+
+_aktif_olcum: ContextVar[Optional['IstekOlcumu']] = ContextVar('stoktakip_aktif_olcum', default=None)
+
+_SAYI_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_METIN_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_RE = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_BOSLUK_RE = re.compile(r"\s+")
+
+
+def sorgu_kalibi(sql: str) -> str:
+    """SQL'in parametre ve sabitlerden arındırılmış kalıbı; aynı sorgu şekli aynı kalıbı verir."""
+    kalip = _METIN_RE.sub('?', sql)
+    kalip = _SAYI_RE.sub('?', kalip)
+    kalip = kalip.replace('%s', '?')
+    kalip = _IN_RE.sub('IN (...)', kalip)
+    return _BOSLUK_RE.sub(' ', kalip).strip()
+
+
+_ATLANAN_DOSYALAR = (os.path.abspath(__file__),)
+
+
+def _cagiran() -> str:
+    """Sorguyu tetikleyen en içteki proje fonksiyonu (modul.fonksiyon:satır); Django ve kütüphaneler atlanır."""
+    kok = str(settings.BASE_DIR)
+    cerceve = sys._getframe(2)
+    while cerceve is not None:
+        dosya = cerceve.f_code.co_filename
+        if dosya.startswith(kok) and 'site-packages' not in dosya and dosya not in _ATLANAN_DOSYALAR:
+            return f"{cerceve.f_globals.get('__name__', '?')}.{cerceve.f_code.co_name}:{cerceve.f_lineno}"
+        cerceve = cerceve.f_back
+    return ''
+
+
+@dataclass
+class YavasSorguKaydi:
+    sql: str
+    params: object
+    coklu: bool
+    sure: float
+    cagiran: str
+    baglanti: str
+
+
+class IstekOlcumu:
+    """Tek isteğin ölçümleri."""
+
+    def __init__(self):
+        self.baslangic = time.perf_counter()
+        self.sure = 0.0
+        self.db_suresi = 0.0
+        self.sorgu_sayisi = 0
+        self.cache_isabet = 0
+        self.cache_iskalama = 0
+        self.kaliplar: Counter = Counter()
+        self.yavas_sorgular: list[YavasSorguKaydi] = []
+        esik_ms = getattr(settings, 'YAVAS_SORGU_ESIGI_MS', None)
+        self.yavas_esik = esik_ms / 1000 if esik_ms else None
+
+    def sorgu_sarmalayici(self, execute, sql, params, many, context):
+        baslangic = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            sure = time.perf_counter() - baslangic
+            self.db_suresi += sure
+            self.sorgu_sayisi += 1
+            self.kaliplar[sql] += 1
+            if self.yavas_esik is not None and sure >= self.yavas_esik:
+                self.yavas_sorgular.append(
+                    YavasSorguKaydi(sql, params, many, sure, _cagiran(), context['connection'].alias)
+                )
+
+    def n1_adaylari(self, esik: int) -> list[tuple[str, int]]:
+        """Eşik kadar veya daha çok tekrarlanan sorgu kalıpları (çok tekrarlanan önce)."""
+        kaliplar: Counter = Counter()
+        for sql, adet in self.kaliplar.items():
+            kaliplar[sorgu_kalibi(sql)] += adet
+        return [(kalip, adet) for kalip, adet in kaliplar.most_common() if adet >= esik]
+
+
+def aktif_olcum() -> Optional[IstekOlcumu]:
+    return _aktif_olcum.get()
+
+
+# Cache isabet / ıskalama sayımı -------------------------------------------
+
+_YOK = object()
+
+
+def _cache_olcumu_kur(cache_nesnesi) -> None:
+    """Cache nesnesinin get / get_many metotlarını aktif ölçüme sayacak şekilde sarar (bir kez)."""
+    if getattr(cache_nesnesi, '_olcum_kurulu', False):
+        return
+    asil_get = cache_nesnesi.get
+    asil_get_many = cache_nesnesi.get_many
+
+    def get(key, default=None, version=None):
+        deger = asil_get(key, _YOK, version=version)
+        olcum = _aktif_olcum.get()
+        if deger is _YOK:
+            if olcum is not None:
+                olcum.cache_iskalama += 1
+            return default
+        if olcum is not None:
+            olcum.cache_isabet += 1
+        return deger
+
+    def get_many(keys, version=None):
+        keys = list(keys)
+        sonuc = asil_get_many(keys, version=version)
+        olcum = _aktif_olcum.get()
+        if olcum is not None:
+            olcum.cache_isabet += len(sonuc)
+            olcum.cache_iskalama += len(keys) - len(sonuc)
+        return sonuc
+
+    cache_nesnesi.get = get
+    cache_nesnesi.get_many = get_many
+    cache_nesnesi._olcum_kurulu = True
+
+
+@contextmanager
+def istek_olcumu() -> Iterator[IstekOlcumu]:
+    """İstek süresince sorguları ve cache erişimlerini ölçer."""
+    from django.core.cache import caches
+
+    olcum = IstekOlcumu()
+    for cache_nesnesi in caches.all():
+        _cache_olcumu_kur(cache_nesnesi)
+    token = _aktif_olcum.set(olcum)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(olcum.sorgu_sarmalayici))
+            yield olcum
+    finally:
+        olcum.sure = time.perf_counter() - olcum.baslangic
+        _aktif_olcum.reset(token)
+
+
+# Süreç içi toplamlar --------------------------------------------------------
+
+class _ViewIstatistigi:
+    __slots__ = ('istek', 'sure', 'db_suresi', 'sorgu', 'cache_isabet', 'cache_iskalama',
+                 'n1', 'butce_asimi', 'en_cok_sorgu', 'sure_dagilimi')
+
+    def __init__(self):
+        self.istek = 0
+        self.sure = 0.0
+        self.db_suresi = 0.0
+        self.sorgu = 0
+        self.cache_isabet = 0
+        self.cache_iskalama = 0
+        self.n1 = 0
+        self.butce_asimi = 0
+        self.en_cok_sorgu = 0
+        self.sure_dagilimi = [0] * len(SURE_ARALIKLARI)
+
+
+_kilit = threading.Lock()
+_istatistikler: dict[tuple[str, str], _ViewIstatistigi] = {}
+_son_n1: deque = deque(maxlen=SON_N1_SAYISI)
+
+
+def sorgu_butcesi(view_adi: str) -> Optional[int]:
+    butceler = getattr(settings, 'PERFORMANS_SORGU_BUTCELERI', {})
+    return butceler.get(view_adi, getattr(settings, 'PERFORMANS_VARSAYILAN_SORGU_BUTCESI', None))
+
+
+def olcumu_kaydet(olcum: IstekOlcumu, view_adi: str, yontem: str, yol: str = '') -> None:
+    """İsteğin ölçümünü view toplamlarına ekler; N+1 adaylarını ve bütçe aşımlarını loglar."""
+    esik = getattr(settings, 'PERFORMANS_N1_ESIGI', 5)
+    n1 = olcum.n1_adaylari(esik) if olcum.sorgu_sayisi >= esik else []
+    butce = sorgu_butcesi(view_adi)
+    butce_asildi = butce is not None and olcum.sorgu_sayisi > butce
+
+    with _kilit:
+        ist = _istatistikler.get((view_adi, yontem))
+        if ist is None:
+            ist = _istatistikler[(view_adi, yontem)] = _ViewIstatistigi()
+        ist.istek += 1
+        ist.sure += olcum.sure
+        ist.db_suresi += olcum.db_suresi
+        ist.sorgu += olcum.sorgu_sayisi
+        ist.cache_isabet += olcum.cache_isabet
+        ist.cache_iskalama += olcum.cache_iskalama
+        ist.en_cok_sorgu = max(ist.en_cok_sorgu, olcum.sorgu_sayisi)
+        for i, sinir in enumerate(SURE_ARALIKLARI):
+            if olcum.sure <= sinir:
+                ist.sure_dagilimi[i] += 1
+        if n1:
+            ist.n1 += 1
+            _son_n1.appendleft({
+                'view': view_adi,
+                'yol': yol,
+                'zaman': time.time(),
+                'kaliplar': n1[:5],
+            })
+        if butce_asildi:
+            ist.butce_asimi += 1
+
+    if n1:
+        kalip, adet = n1[0]
+        logger.warning(f"N+1 adayı: {view_adi} ({yol}) aynı sorguyu {adet} kez çalıştırdı: {kalip[:300]}")
+    if butce_asildi:
+        logger.warning(
+            f"Sorgu bütçesi aşıldı: {view_adi} ({yol}) {olcum.sorgu_sayisi} sorgu (bütçe {butce}), "
+            f"DB {olcum.db_suresi * 1000:.0f} ms / toplam {olcum.sure * 1000:.0f} ms"
+        )
+
+
+def istatistikler() -> list[dict]:
+    """View bazında toplam ve ortalama değerler (toplam süreye göre azalan)."""
+    with _kilit:
+        satirlar = [
+            {
+                'view': view_adi,
+                'yontem': yontem,
+                'istek': ist.istek,
+                'toplam_sure': ist.sure,
+                'ort_sure_ms': ist.sure / ist.istek * 1000,
+                'ort_db_ms': ist.db_suresi / ist.istek * 1000,
+                'ort_sorgu': ist.sorgu / ist.istek,
+                'en_cok_sorgu': ist.en_cok_sorgu,
+                'cache_isabet': ist.cache_isabet,
+                'cache_iskalama': ist.cache_iskalama,
+                'n1': ist.n1,
+                'butce': sorgu_butcesi(view_adi),
+                'butce_asimi': ist.butce_asimi,
+            }
+            for (view_adi, yontem), ist in _istatistikler.items()
+        ]
+    return sorted(satirlar, key=lambda s: s['toplam_sure'], reverse=True)
+
+
+def son_n1_adaylari() -> list[dict]:
+    with _kilit:
+        return list(_son_n1)
+
+
+def istatistikleri_sifirla() -> None:
+    with _kilit:
+        _istatistikler.clear()
+        _son_n1.clear()
+
+
+def _etiket(deger: str) -> str:
+    return deger.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_metni() -> str:
+    """Toplamları Prometheus metin formatında (text/plain; version=0.0.4) döndürür."""
+    with _kilit:
+        kopya = [((v, y), ist, list(ist.sure_dagilimi)) for (v, y), ist in _istatistikler.items()]
+
+    satirlar = [
+        '# HELP stoktakip_http_istek_suresi_saniye View bazında istek süresi.',
+        '# TYPE stoktakip_http_istek_suresi_saniye histogram',
+    ]
+    for (view_adi, yontem), ist, dagilim in kopya:
+        etiket = f'view="{_etiket(view_adi)}",method="{yontem}"'
+        for sinir, adet in zip(SURE_ARALIKLARI, dagilim):
+            satirlar.append(f'stoktakip_http_istek_suresi_saniye_bucket{{{etiket},le="{sinir}"}} {adet}')
+        satirlar.append(f'stoktakip_http_istek_suresi_saniye_bucket{{{etiket},le="+Inf"}} {ist.istek}')
+        satirlar.append(f'stoktakip_http_istek_suresi_saniye_sum{{{etiket}}} {ist.sure:.6f}')
+        satirlar.append(f'stoktakip_http_istek_suresi_saniye_count{{{etiket}}} {ist.istek}')
+
+    sayaclar = (
+        ('stoktakip_db_suresi_saniye_toplam', 'View bazında toplam veritabanı süresi.', 'db_suresi', '{:.6f}'),
+        ('stoktakip_db_sorgu_toplam', 'View bazında çalıştırılan sorgu sayısı.', 'sorgu', '{}'),
+        ('stoktakip_cache_isabet_toplam', 'View bazında cache isabetleri.', 'cache_isabet', '{}'),
+        ('stoktakip_cache_iskalama_toplam', 'View bazında cache ıskalamaları.', 'cache_iskalama', '{}'),
+        ('stoktakip_n1_aday_toplam', 'N+1 adayı tespit edilen istek sayısı.', 'n1', '{}'),
+        ('stoktakip_sorgu_butcesi_asimi_toplam', 'Sorgu bütçesini aşan istek sayısı.', 'butce_asimi', '{}'),
+    )
+    for ad, aciklama, alan, bicim in sayaclar:
+        satirlar.append(f'# HELP {ad} {aciklama}')
+        satirlar.append(f'# TYPE {ad} counter')
+        for (view_adi, yontem), ist, _ in kopya:
+            deger = bicim.format(getattr(ist, alan))
+            satirlar.append(f'{ad}{{view="{_etiket(view_adi)}",method="{yontem}"}} {deger}')
+    return '\n'.join(satirlar) + '\n'
@@ -0,0 +1,50 @@
+"""
+Arama utility fonksiyonları.
+Türkçe karakterlere duyarlı metin normalizasyonu (case folding) için helper'lar.
+"""
+from typing import Optional
+
+# Türkçe büyük/küçük harf ve aksanlı karakterleri ASCII karşılıklarına katlar.
+# Böylece "ŞEKER", "şeker" ve "seker" aynı arama metnine dönüşür; Python'un
+# str.lower() fonksiyonunun "İ" -> "i̇" (noktalı) dönüşümü de engellenir.
+TURKCE_KATLAMA_TABLOSU = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Î': 'i', 'î': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u', 'Û': 'u', 'û': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+    'Â': 'a', 'â': 'a',
+})
+
+
+def turkce_katla(metin: Optional[str]) -> str:
+    """
+    Metni Türkçe kurallarına göre küçük harfe ve ASCII karşılıklarına katlar.
+
+    Fazla boşluklar tek boşluğa indirilir.
+
+    Args:
+        metin: Normalize edilecek metin
+
+    Returns:
+        Katlanmış metin (ör. "İÇECEK  Şişe" -> "icecek sise")
+    """
+    if not metin:
+        return ""
+    return ' '.join(metin.translate(TURKCE_KATLAMA_TABLOSU).lower().split())
+
+
+def urun_arama_metni(ad: Optional[str], barkod: Optional[str] = None, kategori_adi: Optional[str] = None) -> str:
+    """
+    Ürünün aranabilir alanlarından tek bir normalize arama metni üretir.
+
+    Args:
+        ad: Ürün adı
+        barkod: Barkod
+        kategori_adi: Kategori adı
+
+    Returns:
+        Urun.arama_metni alanına yazılacak metin
+    """
+    return turkce_katla(' '.join(parca for parca in (ad, barkod, kategori_adi) if parca))[:400]
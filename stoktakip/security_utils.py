@@ -76,6 +76,21 @@ def validate_date_range(start_date: str, end_date: str) -> tuple[str, str]:
     return start_date, end_date
 
 
+def sanitize_search_query(query: str, max_length: int = 100) -> str:
+    """
+    Serbest metin aramalarını (ürün adı, kodu, barkod) reddetmeden temizler.
+
+    Sorgu ORM'de parametreli kullanıldığından '/', '&', '+', '%', "'" gibi
+    karakterler güvenlidir ve aranabilir kalır; yalnızca kontrol karakterleri
+    boşluğa çevrilir, boşluklar sadeleştirilir ve uzunluk sınırlanır.
+    """
+    if not query:
+        return ""
+
+    cleaned = ''.join(ch if ch.isprintable() else ' ' for ch in sanitize_string(query))
+    return ' '.join(cleaned.split())[:max_length].strip()
+
+
 def validate_search_query(query: str, max_length: int = 100) -> str:
 
     if not query:
@@ -83,8 +98,8 @@ def validate_search_query(query: str, max_length: int = 100) -> str:
     
     cleaned = sanitize_string(query, max_length=max_length)
     
-    # Sadece alfanumerik karakterler, boşluk ve bazı özel karakterlere izin ver
-    if not re.match(r'^[a-zA-Z0-9\s\-_.,;:!?()]+$', cleaned):
+    # Sadece harfler (Türkçe karakterler dahil), rakamlar, boşluk ve bazı özel karakterlere izin ver
+    if not re.match(r'^[\w\s\-.,;:!?()]+$', cleaned):
         raise ValidationError("Arama sorgusu geçersiz karakterler içeriyor.")
     
     return cleaned
@@ -36,6 +36,49 @@ from .cari_service import (
     delete_cari_hareketi_for_fatura,
     create_cari_hareketi,
 )
+from .efatura_service import (
+    export_fatura_ubl,
+    stream_fatura_ubl_zip,
+)
+from .fatura_toplu_service import (
+    bulk_create_faturalar,
+)
+from .fatura_import_service import (
+    import_alis_faturalari,
+)
+from .urun_arama_service import (
+    urun_ara,
+    urun_autocomplete,
+)
+from .urun_service import (
+    urun_bilgileri_toplu,
+)
+from .barkod_index_service import (
+    barkod_coz,
+)
+from .hizli_satis_service import (
+    hizli_satis_olustur,
+)
+from .rezervasyon_service import (
+    kullanilabilir_miktarlar,
+    siparis_rezerve_et,
+)
+from .sayim_service import (
+    sayim_oturumu_baslat,
+    sayim_partisi_isle,
+    sayim_mutabakat,
+)
+from .fiyat_listesi_service import (
+    efektif_fiyatlar,
+)
+from .fiyat_guncelleme_service import (
+    toplu_fiyat_guncelle,
+    urun_fiyatlari_tarihte,
+)
+from .siparis_service import (
+    musteri_siparisi_olustur,
+    siparisleri_faturalandir,
+)
 
 __all__ = [
     # Fatura servisleri
@@ -57,5 +100,33 @@ __all__ = [
     'create_or_update_cari_hareketi_from_fatura',
     'delete_cari_hareketi_for_fatura',
     'create_cari_hareketi',
+    # e-Fatura servisleri
+    'export_fatura_ubl',
+    'stream_fatura_ubl_zip',
+    # Toplu fatura servisleri
+    'bulk_create_faturalar',
+    'import_alis_faturalari',
+    # Ürün arama servisleri
+    'urun_ara',
+    'urun_autocomplete',
+    'urun_bilgileri_toplu',
+    'barkod_coz',
+    # Hızlı satış servisleri
+    'hizli_satis_olustur',
+    # Rezervasyon servisleri
+    'kullanilabilir_miktarlar',
+    'siparis_rezerve_et',
+    # Stok sayımı servisleri
+    'sayim_oturumu_baslat',
+    'sayim_partisi_isle',
+    'sayim_mutabakat',
+    # Fiyat listesi servisleri
+    'efektif_fiyatlar',
+    # Toplu fiyat güncelleme servisleri
+    'toplu_fiyat_guncelle',
+    'urun_fiyatlari_tarihte',
+    # Sipariş servisleri
+    'musteri_siparisi_olustur',
+    'siparisleri_faturalandir',
 ]
 
@@ -0,0 +1,246 @@
+"""
+Barkod indeksi servisi (wrapper).
+
+Barkod okutma ekranları için süreç içi (process-local) barkod → ürün indeksi:
+
+- İndeks sunucu açılışında tek sorguyla ısıtılır (stoktakip/wsgi.py).
+- Her ürünün cache'te bir versiyon damgası vardır. Urun veya StokHareketi
+  değiştiğinde damga artırılır (stok/signals.py). Okutmada yalnızca bu damga
+  cache'ten okunur; damga değişmemişse veritabanına gidilmez.
+- Damgası değişen ürün veritabanından tek sorguyla (stok dahil) yeniden okunur.
+- Toplu fiyat güncellemesi ürün damgaları yerine tek bir fiyat damgasını
+  artırır; damgası eskiyen kayıtlar okutuldukça yeniden okunur.
+- Bilinmeyen barkodlar katalog versiyonu değişene kadar hatırlanır. Bu liste
+  en son okutulanlarla sınırlıdır (BARKOD_INDEX_BILINMEYEN_LIMITI, LRU); rastgele
+  barkod okutmaları süreç belleğini büyütmez.
+
+İndeks yalnızca paylaşımlı cache (Redis) ile kullanılır. LocMemCache'te
+damgalar süreç başınadır (diğer worker'lar artışı görmez, silinen damga 0'a
+döner); bu durumda her okutma doğrudan veritabanından çözülür.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+
+from stok.models import Urun
+from stoktakip.cache_utils import paylasimli_cache_mi
+
+logger = logging.getLogger(__name__)
+
+KATALOG_VERSIYON_KEY = 'barkod_index_katalog_versiyon'
+FIYAT_VERSIYON_KEY = 'barkod_index_fiyat_versiyon'
+VARSAYILAN_BILINMEYEN_LIMITI = 10000
+
+
+def _urun_versiyon_key(urun_id: int) -> str:
+    return f'barkod_index_urun_versiyon_{urun_id}'
+
+
+def _versiyon_artir(key: str) -> None:
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key add ile incr arasında silindiyse
+        cache.set(key, 1, timeout=None)
+
+
+def urun_versiyonlarini_artir(urun_ids: Iterable[int]) -> None:
+    """
+    Ürünlerin versiyon damgalarını artırır; indeksteki kayıtları bir sonraki
+    okutmada yeniden okunmaya zorlar.
+
+    Signal tetiklemeyen toplu işlemlerden (bulk_create, update) sonra
+    elle çağrılmalıdır.
+
+    Args:
+        urun_ids: Değişen ürünlerin ID'leri
+    """
+    for urun_id in set(urun_ids):
+        if urun_id:
+            _versiyon_artir(_urun_versiyon_key(urun_id))
+
+
+def katalog_versiyonunu_artir() -> None:
+    """Yeni ürün eklendiğinde veya barkod değiştiğinde bilinmeyen barkod listesini geçersiz kılar."""
+    _versiyon_artir(KATALOG_VERSIYON_KEY)
+
+
+def fiyat_versiyonunu_artir() -> None:
+    """
+    Toplu fiyat güncellemesinden sonra indeksteki tüm kayıtları geçersiz kılar.
+
+    Değişen ürün sayısından bağımsız olarak tek cache yazmasıdır; kayıtlar
+    bir sonraki okutmada yeniden okunur.
+    """
+    _versiyon_artir(FIYAT_VERSIYON_KEY)
+
+
+def _urun_satirlari(filtre: Q):
+    return Urun.objects.filter(filtre).values(
+        'id', 'ad', 'barkod', 'birim', 'fiyat', 'alis_fiyati', 'kdv_orani'
+    ).annotate(
+        giris=Sum('stokhareketi__miktar', filter=Q(stokhareketi__islem_turu='giriş')),
+        cikis=Sum('stokhareketi__miktar', filter=Q(stokhareketi__islem_turu='çıkış')),
+    ).order_by()
+
+
+def _kayit(satir: dict, versiyon: int, fiyat_versiyon: int = 0) -> dict:
+    return {
+        'id': satir['id'],
+        'ad': satir['ad'],
+        'barkod': satir['barkod'],
+        'birim': satir['birim'],
+        'fiyat': str(satir['fiyat']),
+        'alis_fiyati': str(satir['alis_fiyati']),
+        'kdv_orani': satir['kdv_orani'],
+        'stok': (satir['giris'] or 0) - (satir['cikis'] or 0),
+        'versiyon': versiyon,
+        'fiyat_versiyon': fiyat_versiyon,
+    }
+
+
+class BarkodIndex:
+    """Süreç içi barkod → ürün bilgisi indeksi."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._barkodlar: dict[str, dict] = {}
+        # barkod -> katalog versiyonu; en eski okutulan başta (LRU)
+        self._bilinmeyenler: OrderedDict[str, int] = OrderedDict()
+        self.isitildi = False
+
+    @staticmethod
+    def _bilinmeyen_limiti() -> int:
+        return getattr(settings, 'BARKOD_INDEX_BILINMEYEN_LIMITI', VARSAYILAN_BILINMEYEN_LIMITI)
+
+    def _bilinmeyen_mi(self, barkod: str, katalog_versiyon: int) -> bool:
+        with self._kilit:
+            versiyon = self._bilinmeyenler.get(barkod)
+            if versiyon is None:
+                return False
+            if versiyon != katalog_versiyon:
+                del self._bilinmeyenler[barkod]
+                return False
+            self._bilinmeyenler.move_to_end(barkod)
+            return True
+
+    def _bilinmeyen_ekle(self, barkod: str, katalog_versiyon: int) -> None:
+        with self._kilit:
+            self._bilinmeyenler[barkod] = katalog_versiyon
+            self._bilinmeyenler.move_to_end(barkod)
+            fazla = len(self._bilinmeyenler) - self._bilinmeyen_limiti()
+            for _ in range(max(fazla, 0)):
+                self._bilinmeyenler.popitem(last=False)
+
+    def isit(self, chunk_size: int = 2000) -> int:
+        """
+        Barkodlu tüm ürünleri stoklarıyla birlikte indekse yükler.
+
+        Returns:
+            Yüklenen ürün sayısı (paylaşımlı cache yoksa 0)
+        """
+        if not paylasimli_cache_mi():
+            logger.info("Paylaşımlı cache yok; barkod indeksi kullanılmıyor, okutmalar veritabanından çözülecek.")
+            return 0
+
+        # Damgalar veriden önce okunur (bkz. _yeniden_oku)
+        barkodlu = Q(barkod__isnull=False) & ~Q(barkod='')
+        urun_ids = list(Urun.objects.filter(barkodlu).values_list('id', flat=True))
+        fiyat_versiyon = cache.get(FIYAT_VERSIYON_KEY, 0)
+        versiyonlar = {}
+        for i in range(0, len(urun_ids), chunk_size):
+            versiyonlar.update(cache.get_many([_urun_versiyon_key(urun_id) for urun_id in urun_ids[i:i + chunk_size]]))
+
+        barkodlar = {}
+        for satir in _urun_satirlari(barkodlu).iterator(chunk_size=chunk_size):
+            barkodlar[satir['barkod']] = _kayit(
+                satir, versiyonlar.get(_urun_versiyon_key(satir['id']), 0), fiyat_versiyon
+            )
+
+        with self._kilit:
+            self._barkodlar = barkodlar
+            self._bilinmeyenler = OrderedDict()
+            self.isitildi = True
+        logger.info(f"Barkod indeksi ısıtıldı: {len(barkodlar)} ürün")
+        return len(barkodlar)
+
+    def coz(self, barkod: str) -> Optional[dict]:
+        """
+        Barkodu ürün bilgisine (fiyat ve stok dahil) çözer.
+
+        Args:
+            barkod: Okutulan barkod
+
+        Returns:
+            Ürün bilgisi dict'i veya bulunamazsa None
+        """
+        barkod = (barkod or '').strip()
+        if not barkod:
+            return None
+        if not paylasimli_cache_mi():
+            satir = _urun_satirlari(Q(barkod=barkod)).first()
+            return _kayit(satir, 0) if satir else None
+
+        kayit = self._barkodlar.get(barkod)
+        if kayit is not None:
+            # Tek cache round-trip: ürün damgası + fiyat ve katalog versiyonu
+            urun_key = _urun_versiyon_key(kayit['id'])
+            damgalar = cache.get_many([urun_key, FIYAT_VERSIYON_KEY, KATALOG_VERSIYON_KEY])
+            if (damgalar.get(urun_key, 0) == kayit['versiyon']
+                    and damgalar.get(FIYAT_VERSIYON_KEY, 0) == kayit['fiyat_versiyon']):
+                return kayit
+            katalog_versiyon = damgalar.get(KATALOG_VERSIYON_KEY, 0)
+            urun_id = kayit['id']
+        else:
+            katalog_versiyon = cache.get(KATALOG_VERSIYON_KEY, 0)
+            if self._bilinmeyen_mi(barkod, katalog_versiyon):
+                return None
+            urun_id = Urun.objects.filter(barkod=barkod).values_list('id', flat=True).first()
+
+        kayit = self._yeniden_oku(urun_id, barkod) if urun_id else None
+        if kayit is None:
+            self._bilinmeyen_ekle(barkod, katalog_versiyon)
+        return kayit
+
+    def _yeniden_oku(self, urun_id: int, barkod: str) -> Optional[dict]:
+        # Damga sorgudan önce okunur; arada bir değişiklik olursa bir sonraki
+        # okutmada damga farklı görüneceği için kayıt tekrar okunur.
+        urun_key = _urun_versiyon_key(urun_id)
+        damgalar = cache.get_many([urun_key, FIYAT_VERSIYON_KEY])
+        satir = _urun_satirlari(Q(pk=urun_id)).first()
+        with self._kilit:
+            self._barkodlar.pop(barkod, None)
+            if satir is None or satir['barkod'] != barkod:
+                return None
+            kayit = _kayit(satir, damgalar.get(urun_key, 0), damgalar.get(FIYAT_VERSIYON_KEY, 0))
+            self._barkodlar[barkod] = kayit
+            self._bilinmeyenler.pop(barkod, None)
+            return kayit
+
+    def temizle(self) -> None:
+        with self._kilit:
+            self._barkodlar = {}
+            self._bilinmeyenler = OrderedDict()
+            self.isitildi = False
+
+
+barkod_index = BarkodIndex()
+
+
+def barkod_coz(barkod: str) -> Optional[dict]:
+    """
+    Barkodu süreç içi indeksten ürün bilgisine çözer.
+
+    Args:
+        barkod: Okutulan barkod
+
+    Returns:
+        id, ad, barkod, birim, fiyat, alis_fiyati, kdv_orani, stok alanlarını içeren dict veya None
+    """
+    return barkod_index.coz(barkod)
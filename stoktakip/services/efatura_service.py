@@ -0,0 +1,426 @@
+"""
+e-Fatura (UBL-TR) dışa aktarım servisi (wrapper).
+
+Bu modül, Fatura / FaturaKalem / Cari verilerinden GİB'in UBL-TR 1.2
+formatında Invoice XML belgeleri üretir.
+
+- Tekil dışa aktarımda tek bir XML belgesi döner.
+- Toplu dışa aktarımda faturalar tek prefetch geçişiyle parça parça okunur,
+  her belge küçük bir buffer'a yazılıp hemen ZIP akışına aktarılır; böylece
+  binlerce fatura bellek kullanımı sabit kalarak indirilebilir.
+- Üretilen XML, faturanın içerik hash'i ile cache'lenir. İçerik değişmediği
+  sürece yeniden dışa aktarım XML üretmeden cache'den döner.
+"""
+import hashlib
+import io
+import uuid
+import zipfile
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, Iterator, Optional
+from xml.sax.saxutils import XMLGenerator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch, QuerySet
+from django.utils import timezone
+
+from fatura.models import Fatura, FaturaKalem
+
+# Format değiştiğinde eski cache kayıtlarının kullanılmaması için hash'e dahil edilir
+UBL_FORMAT_VERSION = '1'
+
+UBL_NS = 'urn:oasis:names:specification:ubl:schema:xsd:Invoice-2'
+CAC_NS = 'urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2'
+CBC_NS = 'urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2'
+
+PARA_BIRIMI = 'TRY'
+
+# Urun.birim → UN/ECE Rec. 20 birim kodları
+BIRIM_KODLARI = {
+    'adet': 'C62',
+    'kg': 'KGM',
+    'gr': 'GRM',
+    'lt': 'LTR',
+    'litre': 'LTR',
+    'm': 'MTR',
+    'metre': 'MTR',
+    'm2': 'MTK',
+    'paket': 'PA',
+    'kutu': 'BX',
+    'koli': 'CT',
+}
+
+UBL_CACHE_PREFIX = 'efatura_ubl'
+DEFAULT_CHUNK_SIZE = 200
+
+
+def _tutar(value) -> str:
+    """Tutarı UBL'in beklediği 2 ondalıklı string'e çevirir."""
+    return str(Decimal(str(value or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def _birim_kodu(birim: Optional[str]) -> str:
+    if not birim:
+        return 'C62'
+    return BIRIM_KODLARI.get(birim.strip().lower(), 'C62')
+
+
+def _satici_bilgileri() -> dict:
+    return getattr(settings, 'EFATURA_SATICI', {}) or {}
+
+
+def _kalemler(fatura: Fatura) -> list:
+    """Prefetch edilmiş kalemleri döndürür (prefetch yoksa tek sorgu)."""
+    return list(fatura.kalemler.all())
+
+
+def fatura_icerik_hash(fatura: Fatura, kalemler: Optional[list] = None) -> str:
+    """
+    Faturanın UBL çıktısını etkileyen tüm alanlarından SHA-256 hash üretir.
+
+    _yaz_fatura'nın yazdığı her alan burada da yer almalıdır; aksi halde o
+    alan değiştiğinde cache'teki eski XML döner.
+
+    Args:
+        fatura: Fatura objesi (cari select_related, kalemler prefetch edilmiş olmalı)
+        kalemler: Önceden okunmuş kalem listesi (opsiyonel)
+
+    Returns:
+        Hex formatında içerik hash'i
+    """
+    if kalemler is None:
+        kalemler = _kalemler(fatura)
+    cari = fatura.cari
+    satici = _satici_bilgileri()
+
+    parcalar = [
+        UBL_FORMAT_VERSION,
+        repr(sorted(satici.items())),
+        str(fatura.pk), fatura.fatura_no or '', str(fatura.fatura_tarihi),
+        fatura.fatura_tipi, fatura.durum,
+        _tutar(fatura.toplam_tutar), _tutar(fatura.kdv_tutari),
+        _tutar(fatura.iskonto_orani), _tutar(fatura.iskonto_tutari), _tutar(fatura.genel_toplam),
+        fatura.aciklama or '',
+    ]
+    if cari:
+        parcalar += [
+            str(cari.pk), cari.ad_soyad, cari.vergi_dairesi or '', cari.vergi_no or '',
+            cari.tc_vkn or '', cari.adres or '', cari.sehir or '', cari.ilce or '',
+            cari.telefon or '', cari.email or '',
+        ]
+    for kalem in kalemler:
+        parcalar += [
+            str(kalem.sira_no), kalem.urun_adi, str(kalem.miktar),
+            _tutar(kalem.birim_fiyat), str(kalem.kdv_orani),
+            _tutar(kalem.kdv_tutari), _tutar(kalem.toplam_tutar),
+            _birim_kodu(kalem.urun.birim if kalem.urun else None),
+            (kalem.urun.barkod or '') if kalem.urun else '',
+        ]
+
+    hasher = hashlib.sha256()
+    for parca in parcalar:
+        hasher.update(parca.encode('utf-8'))
+        hasher.update(b'\x1f')
+    return hasher.hexdigest()
+
+
+class _UBLWriter:
+    """XMLGenerator üzerinde küçük bir yardımcı; elemanları doğrudan akışa yazar."""
+
+    def __init__(self, out):
+        self._gen = XMLGenerator(out, encoding='utf-8', short_empty_elements=True)
+
+    def start_document(self):
+        self._gen.startDocument()
+        self._gen.startElement('Invoice', {
+            'xmlns': UBL_NS,
+            'xmlns:cac': CAC_NS,
+            'xmlns:cbc': CBC_NS,
+        })
+
+    def end_document(self):
+        self._gen.endElement('Invoice')
+        self._gen.endDocument()
+
+    def start(self, name: str, attrs: Optional[dict] = None):
+        self._gen.startElement(name, attrs or {})
+
+    def end(self, name: str):
+        self._gen.endElement(name)
+
+    def element(self, name: str, text, attrs: Optional[dict] = None):
+        self._gen.startElement(name, attrs or {})
+        if text not in (None, ''):
+            self._gen.characters(str(text))
+        self._gen.endElement(name)
+
+    def amount(self, name: str, value):
+        self.element(name, _tutar(value), {'currencyID': PARA_BIRIMI})
+
+
+def _kimlik_semasi(numara: str) -> str:
+    return 'TCKN' if len(numara) == 11 else 'VKN'
+
+
+def _yaz_taraf(w: _UBLWriter, unvan: str, kimlik: str, vergi_dairesi: str,
+               adres: str = '', ilce: str = '', sehir: str = '',
+               telefon: str = '', email: str = ''):
+    w.start('cac:Party')
+    if kimlik:
+        w.start('cac:PartyIdentification')
+        w.element('cbc:ID', kimlik, {'schemeID': _kimlik_semasi(kimlik)})
+        w.end('cac:PartyIdentification')
+    w.start('cac:PartyName')
+    w.element('cbc:Name', unvan)
+    w.end('cac:PartyName')
+    w.start('cac:PostalAddress')
+    w.element('cbc:StreetName', adres)
+    w.element('cbc:CitySubdivisionName', ilce)
+    w.element('cbc:CityName', sehir)
+    w.start('cac:Country')
+    w.element('cbc:Name', 'Türkiye')
+    w.end('cac:Country')
+    w.end('cac:PostalAddress')
+    w.start('cac:PartyTaxScheme')
+    w.start('cac:TaxScheme')
+    w.element('cbc:Name', vergi_dairesi)
+    w.end('cac:TaxScheme')
+    w.end('cac:PartyTaxScheme')
+    if telefon or email:
+        w.start('cac:Contact')
+        if telefon:
+            w.element('cbc:Telephone', telefon)
+        if email:
+            w.element('cbc:ElectronicMail', email)
+        w.end('cac:Contact')
+    w.end('cac:Party')
+
+
+def _yaz_vergi_toplami(w: _UBLWriter, vergi_tutari, alt_toplamlar: Iterable[tuple]):
+    w.start('cac:TaxTotal')
+    w.amount('cbc:TaxAmount', vergi_tutari)
+    for oran, matrah, tutar in alt_toplamlar:
+        w.start('cac:TaxSubtotal')
+        w.amount('cbc:TaxableAmount', matrah)
+        w.amount('cbc:TaxAmount', tutar)
+        w.element('cbc:Percent', oran)
+        w.start('cac:TaxCategory')
+        w.start('cac:TaxScheme')
+        w.element('cbc:Name', 'KDV')
+        w.element('cbc:TaxTypeCode', '0015')
+        w.end('cac:TaxScheme')
+        w.end('cac:TaxCategory')
+        w.end('cac:TaxSubtotal')
+    w.end('cac:TaxTotal')
+
+
+def _yaz_fatura(out, fatura: Fatura, kalemler: list) -> None:
+    """Tek bir faturayı UBL-TR Invoice olarak verilen akışa yazar."""
+    w = _UBLWriter(out)
+    satici = _satici_bilgileri()
+    cari = fatura.cari
+
+    w.start_document()
+    w.element('cbc:UBLVersionID', '2.1')
+    w.element('cbc:CustomizationID', 'TR1.2')
+    w.element('cbc:ProfileID', 'TICARIFATURA' if cari and (cari.vergi_no or cari.tc_vkn) else 'TEMELFATURA')
+    w.element('cbc:ID', fatura.fatura_no)
+    w.element('cbc:CopyIndicator', 'false')
+    # Aynı fatura için her dışa aktarımda aynı ETTN üretilsin
+    w.element('cbc:UUID', str(uuid.uuid5(uuid.NAMESPACE_URL, f'stoktakip:fatura:{fatura.pk}:{fatura.fatura_no}')).upper())
+    w.element('cbc:IssueDate', fatura.fatura_tarihi.isoformat())
+    w.element('cbc:InvoiceTypeCode', 'SATIS')
+    if fatura.aciklama:
+        w.element('cbc:Note', fatura.aciklama)
+    w.element('cbc:DocumentCurrencyCode', PARA_BIRIMI)
+    w.element('cbc:LineCountNumeric', len(kalemler))
+
+    w.start('cac:AccountingSupplierParty')
+    _yaz_taraf(
+        w,
+        unvan=satici.get('unvan', ''),
+        kimlik=satici.get('vkn', ''),
+        vergi_dairesi=satici.get('vergi_dairesi', ''),
+        adres=satici.get('adres', ''),
+        ilce=satici.get('ilce', ''),
+        sehir=satici.get('sehir', ''),
+        telefon=satici.get('telefon', ''),
+        email=satici.get('email', ''),
+    )
+    w.end('cac:AccountingSupplierParty')
+
+    w.start('cac:AccountingCustomerParty')
+    if cari:
+        kimlik = (cari.tc_vkn or cari.vergi_no or '').replace('-', '').replace(' ', '')
+        _yaz_taraf(
+            w,
+            unvan=cari.ad_soyad,
+            kimlik=kimlik,
+            vergi_dairesi=cari.vergi_dairesi or '',
+            adres=cari.adres or '',
+            ilce=cari.ilce or '',
+            sehir=cari.sehir or '',
+            telefon=cari.telefon or '',
+            email=cari.email or '',
+        )
+    else:
+        _yaz_taraf(w, unvan='Nihai Tüketici', kimlik='11111111111', vergi_dairesi='')
+    w.end('cac:AccountingCustomerParty')
+
+    if fatura.iskonto_tutari and fatura.iskonto_tutari > 0:
+        w.start('cac:AllowanceCharge')
+        w.element('cbc:ChargeIndicator', 'false')
+        w.element('cbc:MultiplierFactorNumeric', str(Decimal(str(fatura.iskonto_orani)) / Decimal('100')))
+        w.amount('cbc:Amount', fatura.iskonto_tutari)
+        w.amount('cbc:BaseAmount', Decimal(str(fatura.toplam_tutar)) + Decimal(str(fatura.kdv_tutari)))
+        w.end('cac:AllowanceCharge')
+
+    # KDV oranına göre alt toplamlar
+    oranlar: dict = {}
+    for kalem in kalemler:
+        matrah, tutar = oranlar.get(kalem.kdv_orani, (Decimal('0.00'), Decimal('0.00')))
+        oranlar[kalem.kdv_orani] = (matrah + kalem.toplam_tutar, tutar + kalem.kdv_tutari)
+    _yaz_vergi_toplami(
+        w, fatura.kdv_tutari,
+        [(oran, matrah, tutar) for oran, (matrah, tutar) in sorted(oranlar.items())]
+    )
+
+    w.start('cac:LegalMonetaryTotal')
+    w.amount('cbc:LineExtensionAmount', fatura.toplam_tutar)
+    w.amount('cbc:TaxExclusiveAmount', fatura.toplam_tutar)
+    w.amount('cbc:TaxInclusiveAmount', Decimal(str(fatura.toplam_tutar)) + Decimal(str(fatura.kdv_tutari)))
+    w.amount('cbc:AllowanceTotalAmount', fatura.iskonto_tutari)
+    w.amount('cbc:PayableAmount', fatura.genel_toplam)
+    w.end('cac:LegalMonetaryTotal')
+
+    for kalem in kalemler:
+        w.start('cac:InvoiceLine')
+        w.element('cbc:ID', kalem.sira_no)
+        w.element('cbc:InvoicedQuantity', kalem.miktar,
+                  {'unitCode': _birim_kodu(kalem.urun.birim if kalem.urun else None)})
+        w.amount('cbc:LineExtensionAmount', kalem.toplam_tutar)
+        _yaz_vergi_toplami(w, kalem.kdv_tutari, [(kalem.kdv_orani, kalem.toplam_tutar, kalem.kdv_tutari)])
+        w.start('cac:Item')
+        w.element('cbc:Name', kalem.urun_adi)
+        if kalem.urun and kalem.urun.barkod:
+            w.start('cac:SellersItemIdentification')
+            w.element('cbc:ID', kalem.urun.barkod)
+            w.end('cac:SellersItemIdentification')
+        w.end('cac:Item')
+        w.start('cac:Price')
+        w.amount('cbc:PriceAmount', kalem.birim_fiyat)
+        w.end('cac:Price')
+        w.end('cac:InvoiceLine')
+
+    w.end_document()
+
+
+def _ubl_bytes(fatura: Fatura) -> bytes:
+    """Faturanın UBL XML'ini cache'den döndürür, yoksa üretip cache'ler."""
+    if fatura.fatura_tipi != 'Satis':
+        raise ValidationError(f"Sadece satış faturaları e-Fatura olarak dışa aktarılabilir: {fatura.fatura_no}")
+    if not fatura.fatura_no:
+        raise ValidationError("Fatura numarası olmadan e-Fatura oluşturulamaz.")
+
+    kalemler = _kalemler(fatura)
+    cache_key = f"{UBL_CACHE_PREFIX}_{fatura_icerik_hash(fatura, kalemler)}"
+    xml = cache.get(cache_key)
+    if xml is not None:
+        return xml
+
+    buffer = io.BytesIO()
+    _yaz_fatura(buffer, fatura, kalemler)
+    xml = buffer.getvalue()
+    cache.set(cache_key, xml, getattr(settings, 'EFATURA_CACHE_TIMEOUT', 60 * 60 * 24 * 7))
+    return xml
+
+
+def efatura_queryset(queryset: Optional[QuerySet] = None) -> QuerySet:
+    """
+    UBL üretimi için gereken tüm ilişkileri tek geçişte yükleyen queryset döndürür.
+
+    Args:
+        queryset: Filtrelenmiş Fatura queryset'i (opsiyonel, varsayılan: tüm satış faturaları)
+
+    Returns:
+        cari select_related, kalemler (ve ürünleri) prefetch edilmiş queryset
+    """
+    if queryset is None:
+        queryset = Fatura.objects.all()
+    return queryset.filter(fatura_tipi='Satis').select_related('cari').prefetch_related(
+        Prefetch('kalemler', queryset=FaturaKalem.objects.select_related('urun').order_by('sira_no'))
+    )
+
+
+def export_fatura_ubl(fatura: Fatura) -> bytes:
+    """
+    Tek bir satış faturasını UBL-TR XML olarak döndürür.
+
+    Args:
+        fatura: Fatura objesi
+
+    Returns:
+        UTF-8 kodlanmış XML içeriği
+
+    Raises:
+        ValidationError: Fatura satış faturası değilse veya numarası yoksa
+    """
+    fatura = efatura_queryset(Fatura.objects.filter(pk=fatura.pk)).first() or fatura
+    return _ubl_bytes(fatura)
+
+
+class _ZipAkisi:
+    """ZipFile'ın yazdığı veriyi biriktirip parça parça boşaltan, seek edilemeyen akış."""
+
+    def __init__(self):
+        self._parcalar: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parcalar.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def bosalt(self) -> bytes:
+        data = b''.join(self._parcalar)
+        self._parcalar = []
+        return data
+
+
+def stream_fatura_ubl_zip(
+    queryset: Optional[QuerySet] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Faturaları UBL-TR XML dosyaları içeren bir ZIP akışı olarak üretir.
+
+    Faturalar `chunk_size` büyüklüğünde parçalar halinde okunur (parça başına
+    tek prefetch), her belge yazıldıktan sonra buffer boşaltılır.
+
+    Args:
+        queryset: Dışa aktarılacak faturalar (opsiyonel)
+        chunk_size: Veritabanından tek seferde okunacak fatura sayısı
+
+    Yields:
+        ZIP içeriğinin ardışık byte parçaları
+    """
+    akis = _ZipAkisi()
+    hatalar = []
+    with zipfile.ZipFile(akis, mode='w', compression=zipfile.ZIP_DEFLATED) as arsiv:
+        for fatura in efatura_queryset(queryset).order_by('pk').iterator(chunk_size=chunk_size):
+            try:
+                xml = _ubl_bytes(fatura)
+            except ValidationError as e:
+                hatalar.append(f"{fatura.fatura_no or fatura.pk}: {'; '.join(e.messages)}")
+                continue
+            arsiv.writestr(f"{fatura.fatura_no}.xml", xml)
+            yield akis.bosalt()
+        if hatalar:
+            arsiv.writestr('hatalar.txt', '\n'.join(hatalar).encode('utf-8'))
+    yield akis.bosalt()
+
+
+def ubl_dosya_adi(prefix: str = 'efatura') -> str:
+    return f"{prefix}_{timezone.localtime():%Y%m%d_%H%M%S}.zip"
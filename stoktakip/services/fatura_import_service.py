@@ -0,0 +1,404 @@
+"""
+Alış faturası içe aktarma servisi (wrapper).
+
+Tedarikçilerden gelen UBL-TR XML ve CSV dosyalarını okuyup alış faturası
+olarak kaydeder.
+
+- Dosyalar artımlı okunur (XML için iterparse, CSV için satır satır);
+  tüm dosya belleğe alınmaz. Yüklenen XML defusedxml ile okunur (entity
+  genişletme / DTD saldırılarına karşı).
+- Ürünler barkod veya ad ile, cariler vergi numarası ile bellekteki
+  indekslerden eşleştirilir (satır başına sorgu yapılmaz).
+- Geçerli faturalar batch'ler halinde fatura_toplu_service ile oluşturulur.
+- Her dosya için başarılı / reddedilen faturaları içeren bir rapor döner.
+
+CSV formatı (başlık satırı zorunlu, aynı fatura_no'lu satırlar ardışık olmalı):
+    fatura_no,fatura_tarihi,vergi_no,barkod,urun_adi,miktar,birim_fiyat,kdv_orani
+"""
+import csv
+import io
+import itertools
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterator, Optional
+
+from defusedxml import DefusedXmlException
+from defusedxml import ElementTree as ET
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError, transaction
+from django.http import HttpRequest
+from django.utils import timezone
+
+from accounts.utils import log_action
+from cari.models import Cari
+from fatura.models import Fatura, FaturaKalem
+from stok.models import Urun
+from stoktakip.services.fatura_toplu_service import VARSAYILAN_KDV_ORANI, bulk_create_faturalar
+
+logger = logging.getLogger(__name__)
+
+UBL_NS = {
+    'ubl': 'urn:oasis:names:specification:ubl:schema:xsd:Invoice-2',
+    'cac': 'urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2',
+    'cbc': 'urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2',
+}
+INVOICE_TAG = f"{{{UBL_NS['ubl']}}}Invoice"
+
+IMPORT_BATCH_SIZE = 100
+
+
+def _normalize_ad(ad: str) -> str:
+    return ' '.join((ad or '').casefold().split())
+
+
+def _normalize_vkn(vkn: Optional[str]) -> str:
+    return ''.join(ch for ch in (vkn or '') if ch.isdigit())
+
+
+class UrunIndex:
+    """Barkod ve normalize edilmiş ürün adına göre bellek içi ürün indeksi."""
+
+    def __init__(self):
+        self.barkod: dict[str, tuple[int, str]] = {}
+        self.ad: dict[str, tuple[int, str]] = {}
+        for urun_id, barkod, ad in Urun.objects.values_list('id', 'barkod', 'ad').iterator(chunk_size=5000):
+            if barkod:
+                self.barkod[barkod.strip()] = (urun_id, ad)
+            self.ad.setdefault(_normalize_ad(ad), (urun_id, ad))
+
+    def bul(self, barkod: Optional[str], ad: Optional[str]) -> Optional[tuple[int, str]]:
+        if barkod and barkod.strip() in self.barkod:
+            return self.barkod[barkod.strip()]
+        if ad:
+            return self.ad.get(_normalize_ad(ad))
+        return None
+
+
+class CariIndex:
+    """Vergi numarası / TCKN'ye göre bellek içi cari indeksi."""
+
+    def __init__(self):
+        self.vkn: dict[str, int] = {}
+        for cari_id, vergi_no, tc_vkn in Cari.objects.values_list('id', 'vergi_no', 'tc_vkn'):
+            for numara in (vergi_no, tc_vkn):
+                numara = _normalize_vkn(numara)
+                if numara:
+                    self.vkn.setdefault(numara, cari_id)
+
+    def bul(self, vkn: Optional[str]) -> Optional[int]:
+        return self.vkn.get(_normalize_vkn(vkn))
+
+
+def _yeni_rapor(dosya_adi: str) -> dict:
+    return {'dosya': dosya_adi, 'toplam': 0, 'basarili': 0, 'reddedilen': []}
+
+
+def _reddet(rapor: dict, fatura_no: str, sebep: str) -> None:
+    rapor['reddedilen'].append({'fatura_no': fatura_no or '-', 'sebep': sebep})
+
+
+def _decimal(deger, alan: str) -> Decimal:
+    try:
+        return Decimal(str(deger).strip().replace(',', '.'))
+    except (InvalidOperation, AttributeError):
+        raise ValidationError(f"Geçersiz {alan}: {deger}")
+
+
+def _tarih(deger) -> date:
+    deger = (deger or '').strip()
+    for fmt in ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(deger, fmt).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"Geçersiz fatura tarihi: {deger}")
+
+
+# ---------------------------------------------------------------------------
+# Dosya okuyucular: her biri ham fatura dict'leri üretir
+# ---------------------------------------------------------------------------
+
+def _text(elem, path: str) -> str:
+    found = elem.find(path, UBL_NS)
+    return (found.text or '').strip() if found is not None and found.text else ''
+
+
+def iter_ubl_faturalar(fileobj: IO[bytes]) -> Iterator[dict]:
+    """
+    UBL-TR dosyasındaki Invoice belgelerini sırayla okur.
+
+    Dosya tek bir Invoice ya da birden fazla Invoice içeren bir zarf olabilir.
+    Her belge işlendikten sonra ağaçtan silinir.
+
+    Yields:
+        Ham fatura dict'i (fatura_no, fatura_tarihi, vergi_no, satici, iskonto_orani, kalemler)
+    """
+    for _, elem in ET.iterparse(fileobj, events=('end',)):
+        if elem.tag != INVOICE_TAG:
+            continue
+
+        vergi_no = ''
+        for kimlik in elem.findall('cac:AccountingSupplierParty/cac:Party/cac:PartyIdentification/cbc:ID', UBL_NS):
+            if kimlik.get('schemeID') in ('VKN', 'TCKN') and kimlik.text:
+                vergi_no = kimlik.text.strip()
+                break
+
+        iskonto_orani = Decimal('0')
+        for indirim in elem.findall('cac:AllowanceCharge', UBL_NS):
+            if _text(indirim, 'cbc:ChargeIndicator') == 'false' and _text(indirim, 'cbc:MultiplierFactorNumeric'):
+                iskonto_orani = _decimal(_text(indirim, 'cbc:MultiplierFactorNumeric'), 'iskonto') * 100
+
+        kalemler = []
+        for satir in elem.findall('cac:InvoiceLine', UBL_NS):
+            barkod = (
+                _text(satir, 'cac:Item/cac:SellersItemIdentification/cbc:ID')
+                or _text(satir, 'cac:Item/cac:StandardItemIdentification/cbc:ID')
+                or _text(satir, 'cac:Item/cac:BuyersItemIdentification/cbc:ID')
+            )
+            kalemler.append({
+                'barkod': barkod,
+                'urun_adi': _text(satir, 'cac:Item/cbc:Name'),
+                'miktar': _text(satir, 'cbc:InvoicedQuantity'),
+                'birim_fiyat': _text(satir, 'cac:Price/cbc:PriceAmount'),
+                'kdv_orani': _text(satir, 'cac:TaxTotal/cac:TaxSubtotal/cbc:Percent'),
+            })
+
+        yield {
+            'fatura_no': _text(elem, 'cbc:ID'),
+            'fatura_tarihi': _text(elem, 'cbc:IssueDate'),
+            'vergi_no': vergi_no,
+            'satici': _text(elem, 'cac:AccountingSupplierParty/cac:Party/cac:PartyName/cbc:Name'),
+            'iskonto_orani': iskonto_orani,
+            'kalemler': kalemler,
+        }
+        elem.clear()
+
+
+def iter_csv_faturalar(fileobj: IO[bytes]) -> Iterator[dict]:
+    """
+    CSV dosyasını satır satır okuyup ardışık aynı fatura_no'lu satırları
+    tek faturada toplar.
+
+    Yields:
+        Ham fatura dict'i
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    ornek = text.readline()
+    ayrac = ';' if ornek.count(';') > ornek.count(',') else ','
+    reader = csv.DictReader(itertools.chain([ornek], text), delimiter=ayrac)
+    try:
+        for fatura_no, satirlar in itertools.groupby(reader, key=lambda r: (r.get('fatura_no') or '').strip()):
+            satirlar = list(satirlar)
+            ilk = satirlar[0]
+            yield {
+                'fatura_no': fatura_no,
+                'fatura_tarihi': ilk.get('fatura_tarihi', ''),
+                'vergi_no': ilk.get('vergi_no', ''),
+                'satici': ilk.get('satici', ''),
+                'iskonto_orani': ilk.get('iskonto_orani') or '0',
+                'kalemler': [{
+                    'barkod': (satir.get('barkod') or '').strip(),
+                    'urun_adi': (satir.get('urun_adi') or '').strip(),
+                    'miktar': satir.get('miktar', ''),
+                    'birim_fiyat': satir.get('birim_fiyat', ''),
+                    'kdv_orani': satir.get('kdv_orani', ''),
+                } for satir in satirlar],
+            }
+    finally:
+        # Yüklenen dosyanın kapanmaması için wrapper'ı ayır
+        text.detach()
+
+
+# ---------------------------------------------------------------------------
+# Doğrulama ve kayıt
+# ---------------------------------------------------------------------------
+
+def _hazirla(ham: dict, urun_index: UrunIndex, cari_index: CariIndex, durum: str) -> tuple[Fatura, list[FaturaKalem]]:
+    """Ham fatura verisini doğrular, kaydedilmemiş Fatura ve kalemlere çevirir."""
+    fatura_no = (ham.get('fatura_no') or '').strip()
+    if not fatura_no:
+        raise ValidationError("Fatura numarası yok.")
+    if len(fatura_no) > 50:
+        raise ValidationError("Fatura numarası 50 karakterden uzun olamaz.")
+
+    fatura_tarihi = _tarih(ham.get('fatura_tarihi'))
+    if fatura_tarihi > timezone.now().date():
+        raise ValidationError("Gelecek tarihli fatura içe aktarılamaz.")
+
+    cari_id = cari_index.bul(ham.get('vergi_no'))
+    if not cari_id:
+        raise ValidationError(f"Cari bulunamadı (VKN: {ham.get('vergi_no') or '-'} {ham.get('satici') or ''}).".strip())
+
+    if not ham.get('kalemler'):
+        raise ValidationError("Faturada kalem yok.")
+
+    kalemler = []
+    for sira, satir in enumerate(ham['kalemler'], start=1):
+        eslesme = urun_index.bul(satir.get('barkod'), satir.get('urun_adi'))
+        if not eslesme:
+            raise ValidationError(
+                f"{sira}. satır: ürün bulunamadı ({satir.get('barkod') or satir.get('urun_adi') or '-'})."
+            )
+        urun_id, urun_adi = eslesme
+
+        miktar = _decimal(satir.get('miktar'), 'miktar')
+        if miktar != miktar.to_integral_value() or miktar <= 0:
+            raise ValidationError(f"{sira}. satır: miktar pozitif tam sayı olmalıdır ({satir.get('miktar')}).")
+        birim_fiyat = _decimal(satir.get('birim_fiyat'), 'birim fiyat')
+        kdv_orani = int(_decimal(satir.get('kdv_orani') or VARSAYILAN_KDV_ORANI, 'KDV oranı'))
+
+        kalemler.append(FaturaKalem(
+            urun_id=urun_id,
+            urun_adi=urun_adi[:100],
+            miktar=int(miktar),
+            birim_fiyat=birim_fiyat.quantize(Decimal('0.01')),
+            kdv_orani=kdv_orani,
+            sira_no=sira,
+        ))
+
+    fatura = Fatura(
+        fatura_no=fatura_no,
+        cari_id=cari_id,
+        fatura_tarihi=fatura_tarihi,
+        fatura_tipi='Alis',
+        durum=durum,
+        iskonto_orani=_decimal(ham.get('iskonto_orani') or 0, 'iskonto').quantize(Decimal('0.01')),
+        aciklama=f"İçe aktarıldı: {ham.get('satici') or fatura_no}"[:500],
+    )
+    return fatura, kalemler
+
+
+def _kaydet_batch(batch: list[tuple[Fatura, list[FaturaKalem], dict]], user: User) -> None:
+    """
+    Batch'i tek transaction'da kaydeder; hata olursa faturaları tek tek dener.
+
+    Veritabanı hataları (çakışma, alan taşması vb.) her fatura için kendi
+    savepoint'inde yakalanıp rapora yazılır; önceki batch'lerde kaydedilenler
+    raporda kalır, içe aktarma yarıda kesilmez.
+    """
+    try:
+        with transaction.atomic():
+            bulk_create_faturalar([(fatura, kalemler) for fatura, kalemler, _ in batch], user)
+        for _, _, rapor in batch:
+            rapor['basarili'] += 1
+        return
+    except (DatabaseError, ValidationError) as e:
+        logger.warning(f"İçe aktarma batch'i tek tek kaydedilecek: {str(e)}")
+
+    for fatura, kalemler, rapor in batch:
+        fatura.pk = None
+        for kalem in kalemler:
+            kalem.pk = None
+        try:
+            with transaction.atomic():
+                bulk_create_faturalar([(fatura, kalemler)], user)
+            rapor['basarili'] += 1
+        except IntegrityError:
+            _reddet(rapor, fatura.fatura_no, "Bu fatura numarası zaten kayıtlı.")
+        except DatabaseError as e:
+            logger.warning(f"İçe aktarılan fatura kaydedilemedi ({fatura.fatura_no}): {str(e)}")
+            _reddet(rapor, fatura.fatura_no, "Kaydedilemedi: tutar veya miktar izin verilen sınırları aşıyor olabilir.")
+        except ValidationError as e:
+            _reddet(rapor, fatura.fatura_no, '; '.join(e.messages))
+
+
+def import_alis_faturalari(
+    dosyalar: list,
+    user: User,
+    durum: str = 'AcikHesap',
+    request: Optional[HttpRequest] = None,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> list[dict]:
+    """
+    UBL XML ve CSV dosyalarındaki alış faturalarını içe aktarır.
+
+    Bu fonksiyon:
+    - Ürün ve cari indekslerini bir kez oluşturur
+    - Dosyaları artımlı okuyup her faturayı doğrular
+    - Geçerli faturaları batch'ler halinde stok ve cari hareketleriyle kaydeder
+    - Tek bir audit log kaydı tutar
+
+    Args:
+        dosyalar: `name` özniteliği olan ve okunabilir dosya objeleri (UploadedFile vb.)
+        user: İşlemi yapan kullanıcı
+        durum: Faturaların durumu ('AcikHesap' veya 'KasadanKapanacak')
+        request: HTTP request (audit log için opsiyonel)
+        batch_size: Tek transaction'da kaydedilecek fatura sayısı
+
+    Returns:
+        Dosya başına rapor listesi: {'dosya', 'toplam', 'basarili', 'reddedilen': [{'fatura_no', 'sebep'}]}
+    """
+    urun_index = UrunIndex()
+    cari_index = CariIndex()
+    raporlar = []
+    batch: list[tuple[Fatura, list[FaturaKalem], dict]] = []
+    gorulen_nolar: set[str] = set()
+
+    for dosya in dosyalar:
+        dosya_adi = getattr(dosya, 'name', str(dosya))
+        rapor = _yeni_rapor(dosya_adi)
+        raporlar.append(rapor)
+
+        uzanti = dosya_adi.rsplit('.', 1)[-1].lower() if '.' in dosya_adi else ''
+        if uzanti == 'xml':
+            okuyucu = iter_ubl_faturalar(dosya)
+        elif uzanti == 'csv':
+            okuyucu = iter_csv_faturalar(dosya)
+        else:
+            _reddet(rapor, '-', "Desteklenmeyen dosya türü (sadece .xml ve .csv).")
+            continue
+
+        try:
+            for ham in okuyucu:
+                rapor['toplam'] += 1
+                fatura_no = (ham.get('fatura_no') or '').strip()
+                try:
+                    if fatura_no in gorulen_nolar:
+                        raise ValidationError("Aynı fatura numarası bu içe aktarımda birden fazla kez geçiyor.")
+                    fatura, kalemler = _hazirla(ham, urun_index, cari_index, durum)
+                except ValidationError as e:
+                    _reddet(rapor, fatura_no, '; '.join(e.messages))
+                    continue
+                gorulen_nolar.add(fatura_no)
+                batch.append((fatura, kalemler, rapor))
+
+                if len(batch) >= batch_size:
+                    _batch_kontrol_et_ve_kaydet(batch, user)
+                    batch = []
+        except DefusedXmlException:
+            _reddet(rapor, '-', "Dosya okunamadı: entity tanımı içeren XML kabul edilmez.")
+        except (ET.ParseError, csv.Error, UnicodeDecodeError) as e:
+            _reddet(rapor, '-', f"Dosya okunamadı: {str(e)}")
+
+    if batch:
+        _batch_kontrol_et_ve_kaydet(batch, user)
+
+    basarili = sum(r['basarili'] for r in raporlar)
+    reddedilen = sum(len(r['reddedilen']) for r in raporlar)
+    log_action(
+        user,
+        'create',
+        None,
+        f'Alış faturası içe aktarma: {len(raporlar)} dosya, {basarili} fatura eklendi, {reddedilen} reddedildi',
+        request
+    )
+    return raporlar
+
+
+def _batch_kontrol_et_ve_kaydet(batch: list[tuple[Fatura, list[FaturaKalem], dict]], user: User) -> None:
+    """Daha önce kayıtlı fatura numaralarını tek sorguyla eleyip batch'i kaydeder."""
+    mevcut = set(Fatura.objects.filter(
+        fatura_no__in=[fatura.fatura_no for fatura, _, _ in batch]
+    ).values_list('fatura_no', flat=True))
+
+    kaydedilecek = []
+    for fatura, kalemler, rapor in batch:
+        if fatura.fatura_no in mevcut:
+            _reddet(rapor, fatura.fatura_no, "Bu fatura numarası zaten kayıtlı.")
+        else:
+            kaydedilecek.append((fatura, kalemler, rapor))
+
+    if kaydedilecek:
+        _kaydet_batch(kaydedilecek, user)
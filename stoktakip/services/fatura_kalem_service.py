@@ -343,7 +343,7 @@ def add_fatura_kalemler_from_post_data(
                 sira_no=kalem_sayisi + 1
             )
             
-            kalem.full_clean()
+            # save() doğrulaması sorgusuzdur (hizli_dogrula); ayrıca full_clean çağrılmaz
             kalem.save()
             
             kalem_sayisi += 1
@@ -8,6 +8,7 @@ from django.db import transaction
 from django.core.exceptions import ValidationError
 from fatura.models import Fatura
 from fatura.forms import FaturaForm
+from stoktakip.model_utils import dogrulanmis_kayit
 from stoktakip.services.stok_service import create_stok_hareketleri_from_fatura, delete_stok_hareketleri_for_fatura
 from stoktakip.services.cari_service import create_or_update_cari_hareketi_from_fatura, delete_cari_hareketi_for_fatura
 from accounts.utils import log_action
@@ -230,19 +231,20 @@ def copy_fatura(
         olusturan=user
     )
     
-    # Kalemleri kopyala
-    for kalem in fatura.kalemler.all():
-        FaturaKalem.objects.create(
-            fatura=yeni_fatura,
-            urun=kalem.urun,
-            urun_adi=kalem.urun_adi,
-            miktar=kalem.miktar,
-            birim_fiyat=kalem.birim_fiyat,
-            kdv_orani=kalem.kdv_orani,
-            kdv_tutari=kalem.kdv_tutari,
-            toplam_tutar=kalem.toplam_tutar,
-            sira_no=kalem.sira_no
-        )
+    # Kalemleri kopyala (kaynak kalemler zaten doğrulanmış)
+    with dogrulanmis_kayit():
+        for kalem in fatura.kalemler.all():
+            FaturaKalem.objects.create(
+                fatura=yeni_fatura,
+                urun_id=kalem.urun_id,
+                urun_adi=kalem.urun_adi,
+                miktar=kalem.miktar,
+                birim_fiyat=kalem.birim_fiyat,
+                kdv_orani=kalem.kdv_orani,
+                kdv_tutari=kalem.kdv_tutari,
+                toplam_tutar=kalem.toplam_tutar,
+                sira_no=kalem.sira_no
+            )
     
     # Toplamları hesapla
     yeni_fatura.hesapla_toplamlar()
@@ -0,0 +1,247 @@
+"""
+Toplu fatura oluşturma servisi (wrapper).
+
+Bu modül, birden fazla faturanın kalemleriyle birlikte set bazlı olarak
+oluşturulması için iş mantığını içerir:
+
+- Kalem ve fatura toplamları Python'da, Fatura.hesapla_toplamlar ile aynı
+  kurallarla hesaplanır (kalem başına kayıt + yeniden toplama yapılmaz).
+- Fatura, kalem, stok hareketi ve cari hareketleri bulk_create ile eklenir.
+- Numarası verilmemiş faturalara (tip, tarih) grubu başına ardışık fatura
+  numarası atanır; numaralar kilitlenen FaturaNoSayaci satırından ayrılır,
+  eşzamanlı satışlar aynı numarayı alamaz.
+
+İçe aktarma, hızlı satış ve siparişten toplu faturalandırma gibi yüksek
+hacimli akışlar bu servisi kullanır.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from cari.models import CariHareketi
+from fatura.models import Fatura, FaturaKalem, FaturaNoSayaci
+from stok.models import StokHareketi
+
+VARSAYILAN_KDV_ORANI = 20
+
+
+def hesapla_kalem_tutarlari(birim_fiyat, miktar: int, kdv_orani: int) -> tuple[Decimal, Decimal]:
+    """
+    Kalemin KDV hariç toplamını ve KDV tutarını FaturaKalem.save ile aynı
+    yuvarlama kurallarıyla hesaplar.
+
+    Args:
+        birim_fiyat: KDV hariç birim fiyat
+        miktar: Miktar
+        kdv_orani: KDV oranı (%)
+
+    Returns:
+        (ara_toplam, kdv_tutari) tuple
+    """
+    ara_toplam = (Decimal(str(birim_fiyat)) * Decimal(str(miktar))).quantize(
+        Decimal('0.01'), rounding=ROUND_HALF_UP
+    )
+    kdv_tutari = (ara_toplam * (Decimal(str(kdv_orani)) / Decimal('100'))).quantize(
+        Decimal('0.01'), rounding=ROUND_HALF_UP
+    )
+    return ara_toplam, kdv_tutari
+
+
+def hesapla_fatura_toplamlari(kalemler: Iterable[FaturaKalem], iskonto_orani) -> dict:
+    """
+    Fatura toplamlarını Fatura.hesapla_toplamlar ile aynı kurallarla hesaplar.
+
+    Args:
+        kalemler: Tutarları hesaplanmış FaturaKalem objeleri
+        iskonto_orani: İskonto oranı (%)
+
+    Returns:
+        toplam_tutar, kdv_tutari, iskonto_tutari, genel_toplam alanlarını içeren dict
+    """
+    toplam_tutar = Decimal('0.00')
+    kdv_tutari = Decimal('0.00')
+    for kalem in kalemler:
+        toplam_tutar += kalem.toplam_tutar
+        kdv_tutari += kalem.kdv_tutari
+
+    genel_toplam_brut = toplam_tutar + kdv_tutari
+    iskonto_tutari = Decimal('0.00')
+    if iskonto_orani and Decimal(str(iskonto_orani)) > 0:
+        iskonto_tutari = (genel_toplam_brut * (Decimal(str(iskonto_orani)) / Decimal('100'))).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
+
+    return {
+        'toplam_tutar': toplam_tutar,
+        'kdv_tutari': kdv_tutari,
+        'iskonto_tutari': iskonto_tutari,
+        'genel_toplam': genel_toplam_brut - iskonto_tutari,
+    }
+
+
+def _mevcut_son_no(arama_pattern: str) -> int:
+    """Önekle başlayan en büyük fatura numarası (önce uzunluk, sonra değer; 999 sonrası da doğru sıralanır)."""
+    son_no = Fatura.objects.filter(
+        fatura_no__startswith=arama_pattern
+    ).annotate(
+        no_uzunluk=Length('fatura_no')
+    ).order_by('-no_uzunluk', '-fatura_no').values_list('fatura_no', flat=True).first()
+    if son_no:
+        try:
+            return int(son_no.split('-')[-1])
+        except (ValueError, IndexError):
+            return 0
+    return 0
+
+
+@transaction.atomic
+def siradaki_fatura_nolari(fatura_tipi: str, tarih, adet: int) -> list[str]:
+    """
+    Verilen tip ve tarih için ardışık `adet` fatura numarası ayırır.
+
+    Tüm fatura numaraları buradan ayrılır (tekil kayıtta
+    Fatura.olustur_fatura_no da bunu çağırır). Önek başına sayaç satırı
+    çağıran transaction bitene kadar kilitli kalır; aynı gün fatura kesen
+    kasalar ve formlar sırayla numara alır. Sayaç, sayaçtan önce verilmiş
+    (veya elle girilmiş) numaraların gerisinde kalmışsa mevcut en büyük
+    numaradan devam edilir.
+
+    Args:
+        fatura_tipi: 'Satis' veya 'Alis'
+        tarih: Fatura tarihi
+        adet: Üretilecek numara sayısı
+
+    Returns:
+        Fatura numaraları listesi
+    """
+    prefix = 'SATIS' if fatura_tipi == 'Satis' else 'ALIS'
+    arama_pattern = f"{prefix}-{tarih.year}{tarih.month:02d}{tarih.day:02d}-"
+
+    # Satır yoksa oluşturulur; eşzamanlı oluşturmada get_or_create kilitli okumaya düşer
+    sayac, _ = FaturaNoSayaci.objects.select_for_update().get_or_create(onek=arama_pattern)
+    baslangic = max(sayac.son_no, _mevcut_son_no(arama_pattern)) + 1
+    sayac.son_no = baslangic + adet - 1
+    sayac.save(update_fields=['son_no', 'guncelleme_tarihi'])
+
+    return [f"{arama_pattern}{no:03d}" for no in range(baslangic, baslangic + adet)]
+
+
+def _fatura_tarihi_datetime(fatura: Fatura):
+    return timezone.make_aware(datetime.combine(fatura.fatura_tarihi, time.min))
+
+
+@transaction.atomic
+def bulk_create_faturalar(
+    fatura_kalemleri: list[tuple[Fatura, list[FaturaKalem]]],
+    user: Optional[User] = None,
+    batch_size: int = 500
+) -> list[Fatura]:
+    """
+    Faturaları kalemleri, stok hareketleri ve cari hareketleriyle birlikte
+    set bazlı olarak oluşturur.
+
+    Bu fonksiyon:
+    - Kalem tutarlarını ve fatura toplamlarını bellekte hesaplar
+    - Numarası olmayan faturalara ardışık numara atar
+    - Faturaları, kalemleri, stok ve cari hareketlerini bulk_create ile ekler
+
+    Model save() çağrılmadığı için clean() kuralları burada elle uygulanır.
+
+    Args:
+        fatura_kalemleri: (kaydedilmemiş Fatura, kaydedilmemiş FaturaKalem listesi) çiftleri
+        user: İşlemi yapan kullanıcı (opsiyonel)
+        batch_size: bulk_create batch büyüklüğü
+
+    Returns:
+        Oluşturulan Fatura objeleri (pk ve toplamlar dolu)
+
+    Raises:
+        ValidationError: Bir kalem veya hareket model kurallarını ihlal ederse
+        IntegrityError: Elle verilen fatura numarası zaten kullanılmışsa
+    """
+    if not fatura_kalemleri:
+        return []
+
+    # 1) Kalem tutarları ve fatura toplamları
+    numarasizlar = defaultdict(list)
+    for fatura, kalemler in fatura_kalemleri:
+        for sira, kalem in enumerate(kalemler, start=1):
+            if kalem.kdv_orani is None:
+                kalem.kdv_orani = VARSAYILAN_KDV_ORANI
+            kalem.toplam_tutar, kalem.kdv_tutari = hesapla_kalem_tutarlari(
+                kalem.birim_fiyat, kalem.miktar, kalem.kdv_orani
+            )
+            if not kalem.sira_no:
+                kalem.sira_no = sira
+            kalem.clean()
+
+        for alan, deger in hesapla_fatura_toplamlari(kalemler, fatura.iskonto_orani).items():
+            setattr(fatura, alan, deger)
+        if not fatura.olusturan_id and user is not None:
+            fatura.olusturan = user
+        if not fatura.fatura_no:
+            numarasizlar[(fatura.fatura_tipi, fatura.fatura_tarihi)].append(fatura)
+
+    # 2) Fatura numaraları - (tip, tarih) grubu başına tek sayaç kilidi
+    for (fatura_tipi, tarih), faturalar in numarasizlar.items():
+        for fatura, fatura_no in zip(faturalar, siradaki_fatura_nolari(fatura_tipi, tarih, len(faturalar))):
+            fatura.fatura_no = fatura_no
+
+    # 3) Faturalar ve kalemler
+    faturalar = [fatura for fatura, _ in fatura_kalemleri]
+    Fatura.objects.bulk_create(faturalar, batch_size=batch_size)
+
+    tum_kalemler = []
+    for fatura, kalemler in fatura_kalemleri:
+        for kalem in kalemler:
+            kalem.fatura = fatura
+            tum_kalemler.append(kalem)
+    FaturaKalem.objects.bulk_create(tum_kalemler, batch_size=batch_size)
+
+    # 4) Stok ve cari hareketleri (stok_service / cari_service ile aynı kurallar)
+    stok_hareketleri = []
+    cari_hareketleri = []
+    for fatura, kalemler in fatura_kalemleri:
+        islem_turu = 'giriş' if fatura.fatura_tipi == 'Alis' else 'çıkış'
+        olusturan = user or fatura.olusturan
+        for kalem in kalemler:
+            if not kalem.urun_id:
+                continue
+            hareket = StokHareketi(
+                urun_id=kalem.urun_id,
+                islem_turu=islem_turu,
+                miktar=kalem.miktar,
+                aciklama=f"Fatura: {fatura.fatura_no}",
+                olusturan=olusturan
+            )
+            hareket.clean()
+            stok_hareketleri.append(hareket)
+
+        if fatura.cari_id and fatura.durum == 'AcikHesap' and fatura.genel_toplam > 0:
+            hareket = CariHareketi(
+                cari_id=fatura.cari_id,
+                hareket_turu='satis_faturasi' if fatura.fatura_tipi == 'Satis' else 'alis_faturasi',
+                tutar=fatura.genel_toplam,
+                aciklama=f"Fatura: {fatura.fatura_no}",
+                belge_no=fatura.fatura_no,
+                tarih=_fatura_tarihi_datetime(fatura),
+                olusturan=olusturan
+            )
+            hareket.clean()
+            cari_hareketleri.append(hareket)
+
+    StokHareketi.objects.bulk_create(stok_hareketleri, batch_size=batch_size)
+    CariHareketi.objects.bulk_create(cari_hareketleri, batch_size=batch_size)
+
+    # bulk_create signal tetiklemez; barkod indeksindeki stokları elle geçersiz kıl
+    from stoktakip.services.barkod_index_service import urun_versiyonlarini_artir
+    degisen_urunler = {hareket.urun_id for hareket in stok_hareketleri}
+    transaction.on_commit(lambda: urun_versiyonlarini_artir(degisen_urunler))
+
+    return faturalar
@@ -0,0 +1,238 @@
+"""
+Toplu fiyat güncelleme servisi (wrapper).
+
+"X kategorisine %12 zam" gibi fiyat değişikliklerini ürün ürün kaydetmek
+yerine set bazlı uygular:
+
+- Hedef ürünler kategori, fiyat aralığı ve tedarikçiye (alış faturalarında
+  geçtiği cari) göre tek sorguyla seçilir.
+- Yeni fiyat veritabanı ifadesi olarak hesaplanır; önizleme ve uygulama aynı
+  ifadeyi kullanır.
+- Uygulamada yeni fiyatlar tek INSERT ... SELECT ile fiyat geçmişine
+  (UrunFiyatGecmisi) yazılır, ürünler aynı ifadeyle tek UPDATE ile güncellenir.
+
+Bir tarihteki fiyat, fiyat geçmişinin (urun, tarih) indeksinden okunur.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import (
+    Avg, Count, DateTimeField, DecimalField, Exists, ExpressionWrapper, F, IntegerField, OuterRef, QuerySet,
+    Subquery, Value
+)
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
+
+from fatura.models import FaturaKalem
+from stok.models import FiyatGuncellemeIslemi, Urun, UrunFiyatGecmisi
+
+YUVARLAMA_ADIMLARI = ('0.01', '0.05', '0.10', '0.25', '0.50', '1.00')
+
+
+@dataclass
+class FiyatKurali:
+    """Toplu fiyat güncelleme kuralı."""
+    alan: str = 'fiyat'
+    islem: str = 'yuzde'
+    deger: Decimal = Decimal('0')
+    kategori_id: Optional[int] = None
+    min_fiyat: Optional[Decimal] = None
+    max_fiyat: Optional[Decimal] = None
+    tedarikci_id: Optional[int] = None
+    yuvarlama: Decimal = Decimal('0.01')
+
+    def dogrula(self) -> None:
+        """
+        Raises:
+            ValidationError: Kural geçersizse
+        """
+        if self.alan not in dict(FiyatGuncellemeIslemi.ALAN_CHOICES):
+            raise ValidationError("Geçersiz fiyat alanı.")
+        if self.islem not in dict(FiyatGuncellemeIslemi.ISLEM_CHOICES):
+            raise ValidationError("Geçersiz işlem.")
+        if self.islem == 'yuzde' and self.deger <= Decimal('-100'):
+            raise ValidationError("Yüzde indirim -100'den büyük olmalıdır.")
+        if self.islem == 'sabit' and self.deger < 0:
+            raise ValidationError("Fiyat negatif olamaz.")
+        if self.yuvarlama <= 0:
+            raise ValidationError("Yuvarlama adımı pozitif olmalıdır.")
+        if self.min_fiyat is not None and self.max_fiyat is not None and self.min_fiyat > self.max_fiyat:
+            raise ValidationError("Minimum fiyat maksimum fiyattan büyük olamaz.")
+
+    def ozet(self) -> str:
+        """Kuralın okunabilir özeti (işlem kaydında saklanır)."""
+        alan = dict(FiyatGuncellemeIslemi.ALAN_CHOICES)[self.alan]
+        if self.islem == 'yuzde':
+            degisim = f"%{self.deger:+}"
+        elif self.islem == 'tutar':
+            degisim = f"{self.deger:+} ₺"
+        else:
+            degisim = f"= {self.deger} ₺"
+        filtreler = []
+        if self.kategori_id:
+            filtreler.append(f"kategori #{self.kategori_id}")
+        if self.min_fiyat is not None:
+            filtreler.append(f"{alan} >= {self.min_fiyat}")
+        if self.max_fiyat is not None:
+            filtreler.append(f"{alan} <= {self.max_fiyat}")
+        if self.tedarikci_id:
+            filtreler.append(f"tedarikçi #{self.tedarikci_id}")
+        return f"{alan} {degisim} ({', '.join(filtreler) or 'tüm ürünler'}, yuvarlama {self.yuvarlama})"
+
+
+def _hedef_urunler(kural: FiyatKurali) -> QuerySet:
+    queryset = Urun.objects.all()
+    if kural.kategori_id:
+        queryset = queryset.filter(kategori_id=kural.kategori_id)
+    if kural.min_fiyat is not None:
+        queryset = queryset.filter(**{f'{kural.alan}__gte': kural.min_fiyat})
+    if kural.max_fiyat is not None:
+        queryset = queryset.filter(**{f'{kural.alan}__lte': kural.max_fiyat})
+    if kural.tedarikci_id:
+        queryset = queryset.filter(Exists(FaturaKalem.objects.filter(
+            urun_id=OuterRef('pk'),
+            fatura__cari_id=kural.tedarikci_id,
+            fatura__fatura_tipi='Alis',
+        )))
+    return queryset
+
+
+def _yeni_fiyat_ifadesi(kural: FiyatKurali):
+    cikti = DecimalField(max_digits=12, decimal_places=4)
+    if kural.islem == 'yuzde':
+        carpan = (Decimal('100') + kural.deger) / Decimal('100')
+        ifade = F(kural.alan) * Value(carpan, output_field=cikti)
+    elif kural.islem == 'tutar':
+        ifade = F(kural.alan) + Value(kural.deger, output_field=cikti)
+    else:
+        ifade = Value(kural.deger, output_field=cikti)
+    # Yuvarlama adımına göre yuvarla, negatif fiyat oluşmasın
+    adim = Value(kural.yuvarlama, output_field=cikti)
+    ifade = ExpressionWrapper(Round(ExpressionWrapper(ifade / adim, output_field=cikti)) * adim, output_field=cikti)
+    return Greatest(ifade, Value(Decimal('0'), output_field=cikti), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def fiyat_guncelleme_onizleme(kural: FiyatKurali, ornek_sayisi: int = 50) -> dict:
+    """
+    Kuralın etkileyeceği ürünleri ve yeni fiyatları veritabanına yazmadan hesaplar.
+
+    Args:
+        kural: Fiyat kuralı
+        ornek_sayisi: Döndürülecek örnek satır sayısı
+
+    Returns:
+        {'urun_sayisi', 'degisen_sayisi', 'ortalama_eski', 'ortalama_yeni', 'ornekler': [...]}
+    """
+    kural.dogrula()
+    queryset = _hedef_urunler(kural).annotate(yeni_fiyat=_yeni_fiyat_ifadesi(kural))
+    ozet = queryset.aggregate(
+        urun_sayisi=Count('id'),
+        ortalama_eski=Avg(kural.alan),
+        ortalama_yeni=Avg('yeni_fiyat'),
+    )
+    ozet['degisen_sayisi'] = queryset.exclude(**{kural.alan: F('yeni_fiyat')}).count()
+    ozet['ornekler'] = list(queryset.order_by('ad').values('id', 'ad', 'barkod', kural.alan, 'yeni_fiyat')[:ornek_sayisi])
+    for satir in ozet['ornekler']:
+        satir['eski_fiyat'] = satir.pop(kural.alan)
+    return ozet
+
+
+@transaction.atomic
+def toplu_fiyat_guncelle(kural: FiyatKurali, user: Optional[User] = None) -> FiyatGuncellemeIslemi:
+    """
+    Kuralı uygular: fiyat geçmişini tek INSERT ... SELECT ile yazar, ürünleri
+    tek UPDATE ile günceller.
+
+    Satırlar Python'a taşınmaz; geçmiş ve UPDATE aynı fiyat ifadesini kullanır.
+    Fiyatı değişmeyen ürünler için geçmiş kaydı oluşturulmaz.
+
+    Args:
+        kural: Fiyat kuralı
+        user: İşlemi yapan kullanıcı
+
+    Returns:
+        Oluşturulan FiyatGuncellemeIslemi (etkilenen_urun_sayisi dolu)
+    """
+    kural.dogrula()
+    islem = FiyatGuncellemeIslemi.objects.create(
+        aciklama=kural.ozet()[:500],
+        alan=kural.alan,
+        islem=kural.islem,
+        deger=kural.deger,
+        olusturan=user,
+    )
+
+    # Hedef satırlar kilitlenir; geçmiş ve UPDATE aynı değerleri görür
+    fiyatlar = {'fiyat': F('fiyat'), 'alis_fiyati': F('alis_fiyati'), kural.alan: F('yeni_fiyat')}
+    secim = (
+        _hedef_urunler(kural).select_for_update()
+        .annotate(yeni_fiyat=_yeni_fiyat_ifadesi(kural))
+        .exclude(**{kural.alan: F('yeni_fiyat')})
+        .order_by()
+        .annotate(
+            gecmis_fiyat=fiyatlar['fiyat'],
+            gecmis_alis_fiyati=fiyatlar['alis_fiyati'],
+            gecmis_tarih=Value(timezone.now(), output_field=DateTimeField()),
+            gecmis_islem=Value(islem.pk, output_field=IntegerField()),
+            gecmis_degistiren=Value(user.pk if user else None, output_field=IntegerField()),
+        )
+        .values_list('id', 'gecmis_fiyat', 'gecmis_alis_fiyati', 'gecmis_tarih', 'gecmis_islem', 'gecmis_degistiren')
+    )
+    sql, params = secim.query.sql_with_params()
+    connection = connections[secim.db]
+    meta = UrunFiyatGecmisi._meta
+    sutunlar = ', '.join(
+        connection.ops.quote_name(meta.get_field(alan).column)
+        for alan in ('urun', 'fiyat', 'alis_fiyati', 'tarih', 'islem', 'degistiren')
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {connection.ops.quote_name(meta.db_table)} ({sutunlar}) {sql}', params)
+        etkilenen = cursor.rowcount
+
+    if etkilenen:
+        Urun.objects.filter(
+            pk__in=Subquery(UrunFiyatGecmisi.objects.filter(islem=islem).order_by().values('urun_id'))
+        ).update(**{kural.alan: _yeni_fiyat_ifadesi(kural)})
+
+    islem.etkilenen_urun_sayisi = etkilenen
+    islem.save(update_fields=['etkilenen_urun_sayisi'])
+
+    # update() signal tetiklemez; barkod indeksindeki fiyatlar tek damgayla geçersiz kılınır
+    if etkilenen:
+        from stoktakip.services.barkod_index_service import fiyat_versiyonunu_artir
+        transaction.on_commit(fiyat_versiyonunu_artir)
+    return islem
+
+
+def urun_fiyatlari_tarihte(urun_ids: Iterable[int], tarih: datetime) -> dict[int, dict]:
+    """
+    Ürünlerin verilen tarihte geçerli olan satış ve alış fiyatlarını döndürür.
+
+    Her ürün için tarihten önceki en son fiyat geçmişi satırı (urun, tarih)
+    indeksinden okunur; tüm ürünler tek sorguda çözülür.
+
+    Args:
+        urun_ids: Ürün ID'leri
+        tarih: Tarih (datetime)
+
+    Returns:
+        {urun_id: {'fiyat', 'alis_fiyati', 'tarih'}} (o tarihte kaydı olmayan ürünler dönmez)
+    """
+    son_kayit = UrunFiyatGecmisi.objects.filter(
+        urun_id=OuterRef('pk'), tarih__lte=tarih
+    ).order_by('-tarih', '-id')
+    satirlar = Urun.objects.filter(id__in=list(urun_ids)).annotate(
+        gecmis_fiyat=Subquery(son_kayit.values('fiyat')[:1]),
+        gecmis_alis_fiyati=Subquery(son_kayit.values('alis_fiyati')[:1]),
+        gecmis_tarih=Subquery(son_kayit.values('tarih')[:1]),
+    ).values_list('id', 'gecmis_fiyat', 'gecmis_alis_fiyati', 'gecmis_tarih')
+    return {
+        urun_id: {'fiyat': fiyat, 'alis_fiyati': alis_fiyati, 'tarih': gecerlilik}
+        for urun_id, fiyat, alis_fiyati, gecerlilik in satirlar
+        if gecerlilik is not None
+    }
@@ -0,0 +1,260 @@
+"""
+Cari fiyat listesi servisi (wrapper).
+
+Müşteriye özel (B2B) satış fiyatlarını toplu olarak çözer:
+
+- Carinin fiyat listesi (cariye özel liste, yoksa grubunun listesi) cache'ten
+  okunur; liste atamaları değiştiğinde atama versiyonu artırılır.
+- Liste fiyatı ve iskonto kuralından oluşan (liste, ürün) sonucu, listenin
+  versiyon damgasıyla birlikte cache'lenir. Liste, kalemleri veya kuralları
+  değiştiğinde damga artırılır (cari/signals.py); eski kayıtlar okunmaz.
+- Cache'te olmayan ürünler için liste fiyatları tek sorguda okunur. Ürün
+  başına sorgu yapılmaz.
+- Ürünün kategorisi değişirse kategori kuralları en geç cache süresi
+  (FIYAT_LISTESI_CACHE_TIMEOUT) dolduğunda yansır.
+- Damgalar ancak paylaşımlı cache'te (Redis) tüm worker'lara ulaşır.
+  LocMemCache'te damga yalnızca değişikliği yapan süreçte artar; diğer
+  süreçler eski fiyatı verebileceğinden kayıtlar yalnızca birkaç saniye
+  (FIYAT_LISTESI_YEREL_CACHE_TIMEOUT) tutulur.
+
+Efektif fiyat = listedeki fiyat, yoksa standart fiyattan kural iskontosu
+düşülmüş fiyat, yoksa standart fiyat. Fiyatlar Urun.fiyat gibi KDV dahildir.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+
+from cari.models import Cari, FiyatListesi, FiyatListesiKalemi, IskontoKurali
+from stok.models import Urun
+from stoktakip.cache_utils import paylasimli_cache_mi
+
+ATAMA_VERSIYON_KEY = 'fiyat_listesi_atama_versiyon'
+
+
+def _cache_timeout() -> int:
+    if paylasimli_cache_mi():
+        return getattr(settings, 'FIYAT_LISTESI_CACHE_TIMEOUT', 3600)
+    # Süreç içi cache: diğer worker'lar damga artışını görmez, eskime süresi kısa tutulur
+    return getattr(settings, 'FIYAT_LISTESI_YEREL_CACHE_TIMEOUT', 5)
+
+
+def _liste_versiyon_key(liste_id: int) -> str:
+    return f'fiyat_listesi_versiyon_{liste_id}'
+
+
+def _versiyon_artir(key: str) -> None:
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key add ile incr arasında silindiyse
+        cache.set(key, 1, timeout=None)
+
+
+def fiyat_listesi_versiyonunu_artir(liste_ids: Iterable[int]) -> None:
+    """
+    Fiyat listelerinin cache'lenmiş (liste, ürün) sonuçlarını geçersiz kılar.
+
+    Signal tetiklemeyen toplu işlemlerden (bulk_create, update) sonra elle
+    çağrılmalıdır.
+
+    Args:
+        liste_ids: Değişen fiyat listelerinin ID'leri
+    """
+    for liste_id in set(liste_ids):
+        if liste_id:
+            _versiyon_artir(_liste_versiyon_key(liste_id))
+
+
+def fiyat_listesi_atamalarini_gecersiz_kil() -> None:
+    """Cari → fiyat listesi eşleşmelerini geçersiz kılar (liste/cari grubu değiştiğinde)."""
+    _versiyon_artir(ATAMA_VERSIYON_KEY)
+
+
+def cari_fiyat_listesi_id(cari_id: Optional[int]) -> Optional[int]:
+    """
+    Cariye uygulanacak aktif fiyat listesinin ID'sini döndürür.
+
+    Cariye doğrudan atanmış liste, grubunun listesinden önce gelir; aynı
+    seviyede önceliği yüksek olan seçilir. Sonuç cache'lenir.
+
+    Args:
+        cari_id: Cari ID'si
+
+    Returns:
+        Fiyat listesi ID'si veya liste yoksa None
+    """
+    if not cari_id:
+        return None
+    atama_versiyon = cache.get(ATAMA_VERSIYON_KEY, 0)
+    key = f'cari_fiyat_listesi_{cari_id}_{atama_versiyon}'
+    liste_id = cache.get(key)
+    if liste_id is None:
+        grup_id = Cari.objects.filter(pk=cari_id).values_list('grup_id', flat=True).first()
+        filtre = Q(cari_id=cari_id)
+        if grup_id:
+            filtre |= Q(cari_grubu_id=grup_id)
+        liste_id = FiyatListesi.objects.filter(filtre, aktif=True).order_by(
+            F('cari_id').asc(nulls_last=True),  # cariye özel liste, grup listesinden önce
+            '-oncelik', 'id'
+        ).values_list('id', flat=True).first() or 0
+        cache.set(key, liste_id, _cache_timeout())
+    return liste_id or None
+
+
+def _liste_kurallari(liste_id: int, versiyon: int) -> list[tuple]:
+    key = f'fiyat_listesi_kurallari_{liste_id}_{versiyon}'
+    kurallar = cache.get(key)
+    if kurallar is None:
+        kurallar = list(IskontoKurali.objects.filter(fiyat_listesi_id=liste_id).order_by('id').values_list(
+            'urun_id', 'kategori_id', 'iskonto_orani'
+        ))
+        cache.set(key, kurallar, _cache_timeout())
+    return kurallar
+
+
+def _kural_iskontosu(kurallar: list[tuple], urun_id: int, kategori_id: Optional[int]) -> Decimal:
+    """Ürüne özel > kategori > genel kural sırasıyla ilk eşleşen iskonto oranı."""
+    kategori_orani = genel_orani = None
+    for kural_urun_id, kural_kategori_id, oran in kurallar:
+        if kural_urun_id:
+            if kural_urun_id == urun_id:
+                return oran
+        elif kural_kategori_id:
+            if kategori_orani is None and kural_kategori_id == kategori_id:
+                kategori_orani = oran
+        elif genel_orani is None:
+            genel_orani = oran
+    if kategori_orani is not None:
+        return kategori_orani
+    return genel_orani if genel_orani is not None else Decimal('0')
+
+
+def _liste_kayitlari(liste_id: int, urun_ids: list[int]) -> dict[int, tuple]:
+    """
+    (liste, ürün) sonuçlarını döndürür: {urun_id: (liste_fiyati veya None, iskonto_orani)}.
+
+    Cache'te olmayanlar tek sorguyla (liste fiyatı subquery ile) okunur.
+    """
+    versiyon = cache.get(_liste_versiyon_key(liste_id), 0)
+    anahtarlar = {urun_id: f'fiyat_listesi_{liste_id}_{versiyon}_urun_{urun_id}' for urun_id in urun_ids}
+    bulunan = cache.get_many(list(anahtarlar.values()))
+    kayitlar = {urun_id: bulunan[key] for urun_id, key in anahtarlar.items() if key in bulunan}
+
+    eksikler = [urun_id for urun_id in urun_ids if urun_id not in kayitlar]
+    if eksikler:
+        kurallar = _liste_kurallari(liste_id, versiyon)
+        liste_fiyati = FiyatListesiKalemi.objects.filter(
+            fiyat_listesi_id=liste_id, urun_id=OuterRef('pk')
+        ).values('fiyat')[:1]
+        satirlar = Urun.objects.filter(id__in=eksikler).annotate(
+            liste_fiyati=Subquery(liste_fiyati)
+        ).values_list('id', 'kategori_id', 'liste_fiyati')
+
+        yeni = {}
+        for urun_id, kategori_id, fiyat in satirlar:
+            kayit = (fiyat, Decimal('0') if fiyat is not None else _kural_iskontosu(kurallar, urun_id, kategori_id))
+            kayitlar[urun_id] = kayit
+            yeni[anahtarlar[urun_id]] = kayit
+        cache.set_many(yeni, _cache_timeout())
+    return kayitlar
+
+
+def efektif_fiyatlar(cari_id: Optional[int], standart_fiyatlar: dict[int, Decimal]) -> dict[int, dict]:
+    """
+    Ürünlerin cariye özel (efektif) satış fiyatlarını toplu olarak çözer.
+
+    Args:
+        cari_id: Cari ID'si (None ise standart fiyatlar döner)
+        standart_fiyatlar: {urun_id: Urun.fiyat} - çağıran zaten okuduğu fiyatları verir
+
+    Returns:
+        {urun_id: {'fiyat', 'standart_fiyat', 'iskonto_orani', 'kaynak'}}
+        kaynak: 'liste' (listede fiyat var), 'iskonto' (kural uygulandı) veya 'standart'
+    """
+    sonuc = {
+        urun_id: {'fiyat': fiyat, 'standart_fiyat': fiyat, 'iskonto_orani': Decimal('0'), 'kaynak': 'standart'}
+        for urun_id, fiyat in standart_fiyatlar.items()
+    }
+    liste_id = cari_fiyat_listesi_id(cari_id)
+    if not liste_id or not sonuc:
+        return sonuc
+
+    for urun_id, (liste_fiyati, iskonto_orani) in _liste_kayitlari(liste_id, list(sonuc)).items():
+        satir = sonuc[urun_id]
+        if liste_fiyati is not None:
+            satir['fiyat'] = liste_fiyati
+            satir['kaynak'] = 'liste'
+        elif iskonto_orani:
+            satir['fiyat'] = (
+                Decimal(satir['standart_fiyat']) * (Decimal('100') - iskonto_orani) / Decimal('100')
+            ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            satir['iskonto_orani'] = iskonto_orani
+            satir['kaynak'] = 'iskonto'
+    return sonuc
+
+
+@transaction.atomic
+def fiyat_listesi_kalemlerini_kaydet(liste: FiyatListesi, satirlar: list[tuple[str, str]]) -> dict:
+    """
+    Fiyat listesine ürün fiyatlarını toplu olarak ekler veya günceller.
+
+    Ürünler barkod veya ürün ID'si ile verilebilir; tümü tek sorguyla çözülür
+    ve kalemler tek bulk_create (çakışmada güncelle) ile yazılır.
+
+    Args:
+        liste: Fiyat listesi
+        satirlar: [(barkod veya ürün ID, fiyat metni), ...]
+
+    Returns:
+        {'kaydedilen': int, 'bulunamayan': [...], 'hatali': [...]}
+
+    Raises:
+        ValidationError: Hiç geçerli satır yoksa
+    """
+    fiyatlar: dict[str, Decimal] = {}
+    hatali = []
+    for anahtar, fiyat_metni in satirlar:
+        anahtar = (anahtar or '').strip()
+        try:
+            fiyat = Decimal(str(fiyat_metni).strip().replace(',', '.')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        except ArithmeticError:
+            fiyat = None
+        if not anahtar or fiyat is None or fiyat < 0:
+            hatali.append(anahtar or '?')
+            continue
+        fiyatlar[anahtar] = fiyat
+
+    idler = [int(anahtar) for anahtar in fiyatlar if anahtar.isdigit()]
+    urunler = Urun.objects.filter(Q(barkod__in=list(fiyatlar)) | Q(id__in=idler)).values_list('id', 'barkod')
+    barkod_ile = {barkod: urun_id for urun_id, barkod in urunler if barkod}
+    id_ile = {urun_id for urun_id, _ in urunler}
+
+    kalemler: dict[int, Decimal] = {}
+    bulunamayan = []
+    for anahtar, fiyat in fiyatlar.items():
+        # Barkod önce denenir (sayısal barkodlar ürün ID'siyle karışmasın)
+        urun_id = barkod_ile.get(anahtar) or (int(anahtar) if anahtar.isdigit() and int(anahtar) in id_ile else None)
+        if urun_id is None:
+            bulunamayan.append(anahtar)
+        else:
+            kalemler[urun_id] = fiyat
+    if not kalemler:
+        raise ValidationError("Geçerli fiyat satırı bulunamadı.")
+
+    FiyatListesiKalemi.objects.bulk_create(
+        [FiyatListesiKalemi(fiyat_listesi=liste, urun_id=urun_id, fiyat=fiyat) for urun_id, fiyat in kalemler.items()],
+        update_conflicts=True,
+        unique_fields=['fiyat_listesi', 'urun'],
+        update_fields=['fiyat'],
+        batch_size=1000,
+    )
+    # bulk_create signal tetiklemez
+    liste_id = liste.pk
+    transaction.on_commit(lambda: fiyat_listesi_versiyonunu_artir([liste_id]))
+    return {'kaydedilen': len(kalemler), 'bulunamayan': bulunamayan, 'hatali': hatali}
@@ -0,0 +1,168 @@
+"""
+Hızlı satış (POS) servisi (wrapper).
+
+Kasada barkodla oluşturulan sepet tek bir transaction içinde satışa çevrilir:
+
+- Sepetteki ürünler tek sorguyla okunur.
+- Sepet fiyatları KDV dahildir; her kalem ürünün kendi KDV oranıyla
+  (Urun.kdv_orani) KDV hariç birim fiyata çevrilir.
+- Satış faturası, kalemleri ve stok çıkışları bulk_create_faturalar ile
+  set bazlı eklenir (kalem başına save() ve toplam yeniden hesaplama yoktur).
+- Tahsilat, seçilen kasa/banka hesabına tek bir gelir hareketi olarak işlenir.
+
+Fatura 'KasadanKapanacak' durumunda oluşturulduğu için cari hareketi oluşmaz;
+müşteri seçimi opsiyoneldir (perakende satış).
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from cari.models import Cari
+from fatura.models import Fatura, FaturaKalem
+from finans.models import FinansHareketi, HesapKart
+from stok.models import Urun
+from stoktakip.model_utils import dogrulanmis_toplu_olustur
+from stoktakip.services.fatura_toplu_service import bulk_create_faturalar
+
+HIZLI_SATIS_KALEM_LIMIT = 200
+HIZLI_SATIS_HESAP_TIPLERI = ['kasa', 'banka', 'kredi_karti']
+
+
+def hizli_satis_hesaplari():
+    """Hızlı satışta tahsilat yapılabilecek aktif hesaplar (kasa önce)."""
+    hesaplar = HesapKart.objects.filter(durum=True, hesap_tipi__in=HIZLI_SATIS_HESAP_TIPLERI)
+    return sorted(hesaplar, key=lambda h: (h.hesap_tipi != 'kasa', h.ad))
+
+
+def _sepeti_birlestir(sepet: list[dict]) -> dict[int, dict]:
+    """Aynı ürünün birden fazla satırını tek satırda toplar (okutma sırası korunur)."""
+    satirlar: dict[int, dict] = {}
+    for satir in sepet:
+        try:
+            urun_id = int(satir.get('urun_id'))
+            miktar = int(satir.get('miktar', 1))
+        except (TypeError, ValueError):
+            raise ValidationError("Sepette geçersiz ürün veya miktar var.")
+        if urun_id <= 0 or miktar <= 0:
+            raise ValidationError("Sepette geçersiz ürün veya miktar var.")
+
+        kdv_dahil_fiyat = satir.get('kdv_dahil_fiyat')
+        if kdv_dahil_fiyat not in (None, ''):
+            try:
+                kdv_dahil_fiyat = Decimal(str(kdv_dahil_fiyat).replace(',', '.'))
+            except ArithmeticError:
+                raise ValidationError("Sepette geçersiz fiyat var.")
+            if kdv_dahil_fiyat < 0:
+                raise ValidationError("Fiyat negatif olamaz.")
+        else:
+            kdv_dahil_fiyat = None
+
+        mevcut = satirlar.get(urun_id)
+        if mevcut:
+            mevcut['miktar'] += miktar
+            if kdv_dahil_fiyat is not None:
+                mevcut['kdv_dahil_fiyat'] = kdv_dahil_fiyat
+        else:
+            satirlar[urun_id] = {'miktar': miktar, 'kdv_dahil_fiyat': kdv_dahil_fiyat}
+    return satirlar
+
+
+def _kdv_haric_fiyat(kdv_dahil_fiyat: Decimal, kdv_orani: int) -> Decimal:
+    if not kdv_orani:
+        return kdv_dahil_fiyat.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return (kdv_dahil_fiyat / (Decimal('1') + Decimal(str(kdv_orani)) / Decimal('100'))).quantize(
+        Decimal('0.01'), rounding=ROUND_HALF_UP
+    )
+
+
+@transaction.atomic
+def hizli_satis_olustur(
+    sepet: list[dict],
+    user: User,
+    hesap: HesapKart,
+    cari: Optional[Cari] = None,
+    iskonto_orani=0,
+    aciklama: str = ''
+) -> Fatura:
+    """
+    Hızlı satış sepetinden satış faturası, stok çıkışları ve kasa hareketini
+    tek transaction içinde oluşturur.
+
+    Args:
+        sepet: [{'urun_id': 1, 'miktar': 2, 'kdv_dahil_fiyat': '12.50'}, ...]
+               (kdv_dahil_fiyat verilmezse ürünün satış fiyatı kullanılır)
+        user: Satışı yapan kullanıcı
+        hesap: Tahsilatın işleneceği kasa/banka hesabı
+        cari: Müşteri (opsiyonel, perakende satışta boş)
+        iskonto_orani: Fatura iskonto oranı (%)
+        aciklama: Fatura açıklaması
+
+    Returns:
+        Oluşturulan Fatura
+
+    Raises:
+        ValidationError: Sepet boş/geçersizse, ürün bulunamazsa veya hesap pasifse
+    """
+    if not sepet:
+        raise ValidationError("Sepet boş.")
+    satirlar = _sepeti_birlestir(sepet)
+    if len(satirlar) > HIZLI_SATIS_KALEM_LIMIT:
+        raise ValidationError(f"Bir satışta en fazla {HIZLI_SATIS_KALEM_LIMIT} farklı ürün olabilir.")
+    if hesap is None or not hesap.durum:
+        raise ValidationError("Tahsilat için aktif bir kasa/banka hesabı seçilmelidir.")
+
+    try:
+        iskonto_orani = Decimal(str(iskonto_orani or 0))
+    except ArithmeticError:
+        raise ValidationError("Geçersiz iskonto oranı.")
+    if iskonto_orani < 0 or iskonto_orani > 100:
+        raise ValidationError("İskonto oranı 0 ile 100 arasında olmalıdır.")
+
+    # Ürünler tek sorguyla
+    urunler = Urun.objects.only('id', 'ad', 'fiyat', 'kdv_orani').in_bulk(list(satirlar))
+    bulunamayanlar = [urun_id for urun_id in satirlar if urun_id not in urunler]
+    if bulunamayanlar:
+        raise ValidationError(f"Ürün bulunamadı: {', '.join(map(str, bulunamayanlar))}")
+
+    kalemler = []
+    for urun_id, satir in satirlar.items():
+        urun = urunler[urun_id]
+        kdv_dahil_fiyat = satir['kdv_dahil_fiyat']
+        if kdv_dahil_fiyat is None:
+            kdv_dahil_fiyat = Decimal(str(urun.fiyat or 0))
+        kalemler.append(FaturaKalem(
+            urun_id=urun_id,
+            urun_adi=urun.ad[:100],
+            miktar=satir['miktar'],
+            kdv_orani=urun.kdv_orani,
+            birim_fiyat=_kdv_haric_fiyat(kdv_dahil_fiyat, urun.kdv_orani),
+        ))
+
+    fatura = Fatura(
+        cari=cari,
+        fatura_tarihi=timezone.localdate(),
+        fatura_tipi='Satis',
+        durum='KasadanKapanacak',
+        iskonto_orani=iskonto_orani,
+        aciklama=aciklama or 'Hızlı satış',
+    )
+    bulk_create_faturalar([(fatura, kalemler)], user=user)
+
+    if fatura.genel_toplam > 0:
+        hareket = FinansHareketi(
+            hareket_no=f"POS-{fatura.fatura_no}",
+            hesap=hesap,
+            hareket_tipi='gelir',
+            tutar=fatura.genel_toplam,
+            aciklama=f"Hızlı satış: {fatura.fatura_no}",
+            tarih=fatura.fatura_tarihi,
+            belge_no=fatura.fatura_no,
+            olusturan=user,
+        )
+        dogrulanmis_toplu_olustur(FinansHareketi, [hareket])
+
+    return fatura
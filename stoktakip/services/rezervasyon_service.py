@@ -0,0 +1,206 @@
+"""
+Sipariş stok rezervasyonu servisi (wrapper).
+
+Müşteri siparişleri oluşturulduğu anda stok ayırır; böylece aynı stok iki
+siparişe birden söz verilemez:
+
+- Ürün başına ayrılmış toplam miktar StokRezervasyonBakiyesi satırında tutulur.
+  Rezervasyon sırasında bu satırlar ürün ID sırasıyla kilitlenir ve F() ile
+  tek UPDATE'te güncellenir.
+- Satılabilir miktar (ATP) = mevcut stok - rezerve miktar. Stoklar tek
+  GROUP BY sorgusuyla, rezervler birincil anahtarla okunur; ürün başına ek
+  sorgu yapılmaz.
+- Rezervasyon sipariş reddedildiğinde/iptal edildiğinde serbest bırakılır,
+  sipariş faturalandırıldığında tüketilir (stok çıkışı faturayla yapılır).
+"""
+from typing import Iterable
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from musteri_paneli.models import Siparis, SiparisRezervasyonu, StokRezervasyonBakiyesi
+from stoktakip.services.stok_service import urun_stok_miktarlari
+
+REZERVE_EDEN_DURUMLAR = ('beklemede', 'onaylandi')
+
+
+def rezerve_miktarlar(urun_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Ürünlerin açık siparişlerce ayrılmış miktarlarını döndürür.
+
+    Args:
+        urun_ids: Ürün ID'leri
+
+    Returns:
+        {urun_id: rezerve_miktar} (rezervasyonu olmayan ürünler için 0)
+    """
+    urun_ids = list(urun_ids)
+    rezervler = {urun_id: 0 for urun_id in urun_ids}
+    rezervler.update(
+        StokRezervasyonBakiyesi.objects.filter(urun_id__in=urun_ids).values_list('urun_id', 'rezerve_miktar')
+    )
+    return rezervler
+
+
+def kullanilabilir_miktarlar(urun_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Ürünlerin satılabilir (available-to-promise) miktarlarını döndürür.
+
+    Args:
+        urun_ids: Ürün ID'leri
+
+    Returns:
+        {urun_id: mevcut stok - rezerve miktar}
+    """
+    urun_ids = list(urun_ids)
+    stoklar = urun_stok_miktarlari(urun_ids)
+    rezervler = rezerve_miktarlar(urun_ids)
+    return {urun_id: stoklar[urun_id] - rezervler[urun_id] for urun_id in urun_ids}
+
+
+def _bakiyeleri_guncelle(degisimler: dict[int, int]) -> None:
+    """Rezerve miktarları tek UPDATE ile (F() + CASE) değiştirir."""
+    degisimler = {urun_id: fark for urun_id, fark in degisimler.items() if fark}
+    if not degisimler:
+        return
+    StokRezervasyonBakiyesi.objects.filter(urun_id__in=degisimler).update(
+        rezerve_miktar=Case(
+            *[When(urun_id=urun_id, then=F('rezerve_miktar') + Value(fark)) for urun_id, fark in degisimler.items()],
+            default=F('rezerve_miktar'),
+            output_field=IntegerField(),
+        ),
+        guncelleme_tarihi=timezone.now(),
+    )
+
+
+def _bakiyeleri_kilitle(urun_ids: Iterable[int]) -> None:
+    urun_ids = sorted(set(urun_ids))
+    StokRezervasyonBakiyesi.objects.bulk_create(
+        [StokRezervasyonBakiyesi(urun_id=urun_id) for urun_id in urun_ids],
+        ignore_conflicts=True
+    )
+    # ID sırasıyla kilit: aynı ürünleri içeren eşzamanlı rezervasyonlar kilitlenmez (deadlock)
+    list(StokRezervasyonBakiyesi.objects.select_for_update().filter(urun_id__in=urun_ids).order_by('urun_id').values_list('urun_id'))
+
+
+@transaction.atomic
+def siparis_rezerve_et(siparis: Siparis, miktarlar: dict[int, int], stok_kontrolu: bool = True) -> None:
+    """
+    Sipariş için stok ayırır.
+
+    Args:
+        siparis: Sipariş
+        miktarlar: {urun_id: miktar}
+        stok_kontrolu: False ise satılabilir miktar aşılsa da rezerve edilir
+
+    Raises:
+        ValidationError: Satılabilir miktar yetersizse (hangi ürünlerde ne kadar kaldığı ile)
+            veya siparişin aynı üründe aktif rezervasyonu zaten varsa
+    """
+    miktarlar = {urun_id: miktar for urun_id, miktar in miktarlar.items() if miktar > 0}
+    if not miktarlar:
+        return
+
+    _bakiyeleri_kilitle(miktarlar)
+    if stok_kontrolu:
+        kullanilabilir = kullanilabilir_miktarlar(miktarlar)
+        yetersiz = {urun_id: kullanilabilir[urun_id] for urun_id, miktar in miktarlar.items()
+                    if miktar > kullanilabilir[urun_id]}
+        if yetersiz:
+            from stok.models import Urun
+            adlar = dict(Urun.objects.filter(id__in=yetersiz).values_list('id', 'ad'))
+            raise ValidationError(
+                "Yetersiz stok: " + ', '.join(
+                    f"{adlar.get(urun_id, urun_id)} (en fazla {max(miktar, 0)})" for urun_id, miktar in yetersiz.items()
+                )
+            )
+
+    try:
+        SiparisRezervasyonu.objects.bulk_create([
+            SiparisRezervasyonu(siparis=siparis, urun_id=urun_id, miktar=miktar)
+            for urun_id, miktar in miktarlar.items()
+        ])
+    except IntegrityError:
+        # siparisrezervasyonu_aktif_uniq: sipariş başka bir işlemle zaten rezerve edilmiş
+        raise ValidationError(f"{siparis.siparis_no} siparişi için aktif rezervasyon zaten var.")
+    _bakiyeleri_guncelle(miktarlar)
+
+
+def _rezervasyonlari_kapat(siparis_ids: list[int], yeni_durum: str) -> int:
+    rezervasyonlar = list(
+        SiparisRezervasyonu.objects.select_for_update().filter(
+            siparis_id__in=siparis_ids, durum='aktif'
+        ).values_list('id', 'urun_id', 'miktar')
+    )
+    if not rezervasyonlar:
+        return 0
+
+    degisimler: dict[int, int] = {}
+    for _, urun_id, miktar in rezervasyonlar:
+        degisimler[urun_id] = degisimler.get(urun_id, 0) - miktar
+    _bakiyeleri_kilitle(degisimler)
+    _bakiyeleri_guncelle(degisimler)
+    SiparisRezervasyonu.objects.filter(id__in=[r[0] for r in rezervasyonlar]).update(
+        durum=yeni_durum, kapanma_tarihi=timezone.now()
+    )
+    return len(rezervasyonlar)
+
+
+@transaction.atomic
+def siparis_rezervasyonunu_serbest_birak(siparis_ids: Iterable[int]) -> int:
+    """
+    Reddedilen / iptal edilen siparişlerin rezervasyonlarını serbest bırakır.
+
+    Args:
+        siparis_ids: Sipariş ID'leri
+
+    Returns:
+        Serbest bırakılan rezervasyon satırı sayısı
+    """
+    return _rezervasyonlari_kapat(list(siparis_ids), 'serbest')
+
+
+@transaction.atomic
+def siparis_rezervasyonunu_tuket(siparis_ids: Iterable[int]) -> int:
+    """
+    Faturalandırılan siparişlerin rezervasyonlarını tüketir.
+
+    Stok çıkışı faturayla yapıldığından rezerve miktar aynı transaction içinde düşülür.
+
+    Args:
+        siparis_ids: Sipariş ID'leri
+
+    Returns:
+        Tüketilen rezervasyon satırı sayısı
+    """
+    return _rezervasyonlari_kapat(list(siparis_ids), 'tuketildi')
+
+
+@transaction.atomic
+def siparis_durumunu_degistir(siparis: Siparis, yeni_durum: str) -> None:
+    """
+    Sipariş durumunu değiştirir ve rezervasyonları yeni duruma göre günceller.
+
+    Açık bir duruma (beklemede/onaylandi) geri alınan siparişler yeniden
+    rezerve edilir; reddedilen/iptal edilen siparişlerin rezervasyonu serbest
+    bırakılır. Faturalandırma için siparis_faturalandir kullanılmalıdır.
+
+    Args:
+        siparis: Sipariş
+        yeni_durum: Yeni durum
+
+    Raises:
+        ValidationError: Yeniden rezervasyon için stok yetersizse
+    """
+    eski_acik = siparis.durum in REZERVE_EDEN_DURUMLAR
+    yeni_acik = yeni_durum in REZERVE_EDEN_DURUMLAR
+    if eski_acik and not yeni_acik:
+        siparis_rezervasyonunu_serbest_birak([siparis.pk])
+    elif yeni_acik and not eski_acik:
+        miktarlar: dict[int, int] = {}
+        for urun_id, miktar in siparis.kalemler.values_list('urun_id', 'miktar'):
+            miktarlar[urun_id] = miktarlar.get(urun_id, 0) + miktar
+        siparis_rezerve_et(siparis, miktarlar)
+    siparis.durum = yeni_durum
@@ -0,0 +1,347 @@
+"""
+Stok sayımı oturum servisi (wrapper).
+
+Büyük depo sayımları tek bir POST'a sığmadığı için sayım bir oturum olarak
+yürütülür:
+
+- El terminalleri okutmaları partiler halinde, istedikleri zaman gönderir.
+  Her parti istemcinin ürettiği parti_no ile gelir; aynı parti ikinci kez
+  gönderilirse işlenmez (idempotent), bu yüzden bağlantı koptuğunda güvenle
+  tekrar denenebilir.
+- Oturum tamamlanana kadar açık kalır; sayım kaldığı yerden sürdürülebilir.
+- Mutabakatta tüm ürünlerin sistem stoku tek bir UPDATE ile sayım
+  satırlarına yazılır, farklar tek sorguyla okunur ve düzeltme hareketleri
+  bulk_create ile eklenir.
+"""
+from typing import Optional
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from stok.models import SayimOturumu, SayimPartisi, SayimSatiri, StokHareketi, Urun
+
+SAYIM_PARTI_LIMIT = 1000
+SAYIM_SATIR_SAYFA_BOYUTU = 500
+SAYIM_MAKS_MIKTAR = 10000000
+
+
+def sayim_oturumu_baslat(user: Optional[User], ad: str = '', aciklama: str = '') -> SayimOturumu:
+    """
+    Yeni bir sayım oturumu açar.
+
+    Args:
+        user: Oturumu açan kullanıcı
+        ad: Sayım adı (boşsa tarih ile üretilir)
+        aciklama: Açıklama
+
+    Returns:
+        Oluşturulan SayimOturumu
+    """
+    if not ad:
+        ad = f"Sayım {timezone.localtime():%d.%m.%Y %H:%M}"
+    return SayimOturumu.objects.create(ad=ad, aciklama=aciklama or None, olusturan=user)
+
+
+def _acik_oturumu_kilitle(oturum_id: int) -> SayimOturumu:
+    # Aynı oturuma eşzamanlı gelen partiler ve mutabakat sırayla işlenir
+    oturum = SayimOturumu.objects.select_for_update().filter(pk=oturum_id).first()
+    if oturum is None:
+        raise ValidationError("Sayım oturumu bulunamadı.")
+    if oturum.durum != 'acik':
+        raise ValidationError(f"Sayım oturumu {oturum.get_durum_display().lower()} durumda; okutma kabul edilmiyor.")
+    return oturum
+
+
+def _okutmalari_dogrula(okutmalar: list) -> list[dict]:
+    temiz = []
+    for okutma in okutmalar:
+        if not isinstance(okutma, dict):
+            raise ValidationError("Okutmalar nesne listesi olmalıdır.")
+        mod = okutma.get('mod') or 'ekle'
+        if mod not in ('ekle', 'ayarla'):
+            raise ValidationError("Okutma modu 'ekle' veya 'ayarla' olmalıdır.")
+        try:
+            miktar = int(okutma.get('miktar', 1))
+            urun_id = int(okutma['urun_id']) if okutma.get('urun_id') else None
+        except (TypeError, ValueError):
+            raise ValidationError("Okutmada geçersiz ürün veya miktar var.")
+        barkod = str(okutma.get('barkod') or '').strip()[:100]
+        if urun_id is None and not barkod:
+            raise ValidationError("Her okutmada urun_id veya barkod olmalıdır.")
+        if miktar < 0 or (mod == 'ekle' and miktar == 0) or miktar > SAYIM_MAKS_MIKTAR:
+            raise ValidationError("Okutmada geçersiz miktar var.")
+        temiz.append({'urun_id': urun_id, 'barkod': barkod, 'miktar': miktar, 'mod': mod})
+    return temiz
+
+
+@transaction.atomic
+def sayim_partisi_isle(
+    oturum_id: int,
+    parti_no: str,
+    okutmalar: list,
+    user: Optional[User] = None
+) -> dict:
+    """
+    Bir okutma partisini sayım oturumuna işler.
+
+    Okutmalar gönderildikleri sırayla uygulanır: 'ekle' sayılan miktarı
+    artırır (barkod okutma), 'ayarla' miktarı verilen değere eşitler (elle
+    düzeltme). Daha önce işlenmiş bir parti_no tekrar gelirse hiçbir şey
+    değişmez ve 'tekrar': True döner.
+
+    Args:
+        oturum_id: Sayım oturumu ID'si
+        parti_no: İstemcinin ürettiği benzersiz parti numarası (ör. UUID)
+        okutmalar: [{'urun_id': 1 | 'barkod': '869...', 'miktar': 1, 'mod': 'ekle'}, ...]
+        user: Partiyi gönderen kullanıcı
+
+    Returns:
+        {'parti_no', 'tekrar', 'islenen', 'bilinmeyen_barkodlar', 'bilinmeyen_urunler', 'satir_sayisi'}
+
+    Raises:
+        ValidationError: Oturum açık değilse veya parti geçersizse
+    """
+    parti_no = (parti_no or '').strip()
+    if not parti_no or len(parti_no) > 64:
+        raise ValidationError("Geçerli bir parti numarası gönderilmelidir.")
+    if not isinstance(okutmalar, list):
+        raise ValidationError("Okutmalar liste olmalıdır.")
+    if len(okutmalar) > SAYIM_PARTI_LIMIT:
+        raise ValidationError(f"Bir partide en fazla {SAYIM_PARTI_LIMIT} okutma gönderilebilir.")
+    okutmalar = _okutmalari_dogrula(okutmalar)
+
+    oturum = _acik_oturumu_kilitle(oturum_id)
+    if SayimPartisi.objects.filter(oturum=oturum, parti_no=parti_no).exists():
+        return {
+            'parti_no': parti_no,
+            'tekrar': True,
+            'islenen': 0,
+            'bilinmeyen_barkodlar': [],
+            'bilinmeyen_urunler': [],
+            'satir_sayisi': oturum.satirlar.count(),
+        }
+
+    # Barkodlar ve ürün ID'leri tek sorguyla çözülür
+    barkodlar = {o['barkod'] for o in okutmalar if o['urun_id'] is None}
+    idler = {o['urun_id'] for o in okutmalar if o['urun_id'] is not None}
+    bulunan = Urun.objects.filter(Q(id__in=idler) | Q(barkod__in=barkodlar)).values_list('id', 'barkod')
+    gecerli_idler = set()
+    barkod_ile = {}
+    for urun_id, barkod in bulunan:
+        gecerli_idler.add(urun_id)
+        if barkod:
+            barkod_ile[barkod] = urun_id
+
+    bilinmeyen_barkodlar = []
+    bilinmeyen_urunler = []
+    sirali = []
+    for okutma in okutmalar:
+        if okutma['urun_id'] is None:
+            urun_id = barkod_ile.get(okutma['barkod'])
+            if urun_id is None:
+                bilinmeyen_barkodlar.append(okutma['barkod'])
+                continue
+        else:
+            urun_id = okutma['urun_id']
+            if urun_id not in gecerli_idler:
+                bilinmeyen_urunler.append(urun_id)
+                continue
+        sirali.append((urun_id, okutma))
+
+    mevcut = {
+        satir.urun_id: satir
+        for satir in SayimSatiri.objects.filter(oturum=oturum, urun_id__in={u for u, _ in sirali})
+    }
+    yeni = {}
+    for urun_id, okutma in sirali:
+        satir = mevcut.get(urun_id) or yeni.get(urun_id)
+        if satir is None:
+            satir = yeni[urun_id] = SayimSatiri(oturum=oturum, urun_id=urun_id, miktar=0)
+        if okutma['mod'] == 'ayarla':
+            satir.miktar = okutma['miktar']
+        else:
+            satir.miktar = min(satir.miktar + okutma['miktar'], SAYIM_MAKS_MIKTAR)
+
+    simdi = timezone.now()
+    guncellenen = list(mevcut.values())
+    for satir in guncellenen:
+        satir.guncelleme_tarihi = simdi
+    SayimSatiri.objects.bulk_update(guncellenen, ['miktar', 'guncelleme_tarihi'], batch_size=500)
+    SayimSatiri.objects.bulk_create(list(yeni.values()), batch_size=500)
+
+    SayimPartisi.objects.create(oturum=oturum, parti_no=parti_no, okutma_sayisi=len(okutmalar), olusturan=user)
+    SayimOturumu.objects.filter(pk=oturum.pk).update(guncelleme_tarihi=simdi)
+
+    return {
+        'parti_no': parti_no,
+        'tekrar': False,
+        'islenen': len(sirali),
+        'bilinmeyen_barkodlar': bilinmeyen_barkodlar,
+        'bilinmeyen_urunler': bilinmeyen_urunler,
+        'satir_sayisi': oturum.satirlar.count(),
+    }
+
+
+def sayim_satirlari(oturum: SayimOturumu, sayfa: int = 1, sayfa_boyutu: int = SAYIM_SATIR_SAYFA_BOYUTU) -> dict:
+    """
+    Oturumun sayılan ürünlerini sayfa sayfa döndürür (kaldığı yerden devam için).
+
+    Args:
+        oturum: Sayım oturumu
+        sayfa: Sayfa numarası (1'den başlar)
+        sayfa_boyutu: Sayfa başına satır
+
+    Returns:
+        {'satirlar': [...], 'sayfa', 'sonraki_sayfa'}; her satır id, ad, barkod,
+        birim, kategori, miktar ve stok (sistem stoku) içerir
+    """
+    baslangic = (sayfa - 1) * sayfa_boyutu
+    satirlar = list(
+        oturum.satirlar.order_by('id').values(
+            'urun_id', 'miktar', 'urun__ad', 'urun__barkod', 'urun__birim', 'urun__kategori__ad'
+        )[baslangic:baslangic + sayfa_boyutu + 1]
+    )
+    sonraki_var = len(satirlar) > sayfa_boyutu
+    satirlar = satirlar[:sayfa_boyutu]
+
+    from stoktakip.services.stok_service import urun_stok_miktarlari
+    stoklar = urun_stok_miktarlari(s['urun_id'] for s in satirlar)
+    return {
+        'satirlar': [
+            {
+                'id': s['urun_id'],
+                'ad': s['urun__ad'],
+                'barkod': s['urun__barkod'] or '',
+                'birim': s['urun__birim'],
+                'kategori': s['urun__kategori__ad'] or '',
+                'miktar': s['miktar'],
+                'stok': stoklar.get(s['urun_id'], 0),
+            }
+            for s in satirlar
+        ],
+        'sayfa': sayfa,
+        'sonraki_sayfa': sayfa + 1 if sonraki_var else None,
+    }
+
+
+def _sistem_stoku_subquery():
+    return Subquery(
+        StokHareketi.objects.filter(urun_id=OuterRef('urun_id')).order_by().values('urun_id').annotate(
+            net=Sum(Case(
+                When(islem_turu='giriş', then=F('miktar')),
+                default=-F('miktar'),
+                output_field=IntegerField(),
+            ))
+        ).values('net'),
+        output_field=IntegerField(),
+    )
+
+
+@transaction.atomic
+def sayim_mutabakat(oturum_id: int, user: Optional[User] = None, batch_size: int = 1000) -> dict:
+    """
+    Sayım oturumunu tamamlar: sayılan miktarları sistem stoku ile karşılaştırır
+    ve fark bulunan ürünler için düzeltme hareketleri oluşturur.
+
+    Sistem stokları tek bir UPDATE ile sayım satırlarına yazılır; farklar tek
+    sorguyla okunur ve hareketler bulk_create ile eklenir. Ürün başına sorgu
+    yapılmaz.
+
+    Args:
+        oturum_id: Sayım oturumu ID'si
+        user: Sayımı tamamlayan kullanıcı
+        batch_size: bulk_create batch büyüklüğü
+
+    Returns:
+        {'oturum', 'sayilan', 'fark_sayisi', 'giris_toplam', 'cikis_toplam'}
+
+    Raises:
+        ValidationError: Oturum açık değilse veya hiç ürün sayılmadıysa
+    """
+    oturum = _acik_oturumu_kilitle(oturum_id)
+    satirlar = SayimSatiri.objects.filter(oturum=oturum)
+    sayilan = satirlar.update(sistem_miktari=Coalesce(_sistem_stoku_subquery(), 0))
+    if not sayilan:
+        raise ValidationError("Bu oturumda hiç ürün sayılmadı.")
+
+    hareketler = []
+    giris_toplam = cikis_toplam = 0
+    farklar = satirlar.exclude(miktar=F('sistem_miktari')).values_list('urun_id', 'miktar', 'sistem_miktari')
+    for urun_id, gercek_miktar, sistem_miktari in farklar.iterator(chunk_size=batch_size):
+        fark = gercek_miktar - sistem_miktari
+        if fark > 0:
+            giris_toplam += fark
+        else:
+            cikis_toplam += -fark
+        hareketler.append(StokHareketi(
+            urun_id=urun_id,
+            islem_turu='giriş' if fark > 0 else 'çıkış',
+            miktar=abs(fark),
+            aciklama=f'Stok sayımı ({oturum.ad}) - Mevcut: {sistem_miktari}, Gerçek: {gercek_miktar}'[:500],
+            olusturan=user,
+        ))
+    StokHareketi.objects.bulk_create(hareketler, batch_size=batch_size)
+
+    oturum.durum = 'tamamlandi'
+    oturum.sayilan_urun_sayisi = sayilan
+    oturum.fark_sayisi = len(hareketler)
+    oturum.tamamlanma_tarihi = timezone.now()
+    oturum.save(update_fields=['durum', 'sayilan_urun_sayisi', 'fark_sayisi', 'tamamlanma_tarihi', 'guncelleme_tarihi'])
+
+    # bulk_create signal tetiklemez; barkod indeksindeki stokları elle geçersiz kıl
+    from stoktakip.services.barkod_index_service import urun_versiyonlarini_artir
+    degisen_urunler = [hareket.urun_id for hareket in hareketler]
+    transaction.on_commit(lambda: urun_versiyonlarini_artir(degisen_urunler))
+
+    return {
+        'oturum': oturum,
+        'sayilan': sayilan,
+        'fark_sayisi': len(hareketler),
+        'giris_toplam': giris_toplam,
+        'cikis_toplam': cikis_toplam,
+    }
+
+
+@transaction.atomic
+def sayim_oturumu_iptal(oturum_id: int) -> SayimOturumu:
+    """
+    Açık sayım oturumunu stok hareketi oluşturmadan iptal eder.
+
+    Args:
+        oturum_id: Sayım oturumu ID'si
+
+    Returns:
+        İptal edilen SayimOturumu
+    """
+    oturum = _acik_oturumu_kilitle(oturum_id)
+    oturum.durum = 'iptal'
+    oturum.save(update_fields=['durum', 'guncelleme_tarihi'])
+    return oturum
+
+
+def tek_seferde_sayim(sayim_verileri: dict[int, int], user: Optional[User] = None, ad: str = '') -> dict:
+    """
+    Tek istekte gelen {urun_id: gercek_miktar} sayımını bir oturum üzerinden
+    işler ve hemen mutabakat yapar (klasik sayım formu için).
+
+    Args:
+        sayim_verileri: {urun_id: gerçek miktar}
+        user: Sayımı yapan kullanıcı
+        ad: Sayım adı
+
+    Returns:
+        sayim_mutabakat sonucu
+    """
+    with transaction.atomic():
+        oturum = sayim_oturumu_baslat(user, ad=ad)
+        okutmalar = [
+            {'urun_id': urun_id, 'miktar': miktar, 'mod': 'ayarla'}
+            for urun_id, miktar in sayim_verileri.items()
+        ]
+        for i in range(0, len(okutmalar), SAYIM_PARTI_LIMIT):
+            sayim_partisi_isle(oturum.pk, f'form-{i // SAYIM_PARTI_LIMIT + 1}', okutmalar[i:i + SAYIM_PARTI_LIMIT], user)
+        return sayim_mutabakat(oturum.pk, user)
@@ -0,0 +1,210 @@
+"""
+Müşteri siparişleri için servis katmanı (wrapper).
+
+Sipariş oluşturma ve siparişlerin toplu olarak faturaya dönüştürülmesi için
+iş mantığını içerir:
+
+- Sipariş oluşturulurken ürünler tek sorguyla okunur, fiyatlar müşterinin
+  fiyat listesine göre toplu çözülür, kalemler bulk_create ile eklenir ve
+  toplam tek SQL ile hesaplanır (kalem sayısıyla doğrusal).
+- Faturalar, kalemler, stok ve cari hareketleri bulk_create_faturalar ile set
+  bazlı oluşturulur; sipariş başına kalem kaydı ve toplam yeniden hesaplama
+  yapılmaz.
+"""
+from typing import Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cari.models import Cari
+from fatura.models import Fatura, FaturaKalem
+from musteri_paneli.models import Siparis, SiparisKalem
+from stok.models import Urun
+from stoktakip.services.fatura_toplu_service import bulk_create_faturalar
+from stoktakip.services.fiyat_listesi_service import efektif_fiyatlar
+from stoktakip.services.rezervasyon_service import siparis_rezerve_et, siparis_rezervasyonunu_tuket
+
+FATURALANDIRILABILIR_DURUMLAR = ('beklemede', 'onaylandi')
+SIPARIS_KALEM_LIMIT = 500
+
+
+def _kalemleri_coz(kalemler: list[dict]) -> tuple[dict[int, int], dict]:
+    """
+    Sipariş satırlarını ({urun_id: miktar}, {urun_id: fiyat}) olarak çözer.
+
+    Satırlar ürün ID'si (urun_id) veya barkod ile verilebilir; tüm ürünler tek
+    sorguyla okunur. Aynı ürünün birden fazla satırı toplanır.
+    """
+    satirlar = []
+    hatalar = []
+    for sira, kalem in enumerate(kalemler, start=1):
+        if not isinstance(kalem, dict):
+            hatalar.append(f"{sira}. satır geçersiz.")
+            continue
+        try:
+            miktar = int(kalem.get('miktar'))
+        except (TypeError, ValueError):
+            miktar = 0
+        urun_id = kalem.get('urun_id')
+        barkod = str(kalem.get('barkod') or '').strip()
+        if miktar <= 0:
+            hatalar.append(f"{sira}. satır: miktar pozitif tam sayı olmalıdır.")
+        elif urun_id in (None, '') and not barkod:
+            hatalar.append(f"{sira}. satır: ürün (urun_id veya barkod) belirtilmeli.")
+        else:
+            try:
+                urun_id = int(urun_id) if urun_id not in (None, '') else None
+            except (TypeError, ValueError):
+                hatalar.append(f"{sira}. satır: geçersiz ürün.")
+                continue
+            satirlar.append((sira, urun_id, barkod, miktar))
+    if hatalar:
+        raise ValidationError(hatalar)
+
+    idler = {urun_id for _, urun_id, _, _ in satirlar if urun_id is not None}
+    barkodlar = {barkod for _, urun_id, barkod, _ in satirlar if urun_id is None}
+    fiyatlar = {}
+    by_barkod = {}
+    urunler = Urun.objects.filter(Q(id__in=idler) | Q(barkod__in=barkodlar)).values_list('id', 'barkod', 'fiyat')
+    for urun_id, barkod, fiyat in urunler:
+        fiyatlar[urun_id] = fiyat
+        if barkod:
+            by_barkod[barkod] = urun_id
+
+    miktarlar: dict[int, int] = {}
+    for sira, urun_id, barkod, miktar in satirlar:
+        cozulen = (urun_id if urun_id in fiyatlar else None) if urun_id is not None else by_barkod.get(barkod)
+        if cozulen is None:
+            hatalar.append(f"{sira}. satır: ürün bulunamadı ({urun_id if urun_id is not None else barkod}).")
+            continue
+        miktarlar[cozulen] = miktarlar.get(cozulen, 0) + miktar
+    if hatalar:
+        raise ValidationError(hatalar)
+    return miktarlar, fiyatlar
+
+
+@transaction.atomic
+def musteri_siparisi_olustur(cari: Cari, kalemler: list[dict], notlar: str = '') -> Siparis:
+    """
+    Müşteri siparişini kalemleri ve stok rezervasyonuyla birlikte oluşturur.
+
+    Maliyet kalem sayısıyla doğrusaldır: ürünler tek sorguyla okunur, kalemler
+    bulk_create ile eklenir, toplam tek SQL ile hesaplanır.
+
+    Args:
+        cari: Siparişi veren müşteri
+        kalemler: [{'urun_id' veya 'barkod': ..., 'miktar': ...}, ...]
+        notlar: Müşteri notu
+
+    Returns:
+        Oluşturulan Siparis (toplam_tutar dolu)
+
+    Raises:
+        ValidationError: Satır hatalıysa, ürün bulunamazsa veya stok yetersizse
+    """
+    if not kalemler:
+        raise ValidationError("Lütfen en az bir ürün seçiniz.")
+    if len(kalemler) > SIPARIS_KALEM_LIMIT:
+        raise ValidationError(f"Bir siparişte en fazla {SIPARIS_KALEM_LIMIT} satır olabilir.")
+
+    miktarlar, standart_fiyatlar = _kalemleri_coz(kalemler)
+    fiyatlar = {urun_id: fiyat['fiyat'] for urun_id, fiyat in efektif_fiyatlar(cari.pk, standart_fiyatlar).items()}
+
+    siparis = Siparis.objects.create(cari=cari, notlar=notlar)
+    SiparisKalem.objects.bulk_create([
+        SiparisKalem(
+            siparis=siparis,
+            urun_id=urun_id,
+            miktar=miktar,
+            birim_fiyat=fiyatlar[urun_id],
+            toplam_tutar=miktar * fiyatlar[urun_id],
+        )
+        for urun_id, miktar in miktarlar.items()
+    ])
+
+    # Sipariş onay beklerken stok bu sipariş için ayrılır
+    siparis_rezerve_et(siparis, miktarlar)
+    siparis.hesapla_toplam()
+    return siparis
+
+
+@transaction.atomic
+def siparisleri_faturalandir(
+    siparis_ids: Iterable[int],
+    user: Optional[User] = None,
+    durumlar: Iterable[str] = FATURALANDIRILABILIR_DURUMLAR
+) -> dict:
+    """
+    Siparişleri tek transaction içinde satış faturasına dönüştürür.
+
+    - Siparişler satır kilidiyle okunur; aynı sipariş iki kez faturalandırılamaz.
+    - Tüm siparişlerin kalemleri tek sorguyla okunur.
+    - Faturalar, kalemler, stok ve cari hareketleri set bazlı eklenir.
+    - Rezervasyonlar tüketilir ve sipariş durumları tek UPDATE ile güncellenir.
+
+    Args:
+        siparis_ids: Sipariş ID'leri
+        user: İşlemi yapan kullanıcı
+        durumlar: Faturalandırılabilecek sipariş durumları
+
+    Returns:
+        {'faturalar': [Fatura, ...], 'siparisler': [Siparis, ...], 'atlanan': [(siparis_no veya id, sebep), ...]}
+    """
+    siparis_ids = list(dict.fromkeys(siparis_ids))
+    siparisler = list(
+        Siparis.objects.select_for_update().filter(pk__in=siparis_ids).order_by('pk')
+    )
+    atlanan = [(siparis_id, 'Sipariş bulunamadı') for siparis_id in
+               set(siparis_ids) - {siparis.pk for siparis in siparisler}]
+
+    uygun = []
+    for siparis in siparisler:
+        if siparis.durum not in durumlar:
+            atlanan.append((siparis.siparis_no, f"Durum uygun değil ({siparis.get_durum_display()})"))
+        else:
+            uygun.append(siparis)
+
+    kalemler_by_siparis: dict[int, list[FaturaKalem]] = {siparis.pk: [] for siparis in uygun}
+    satirlar = SiparisKalem.objects.filter(siparis_id__in=kalemler_by_siparis).order_by('siparis_id', 'id').values(
+        'siparis_id', 'urun_id', 'urun__ad', 'urun__kdv_orani', 'miktar', 'birim_fiyat'
+    )
+    for satir in satirlar:
+        kalemler_by_siparis[satir['siparis_id']].append(FaturaKalem(
+            urun_id=satir['urun_id'],
+            urun_adi=satir['urun__ad'][:100],
+            miktar=satir['miktar'],
+            birim_fiyat=satir['birim_fiyat'],
+            kdv_orani=satir['urun__kdv_orani'],
+        ))
+
+    bugun = timezone.now().date()
+    fatura_kalemleri = []
+    faturalanan = []
+    for siparis in uygun:
+        kalemler = kalemler_by_siparis[siparis.pk]
+        if not kalemler:
+            atlanan.append((siparis.siparis_no, 'Siparişte kalem yok'))
+            continue
+        fatura = Fatura(
+            cari_id=siparis.cari_id,
+            fatura_tarihi=bugun,
+            fatura_tipi='Satis',
+            durum='AcikHesap',
+            aciklama=f"Sipariş No: {siparis.siparis_no} üzerinden otomatik oluşturuldu.",
+            olusturan=user,
+        )
+        fatura_kalemleri.append((fatura, kalemler))
+        faturalanan.append(siparis)
+
+    faturalar = bulk_create_faturalar(fatura_kalemleri, user=user)
+
+    faturalanan_ids = [siparis.pk for siparis in faturalanan]
+    siparis_rezervasyonunu_tuket(faturalanan_ids)
+    Siparis.objects.filter(pk__in=faturalanan_ids).update(durum='faturalandi', guncelleme_tarihi=timezone.now())
+    for siparis in faturalanan:
+        siparis.durum = 'faturalandi'
+
+    return {'faturalar': faturalar, 'siparisler': faturalanan, 'atlanan': atlanan}
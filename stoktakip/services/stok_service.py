@@ -5,9 +5,10 @@ Bu modül, stok hareketlerinin oluşturulması ve yönetimi için
 iş mantığını içerir. View ve Model katmanlarından bağımsızdır.
 """
 from django.db import transaction
+from django.db.models import Q, Sum
 from stok.models import StokHareketi
 from fatura.models import Fatura
-from typing import Optional
+from typing import Iterable, Optional
 from django.contrib.auth.models import User
 
 
@@ -99,3 +100,104 @@ def create_stok_hareketi(
         aciklama=aciklama,
         olusturan=user
     )
+
+
+def urun_stok_miktarlari(urun_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Birden fazla ürünün mevcut stokunu tek sorguyla hesaplar.
+
+    Urun.mevcut_stok property'si ürün başına iki aggregate sorgusu çalıştırır;
+    listelerde bu fonksiyon kullanılmalıdır.
+
+    Args:
+        urun_ids: Ürün ID'leri
+
+    Returns:
+        {urun_id: mevcut_stok} dict'i (hareketi olmayan ürünler için 0)
+    """
+    urun_ids = list(urun_ids)
+    stoklar = {urun_id: 0 for urun_id in urun_ids}
+    if not urun_ids:
+        return stoklar
+
+    satirlar = StokHareketi.objects.filter(urun_id__in=urun_ids).values('urun_id').annotate(
+        giris=Sum('miktar', filter=Q(islem_turu='giriş')),
+        cikis=Sum('miktar', filter=Q(islem_turu='çıkış')),
+    )
+    for satir in satirlar:
+        stoklar[satir['urun_id']] = (satir['giris'] or 0) - (satir['cikis'] or 0)
+    return stoklar
+
+
+@transaction.atomic
+def toplu_stok_hareketi_olustur(
+    urun_ids: Iterable[int],
+    islem_turu: str,
+    miktar: int,
+    aciklama: str,
+    user: Optional[User] = None,
+    batch_size: int = 1000
+) -> dict:
+    """
+    Birden fazla ürün için aynı miktarda stok giriş/çıkış hareketini set bazlı oluşturur.
+
+    - Ürünler tek sorguda, ID sırasıyla satır kilidi (SELECT ... FOR UPDATE)
+      alınarak okunur; eşzamanlı toplu çıkışlar aynı stoku ikinci kez düşemez.
+    - Stoklar tek GROUP BY sorgusuyla okunur (urun_stok_miktarlari).
+    - Hareketler bulk_create ile eklenir.
+
+    Çıkışta stoku yetersiz olan ürünler atlanır.
+
+    Args:
+        urun_ids: Ürün ID'leri
+        islem_turu: 'giriş' veya 'çıkış'
+        miktar: Ürün başına miktar
+        aciklama: Hareket açıklaması
+        user: İşlemi yapan kullanıcı (opsiyonel)
+        batch_size: bulk_create batch büyüklüğü
+
+    Returns:
+        {'islenen': [Urun, ...], 'yetersiz_stok': [Urun, ...], 'bulunamayan': [id, ...]}
+    """
+    from stok.models import Urun
+
+    if islem_turu not in ['giriş', 'çıkış']:
+        raise ValueError("İşlem türü 'giriş' veya 'çıkış' olmalıdır.")
+    if miktar <= 0:
+        raise ValueError("Miktar 0'dan büyük olmalıdır.")
+
+    urun_ids = list(dict.fromkeys(urun_ids))
+    # ID sırasıyla kilit: aynı ürünleri içeren eşzamanlı işlemler kilitlenmez (deadlock)
+    urunler = list(
+        Urun.objects.select_for_update().filter(id__in=urun_ids).order_by('id').only('id', 'ad', 'birim')
+    )
+    bulunan_idler = {urun.id for urun in urunler}
+    bulunamayan = [urun_id for urun_id in urun_ids if urun_id not in bulunan_idler]
+
+    islenen = urunler
+    yetersiz_stok = []
+    if islem_turu == 'çıkış':
+        stoklar = urun_stok_miktarlari(bulunan_idler)
+        islenen = [urun for urun in urunler if stoklar[urun.id] >= miktar]
+        yetersiz_stok = [urun for urun in urunler if stoklar[urun.id] < miktar]
+
+    StokHareketi.objects.bulk_create(
+        [
+            StokHareketi(
+                urun_id=urun.id,
+                islem_turu=islem_turu,
+                miktar=miktar,
+                aciklama=aciklama,
+                olusturan=user
+            )
+            for urun in islenen
+        ],
+        batch_size=batch_size
+    )
+
+    # bulk_create signal tetiklemez; barkod indeksindeki stokları elle geçersiz kıl
+    from stoktakip.services.barkod_index_service import urun_versiyonlarini_artir
+    degisen_urunler = [urun.id for urun in islenen]
+    transaction.on_commit(lambda: urun_versiyonlarini_artir(degisen_urunler))
+
+    return {'islenen': islenen, 'yetersiz_stok': yetersiz_stok, 'bulunamayan': bulunamayan}
@@ -0,0 +1,132 @@
+"""
+Ürün arama servisi (wrapper).
+
+Urun.arama_metni alanı (ad + barkod + kategori adının Türkçe katlanmış hali)
+üzerinde arama yapar:
+
+- Sorgu da aynı şekilde katlanır; "SEKER", "şeker" ve "Şeker" aynı sonucu verir.
+- Her kelime arama metninde geçmelidir (pg_trgm GIN indeksi LIKE '%...%'
+  sorgularını indeksten karşılar, kategori join'i gerekmez).
+- PostgreSQL'de yazım hatalarına karşı trigram kelime benzerliği de kullanılır.
+- Sonuçlar alaka düzeyine göre sıralanır: tam barkod eşleşmesi, başlangıç
+  eşleşmesi, trigram benzerliği, ardından ürün adı.
+
+Stok listesi, ürün seçiciler (fatura, toplu stok işlemi, sayım) ve müşteri
+sipariş formu bu servisi kullanır. Seçiciler ürünleri urun_autocomplete ile
+sayfa sayfa, ihtiyaç oldukça yükler.
+"""
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, QuerySet, Value, When
+from django.contrib.postgres.search import TrigramWordSimilarity
+
+from stok.models import Urun
+from stoktakip.search_utils import turkce_katla
+from stoktakip.services.stok_service import urun_stok_miktarlari
+
+
+def _postgres_mi() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def urun_ara(sorgu: str, queryset: Optional[QuerySet] = None, limit: Optional[int] = None) -> QuerySet:
+    """
+    Ürünleri Türkçe duyarlı arama ile filtreleyip alaka düzeyine göre sıralar.
+
+    Args:
+        sorgu: Kullanıcının girdiği arama metni
+        queryset: Filtrelenecek Urun queryset'i (None ise tüm ürünler)
+        limit: Maksimum sonuç sayısı (None ise sınırsız)
+
+    Returns:
+        `arama_skoru` annotate edilmiş ve skora göre sıralanmış Urun queryset'i.
+        Sorgu boşsa queryset olduğu gibi (ad sırasıyla) döner.
+    """
+    if queryset is None:
+        queryset = Urun.objects.all()
+
+    katli_sorgu = turkce_katla(sorgu)
+    if not katli_sorgu:
+        return queryset.order_by('ad')
+
+    kelime_eslesmesi = Q()
+    for kelime in katli_sorgu.split():
+        kelime_eslesmesi &= Q(arama_metni__contains=kelime)
+
+    skor = Case(
+        When(barkod=sorgu.strip(), then=Value(100.0)),
+        When(arama_metni__startswith=katli_sorgu, then=Value(10.0)),
+        When(arama_metni__contains=katli_sorgu, then=Value(5.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+    if _postgres_mi():
+        # Yazım hatası toleransı: "%>" operatörü de trigram indeksini kullanır
+        queryset = queryset.filter(
+            kelime_eslesmesi | Q(arama_metni__trigram_word_similar=katli_sorgu)
+        ).annotate(
+            arama_skoru=skor + TrigramWordSimilarity(katli_sorgu, 'arama_metni'),
+        )
+    else:
+        queryset = queryset.filter(kelime_eslesmesi).annotate(arama_skoru=skor)
+
+    queryset = queryset.order_by(F('arama_skoru').desc(), 'ad')
+    if limit:
+        queryset = queryset[:limit]
+    return queryset
+
+
+def urun_autocomplete(sorgu: str = '', sayfa: int = 1, sayfa_boyutu: int = 20) -> dict:
+    """
+    Ürün seçiciler için sayfalı arama sonucu döndürür.
+
+    Sorgu boşsa ürünler ad sırasıyla listelenir. COUNT sorgusu yapılmaz;
+    sonraki sayfanın varlığı bir fazla kayıt çekilerek anlaşılır. Stoklar
+    sayfadaki ürünler için tek sorguda hesaplanır. Sonuç kısa süreli cache'lenir.
+
+    Args:
+        sorgu: Arama metni
+        sayfa: Sayfa numarası (1'den başlar)
+        sayfa_boyutu: Sayfa başına kayıt sayısı
+
+    Returns:
+        {'sonuclar': [...], 'sayfa': int, 'sonraki_sayfa': bool}
+        Her sonuç: id, ad, barkod, birim, kategori, fiyat, alis_fiyati, kdv_orani, stok
+    """
+    anahtar = hashlib.md5(f"{turkce_katla(sorgu)}|{sorgu.strip()}|{sayfa}|{sayfa_boyutu}".encode('utf-8')).hexdigest()
+    cache_key = f"urun_autocomplete_{anahtar}"
+    sonuc = cache.get(cache_key)
+    if sonuc is not None:
+        return sonuc
+
+    queryset = Urun.objects.select_related('kategori').only(
+        'id', 'ad', 'barkod', 'birim', 'fiyat', 'alis_fiyati', 'kdv_orani', 'kategori__ad'
+    )
+    baslangic = (sayfa - 1) * sayfa_boyutu
+    urunler = list(urun_ara(sorgu, queryset)[baslangic:baslangic + sayfa_boyutu + 1])
+    sonraki_sayfa = len(urunler) > sayfa_boyutu
+    urunler = urunler[:sayfa_boyutu]
+    stoklar = urun_stok_miktarlari(urun.id for urun in urunler)
+
+    sonuc = {
+        'sonuclar': [{
+            'id': urun.id,
+            'ad': urun.ad,
+            'barkod': urun.barkod or '',
+            'birim': urun.birim,
+            'kategori': urun.kategori.ad if urun.kategori else '',
+            'fiyat': str(urun.fiyat),
+            'alis_fiyati': str(urun.alis_fiyati),
+            'kdv_orani': urun.kdv_orani,
+            'stok': stoklar[urun.id],
+        } for urun in urunler],
+        'sayfa': sayfa,
+        'sonraki_sayfa': sonraki_sayfa,
+    }
+    cache.set(cache_key, sonuc, getattr(settings, 'URUN_AUTOCOMPLETE_CACHE_TIMEOUT', 30))
+    return sonuc
@@ -0,0 +1,108 @@
+"""
+Ürün bilgileri için servis katmanı (wrapper).
+
+Fatura formu gibi ekranların ihtiyaç duyduğu fiyat, stok ve KDV bilgilerini
+birden fazla ürün için tek sorguda döndürür. Cari verilirse fiyatlar carinin
+fiyat listesine göre (fiyat_listesi_service) çözülür.
+"""
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Sum
+
+from stok.models import Urun
+from stoktakip.services.fiyat_listesi_service import efektif_fiyatlar
+
+TOPLU_URUN_BILGI_LIMIT = 500
+
+
+def urun_bilgileri_toplu(
+    urun_ids: Optional[Iterable[int]] = None,
+    barkodlar: Optional[Iterable[str]] = None,
+    cari_id: Optional[int] = None
+) -> dict:
+    """
+    Verilen ID ve barkodlara ait ürünlerin fiyat, stok ve KDV bilgilerini döndürür.
+
+    Ürünler ve stokları (giriş/çıkış toplamları) tek bir GROUP BY sorgusuyla
+    alınır; ürün başına sorgu yapılmaz.
+
+    Args:
+        urun_ids: Ürün ID'leri
+        barkodlar: Barkodlar
+        cari_id: Satış fiyatı çözülecek cari (opsiyonel)
+
+    Returns:
+        {'urunler': [...], 'bulunamayan_idler': [...], 'bulunamayan_barkodlar': [...]}
+        Her ürün: id, ad, barkod, birim, fiyat, standart_fiyat, fiyat_kaynagi,
+        alis_fiyati, kdv_orani, stok (istek sırası korunur, ID'ler önce gelir)
+    """
+    urun_ids = list(dict.fromkeys(urun_ids or []))
+    barkodlar = list(dict.fromkeys(b for b in (barkodlar or []) if b))
+    if not urun_ids and not barkodlar:
+        return {'urunler': [], 'bulunamayan_idler': [], 'bulunamayan_barkodlar': []}
+
+    filtre = Q()
+    if urun_ids:
+        filtre |= Q(id__in=urun_ids)
+    if barkodlar:
+        filtre |= Q(barkod__in=barkodlar)
+
+    satirlar = Urun.objects.filter(filtre).values(
+        'id', 'ad', 'barkod', 'birim', 'fiyat', 'alis_fiyati', 'kdv_orani'
+    ).annotate(
+        giris=Sum('stokhareketi__miktar', filter=Q(stokhareketi__islem_turu='giriş')),
+        cikis=Sum('stokhareketi__miktar', filter=Q(stokhareketi__islem_turu='çıkış')),
+    ).order_by()
+
+    satirlar = list(satirlar)
+    fiyatlar = efektif_fiyatlar(cari_id, {satir['id']: satir['fiyat'] for satir in satirlar})
+
+    id_ile = {}
+    barkod_ile = {}
+    for satir in satirlar:
+        fiyat = fiyatlar[satir['id']]
+        urun = {
+            'id': satir['id'],
+            'ad': satir['ad'],
+            'barkod': satir['barkod'] or '',
+            'birim': satir['birim'],
+            'fiyat': str(fiyat['fiyat']),
+            'standart_fiyat': str(satir['fiyat']),
+            'fiyat_kaynagi': fiyat['kaynak'],
+            'alis_fiyati': str(satir['alis_fiyati']),
+            'kdv_orani': satir['kdv_orani'],
+            'stok': (satir['giris'] or 0) - (satir['cikis'] or 0),
+        }
+        id_ile[urun['id']] = urun
+        if satir['barkod']:
+            barkod_ile[satir['barkod']] = urun
+
+    urunler = []
+    eklenenler = set()
+    for urun in [id_ile.get(urun_id) for urun_id in urun_ids] + [barkod_ile.get(b) for b in barkodlar]:
+        if urun and urun['id'] not in eklenenler:
+            eklenenler.add(urun['id'])
+            urunler.append(urun)
+
+    return {
+        'urunler': urunler,
+        'bulunamayan_idler': [urun_id for urun_id in urun_ids if urun_id not in id_ile],
+        'bulunamayan_barkodlar': [b for b in barkodlar if b not in barkod_ile],
+    }
+
+
+def icerik_etag(veri) -> str:
+    """
+    JSON'a çevrilebilir verinin içerik hash'inden ETag üretir.
+
+    Args:
+        veri: JSON'a çevrilebilir veri
+
+    Returns:
+        Tırnak içinde ETag değeri (ör. '"3f2a..."')
+    """
+    icerik = json.dumps(veri, sort_keys=True, cls=DjangoJSONEncoder).encode('utf-8')
+    return f'"{hashlib.md5(icerik).hexdigest()}"'
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "accounts",
@@ -68,13 +69,17 @@ except ImportError:
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "accounts.middleware.PerformansOlcumMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "accounts.middleware.OturumYenilemeMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.middleware.ProfilMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "accounts.middleware.RateLimitMiddleware",
+    "accounts.middleware.AuditLogMiddleware",
     "accounts.middleware.SecurityHeadersMiddleware",
 ]
 
@@ -90,6 +95,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "accounts.context_processors.yetkiler",
             ],
         },
     },
@@ -151,7 +157,10 @@ if not DEBUG:
 
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 saat
-SESSION_SAVE_EVERY_REQUEST = True
+# Oturum her istekte yazılmaz; süre, SESSION_COOKIE_AGE'in bu oranı geçtiğinde uzatılır
+# (accounts.middleware.OturumYenilemeMiddleware). Süresi dolan DB oturumları: oturumlari_temizle
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_YENILEME_ORANI = float(os.getenv('SESSION_YENILEME_ORANI', '0.1'))
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
 # Default primary key field type
@@ -207,6 +216,28 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', f"Stok Takip <{EMAIL_HOST_U
 
 # Error pages (urls.py'de tanımlı)
 
+# e-Fatura (UBL-TR) satıcı bilgileri - .env içinde firma bilgileriyle doldurulmalı
+EFATURA_SATICI = {
+    'unvan': os.getenv('EFATURA_UNVAN', 'Stok Takip'),
+    'vkn': os.getenv('EFATURA_VKN', ''),
+    'vergi_dairesi': os.getenv('EFATURA_VERGI_DAIRESI', ''),
+    'adres': os.getenv('EFATURA_ADRES', ''),
+    'ilce': os.getenv('EFATURA_ILCE', ''),
+    'sehir': os.getenv('EFATURA_SEHIR', ''),
+    'telefon': os.getenv('EFATURA_TELEFON', ''),
+    'email': os.getenv('EFATURA_EMAIL', ''),
+}
+EFATURA_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # Üretilen XML içerik hash'i ile 1 hafta cache'lenir
+
+# Audit log kayıtları commit sonrası toplu ve eşzamanlı yazılır. True ise yazma süreç içi bir arka plan
+# iş parçacığına bırakılır: süreç öldürülürse (SIGKILL, OOM, worker timeout) kuyruktaki kayıtlar kaybolur.
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', 'False').lower() == 'true'
+# Canlı tabloda tutulan ay sayısı; daha eskiler audit_log_arsivle komutuyla gzip'li JSONL arşive taşınır
+AUDIT_LOG_SAKLAMA_AY = int(os.getenv('AUDIT_LOG_SAKLAMA_AY', '12'))
+AUDIT_LOG_ARSIV_DIZINI = os.getenv('AUDIT_LOG_ARSIV_DIZINI', str(BASE_DIR / 'arsiv' / 'audit_log'))
+# Tarih filtresi verilmediğinde audit log listesi son N günü gösterir
+AUDIT_LOG_VARSAYILAN_GUN = 30
+
 # Cache Configuration (Redis)
 # Redis bağlantısını test et, yoksa LocMemCache kullan
 REDIS_AVAILABLE = False
@@ -248,6 +279,49 @@ else:
     # Session normal session backend kullan (Redis yoksa)
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
+# Kullanıcı rol / izin / cari bağlantısı cache süresi (saniye); değişikliklerde damga ile geçersiz kılınır.
+# Yalnızca paylaşımlı cache (Redis) ile kullanılır: LocMemCache'te damga sadece değişikliği yapan worker'da
+# artacağından, geri alınan yetki diğer worker'larda bu süre boyunca geçerli kalırdı. Redis yoksa yetkiler
+# istek başına bir kez veritabanından okunur (accounts/services/yetki_service.py).
+YETKI_CACHE_TIMEOUT = 3600
+
+# Cari fiyat listesi (liste, ürün) sonuçlarının cache süresi (saniye); değişikliklerde damga ile geçersiz kılınır.
+# Damga yalnızca paylaşımlı cache'te (Redis) tüm worker'lara ulaşır; LocMemCache ile kısa süre kullanılır.
+FIYAT_LISTESI_CACHE_TIMEOUT = 3600
+FIYAT_LISTESI_YEREL_CACHE_TIMEOUT = 5
+
+# İstek performans ölçümü (accounts.middleware.PerformansOlcumMiddleware, /metrics)
+PERFORMANS_OLCUMU = os.getenv('PERFORMANS_OLCUMU', 'True').lower() == 'true'
+# Aynı sorgu kalıbı bir istekte bu kadar çalışırsa N+1 adayı sayılır
+PERFORMANS_N1_ESIGI = 5
+# View adına göre sorgu bütçeleri; aşılırsa uyarı loglanır
+PERFORMANS_VARSAYILAN_SORGU_BUTCESI = 50
+PERFORMANS_SORGU_BUTCELERI = {
+    'raporlar:dashboard': 40,
+    'cari:index': 15,
+    'stok:index': 15,
+    'fatura:index': 15,
+}
+# Bu süreyi (ms) aşan sorgular kalıp bazında yavaş sorgu kaydına yazılır; 0 kapatır
+YAVAS_SORGU_ESIGI_MS = int(os.getenv('YAVAS_SORGU_ESIGI_MS', '200'))
+# /metrics için Bearer token (Prometheus); tanımlı değilse yalnızca personel erişebilir
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# İstek üzerine profil çıkarma (accounts.middleware.ProfilMiddleware): personel ?_profil=1 veya
+# X-Stoktakip-Profil başlığıyla ister; tüm kullanıcılar için PROFIL_PENCERE saniyede en fazla PROFIL_LIMITI profil
+PROFIL_ETKIN = os.getenv('PROFIL_ETKIN', 'True').lower() == 'true'
+PROFIL_LIMITI = 20
+PROFIL_PENCERE = 3600
+PROFIL_TOKEN_SURESI = 3600
+PROFIL_SAKLAMA_SAYISI = 100
+PROFIL_DIZINI = os.getenv('PROFIL_DIZINI', str(BASE_DIR / 'profiller'))
+
+# Ürün seçici (autocomplete) sonuçları kısa süreli cache'lenir (saniye)
+URUN_AUTOCOMPLETE_CACHE_TIMEOUT = 30
+
+# Barkod indeksinde hatırlanan bilinmeyen barkod sayısı (worker başına, en son okutulanlar tutulur)
+BARKOD_INDEX_BILINMEYEN_LIMITI = 10000
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -296,5 +370,7 @@ LOGGING = {
 }
 
 # Rate Limiting
-RATELIMIT_ENABLE = True
+RATELIMIT_ENABLE = os.getenv('RATELIMIT_ENABLE', 'True').lower() == 'true'
 RATELIMIT_USE_CACHE = 'default'
+# Yol önekine göre kayan pencere kuralları RATELIMIT_KURALLARI ile değiştirilebilir; tanımlanmazsa
+# accounts/services/rate_limit_service.py içindeki VARSAYILAN_KURALLAR (giriş POST'u ve API önekleri) kullanılır.
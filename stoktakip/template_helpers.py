@@ -34,11 +34,51 @@ def generate_table_html(headers: Sequence[str], rows: Sequence[Sequence[str]]) -
     )
 
 
+def _format_count(value: int) -> str:
+    return f"{value:,}".replace(",", ".")
+
+
+def _keyset_pagination_html(page_obj, params: dict, base_path: str) -> str:
+    """
+    Keyset sayfası için İlk / Önceki / Sonraki bağlantıları üretir.
+
+    Toplam kayıt sayısı kesin değilse yaklaşık olarak gösterilir.
+    """
+    from stoktakip.pagination import IMLEC_PARAMETRESI
+
+    params = {k: v for k, v in params.items() if k not in ("page", IMLEC_PARAMETRESI)}
+
+    def cursor_link(cursor, label: str, disabled: bool = False) -> str:
+        query = params | ({IMLEC_PARAMETRESI: cursor} if cursor else {})
+        href = f"{base_path}?{urlencode(query)}" if query else base_path
+        cls = "page-item disabled" if disabled else "page-item"
+        return f"<li class='{cls}'><a class='page-link' href='{href}'>{label}</a></li>"
+
+    toplam, kesin = page_obj.paginator.toplam
+    toplam_str = _format_count(toplam) if kesin else f"~{_format_count(toplam)}"
+    items = [
+        cursor_link(None, "&laquo;", not page_obj.has_previous()),
+        cursor_link(page_obj.onceki_imlec, "&lsaquo; Önceki", not page_obj.has_previous()),
+        f"<li class='page-item active'><span class='page-link'>Sayfa {page_obj.number}</span></li>",
+        cursor_link(page_obj.sonraki_imlec, "Sonraki &rsaquo;", not page_obj.has_next()),
+    ]
+    return (
+        "<nav class='d-flex justify-content-center align-items-center gap-3'>"
+        f"<ul class='pagination mb-0'>{''.join(items)}</ul>"
+        f"<small class='text-muted'>{toplam_str} kayıt</small>"
+        "</nav>"
+    )
+
+
 def generate_pagination_html(page_obj, request_params: Mapping[str, str], base_path: str) -> str:
     """
     Basit sayfalama HTML'i üretir. Mevcut query parametrelerini korur.
+
+    KeysetPage verilirse sayfa numaraları yerine imleç bağlantıları üretilir.
     """
     params = {k: v for k, v in request_params.items() if v not in (None, "", [])}
+    if hasattr(page_obj, "sonraki_imlec"):
+        return _keyset_pagination_html(page_obj, params, base_path)
     items: list[str] = []
 
     def page_link(page_number: int, label: str, disabled: bool = False, active: bool = False) -> str:
@@ -1,6 +1,9 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import logout
 from django.contrib import messages
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
 
 
 def handler404(request, exception):
@@ -26,3 +29,19 @@ def custom_logout(request):
         logout(request)
         messages.success(request, 'Başarıyla çıkış yaptınız.')
     return redirect('login')
+
+
+def metrics(request):
+    """
+    Prometheus metrikleri (view bazında süre, DB süresi, sorgu, cache, N+1 sayaçları).
+
+    Authorization: Bearer <METRICS_TOKEN> ile veya personel oturumuyla erişilir.
+    """
+    from stoktakip.performans import prometheus_metni
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    yetki = request.META.get('HTTP_AUTHORIZATION', '')
+    token_gecerli = bool(token) and yetki.startswith('Bearer ') and constant_time_compare(yetki[7:].strip(), token)
+    if not token_gecerli and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(prometheus_metni(), content_type='text/plain; version=0.0.4; charset=utf-8')
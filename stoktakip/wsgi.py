@@ -5,3 +5,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "stoktakip.settings")
 
 application = get_wsgi_application()
+
+# Barkod okutma ekranları için süreç içi barkod indeksini ısıt
+try:
+    from stoktakip.services.barkod_index_service import barkod_index
+    barkod_index.isit()
+except Exception:
+    import logging
+    logging.getLogger(__name__).warning("Barkod indeksi ısıtılamadı; ilk okutmalarda doldurulacak.", exc_info=True)